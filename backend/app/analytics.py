@@ -0,0 +1,136 @@
+"""
+Analytics Module
+
+Alignment analytics (tasks and average fulfillment per core value) kept up
+to date from change events (see event_bus.py), instead of grouping the
+whole tasks table on every request. The counts are read from the database
+once when the subscriber starts; after that each event only adjusts the
+value(s) it touches.
+
+After each batch of events the subscriber also builds one small delta (the
+values and tasks that changed) and hands it to its listeners, so live
+dashboards (see live.py) share this one computation.
+"""
+
+import threading
+
+from . import config
+from . import event_bus
+
+_TASK_CHANGES = {
+    event_bus.TASK_CREATED: "created",
+    event_bus.FEEDBACK_RECORDED: "updated",
+    event_bus.TASK_UPDATED: "updated",
+    event_bus.TASK_DELETED: "deleted",
+}
+
+
+class AlignmentStats(event_bus.Subscriber):
+    """Same numbers as data_manager.get_alignment_stats(), maintained incrementally."""
+
+    name = "alignment_stats"
+
+    def __init__(self, max_task_ids=100):
+        self.max_task_ids = max_task_ids
+        self._lock = threading.Lock()
+        self._seq = 0
+        self._total = 0
+        self._counts = {}   # value name -> tasks aligned with it
+        self._sums = {}     # value name -> sum of their fulfillment scores (unrated counts as 0)
+        self._changed_values = set()
+        self._changed_tasks = {"created": [], "updated": [], "deleted": []}
+        self._listeners = []
+
+    def add_listener(self, callback):
+        """callback(delta) is called from the delivery thread after each batch that changed something."""
+        self._listeners.append(callback)
+
+    def remove_listener(self, callback):
+        if callback in self._listeners:
+            self._listeners.remove(callback)
+
+    def load(self, conn):
+        rows = conn.execute("""
+            SELECT v.value_name, COUNT(*), SUM(COALESCE(t.fulfillment_score, 0))
+            FROM task_entries t JOIN core_values v ON v.id = t.value_id
+            GROUP BY t.value_id
+        """).fetchall()
+        total = conn.execute("SELECT COUNT(*) FROM task_entries").fetchone()[0]
+        with self._lock:
+            self._seq = event_bus.head(conn)
+            self._total = total
+            self._counts = {name: count for name, count, _ in rows}
+            self._sums = {name: score_sum for name, _, score_sum in rows}
+
+    def _add(self, value_name, score, sign):
+        if value_name is None:
+            return
+        self._changed_values.add(value_name)
+        count = self._counts.get(value_name, 0) + sign
+        if count:
+            self._counts[value_name] = count
+            self._sums[value_name] = self._sums.get(value_name, 0) + sign * (score or 0)
+        else:
+            self._counts.pop(value_name, None)
+            self._sums.pop(value_name, None)
+
+    def handle(self, event):
+        payload = event.payload
+        with self._lock:
+            self._seq = event.seq
+            if event.type == event_bus.TASK_CREATED:
+                self._total += 1
+                self._add(payload["aligned_value"], payload["fulfillment_score"], 1)
+            elif event.type in (event_bus.FEEDBACK_RECORDED, event_bus.TASK_UPDATED):
+                previous = payload["previous"]
+                self._add(previous["aligned_value"], previous["fulfillment_score"], -1)
+                self._add(payload["aligned_value"], payload["fulfillment_score"], 1)
+            elif event.type == event_bus.TASK_DELETED:
+                self._total -= 1
+                self._add(payload["aligned_value"], payload["fulfillment_score"], -1)
+            change = _TASK_CHANGES.get(event.type)
+            if change:
+                self._changed_tasks[change].append(payload["task_id"])
+
+    def flush(self):
+        with self._lock:
+            if not self._changed_values and not any(self._changed_tasks.values()):
+                return
+            delta = self._delta()
+            self._changed_values = set()
+            self._changed_tasks = {"created": [], "updated": [], "deleted": []}
+        for listener in list(self._listeners):
+            listener(delta)
+
+    def _delta(self):
+        # Values carry their current totals rather than increments, so applying
+        # a delta twice (or one already covered by a snapshot) is harmless
+        changed = sorted(self._changed_values)
+        tasks = {}
+        for change, ids in self._changed_tasks.items():
+            tasks[change] = ids[-self.max_task_ids:]
+        return {
+            "seq": self._seq,
+            "total_tasks": self._total,
+            "values": [self._breakdown_row(name) for name in changed if name in self._counts],
+            "removed_values": [name for name in changed if name not in self._counts],
+            "tasks": tasks,
+            # Too many task ids to list: reload the task list instead
+            "tasks_truncated": any(len(ids) > self.max_task_ids for ids in self._changed_tasks.values()),
+        }
+
+    def _breakdown_row(self, name):
+        count = self._counts[name]
+        return {"value_name": name, "task_count": count, "avg_fulfillment": self._sums[name] / count}
+
+    def get(self):
+        """Returns (total_tasks, breakdown) like data_manager.get_alignment_stats()."""
+        return self.snapshot()[1:]
+
+    def snapshot(self):
+        """Returns (seq, total_tasks, breakdown): the stats as of outbox event `seq`."""
+        with self._lock:
+            return self._seq, self._total, [self._breakdown_row(name) for name in sorted(self._counts)]
+
+
+alignment_stats = AlignmentStats(max_task_ids=config.LIVE_MAX_TASK_IDS)
@@ -0,0 +1,224 @@
+"""
+Audio Preprocessing Module
+
+Voice plans are uploaded as whatever the browser or Streamlit recorded,
+usually long, uncompressed WAV files. Gemini only needs mono speech at 16 kHz,
+so before uploading we:
+
+1. Read the upload in chunks (with a hard size cap).
+2. Detect the real container format from its magic bytes.
+3. For PCM WAV: downmix to mono, resample to 16 kHz, trim leading/trailing
+   silence and cap the duration, then re-encode as 16-bit WAV.
+4. Other formats (mp3, ogg, flac, ...) are already compressed and are passed
+   through unchanged, but labelled with their real MIME type.
+
+numpy is imported by the decoding helpers on first use rather than at module
+import, which keeps it off the API's startup path.
+"""
+
+from __future__ import annotations
+
+import io
+import logging
+import wave
+from dataclasses import dataclass
+from typing import TYPE_CHECKING, Optional
+
+from . import config
+
+if TYPE_CHECKING:
+    import numpy as np
+
+logger = logging.getLogger(__name__)
+
+UPLOAD_CHUNK_SIZE = 64 * 1024
+
+
+class AudioTooLargeError(ValueError):
+    """Raised when an upload is bigger than config.AUDIO_MAX_UPLOAD_BYTES."""
+
+
+class UnsupportedAudioError(ValueError):
+    """Raised when the upload is not an audio format Gemini understands."""
+
+
+@dataclass
+class ProcessedAudio:
+    data: bytes
+    mime_type: str
+    original_bytes: int
+    duration_seconds: Optional[float] = None
+
+    @property
+    def bytes_saved(self) -> int:
+        return self.original_bytes - len(self.data)
+
+
+async def read_upload(upload_file, max_bytes: int = None) -> bytes:
+    """
+    Reads an UploadFile into memory in fixed-size chunks. The size limit is
+    checked after every chunk (and up front when the upload's size is
+    known), so at most max_bytes plus one chunk is ever held; the payload
+    itself is not streamed, preprocess() needs all of it.
+    """
+    max_bytes = max_bytes or config.AUDIO_MAX_UPLOAD_BYTES
+    too_large = AudioTooLargeError(f"Audio upload exceeds the {max_bytes // (1024 * 1024)} MB limit.")
+    if (getattr(upload_file, "size", None) or 0) > max_bytes:
+        raise too_large
+    buffer = bytearray()
+    while True:
+        chunk = await upload_file.read(UPLOAD_CHUNK_SIZE)
+        if not chunk:
+            break
+        buffer.extend(chunk)
+        if len(buffer) > max_bytes:
+            raise too_large
+    return bytes(buffer)
+
+
+def detect_format(data: bytes) -> Optional[str]:
+    """Returns the MIME type of an audio payload based on its magic bytes."""
+    head = data[:12]
+    if head[:4] == b"RIFF" and head[8:12] == b"WAVE":
+        return "audio/wav"
+    if head[:4] == b"FORM" and head[8:12] in (b"AIFF", b"AIFC"):
+        return "audio/aiff"
+    if head[:4] == b"OggS":
+        return "audio/ogg"
+    if head[:4] == b"fLaC":
+        return "audio/flac"
+    if head[:3] == b"ID3" or (len(head) >= 2 and head[0] == 0xFF and (head[1] & 0xE0) == 0xE0):
+        # MP3 files start with an ID3 tag or directly with an MPEG frame sync.
+        # ADTS AAC shares the sync word but sets layer bits to 00.
+        if head[:3] != b"ID3" and (head[1] & 0x06) == 0:
+            return "audio/aac"
+        return "audio/mp3"
+    if head[4:8] == b"ftyp":
+        return "audio/mp4"
+    if head[:4] == b"\x1a\x45\xdf\xa3":
+        return "audio/webm"
+    return None
+
+
+def _decode_wav(data: bytes):
+    """Decodes a PCM WAV file into a (frames, channels) float32 array and its rate."""
+    import numpy as np
+
+    with wave.open(io.BytesIO(data), "rb") as wav:
+        channels = wav.getnchannels()
+        sample_width = wav.getsampwidth()
+        sample_rate = wav.getframerate()
+        frames = wav.readframes(wav.getnframes())
+
+    if sample_width == 1:
+        # 8-bit WAV is unsigned
+        samples = (np.frombuffer(frames, dtype=np.uint8).astype(np.float32) - 128.0) / 128.0
+    elif sample_width == 2:
+        samples = np.frombuffer(frames, dtype="<i2").astype(np.float32) / 32768.0
+    elif sample_width == 3:
+        raw = np.frombuffer(frames, dtype=np.uint8).reshape(-1, 3)
+        ints = (raw[:, 0].astype(np.int32)
+                | (raw[:, 1].astype(np.int32) << 8)
+                | (raw[:, 2].astype(np.int32) << 16))
+        ints = np.where(ints & 0x800000, ints - 0x1000000, ints)
+        samples = ints.astype(np.float32) / 8388608.0
+    elif sample_width == 4:
+        samples = np.frombuffer(frames, dtype="<i4").astype(np.float32) / 2147483648.0
+    else:
+        raise UnsupportedAudioError(f"Unsupported WAV sample width: {sample_width}")
+
+    usable = len(samples) - len(samples) % channels
+    return samples[:usable].reshape(-1, channels), sample_rate
+
+
+def _resample(samples: np.ndarray, source_rate: int, target_rate: int) -> np.ndarray:
+    """Linear-interpolation resampler with a box-filter low-pass when downsampling."""
+    import numpy as np
+
+    if source_rate == target_rate or len(samples) == 0:
+        return samples
+    ratio = source_rate / target_rate
+    if ratio > 1:
+        width = int(np.ceil(ratio))
+        kernel = np.ones(width, dtype=np.float32) / width
+        samples = np.convolve(samples, kernel, mode="same")
+    target_length = int(len(samples) / ratio)
+    positions = np.arange(target_length, dtype=np.float64) * ratio
+    return np.interp(positions, np.arange(len(samples)), samples).astype(np.float32)
+
+
+def _trim_silence(samples: np.ndarray, sample_rate: int) -> np.ndarray:
+    """Cuts leading and trailing frames whose RMS is below the silence threshold."""
+    import numpy as np
+
+    frame = max(1, int(sample_rate * 0.02))  # 20 ms frames
+    n_frames = len(samples) // frame
+    if n_frames == 0:
+        return samples
+
+    framed = samples[:n_frames * frame].reshape(n_frames, frame)
+    rms = np.sqrt(np.mean(framed ** 2, axis=1))
+    voiced = np.nonzero(rms > config.AUDIO_SILENCE_THRESHOLD)[0]
+    if len(voiced) == 0:
+        return samples[:0]
+
+    # Keep a little padding so words are not clipped
+    pad = int(sample_rate * 0.2)
+    start = max(0, voiced[0] * frame - pad)
+    end = min(len(samples), (voiced[-1] + 1) * frame + pad)
+    return samples[start:end]
+
+
+def _encode_wav(samples: np.ndarray, sample_rate: int) -> bytes:
+    """Encodes mono float samples as a 16-bit PCM WAV file."""
+    import numpy as np
+
+    pcm = (np.clip(samples, -1.0, 1.0) * 32767.0).astype("<i2")
+    out = io.BytesIO()
+    with wave.open(out, "wb") as wav:
+        wav.setnchannels(1)
+        wav.setsampwidth(2)
+        wav.setframerate(sample_rate)
+        wav.writeframes(pcm.tobytes())
+    return out.getvalue()
+
+
+def preprocess(data: bytes) -> ProcessedAudio:
+    """
+    Shrinks an audio payload to what the model needs.
+
+    Returns a ProcessedAudio with the bytes to upload, their real MIME type,
+    and the original size so callers can report how much was saved.
+    """
+    mime_type = detect_format(data)
+    if mime_type is None:
+        raise UnsupportedAudioError("Unrecognized audio format.")
+
+    if mime_type != "audio/wav":
+        # Compressed formats are already small and we have no decoder for them
+        return ProcessedAudio(data=data, mime_type=mime_type, original_bytes=len(data))
+
+    try:
+        samples, sample_rate = _decode_wav(data)
+    except (wave.Error, EOFError) as e:
+        # e.g. IEEE-float or ADPCM WAV files, which the wave module can't read
+        logger.warning("Could not decode WAV, sending as-is", extra={"event": "audio_decode_failed", "error": str(e)})
+        return ProcessedAudio(data=data, mime_type=mime_type, original_bytes=len(data))
+
+    target_rate = config.AUDIO_TARGET_SAMPLE_RATE
+    mono = samples.mean(axis=1) if samples.shape[1] > 1 else samples[:, 0]
+    mono = _resample(mono, sample_rate, target_rate)
+    mono = _trim_silence(mono, target_rate)
+    mono = mono[:int(config.AUDIO_MAX_SECONDS * target_rate)]
+
+    encoded = _encode_wav(mono, target_rate)
+    if len(encoded) >= len(data):
+        # Already as compact as we can make it
+        encoded = data
+
+    return ProcessedAudio(
+        data=encoded,
+        mime_type=mime_type,
+        original_bytes=len(data),
+        duration_seconds=round(len(mono) / target_rate, 2)
+    )
@@ -0,0 +1,152 @@
+"""
+Batch Scheduling Module
+
+Free time for many calendars at once, for nightly precomputation (free slots
+and recommendations for every user) rather than one request at a time.
+
+scheduler.get_free_slots() walks one calendar's events in Python from "now".
+Here each calendar's day window is a row of a boolean occupancy matrix at
+minute resolution:
+
+- Busy intervals are written for all rows at once: +1 at each start minute
+  and -1 at each end minute (one bincount), then a cumulative sum marks
+  every busy minute. Each row's marks cancel out, so one cumsum over the
+  flattened matrix serves every row.
+- Free runs are found for all rows at once: np.diff on the flattened matrix
+  is True wherever busy turns free or free turns busy, and np.flatnonzero
+  lists those edges in order. Every row starts and ends with a busy padding
+  column, so the edges pair up as (run start, run end) within one row.
+
+Calendars are processed BATCH_CHUNK_USERS rows at a time, so memory stays
+bounded however many there are.
+
+    calendars = [user_a_busy, user_b_busy, ...]   # {"start", "end"} ISO strings each
+    slots = batch_scheduler.free_slots(calendars, day=tomorrow)
+"""
+
+import datetime
+
+import numpy as np
+
+from . import config
+
+MINUTES_PER_DAY = 24 * 60
+
+
+def _minute(hhmm):
+    hour, minute = (int(part) for part in hhmm.split(":"))
+    return hour * 60 + minute
+
+
+def busy_minutes(calendars, day=None):
+    """
+    Flattens busy intervals ({"start", "end"} ISO strings, as returned by
+    calendar_service.get_todays_busy() or get_todays_events()) into three int
+    arrays: calendar index, start minute and end minute. Minutes count from
+    midnight of `day` (default today) in each event's own UTC offset, so every
+    calendar is planned in its owner's local time. Partial minutes count as busy.
+    """
+    ordinal = (day or datetime.date.today()).toordinal()
+    # Events sit on a few round times, so most timestamps repeat across calendars
+    parsed = {}
+
+    def minutes(text):
+        moment = datetime.datetime.fromisoformat(text)
+        floor = (moment.toordinal() - ordinal) * MINUTES_PER_DAY + moment.hour * 60 + moment.minute
+        parsed[text] = floor, floor + (moment.second > 0 or moment.microsecond > 0)
+        return parsed[text]
+
+    intervals = [interval for calendar in calendars for interval in calendar]
+    starts = [(parsed.get(interval["start"]) or minutes(interval["start"]))[0] for interval in intervals]
+    ends = [(parsed.get(interval["end"]) or minutes(interval["end"]))[1] for interval in intervals]
+    users = np.repeat(np.arange(len(calendars), dtype=np.int64), [len(calendar) for calendar in calendars])
+    return users, np.array(starts, dtype=np.int64), np.array(ends, dtype=np.int64)
+
+
+def occupancy(users, starts, ends, n_users, day_start, day_end):
+    """
+    Boolean matrix (n_users x window minutes + 2), True where the calendar is
+    busy between minute `day_start` and `day_end`. The first and last column
+    are padding and always busy. Intervals may overlap or reach outside the window.
+    """
+    width = day_end - day_start
+    stride = width + 2
+    starts = np.clip(starts - day_start, 0, width)
+    ends = np.clip(ends - day_start, 0, width)
+    keep = ends > starts
+    # Column 0 is padding; an interval ending at the window's end puts its -1
+    # in the last (padding) column, still inside its own row
+    offsets = users[keep] * stride + 1
+    size = n_users * stride
+    edges = (np.bincount(offsets + starts[keep], minlength=size)
+             - np.bincount(offsets + ends[keep], minlength=size))
+    busy = (np.cumsum(edges) != 0).reshape(n_users, stride)
+    busy[:, 0] = True
+    busy[:, -1] = True
+    return busy
+
+
+def free_runs(busy, min_minutes):
+    """
+    Free runs longer than `min_minutes` in every row of an occupancy() matrix,
+    as three arrays (row, first free minute, minute the run ends), in row
+    order. Minutes count from the start of the window.
+    """
+    stride = busy.shape[1]
+    edges = np.flatnonzero(np.diff(busy.ravel()))
+    # Edge i sits just before a run's first free column (i % stride, minus
+    # the padding column) and edge j on its last one, making j % stride the
+    # run's exclusive end
+    run_starts, run_ends = edges[0::2], edges[1::2]
+    rows = run_starts // stride
+    run_starts = run_starts - rows * stride
+    run_ends = run_ends - rows * stride
+    keep = run_ends - run_starts > min_minutes
+    return rows[keep], run_starts[keep], run_ends[keep]
+
+
+def free_runs_for(users, starts, ends, n_users, day_start=None, day_end=None, min_minutes=None,
+                  chunk_size=None):
+    """
+    free_runs() over busy_minutes() output, BATCH_CHUNK_USERS calendars at a
+    time. Returns (calendar index, start minute, end minute) arrays with
+    minutes counted from midnight.
+    """
+    day_start = _minute(day_start or config.BATCH_DAY_START)
+    day_end = _minute(day_end or config.BATCH_DAY_END)
+    min_minutes = config.BATCH_MIN_SLOT_MINUTES if min_minutes is None else min_minutes
+    chunk_size = chunk_size or config.BATCH_CHUNK_USERS
+    order = np.argsort(users, kind="stable")
+    users, starts, ends = users[order], starts[order], ends[order]
+
+    found = []
+    for first in range(0, n_users, chunk_size):
+        last = min(first + chunk_size, n_users)
+        lo, hi = np.searchsorted(users, [first, last])
+        busy = occupancy(users[lo:hi] - first, starts[lo:hi], ends[lo:hi], last - first, day_start, day_end)
+        rows, run_starts, run_ends = free_runs(busy, min_minutes)
+        found.append((rows + first, run_starts + day_start, run_ends + day_start))
+    if not found:
+        empty = np.zeros(0, dtype=np.int64)
+        return empty, empty, empty
+    return tuple(np.concatenate(parts) for parts in zip(*found))
+
+
+def _label(minute):
+    return f"{minute // 60 % 24:02d}:{minute % 60:02d}"
+
+
+def free_slots(calendars, day=None, day_start=None, day_end=None, min_minutes=None):
+    """
+    Free slots for each calendar in `calendars` (lists of busy intervals), in
+    scheduler.get_free_slots()' format: one list of {"start", "end",
+    "duration_minutes"} per calendar. The window is day_start..day_end
+    ("HH:MM") instead of now until 22:00.
+    """
+    users, starts, ends = busy_minutes(calendars, day)
+    rows, run_starts, run_ends = free_runs_for(users, starts, ends, len(calendars), day_start, day_end, min_minutes)
+    labels = [_label(minute) for minute in range(MINUTES_PER_DAY + 1)]
+    result = [[] for _ in calendars]
+    for row, start, end in zip(rows.tolist(), run_starts.tolist(), run_ends.tolist()):
+        result[row].append({"start": labels[start], "end": labels[end], "duration_minutes": end - start})
+    return result
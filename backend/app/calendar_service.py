@@ -1,23 +1,36 @@
 import datetime
+import logging
 import os
-from google.oauth2.credentials import Credentials
-from googleapiclient.discovery import build
-from google.auth.transport.requests import Request
+import threading
+import time
+
+from . import config
+from . import jobs
+from . import metrics
+from . import profiling
+from . import shared_state
+
+logger = logging.getLogger(__name__)
 
 # Define scopes (must match what we used in setup)
 # Define scopes (must match what we used in setup)
 SCOPES = ['https://www.googleapis.com/auth/calendar']
+# We assume the token is in the 'backend' folder relative to where we run the script
+TOKEN_PATH = os.path.join("backend", "token.json")
 
 def get_calendar_service():
     """Authenticates and returns the Google Calendar service object."""
+    # The Google client libraries take a while to import; load them on first use
+    from google.oauth2.credentials import Credentials
+    from googleapiclient.discovery import build
+    from google.auth.transport.requests import Request
+
     creds = None
-    # We assume the token is in the 'backend' folder relative to where we run the script
-    token_path = os.path.join("backend", "token.json")
     
-    if os.path.exists(token_path):
-        creds = Credentials.from_authorized_user_file(token_path, SCOPES)
+    if os.path.exists(TOKEN_PATH):
+        creds = Credentials.from_authorized_user_file(TOKEN_PATH, SCOPES)
     else:
-        print(f"❌ Error: Could not find token.json at {token_path}")
+        logger.error("Could not find token.json", extra={"event": "calendar_no_token", "path": TOKEN_PATH})
         return None
     
     # Refresh token if expired
@@ -25,20 +38,183 @@ def get_calendar_service():
         if creds and creds.expired and creds.refresh_token:
             try:
                 creds.refresh(Request())
-            except Exception as e:
-                print(f"Error refreshing token: {e}")
+            except Exception:
+                logger.exception("Error refreshing token", extra={"event": "calendar_token_refresh_failed"})
                 return None
         else:
-            print("Token invalid and cannot be refreshed.")
+            logger.error("Token invalid and cannot be refreshed.", extra={"event": "calendar_token_invalid"})
             return None
             
     return build('calendar', 'v3', credentials=creds)
 
+# --- Today's Calendar Cache ---
+# /calendar/today needs today's events; /scheduler/free and every planner call
+# only need the busy intervals (see get_todays_busy). Keep both for
+# CALENDAR_CACHE_TTL_SECONDS instead of asking Google each time; add_event()
+# clears them so new events show up right away.
+# With several workers the cache lives in shared_state, so one worker's fetch
+# (and one worker's add_event) counts for all of them.
+_CACHE_KINDS = ("events", "busy")
+_caches = {kind: {"day": None, "expires": 0.0, "value": None} for kind in _CACHE_KINDS}
+_cache_lock = threading.Lock()
+
+def _shared_cache_key(kind, day):
+    return f"calendar_{kind}:{day.isoformat()}"
+
+def clear_events_cache():
+    if config.WORKER_MODE == "multi":
+        for kind in _CACHE_KINDS:
+            shared_state.cache_delete(_shared_cache_key(kind, datetime.date.today()))
+    with _cache_lock:
+        for cache in _caches.values():
+            cache["value"] = None
+
+def _cached(kind, day):
+    if config.WORKER_MODE == "multi":
+        return shared_state.cache_get(_shared_cache_key(kind, day))
+    with _cache_lock:
+        cache = _caches[kind]
+        if cache["value"] is not None and cache["day"] == day and time.monotonic() < cache["expires"]:
+            return list(cache["value"])
+    return None
+
+def _store(kind, day, value):
+    if config.WORKER_MODE == "multi":
+        shared_state.cache_set(_shared_cache_key(kind, day), value, config.CALENDAR_CACHE_TTL_SECONDS)
+        return
+    with _cache_lock:
+        _caches[kind].update(day=day, expires=time.monotonic() + config.CALENDAR_CACHE_TTL_SECONDS, value=value)
+
+def _get_cached(kind, fetch):
+    _note_read(kind)
+    today = datetime.date.today()
+    value = _cached(kind, today)
+    if value is not None:
+        metrics.CALENDAR_CACHE_HITS.inc()
+        return value
+
+    metrics.CALENDAR_CACHE_MISSES.inc()
+    value = fetch()
+    if value is not None:
+        _store(kind, today, value)
+    return list(value or [])
+
+@profiling.profiled()
 def get_todays_events():
-    """Fetches events for the current day."""
+    """Fetches events for the current day (cached for a short while)."""
+    return _get_cached("events", _fetch_todays_events)
+
+@profiling.profiled()
+def get_todays_busy():
+    """
+    Today's busy intervals ({"start", "end"} in local time, sorted, overlaps
+    merged) across config.CALENDAR_BUSY_CALENDARS, cached for a short while.
+    For callers that don't need event titles; much less to download than
+    get_todays_events().
+    """
+    return _get_cached("busy", _fetch_todays_busy)
+
+# --- Background Refresh ---
+# While the calendar is in use, a background job refetches what was read
+# shortly before the cached copy expires, so requests keep hitting the cache
+# instead of one of them waiting for Google every CALENDAR_CACHE_TTL_SECONDS.
+# "In use" is tracked coarsely (at most one update a minute per worker).
+_last_read = {kind: 0.0 for kind in _CACHE_KINDS}
+# Looked up when called, so a stubbed fetch function (benchmarks) is used too
+_FETCHERS = {"events": lambda: _fetch_todays_events(), "busy": lambda: _fetch_todays_busy()}
+
+def _note_read(kind):
+    now = time.time()
+    if now - _last_read[kind] < 60:
+        return
+    _last_read[kind] = now
+    if config.WORKER_MODE == "multi":
+        shared_state.cache_set(f"calendar_last_read:{kind}", now, config.CALENDAR_REFRESH_IDLE_SECONDS)
+
+def _recently_read(kind):
+    if config.WORKER_MODE == "multi":
+        return shared_state.cache_get(f"calendar_last_read:{kind}") is not None
+    return time.time() - _last_read[kind] < config.CALENDAR_REFRESH_IDLE_SECONDS
+
+def refresh_todays_events():
+    """Refetches today's events and/or busy intervals into the cache. Returns a summary for GET /jobs."""
+    if not os.path.exists(TOKEN_PATH):
+        return "skipped: calendar not connected"
+    kinds = [kind for kind in _CACHE_KINDS if _recently_read(kind)]
+    if not kinds:
+        return "skipped: calendar not used recently"
+    refreshed = []
+    for kind in kinds:
+        value = _FETCHERS[kind]()
+        if value is None:
+            raise RuntimeError(f"Could not fetch today's {kind} from Google")
+        _store(kind, datetime.date.today(), value)
+        refreshed.append(f"{len(value)} {kind}")
+    return ", ".join(refreshed) + " cached"
+
+jobs.runner.register(jobs.Job(
+    "calendar_refresh", refresh_todays_events,
+    interval=config.CALENDAR_CACHE_TTL_SECONDS - config.CALENDAR_REFRESH_MARGIN_SECONDS,
+    jitter=config.CALENDAR_REFRESH_MARGIN_SECONDS / 5, lease=60.0,
+    description="Refetches today's calendar events and busy times before the cached copy expires",
+))
+
+def _local_day_bounds():
+    """Start and end of today in local time, as RFC 3339 strings."""
+    now = datetime.datetime.now().astimezone()
+    start = now.replace(hour=0, minute=0, second=0, microsecond=0)
+    return start.isoformat(), (start + datetime.timedelta(days=1)).isoformat()
+
+@profiling.profiled("calendar_service.freebusy_from_google")
+def _fetch_todays_busy():
+    """Asks Google's FreeBusy endpoint for today's busy intervals. Returns None if the call failed."""
+    service = get_calendar_service()
+    if not service:
+        return None
+
+    time_min, time_max = _local_day_bounds()
+    try:
+        # One call covers every calendar; the reply holds only start/end pairs
+        with metrics.CALENDAR_API_LATENCY.time(call="freebusy.query"):
+            result = service.freebusy().query(body={
+                "timeMin": time_min,
+                "timeMax": time_max,
+                "items": [{"id": calendar_id} for calendar_id in config.CALENDAR_BUSY_CALENDARS],
+            }).execute()
+    except Exception:
+        logger.exception("Calendar FreeBusy error", extra={"event": "calendar_freebusy_failed"})
+        return None
+
+    intervals = []
+    for calendar_id, calendar in result.get("calendars", {}).items():
+        if calendar.get("errors"):
+            # e.g. a calendar that isn't shared with us; the others still count
+            logger.warning("FreeBusy could not read a calendar", extra={
+                "event": "calendar_freebusy_partial", "calendar": calendar_id, "errors": calendar["errors"]
+            })
+        for busy in calendar.get("busy", []):
+            # Google answers in UTC; slots are shown in local time
+            intervals.append((
+                datetime.datetime.fromisoformat(busy["start"].replace("Z", "+00:00")).astimezone(),
+                datetime.datetime.fromisoformat(busy["end"].replace("Z", "+00:00")).astimezone(),
+            ))
+    return _merge_intervals(intervals)
+
+def _merge_intervals(intervals):
+    merged = []
+    for start, end in sorted(intervals):
+        if merged and start <= merged[-1][1]:
+            merged[-1][1] = max(merged[-1][1], end)
+        else:
+            merged.append([start, end])
+    return [{"start": start.isoformat(), "end": end.isoformat()} for start, end in merged]
+
+@profiling.profiled("calendar_service.fetch_from_google")
+def _fetch_todays_events():
+    """Asks Google for today's events. Returns None if the call failed."""
     service = get_calendar_service()
     if not service:
-        return []
+        return None
     
     # Get start and end of today
     now = datetime.datetime.now()
@@ -47,13 +223,14 @@ def get_todays_events():
     end_of_day = now.replace(hour=23, minute=59, second=59, microsecond=0).isoformat() + 'Z'
     
     try:
-        events_result = service.events().list(
-            calendarId='primary', 
-            timeMin=start_of_day,
-            timeMax=end_of_day,
-            singleEvents=True,
-            orderBy='startTime'
-        ).execute()
+        with metrics.CALENDAR_API_LATENCY.time(call="events.list"):
+            events_result = service.events().list(
+                calendarId='primary', 
+                timeMin=start_of_day,
+                timeMax=end_of_day,
+                singleEvents=True,
+                orderBy='startTime'
+            ).execute()
         
         events = events_result.get('items', [])
         
@@ -71,10 +248,11 @@ def get_todays_events():
             })
             
         return clean_events
-    except Exception as e:
-        print(f"API Error: {e}")
-        return []
+    except Exception:
+        logger.exception("Calendar API error", extra={"event": "calendar_list_failed"})
+        return None
 
+@profiling.profiled()
 def add_event(summary, start_time, end_time):
     """
     Adds an event to the primary calendar.
@@ -97,9 +275,11 @@ def add_event(summary, start_time, end_time):
     }
 
     try:
-        event = service.events().insert(calendarId='primary', body=event).execute()
-        print(f"Event created: {event.get('htmlLink')}")
+        with metrics.CALENDAR_API_LATENCY.time(call="events.insert"):
+            event = service.events().insert(calendarId='primary', body=event).execute()
+        clear_events_cache()
+        logger.info("Event created", extra={"event": "calendar_event_created", "link": event.get('htmlLink')})
         return event
-    except Exception as e:
-        print(f"An error occurred: {e}")
+    except Exception:
+        logger.exception("Could not create calendar event", extra={"event": "calendar_insert_failed"})
         return None
\ No newline at end of file
@@ -21,4 +21,143 @@ COLUMNS = [
 NUDGE_THRESHOLDS = {
     "strong": 0.4,  # Probability below this triggers a strong nudge
     "medium": 0.7   # Probability below this triggers a medium nudge
-}
\ No newline at end of file
+}
+
+# --- AUDIO PREPROCESSING ---
+# Voice uploads are downmixed, resampled and trimmed before going to Gemini
+AUDIO_TARGET_SAMPLE_RATE = 16000          # Hz, plenty for speech
+AUDIO_MAX_SECONDS = 180                   # Longer recordings are cut off
+AUDIO_MAX_UPLOAD_BYTES = 25 * 1024 * 1024 # Refuse uploads bigger than this
+AUDIO_SILENCE_THRESHOLD = 0.01            # RMS (0-1 full scale) below this counts as silence
+
+
+# --- LLM CLIENT ---
+# Limits and timeouts for calls to Gemini (see llm_client.py)
+LLM_MAX_CONCURRENCY = 4             # Gemini calls allowed in flight at once
+LLM_QUEUE_TIMEOUT = 5.0             # Seconds to wait for a free slot before giving up
+LLM_CALL_TIMEOUT = 30.0             # Deadline for a single attempt, in seconds
+LLM_MAX_RETRIES = 2                 # Extra attempts after a transient failure
+LLM_BACKOFF_BASE = 0.5              # Seconds; doubled on each retry (with jitter)
+LLM_BACKOFF_MAX = 8.0
+LLM_BREAKER_FAILURE_THRESHOLD = 5   # Consecutive failures that open the breaker
+LLM_BREAKER_RESET_SECONDS = 30.0    # How long the breaker stays open
+
+
+# --- GEMINI ---
+GEMINI_MODEL_NAME = 'gemini-2.0-flash'   # Supports multimodal (text + audio) input
+
+
+# --- LOCAL PLANNER FAST PATH ---
+# Plans parsed locally with at least this confidence skip the Gemini round trip
+LOCAL_PARSER_MIN_CONFIDENCE = 0.75
+
+
+# --- PLAN OPTIMIZER ---
+# Where planned tasks go in the free slots (see plan_optimizer.py)
+PLAN_OPTIMIZER_BUDGET_MS = 50       # Search time per plan; the best placement found so far is used after that
+PLAN_OPTIMIZER_STEP_MINUTES = 15    # Flexible tasks start on this grid, counted from each slot's start
+PLAN_DEFAULT_DURATION_MINUTES = 30  # For tasks Gemini couldn't give a duration for
+
+
+# --- FULFILLMENT MODEL ---
+# Trained models are published here and loaded by every worker instead of retraining
+# (see model_store.py and predictor.py)
+MODEL_DIR = os.path.join(DATA_DIR, "models")
+MODEL_WARMUP = os.getenv("PRAXABLE_MODEL_WARMUP", "background")  # "background", "eager" or "lazy"
+MODEL_POLL_SECONDS = 5.0            # How often each worker checks for a newer model version
+MODEL_KEEP_VERSIONS = 3             # Older model files are deleted
+MODEL_RETRAIN_AFTER_LABELS = 10     # Retrain in the background after this many new or changed fulfillment scores
+
+
+# --- FOLLOW-THROUGH MODEL ---
+# Chance that a planned task gets done, with a nudge from NUDGE_THRESHOLDS (see follow_through.py)
+FOLLOW_THROUGH_MIN_ROWS = 6         # Logged tasks (done and skipped) needed to train
+FOLLOW_THROUGH_RETRAIN_SECONDS = 60.0  # Requests on newer data ask for a retrain at most this often
+FOLLOW_THROUGH_MAX_TASKS = 500      # Most tasks scored per POST /predict/follow-through
+
+
+# --- WORKERS ---
+# "single": the data version (ETags) and caches live in process memory; fastest, one worker only.
+# "multi": they live in a shared SQLite file so every worker sees the same state (see shared_state.py).
+WORKER_MODE = os.getenv("PRAXABLE_WORKER_MODE", "single")
+SHARED_STATE_PATH = os.path.join(DATA_DIR, "shared_state.db")
+
+
+# --- WRITE QUEUE ---
+# Group commit: task writes that queue up together share one transaction and
+# one fsync (see write_queue.py). Off by default; every write then commits on its own.
+WRITE_QUEUE_ENABLED = os.getenv("PRAXABLE_WRITE_QUEUE", "0") == "1"
+WRITE_QUEUE_SIZE = 1000             # Writes waiting for the writer before new ones are turned away
+WRITE_QUEUE_BATCH_WINDOW = 0.0      # Extra seconds the writer waits for more writes to join a group
+                                    # (0: a group is whatever queued up during the previous commit)
+WRITE_QUEUE_MAX_BATCH = 256         # Most writes committed in one transaction
+WRITE_QUEUE_PUT_TIMEOUT = 1.0       # Seconds a caller waits for room before getting a 503
+
+
+# --- DELTA SYNC ---
+# GET/POST /sync for offline-first clients (see data_manager.get_changes)
+SYNC_PAGE_SIZE = 1000               # Default number of changed tasks/values per GET /sync
+SYNC_MAX_MUTATIONS = 500            # Most offline mutations accepted per POST /sync
+SYNC_IDEMPOTENCY_TTL_SECONDS = 30 * 24 * 3600  # How long a mutation's key is remembered
+
+
+# --- EVENT BUS ---
+# Change events from data_manager's writes, delivered to subscribers that keep
+# derived state up to date (see event_bus.py)
+EVENT_BUS_POLL_SECONDS = 1.0        # How often subscribers look for events written by other workers
+EVENT_BUS_BATCH_SIZE = 500          # Events read from the outbox at a time
+OUTBOX_RETENTION_SECONDS = 3600     # Delivered events are kept this long before being deleted
+
+
+# --- LIVE UPDATES ---
+# GET /analytics/stream pushes analytics deltas to dashboards (see live.py)
+LIVE_CLIENT_QUEUE_SIZE = 100        # Deltas buffered per client; a client that falls further behind gets a fresh snapshot
+LIVE_HEARTBEAT_SECONDS = 15.0       # Keep-alive comment sent to every client this often
+LIVE_MAX_TASK_IDS = 100             # Task ids listed per change type in one delta (more: tasks_truncated)
+
+
+# --- BACKGROUND JOBS ---
+# Retraining, calendar refreshes and database maintenance run by a scheduler
+# thread in each worker; the schedule and locks are shared (see jobs.py)
+JOBS_ENABLED = os.getenv("PRAXABLE_JOBS", "1") == "1"
+JOBS_POLL_SECONDS = 5.0             # How often each worker checks for due jobs
+MAINTENANCE_TIME = "03:30"          # Local time of the nightly ANALYZE and incremental vacuum
+MAINTENANCE_JITTER_SECONDS = 1800   # Random delay added to the nightly run
+VACUUM_PAGES_PER_STEP = 1000        # Free pages returned per incremental vacuum transaction
+
+
+# --- GOOGLE CALENDAR ---
+CALENDAR_CACHE_TTL_SECONDS = 60     # How long today's events are reused before asking Google again
+CALENDAR_REFRESH_MARGIN_SECONDS = 15  # A background job refetches them this long before they expire...
+CALENDAR_REFRESH_IDLE_SECONDS = 900   # ...as long as the calendar was used within this many seconds
+# Calendars whose busy times block free slots, all asked in one FreeBusy call (comma-separated ids)
+CALENDAR_BUSY_CALENDARS = os.getenv("PRAXABLE_BUSY_CALENDARS", "primary").split(",")
+
+
+# --- BATCH SCHEDULING ---
+# Free time for many calendars at once (see batch_scheduler.py)
+BATCH_DAY_START = "07:00"           # Planned day window, local time of each calendar
+BATCH_DAY_END = "22:00"             # Same end of day as scheduler.get_free_slots
+BATCH_MIN_SLOT_MINUTES = 15         # Gaps must be longer than this to count as a slot
+BATCH_CHUNK_USERS = 4096            # Calendars per occupancy matrix (bounds memory)
+
+
+# --- LOGGING ---
+# Structured JSON logs written from a background thread (see logging_config.py)
+LOG_LEVEL = os.getenv("PRAXABLE_LOG_LEVEL", "INFO")
+LOG_QUEUE_SIZE = 10000              # Records waiting for the writer thread before new ones are dropped
+LOG_LEVELS = {}                     # Per-module overrides, e.g. {"app.calendar_service": "DEBUG"}
+LOG_SAMPLE_RATES = {                # Share of INFO/DEBUG records kept for high-volume events
+    "task_logged": 0.1,
+    "task_feedback": 0.1,
+    "task_updated": 0.1,
+}
+
+
+# --- PROFILING ---
+# Per-request span trees (see profiling.py). Off unless sampled or asked for
+# with the X-Debug-Profile: 1 header.
+PROFILE_SAMPLE_RATE = float(os.getenv("PRAXABLE_PROFILE_SAMPLE_RATE", "0"))  # Share of requests profiled
+PROFILE_MAX_SPANS = 500             # Spans kept per request; the rest are only counted
+SLOW_REQUEST_THRESHOLD_MS = 500     # Profiled requests slower than this are kept
+SLOW_REQUEST_BUFFER_SIZE = 50       # How many slow-request profiles /debug/slow-requests keeps
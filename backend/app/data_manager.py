@@ -1,88 +1,162 @@
+import logging
 import sqlite3
 import os
-import pandas as pd
+import threading
+import time
+from concurrent.futures import Future
 from datetime import datetime
 
+import orjson
+
 # Import our configuration variables
 from . import config 
+from . import metrics
+from . import profiling
+from . import migrations
+from . import shared_state
+from . import event_bus
+from . import jobs
+from . import task_codec
+from . import write_queue
+
+logger = logging.getLogger(__name__)
+
+def _timed_query(func):
+    """
+    Records the function's duration in praxable_db_query_duration_seconds,
+    and as a span when the request is being profiled.
+    """
+    timed = metrics.timed(metrics.DB_QUERY_LATENCY, query=func.__name__)(func)
+    return profiling.profiled(f"data_manager.{func.__name__}")(timed)
+
+# --- Data Version ---
+# Every write below bumps this counter. The API uses it to build ETag and
+# Last-Modified headers, so unchanged reads can be answered with 304 Not Modified
+# without querying the database at all.
+# With several workers (config.WORKER_MODE = "multi") the counter lives in
+# shared_state instead, so a write on one worker invalidates every worker's ETags.
+_data_version = 0
+_last_modified = time.time()
+_version_lock = threading.Lock()
+
+def _bump_data_version():
+    """Marks the data as changed. Call after every successful commit."""
+    global _data_version, _last_modified
+    if config.WORKER_MODE == "multi":
+        shared_state.bump_counter("data_version")
+        return
+    with _version_lock:
+        _data_version += 1
+        _last_modified = time.time()
+
+def get_data_version():
+    """Returns (version, last_modified_timestamp) for the current data."""
+    if config.WORKER_MODE == "multi":
+        return shared_state.get_counter("data_version")
+    with _version_lock:
+        return _data_version, _last_modified
+
+# --- Writes ---
+# Task writes are functions of an open connection, run by _write(): either
+# right away with their own commit, or (config.WRITE_QUEUE_ENABLED) grouped
+# with other writes into one transaction by the write queue's writer thread.
+_write_queue = write_queue.WriteQueue(
+    db_path=lambda: config.DB_PATH,
+    on_commit=lambda count: _committed(),
+    max_pending=config.WRITE_QUEUE_SIZE,
+    batch_window=config.WRITE_QUEUE_BATCH_WINDOW,
+    max_batch=config.WRITE_QUEUE_MAX_BATCH,
+    put_timeout=config.WRITE_QUEUE_PUT_TIMEOUT,
+)
+metrics.WRITE_QUEUE_PENDING.set_function(_write_queue.pending)
 
+def _committed():
+    """Called after every committed write transaction."""
+    _bump_data_version()
+    # Writes emit change events (see event_bus.py); let the subscribers know
+    event_bus.bus.notify()
+
+def _write(func, *args):
+    """
+    Runs func(conn, *args) in a transaction. Returns a Future that holds
+    func's result once the transaction is committed.
+    Raises write_queue.WriteQueueFullError if the write queue has no room.
+    """
+    if config.WRITE_QUEUE_ENABLED:
+        return _write_queue.submit(func, *args)
+    future = Future()
+    # Explicit transaction control, so writes can use savepoints (see apply_sync_mutations)
+    conn = sqlite3.connect(config.DB_PATH, isolation_level=None)
+    try:
+        conn.execute("BEGIN IMMEDIATE")
+        try:
+            result = func(conn, *args)
+            conn.execute("COMMIT")
+        except BaseException:
+            conn.execute("ROLLBACK")
+            raise
+    except Exception as exc:
+        future.set_exception(exc)
+    else:
+        _committed()
+        future.set_result(result)
+    finally:
+        conn.close()
+    return future
+
+@_timed_query
 def initialize_database():
-    """Creates the data directory and SQLite database with a 'tasks' table if they don't exist."""
+    """
+    Creates the data directory and SQLite database if they don't exist, and
+    brings the schema up to date (see migrations.py).
+    """
     os.makedirs(config.DATA_DIR, exist_ok=True)
-    
-    # Connect to the database (it will be created if it doesn't exist)
-    conn = sqlite3.connect(config.DB_PATH)
-    cursor = conn.cursor()
-    
-    # Create the 'tasks' table with a schema that matches our columns
-    # Using "IF NOT EXISTS" prevents errors on subsequent runs
-    cursor.execute('''
-        CREATE TABLE IF NOT EXISTS tasks (
-            id INTEGER PRIMARY KEY AUTOINCREMENT,
-            date TEXT NOT NULL,
-            task TEXT NOT NULL,
-            task_type TEXT,
-            
-            aligned_value TEXT,      -- NEW: Which core value does this serve?
-            
-            dread_level INTEGER,
-            location TEXT,
-            planned_time TEXT,
-            actual_time TEXT,
-            did_it INTEGER NOT NULL,
-            mood_before INTEGER,
-            sleep_quality INTEGER,
-            energy_level INTEGER,
-
-            mood_after INTEGER,        -- NEW: How did you feel after?
-            fulfillment_score INTEGER  -- NEW: Was it energizing or draining?
-        )
-    ''')
-
-    # --- THE NEW 'values' TABLE ---
-    # This table will store the user's core life values
-    cursor.execute('''
-        CREATE TABLE IF NOT EXISTS core_values (
-            id INTEGER PRIMARY KEY AUTOINCREMENT,
-            value_name TEXT NOT NULL UNIQUE
-        )
-    ''')
-    
-    conn.commit()
-    conn.close()
-    print("Database initialized with tables for 'tasks' and 'values'.")
+    before, after = migrations.migrate(config.DB_PATH)
+    logger.info(
+        "Database initialized.",
+        extra={"event": "database_initialized", "schema_version": after, "migrated_from": before}
+    )
 
 
 # ... (after initialize_database) ...
 
+@_timed_query
 def get_values():
     """Fetches all user-defined values from the 'values' table."""
     conn = sqlite3.connect(config.DB_PATH)
     cursor = conn.cursor()
-    cursor.execute("SELECT value_name FROM core_values ORDER BY id")
+    cursor.execute("SELECT value_name FROM core_values WHERE archived = 0 ORDER BY id")
     values = [row[0] for row in cursor.fetchall()]
     conn.close()
     return values
 
+def _add_value(conn, value_name):
+    cursor = conn.execute("""
+        INSERT INTO core_values (value_name) VALUES (?)
+        ON CONFLICT (value_name) DO UPDATE SET archived = 0 WHERE archived = 1
+    """, (value_name,))
+    if cursor.rowcount:
+        event_bus.emit(conn, event_bus.VALUE_ADDED, {"value_name": value_name})
+    else:
+        logger.info("Value already exists", extra={"event": "value_exists", "value_name": value_name})
+
+@_timed_query
 def add_value(value_name):
-    """Adds a new core value to the 'values' table."""
-    conn = sqlite3.connect(config.DB_PATH)
-    cursor = conn.cursor()
-    try:
-        cursor.execute("INSERT INTO core_values (value_name) VALUES (?)", (value_name,))
-        conn.commit()
-    except sqlite3.IntegrityError:
-        print(f"Value '{value_name}' already exists.")
-    finally:
-        conn.close()
+    """Adds a new core value to the 'values' table (or brings back an archived one)."""
+    _write(_add_value, value_name).result()
+
+def _archive_value(conn, value_name):
+    cursor = conn.execute("UPDATE core_values SET archived = 1 WHERE value_name = ? AND archived = 0", (value_name,))
+    if cursor.rowcount:
+        event_bus.emit(conn, event_bus.VALUE_DELETED, {"value_name": value_name})
 
+@_timed_query
 def delete_value(value_name):
-    """Deletes a core value from the 'values' table."""
-    conn = sqlite3.connect(config.DB_PATH)
-    cursor = conn.cursor()
-    cursor.execute("DELETE FROM core_values WHERE value_name = ?", (value_name,))
-    conn.commit()
-    conn.close()
+    """
+    Removes a core value from the user's list. It is archived rather than
+    deleted, because past tasks still point at it.
+    """
+    _write(_archive_value, value_name).result()
 
 # ... (the rest of your functions like log_task, etc.) ...
 
@@ -124,36 +198,105 @@ def delete_value(value_name):
 #     conn.close()
 #     print(f"Logged task to database: {task_details.get('task')}")
 
+_INSERT_TASK_SQL = '''
+    INSERT INTO task_entries (
+        day, task, task_type_id, value_id, location_id, dread_level,
+        planned_start, planned_end, planned_text, actual_minute, actual_text,
+        did_it, mood_before, sleep_quality, energy_level, mood_after, fulfillment_score, date_text
+    )
+    VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
+'''
+
+def _task_insert_params(conn, task_details, ids=None):
+    """
+    Encodes a task dict's fields (see task_codec.py) in _INSERT_TASK_SQL's order.
+    `ids` caches lookup ids across the tasks of one batch.
+    """
+    planned_start, planned_end, planned_text = task_codec.encode_time(task_details['planned_time'], allow_range=True)
+    actual_minute, _, actual_text = task_codec.encode_time(task_details['actual_time'])
+    day, date_text = task_codec.encode_date(task_details['date'])
+    return (
+        day, task_details['task'],
+        task_codec.lookup_id(conn, 'task_types', task_details['task_type'], ids),
+        task_codec.lookup_id(conn, 'core_values', task_details['aligned_value'], ids),
+        task_codec.lookup_id(conn, 'locations', task_details['location'], ids),
+        task_details['dread_level'],
+        planned_start, planned_end, planned_text, actual_minute, actual_text,
+        task_details['did_it'], task_details['mood_before'],
+        task_details['sleep_quality'], task_details['energy_level'],
+        # Only set when importing finished tasks; new tasks get feedback later
+        task_details.get('mood_after'), task_details.get('fulfillment_score'),
+        date_text,
+    )
+
+def _created_event(task_id, task_details):
+    return {
+        "task_id": task_id,
+        "aligned_value": task_details['aligned_value'],
+        "fulfillment_score": task_details.get('fulfillment_score'),
+    }
+
+def _insert_task(conn, task_details):
+    cursor = conn.execute(_INSERT_TASK_SQL, _task_insert_params(conn, task_details))
+    event_bus.emit(conn, event_bus.TASK_CREATED, _created_event(cursor.lastrowid, task_details))
+    logger.info("Logged task to database", extra={"event": "task_logged", "task": task_details.get('task')})
+    return cursor.lastrowid
+
+def submit_log_task(task_details):
+    """Like log_task, but returns a Future of the new task's id instead of waiting for the commit."""
+    return _write(_insert_task, task_details)
+
+@_timed_query
 def log_task(task_details):
     """Logs a new task to the SQLite database.
     
     Args:
         task_details (dict): A dictionary with keys matching the COLUMNS config.
+
+    Returns:
+        int: The new task's id.
     """
-    conn = sqlite3.connect(config.DB_PATH)
-    cursor = conn.cursor()
-    cursor.execute('''
-        INSERT INTO tasks (
-            date, task, task_type, aligned_value, dread_level, location, 
-            planned_time, actual_time, did_it, 
-            mood_before, sleep_quality, energy_level
-        )
-        VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
-    ''', (
-        task_details['date'], task_details['task'], task_details['task_type'],
-        task_details['aligned_value'], # New field
-        task_details['dread_level'], task_details['location'],
-        task_details['planned_time'], task_details['actual_time'],
-        task_details['did_it'], task_details['mood_before'],
-        task_details['sleep_quality'], task_details['energy_level']
-    ))
-    conn.commit()
-    conn.close()
-    print(f"Logged task to database: {task_details.get('task')}")
+    return submit_log_task(task_details).result()
+
+
+@_timed_query
+def log_tasks(task_list):
+    """Logs many tasks in a single transaction (one commit for the whole batch).
+
+    Args:
+        task_list (list[dict]): Task dicts, same shape as for log_task.
+
+    Returns:
+        int: The number of tasks inserted.
+    """
+    return submit_log_tasks(task_list).result()
+
+def submit_log_tasks(task_list):
+    """Like log_tasks, but returns a Future of the count instead of waiting for the commit."""
+    if not task_list:
+        future = Future()
+        future.set_result(0)
+        return future
+    return _write(_insert_tasks, task_list)
 
+def _insert_tasks(conn, task_list):
+    ids = {}
+    conn.executemany(_INSERT_TASK_SQL, [_task_insert_params(conn, t, ids) for t in task_list])
+    # The transaction holds the write lock, so the new ids are the last len(task_list) ones
+    last_id = conn.execute("SELECT seq FROM sqlite_sequence WHERE name = 'task_entries'").fetchone()[0]
+    first_id = last_id - len(task_list) + 1
+    event_bus.emit_many(conn, event_bus.TASK_CREATED, [
+        _created_event(first_id + offset, task) for offset, task in enumerate(task_list)
+    ])
+    logger.info("Logged tasks to database", extra={"event": "tasks_logged", "count": len(task_list)})
+    return len(task_list)
 
+
+@_timed_query
 def get_all_tasks():
     """Fetches all tasks from the database and returns them as a Pandas DataFrame."""
+    import pandas as pd  # Heavy; only loaded once something actually needs a DataFrame
+
     # Connect to the database
     conn = sqlite3.connect(config.DB_PATH)
     
@@ -166,24 +309,175 @@ def get_all_tasks():
     return df
 
 
-def update_task_with_feedback(task_id, mood_after, fulfillment_score):
-    """Updates a task as done and records the post-task feedback."""
+@_timed_query
+def get_task(task_id):
+    """Fetches one task as stored (the same dict as get_task_rows), or None if there is none."""
+    conn = sqlite3.connect(config.DB_PATH)
+    try:
+        row = conn.execute("SELECT * FROM task_entries WHERE id = ?", (task_id,)).fetchone()
+        return task_codec.decode_row(row, task_codec.lookup_names(conn)) if row else None
+    finally:
+        conn.close()
+
+
+@_timed_query
+def get_task_rows(limit=None, offset=0, start_date=None, end_date=None):
+    """
+    Fetches tasks (newest first) as a list of plain dicts, straight from the sqlite tuples.
+    Much cheaper than get_all_tasks() when the rows are only going to be
+    serialized to JSON (no DataFrame, no NaN handling needed).
+
+    Args:
+        limit (int | None): Maximum number of rows to return (None = all).
+        offset (int): Number of rows to skip, for pagination.
+        start_date, end_date (date | str | None): Only tasks dated within this
+            range (inclusive). Uses the index on the stored day number.
+    """
+    conn = sqlite3.connect(config.DB_PATH)
+    where, params = "", []
+    if start_date is not None or end_date is not None:
+        where = "WHERE day BETWEEN ? AND ?"
+        params = [
+            task_codec.to_epoch_day(start_date) if start_date is not None else -2**62,
+            task_codec.to_epoch_day(end_date) if end_date is not None else 2**62,
+        ]
+    # Reads task_entries directly and decodes in Python rather than through
+    # the `tasks` view: same dicts, but no per-row string formatting in SQL.
+    names = task_codec.lookup_names(conn)
+    # LIMIT -1 means "no limit" in SQLite
+    cursor = conn.execute(
+        f"SELECT * FROM task_entries {where} ORDER BY id DESC LIMIT ? OFFSET ?",
+        (*params, -1 if limit is None else limit, offset)
+    )
+    rows = [task_codec.decode_row(row, names) for row in cursor.fetchall()]
+    conn.close()
+    return rows
+
+
+@_timed_query
+def get_alignment_stats():
+    """
+    Returns (total_tasks, breakdown): the number of tasks, and per aligned
+    value its task count and average fulfillment (unrated tasks count as 0),
+    ordered by value name. Grouped in SQL on the integer value ids rather
+    than by loading every task into a DataFrame.
+    """
     conn = sqlite3.connect(config.DB_PATH)
     cursor = conn.cursor()
-    completion_time = datetime.now().strftime("%H:%M")
+    total = cursor.execute("SELECT COUNT(*) FROM task_entries").fetchone()[0]
     cursor.execute("""
-        UPDATE tasks 
-        SET did_it = 1, actual_time = ?, mood_after = ?, fulfillment_score = ?
-        WHERE id = ?
-    """, (completion_time, mood_after, fulfillment_score, task_id))
-    conn.commit()
+        SELECT v.value_name, s.task_count, s.avg_fulfillment
+        FROM (
+            SELECT value_id, COUNT(*) AS task_count, AVG(COALESCE(fulfillment_score, 0)) AS avg_fulfillment
+            FROM task_entries
+            WHERE value_id IS NOT NULL
+            GROUP BY value_id
+        ) s
+        JOIN core_values v ON v.id = s.value_id
+        ORDER BY v.value_name
+    """)
+    breakdown = [
+        {"value_name": name, "task_count": count, "avg_fulfillment": float(avg)}
+        for name, count, avg in cursor.fetchall()
+    ]
     conn.close()
-    print(f"Marked task ID {task_id} as done at {completion_time}.")
+    return total, breakdown
 
 
-    return df
+def _task_state(conn, task_id):
+    """The task's aligned_value and fulfillment_score as a dict, or None if there is no such task."""
+    row = conn.execute("""
+        SELECT v.value_name, t.fulfillment_score
+        FROM task_entries t LEFT JOIN core_values v ON v.id = t.value_id
+        WHERE t.id = ?
+    """, (task_id,)).fetchone()
+    return None if row is None else {"aligned_value": row[0], "fulfillment_score": row[1]}
+
+def _set_feedback(conn, task_id, mood_after, fulfillment_score):
+    previous = _task_state(conn, task_id)
+    if previous is None:
+        return
+    now = datetime.now()
+    conn.execute("""
+        UPDATE task_entries
+        SET did_it = 1, actual_minute = ?, actual_text = NULL, mood_after = ?, fulfillment_score = ?
+        WHERE id = ?
+    """, (now.hour * 60 + now.minute, mood_after, fulfillment_score, task_id))
+    event_bus.emit(conn, event_bus.FEEDBACK_RECORDED, {
+        "task_id": task_id, "aligned_value": previous['aligned_value'],
+        "fulfillment_score": fulfillment_score, "previous": previous,
+    })
+    logger.info(
+        "Marked task as done",
+        extra={"event": "task_feedback", "task_id": task_id, "completed_at": now.strftime("%H:%M")}
+    )
+
+def submit_task_feedback(task_id, mood_after, fulfillment_score):
+    """Like update_task_with_feedback, but returns a Future instead of waiting for the commit."""
+    return _write(_set_feedback, task_id, mood_after, fulfillment_score)
+
+@_timed_query
+def update_task_with_feedback(task_id, mood_after, fulfillment_score):
+    """Updates a task as done and records the post-task feedback."""
+    submit_task_feedback(task_id, mood_after, fulfillment_score).result()
+
+
+# Security: Allow specific fields only to prevent SQL injection or schema breakage
+_UPDATABLE_FIELDS = [
+    'task', 'task_type', 'aligned_value', 'dread_level',
+    'mood_after', 'fulfillment_score', 'energy_level', 'mood_before'
+]
+
+def _update_task(conn, task_id, updates):
+    # task_type and aligned_value are stored as ids into their lookup tables
+    columns = {}
+    for field, value in updates.items():
+        if field == 'task_type':
+            columns['task_type_id'] = task_codec.lookup_id(conn, 'task_types', value)
+        elif field == 'aligned_value':
+            columns['value_id'] = task_codec.lookup_id(conn, 'core_values', value)
+        else:
+            columns[field] = value
+
+    # Construct the SET clause dynamically: "field1 = ?, field2 = ?"
+    set_clause = ", ".join([f"{k} = ?" for k in columns.keys()])
+    
+    # Prepare values
+    values = list(columns.values())
+    values.append(task_id) # Add task_id for the WHERE clause
+    
+    previous = _task_state(conn, task_id)
+    if previous is None:
+        return
+    try:
+        conn.execute(f"UPDATE task_entries SET {set_clause} WHERE id = ?", values)
+    except Exception:
+        logger.exception("Error updating task", extra={"event": "task_update_failed", "task_id": task_id})
+        return
+    event_bus.emit(conn, event_bus.TASK_UPDATED, {
+        "task_id": task_id, "fields": sorted(updates),
+        **{key: updates.get(key, old) for key, old in previous.items()},
+        "previous": previous,
+    })
+    logger.info(
+        "Updated task",
+        extra={"event": "task_updated", "task_id": task_id, "fields": sorted(updates)}
+    )
 
+def submit_task_update(task_id, updates):
+    """
+    Like update_task_details, but returns a Future instead of waiting for the
+    commit (None if there was nothing valid to update).
+    """
+    # Filter updates to only include allowed fields
+    filtered_updates = {k: v for k, v in updates.items() if k in _UPDATABLE_FIELDS}
+    
+    if not filtered_updates:
+        logger.warning("No valid fields to update", extra={"event": "task_update_rejected", "task_id": task_id})
+        return None
+    return _write(_update_task, task_id, filtered_updates)
 
+@_timed_query
 def update_task_details(task_id, updates):
     """
     Updates arbitrary fields for a task.
@@ -191,34 +485,232 @@ def update_task_details(task_id, updates):
         task_id (int): The ID of the task to update.
         updates (dict): A dictionary of field_name: new_value.
     """
-    # Security: Allow specific fields only to prevent SQL injection or schema breakage
-    allowed_fields = [
-        'task', 'task_type', 'aligned_value', 'dread_level', 
-        'mood_after', 'fulfillment_score', 'energy_level', 'mood_before'
-    ]
-    
-    # Filter updates to only include allowed fields
-    filtered_updates = {k: v for k, v in updates.items() if k in allowed_fields}
-    
-    if not filtered_updates:
-        print("No valid fields to update.")
+    future = submit_task_update(task_id, updates)
+    if future is not None:
+        future.result()
+
+
+def _delete_task(conn, task_id):
+    previous = _task_state(conn, task_id)
+    if previous is None:
         return
+    conn.execute("DELETE FROM task_entries WHERE id = ?", (task_id,))
+    event_bus.emit(conn, event_bus.TASK_DELETED, {"task_id": task_id, **previous})
+    logger.info("Deleted task", extra={"event": "task_deleted", "task_id": task_id})
 
-    conn = sqlite3.connect(config.DB_PATH)
-    cursor = conn.cursor()
-    
-    # Construct the SET clause dynamically: "field1 = ?, field2 = ?"
-    set_clause = ", ".join([f"{k} = ?" for k in filtered_updates.keys()])
-    
-    # Prepare values
-    values = list(filtered_updates.values())
-    values.append(task_id) # Add task_id for the WHERE clause
-    
+@_timed_query
+def delete_task(task_id):
+    """Deletes a task. Clients that sync learn about it as a deleted task."""
+    _write(_delete_task, task_id).result()
+
+
+# --- Delta Sync ---
+# Every insert, update and delete of a task or value gets a new revision in
+# change_log (triggers keep it up to date, see migrations.py). Clients keep
+# the last revision they have seen and only fetch what changed after it
+# (get_changes), and send their offline edits as a batch of mutations with
+# idempotency keys (apply_sync_mutations).
+
+class SyncCursorError(ValueError):
+    """The client's revision is newer than anything in this database (it came from another one)."""
+
+
+@_timed_query
+def get_changes(since=0, limit=1000):
+    """
+    Returns what changed after revision `since`, oldest change first, for at most `limit` tasks/values:
+
+        {"revision": pass as `since` next time, "has_more": more changes are waiting,
+         "tasks": [changed tasks, same shape as get_task_rows()], "deleted_tasks": [ids],
+         "values": [added value names], "deleted_values": [removed value names]}
+
+    Raises SyncCursorError if `since` is newer than the latest revision.
+    """
+    conn = sqlite3.connect(config.DB_PATH, isolation_level=None)
     try:
-        cursor.execute(f"UPDATE tasks SET {set_clause} WHERE id = ?", values)
-        conn.commit()
-        print(f"Updated task {task_id} with {filtered_updates}")
-    except Exception as e:
-        print(f"Error updating task: {e}")
+        # One read transaction, so the rows are the ones the revisions refer to
+        conn.execute("BEGIN")
+        latest = conn.execute("SELECT COALESCE(MAX(revision), 0) FROM change_log").fetchone()[0]
+        if since > latest:
+            raise SyncCursorError(f"Revision {since} is ahead of the latest revision {latest}")
+        changes = conn.execute(
+            "SELECT revision, entity, entity_id, deleted FROM change_log WHERE revision > ? ORDER BY revision LIMIT ?",
+            (since, limit + 1)
+        ).fetchall()
+        has_more = len(changes) > limit
+        changes = changes[:limit]
+
+        task_ids = [entity_id for _, entity, entity_id, deleted in changes if entity == 'task' and not deleted]
+        value_ids = [entity_id for _, entity, entity_id, _ in changes if entity == 'value']
+        tasks = {}
+        if task_ids:
+            names = task_codec.lookup_names(conn)
+            placeholders = ", ".join("?" * len(task_ids))
+            for row in conn.execute(f"SELECT * FROM task_entries WHERE id IN ({placeholders})", task_ids):
+                tasks[row[0]] = task_codec.decode_row(row, names)
+        value_names = {}
+        if value_ids:
+            placeholders = ", ".join("?" * len(value_ids))
+            value_names = dict(conn.execute(
+                f"SELECT id, value_name FROM core_values WHERE id IN ({placeholders})", value_ids
+            ))
+        conn.execute("COMMIT")
     finally:
-        conn.close()
\ No newline at end of file
+        conn.close()
+
+    result = {
+        "revision": changes[-1][0] if has_more else latest,
+        "has_more": has_more,
+        "tasks": [], "deleted_tasks": [], "values": [], "deleted_values": [],
+    }
+    for _, entity, entity_id, deleted in changes:
+        if entity == 'task':
+            if deleted:
+                result["deleted_tasks"].append(entity_id)
+            else:
+                result["tasks"].append(tasks[entity_id])
+        else:
+            result["deleted_values" if deleted else "values"].append(value_names[entity_id])
+    return result
+
+
+def _task_revision(conn, task_id):
+    """(revision, deleted) of a task's latest change, or None if it never existed."""
+    return conn.execute(
+        "SELECT revision, deleted FROM change_log WHERE entity = 'task' AND entity_id = ?", (task_id,)
+    ).fetchone()
+
+def _mutation_task_id(conn, mutation):
+    # Offline-created tasks don't have an id yet; later mutations point at
+    # them by the key of the create_task mutation instead
+    if mutation.get('task_id') is not None:
+        return mutation['task_id']
+    if mutation.get('task_key') is None:
+        raise ValueError("task_id or task_key is required")
+    row = conn.execute("SELECT result FROM sync_mutations WHERE key = ?", (mutation['task_key'],)).fetchone()
+    if row is None:
+        raise ValueError(f"No applied create_task mutation with key {mutation['task_key']!r}")
+    return orjson.loads(row[0])['task_id']
+
+def _apply_mutation(conn, mutation):
+    """Applies one offline mutation. Returns its result dict."""
+    op, data = mutation['op'], mutation.get('data') or {}
+    result = {"key": mutation['key'], "status": "applied"}
+
+    if op in ('add_value', 'delete_value'):
+        (_add_value if op == 'add_value' else _archive_value)(conn, data['value_name'])
+        return result
+
+    if op == 'create_task':
+        task_id = _insert_task(conn, data)
+    else:
+        task_id = _mutation_task_id(conn, mutation)
+        current = _task_revision(conn, task_id)
+        if current is None:
+            raise ValueError(f"Task {task_id} does not exist")
+        revision, deleted = current
+        base_revision = mutation.get('base_revision')
+        if deleted and op == 'delete_task':
+            return {**result, "task_id": task_id, "revision": revision}
+        # Edited (or deleted) on the server since the client last synced it: let the client decide
+        if deleted or (base_revision is not None and revision > base_revision):
+            return {"key": mutation['key'], "status": "conflict", "task_id": task_id,
+                    "revision": revision, "deleted": bool(deleted)}
+        if op == 'update_task':
+            updates = {k: v for k, v in data.items() if k in _UPDATABLE_FIELDS}
+            if not updates:
+                raise ValueError("No valid fields to update")
+            _update_task(conn, task_id, updates)
+        elif op == 'task_feedback':
+            _set_feedback(conn, task_id, data['mood_after'], data['fulfillment_score'])
+        elif op == 'delete_task':
+            _delete_task(conn, task_id)
+        else:
+            raise ValueError(f"Unknown mutation op {op!r}")
+    return {**result, "task_id": task_id, "revision": _task_revision(conn, task_id)[0]}
+
+def _apply_sync_mutations(conn, mutations):
+    now = time.time()
+    conn.execute(
+        "DELETE FROM sync_mutations WHERE applied_at < ?", (now - config.SYNC_IDEMPOTENCY_TTL_SECONDS,)
+    )
+    results = []
+    for mutation in mutations:
+        row = conn.execute("SELECT result FROM sync_mutations WHERE key = ?", (mutation['key'],)).fetchone()
+        if row is not None:
+            # Applied by an earlier attempt: answer the same way, don't apply twice
+            results.append({**orjson.loads(row[0]), "duplicate": True})
+            continue
+        # A savepoint per mutation, so a bad one is undone on its own
+        conn.execute("SAVEPOINT mutation")
+        try:
+            result = _apply_mutation(conn, mutation)
+        except (KeyError, TypeError, ValueError, sqlite3.IntegrityError) as exc:
+            conn.execute("ROLLBACK TO mutation")
+            result = {"key": mutation['key'], "status": "error", "detail": str(exc)}
+        if result['status'] == 'applied':
+            conn.execute(
+                "INSERT INTO sync_mutations (key, result, applied_at) VALUES (?, ?, ?)",
+                (mutation['key'], orjson.dumps(result), now)
+            )
+        conn.execute("RELEASE mutation")
+        results.append(result)
+    return results
+
+@_timed_query
+def apply_sync_mutations(mutations):
+    """
+    Applies a batch of offline mutations, in order, in one transaction. Each is a dict:
+
+        {"key": idempotency key, "op": "create_task" | "update_task" | "task_feedback"
+         | "delete_task" | "add_value" | "delete_value", "data": {...},
+         "task_id" or "task_key" (the key of an earlier create_task): the task,
+         "base_revision" (optional): the task's revision the client last saw}
+
+    Returns one result per mutation: status "applied" (with task_id and the
+    task's new revision), "conflict" (changed or deleted on the server after
+    base_revision; nothing was applied) or "error" (with detail). A mutation
+    whose key was already applied is not applied again; its original result
+    is returned with "duplicate": true.
+    """
+    return _write(_apply_sync_mutations, mutations).result()
+
+
+# --- Maintenance ---
+# Nightly background job (see jobs.py): fresh planner statistics, and the
+# pages freed by deletes and pruning (outbox, change log) handed back to the
+# file system in small steps so writers are never blocked for long.
+
+def run_maintenance():
+    """Runs ANALYZE and an incremental vacuum. Returns a summary for GET /jobs."""
+    conn = sqlite3.connect(config.DB_PATH, timeout=30.0, isolation_level=None)
+    try:
+        start = time.perf_counter()
+        conn.execute("ANALYZE")
+        analyze_ms = (time.perf_counter() - start) * 1000
+        freed = 0
+        if conn.execute("PRAGMA auto_vacuum").fetchone()[0] == 2:
+            while True:
+                free_pages = conn.execute("PRAGMA freelist_count").fetchone()[0]
+                if not free_pages:
+                    break
+                # Each step is its own short write transaction; the pragma only
+                # does its work as its rows are fetched
+                conn.execute(f"PRAGMA incremental_vacuum({config.VACUUM_PAGES_PER_STEP})").fetchall()
+                step = free_pages - conn.execute("PRAGMA freelist_count").fetchone()[0]
+                if step <= 0:
+                    break
+                freed += step
+        page_size = conn.execute("PRAGMA page_size").fetchone()[0]
+    finally:
+        conn.close()
+    logger.info("Database maintenance done", extra={
+        "event": "db_maintenance", "analyze_ms": round(analyze_ms, 1), "pages_freed": freed
+    })
+    return f"ANALYZE {analyze_ms:.0f}ms, freed {freed} pages ({freed * page_size // 1024} KiB)"
+
+jobs.runner.register(jobs.Job(
+    "db_maintenance", run_maintenance,
+    daily_at=config.MAINTENANCE_TIME, jitter=config.MAINTENANCE_JITTER_SECONDS, lease=3600.0,
+    description="ANALYZE and incremental vacuum of the task database",
+))
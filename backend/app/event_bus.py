@@ -0,0 +1,316 @@
+"""
+Event Bus Module
+
+Change events for state derived from the task database (analytics, the
+predictor's retraining, live dashboards), so it can be updated incrementally
+instead of rescanning the tasks table:
+
+- Writes in data_manager call emit() inside their own transaction. The event
+  goes into the `outbox` table, so it is committed together with the change
+  (or not at all), and data_manager calls bus.notify() after the commit.
+- Every subscriber gets every event, in commit order, from its own delivery
+  thread, so a slow subscriber (e.g. one that retrains the model) never holds
+  up the others.
+- Delivery is at-least-once. If handle() raises, the same event is retried
+  (with backoff) before anything after it. A durable subscriber's position is
+  saved in outbox_cursors after each batch, together with its state, so events
+  committed before a crash but not yet handled are replayed on the next start
+  (and a few may be seen twice).
+- A subscriber whose state lives only in memory is instead initialized with
+  load(conn), a snapshot read in the same transaction that fixes its starting
+  position, so no event is missed or counted twice.
+
+With several workers each process runs its own subscribers; events written
+by other workers are picked up within EVENT_BUS_POLL_SECONDS.
+"""
+
+import logging
+import sqlite3
+import threading
+import time
+from dataclasses import dataclass
+from typing import Any, Dict
+
+import orjson
+
+from . import config
+from . import metrics
+
+logger = logging.getLogger(__name__)
+
+# --- Event types ---
+TASK_CREATED = "task_created"            # task_id, aligned_value, fulfillment_score
+FEEDBACK_RECORDED = "feedback_recorded"  # task_id, aligned_value, fulfillment_score, previous
+TASK_UPDATED = "task_updated"            # task_id, fields, aligned_value, fulfillment_score, previous
+TASK_DELETED = "task_deleted"            # task_id, aligned_value, fulfillment_score
+VALUE_ADDED = "value_added"              # value_name
+VALUE_DELETED = "value_deleted"          # value_name
+# `previous` holds the task's aligned_value and fulfillment_score before the change
+
+
+@dataclass(frozen=True)
+class Event:
+    seq: int
+    type: str
+    payload: Dict[str, Any]
+    created_at: float
+
+
+def emit(conn, event_type, payload):
+    """Adds an event to the outbox. Call inside the transaction that makes the change."""
+    conn.execute(
+        "INSERT INTO outbox (type, payload, created_at) VALUES (?, ?, ?)",
+        (event_type, orjson.dumps(payload), time.time())
+    )
+
+
+def emit_many(conn, event_type, payloads):
+    now = time.time()
+    conn.executemany(
+        "INSERT INTO outbox (type, payload, created_at) VALUES (?, ?, ?)",
+        [(event_type, orjson.dumps(payload), now) for payload in payloads]
+    )
+
+
+class Subscriber:
+    """
+    Base class for subscribers. Override handle(), and either load() (state
+    kept in memory, rebuilt on start) or, with durable = True, get_state() /
+    set_state() (state saved with the subscriber's position).
+    """
+
+    name = None
+    durable = False
+
+    def load(self, conn):
+        """Builds the in-memory state from the database (non-durable subscribers)."""
+
+    def handle(self, event):
+        raise NotImplementedError
+
+    def flush(self):
+        """Called after each batch of handled events, e.g. to publish what changed."""
+
+    def get_state(self):
+        """JSON-serializable state saved with the position (durable subscribers)."""
+        return None
+
+    def set_state(self, state):
+        """Restores what get_state() returned."""
+
+
+def head(conn):
+    """The seq of the newest event ever written (0 if none)."""
+    row = conn.execute("SELECT seq FROM sqlite_sequence WHERE name = 'outbox'").fetchone()
+    return row[0] if row else 0
+
+
+class _Delivery:
+    """One subscriber's position and delivery thread."""
+
+    def __init__(self, bus, subscriber, seq):
+        self.bus = bus
+        self.subscriber = subscriber
+        self.seq = seq
+        self.failures = 0
+        self.thread = threading.Thread(
+            target=self.run, name=f"praxable-events-{subscriber.name}", daemon=True
+        )
+        self.delivered = metrics.EVENTS_DELIVERED.labels(subscriber=subscriber.name)
+        self.errors = metrics.EVENT_HANDLER_ERRORS.labels(subscriber=subscriber.name)
+
+    def run(self):
+        conn = sqlite3.connect(self.bus.db_path(), timeout=30.0, isolation_level=None)
+        try:
+            while not self.bus.stopped:
+                if not self.deliver_batch(conn):
+                    self.bus.wait(self.bus.poll_interval if not self.failures else self.backoff())
+        finally:
+            conn.close()
+
+    def backoff(self):
+        return min(30.0, 0.1 * 2 ** min(self.failures, 10))
+
+    def deliver_batch(self, conn):
+        """Delivers the next batch. Returns True if there may be more right away."""
+        rows = conn.execute(
+            "SELECT seq, type, payload, created_at FROM outbox WHERE seq > ? ORDER BY seq LIMIT ?",
+            (self.seq, self.bus.batch_size)
+        ).fetchall()
+        if not rows:
+            return False
+        start_seq, handled = self.seq, 0
+        for seq, event_type, payload, created_at in rows:
+            try:
+                self.subscriber.handle(Event(seq, event_type, orjson.loads(payload), created_at))
+            except Exception:
+                self.failures += 1
+                self.errors.inc()
+                logger.exception(
+                    "Event subscriber failed; will retry",
+                    extra={"event": "event_handler_failed", "subscriber": self.subscriber.name, "seq": seq}
+                )
+                break
+            self.seq = seq
+            handled += 1
+        if handled:
+            self.failures = 0
+            self.delivered.inc(handled)
+            try:
+                self.subscriber.flush()
+            except Exception:
+                logger.exception(
+                    "Event subscriber flush failed",
+                    extra={"event": "event_flush_failed", "subscriber": self.subscriber.name}
+                )
+            if self.subscriber.durable:
+                self.checkpoint(conn, start_seq)
+            self.bus.delivered()
+        return handled == len(rows)
+
+    def checkpoint(self, conn, previous_seq):
+        state = orjson.dumps(self.subscriber.get_state())
+        # Only move forward from where we started: if another worker moved this
+        # subscriber on in the meantime, continue from its position instead
+        cursor = conn.execute(
+            "UPDATE outbox_cursors SET seq = ?, state = ? WHERE subscriber = ? AND seq = ?",
+            (self.seq, state, self.subscriber.name, previous_seq)
+        )
+        if not cursor.rowcount:
+            seq, saved = conn.execute(
+                "SELECT seq, state FROM outbox_cursors WHERE subscriber = ?", (self.subscriber.name,)
+            ).fetchone()
+            self.seq = seq
+            self.subscriber.set_state(orjson.loads(saved) if saved else None)
+
+
+class EventBus:
+    """
+    Delivers outbox events to subscribers (see the module docstring).
+
+    Args:
+        db_path: Callable returning the database path.
+    """
+
+    def __init__(self, db_path, poll_interval=1.0, batch_size=500, retention=3600.0):
+        self.db_path = db_path
+        self.poll_interval = poll_interval
+        self.batch_size = batch_size
+        self.retention = retention
+        self.stopped = False
+        self._deliveries = {}
+        self._condition = threading.Condition()
+        self._generation = 0
+        self._last_prune = 0.0
+
+    def _connect(self):
+        return sqlite3.connect(self.db_path(), timeout=30.0, isolation_level=None)
+
+    def subscribe(self, subscriber):
+        """Registers a subscriber and starts delivering to it."""
+        if subscriber.name in self._deliveries:
+            raise ValueError(f"Subscriber {subscriber.name!r} is already registered")
+        conn = self._connect()
+        try:
+            # One read transaction: the snapshot (or saved state) and the
+            # position it corresponds to are taken together
+            conn.execute("BEGIN IMMEDIATE" if subscriber.durable else "BEGIN")
+            seq = head(conn)
+            if subscriber.durable:
+                row = conn.execute(
+                    "SELECT seq, state FROM outbox_cursors WHERE subscriber = ?", (subscriber.name,)
+                ).fetchone()
+                if row is None:
+                    # New subscriber: start from now with empty state
+                    conn.execute(
+                        "INSERT INTO outbox_cursors (subscriber, seq, state) VALUES (?, ?, ?)",
+                        (subscriber.name, seq, orjson.dumps(subscriber.get_state()))
+                    )
+                else:
+                    seq = row[0]
+                    subscriber.set_state(orjson.loads(row[1]) if row[1] else None)
+            else:
+                subscriber.load(conn)
+            conn.execute("COMMIT")
+        finally:
+            conn.close()
+        delivery = _Delivery(self, subscriber, seq)
+        self._deliveries[subscriber.name] = delivery
+        delivery.thread.start()
+        logger.info(
+            "Event subscriber started",
+            extra={"event": "event_subscriber_started", "subscriber": subscriber.name, "seq": seq}
+        )
+
+    def notify(self):
+        """Wakes the subscribers; call after committing a transaction that emitted events."""
+        with self._condition:
+            self._generation += 1
+            self._condition.notify_all()
+
+    def wait(self, timeout):
+        """Sleeps until notify() or the timeout (used by the delivery threads)."""
+        with self._condition:
+            generation = self._generation
+            self._condition.wait_for(lambda: self._generation != generation or self.stopped, timeout)
+        self._maybe_prune()
+
+    def delivered(self):
+        with self._condition:
+            self._condition.notify_all()
+
+    def caught_up(self, name, timeout=1.0):
+        """
+        Waits until subscriber `name` has handled every event committed so far
+        (by any worker). Returns False on timeout, e.g. while it is retrying a
+        failed event, so callers can fall back to reading the database.
+        """
+        delivery = self._deliveries.get(name)
+        if delivery is None:
+            return False
+        conn = self._connect()
+        try:
+            latest = head(conn)
+        finally:
+            conn.close()
+        if delivery.seq >= latest:
+            return True
+        self.notify()
+        with self._condition:
+            return self._condition.wait_for(lambda: delivery.seq >= latest, timeout)
+
+    def stop(self, timeout=5.0):
+        self.stopped = True
+        self.notify()
+        for delivery in self._deliveries.values():
+            delivery.thread.join(timeout)
+        self._deliveries.clear()
+        self.stopped = False
+
+    def _maybe_prune(self):
+        """Drops events every subscriber is done with, once they are `retention` seconds old."""
+        now = time.time()
+        if now - self._last_prune < 60:
+            return
+        self._last_prune = now
+        conn = self._connect()
+        try:
+            positions = [delivery.seq for delivery in list(self._deliveries.values())]
+            positions += [row[0] for row in conn.execute("SELECT seq FROM outbox_cursors")]
+            if positions:
+                # The age limit leaves time for other workers' in-memory subscribers
+                conn.execute(
+                    "DELETE FROM outbox WHERE seq <= ? AND created_at < ?", (min(positions), now - self.retention)
+                )
+        except sqlite3.Error:
+            logger.exception("Could not prune the outbox", extra={"event": "outbox_prune_failed"})
+        finally:
+            conn.close()
+
+
+bus = EventBus(
+    db_path=lambda: config.DB_PATH,
+    poll_interval=config.EVENT_BUS_POLL_SECONDS,
+    batch_size=config.EVENT_BUS_BATCH_SIZE,
+    retention=config.OUTBOX_RETENTION_SECONDS,
+)
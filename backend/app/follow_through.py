@@ -0,0 +1,206 @@
+"""
+Follow-Through Model
+
+The logistic regression from src/predictor.py: the probability that a planned
+task actually gets done (did_it), from its type, location, dread level and
+the day's mood, sleep and energy. score_plan() scores a whole day's plan with
+one predict_proba() call and picks every task's nudge (nudges.py, the
+messages src/nudger.py shows too) from config.NUDGE_THRESHOLDS.
+
+The old Streamlit app retrained on every rerun. Here a model is trained by
+the "train_follow_through" background job and published to the model store
+(see model_store.py) together with the data version it saw: the event bus
+head, which moves on every task write and survives restarts. Every worker
+serves the live version. A request that finds the data newer than the model
+still gets the current model's answer and triggers a retrain, at most once
+per FOLLOW_THROUGH_RETRAIN_SECONDS; the job itself does nothing when the
+published model already matches the data.
+"""
+
+import logging
+import sqlite3
+import threading
+import time
+
+from . import config
+from . import data_manager
+from . import event_bus
+from . import jobs
+from . import model_store
+from . import profiling
+from .nudges import NUDGES
+
+logger = logging.getLogger(__name__)
+
+MODEL_NAME = "follow_through"
+JOB_NAME = "train_follow_through"
+
+CATEGORICAL_FEATURES = ['task_type', 'location']
+NUMERICAL_FEATURES = ['dread_level', 'mood_before', 'sleep_quality', 'energy_level']
+FEATURES = CATEGORICAL_FEATURES + NUMERICAL_FEATURES
+NEUTRAL_PROBABILITY = 0.5   # Served while there is no model, as src/predictor.py did
+
+
+def data_version():
+    """The data version a model trained now would see (event_bus.head())."""
+    conn = sqlite3.connect(config.DB_PATH, timeout=30.0)
+    try:
+        return event_bus.head(conn)
+    finally:
+        conn.close()
+
+
+def nudge_levels(probabilities):
+    """The nudge level ("strong", "medium" or "boost") for each probability, as a NumPy array."""
+    import numpy as np
+
+    thresholds = [config.NUDGE_THRESHOLDS["strong"], config.NUDGE_THRESHOLDS["medium"]]
+    # Below "strong" -> 0, below "medium" -> 1, otherwise 2
+    index = np.searchsorted(thresholds, probabilities, side="right")
+    return np.array(["strong", "medium", "boost"])[index]
+
+
+class FollowThroughModel:
+    def __init__(self):
+        self.model = None
+        self.version = None
+        self.data_version = None
+        self._load_lock = threading.Lock()
+        self._train_lock = threading.Lock()
+        self._requested = (None, float("-inf"))   # (data version, monotonic time) of the last retrain request
+
+    def load_current(self):
+        """Loads the live version if it isn't the one in memory. Returns False if there is none."""
+        version = model_store.current_version(MODEL_NAME)
+        if version is None:
+            return False
+        if version == self.version:
+            return True
+        with self._load_lock:
+            if version == self.version:
+                return True
+            try:
+                artifact = model_store.load(MODEL_NAME, version)
+            except Exception:
+                logger.exception("Could not load model", extra={
+                    "event": "model_load_failed", "model": MODEL_NAME, "version": version,
+                })
+                return False
+            self.model = artifact["model"]
+            self.data_version = artifact["data_version"]
+            self.version = version
+        logger.info("Loaded model.", extra={
+            "event": "model_loaded", "model": MODEL_NAME, "version": version,
+            "rows": artifact.get("rows"), "data_version": artifact["data_version"],
+        })
+        return True
+
+    @profiling.profiled("follow_through.train")
+    def train(self):
+        """
+        Trains on every logged task and publishes the model, unless the live
+        one was already trained on the current data. Returns what it did.
+        """
+        from sklearn.compose import ColumnTransformer
+        from sklearn.linear_model import LogisticRegression
+        from sklearn.pipeline import Pipeline
+        from sklearn.preprocessing import OneHotEncoder
+
+        # One trainer per process (training_lock is per process on Windows)
+        with self._train_lock, model_store.training_lock(MODEL_NAME):
+            # Read before the tasks, so the model never claims newer data than it saw
+            seen = data_version()
+            if self.load_current() and self.data_version == seen:
+                return f"version {self.version} is up to date"
+
+            df = data_manager.get_all_tasks().dropna(subset=FEATURES + ['did_it'])
+            if len(df) < config.FOLLOW_THROUGH_MIN_ROWS or df['did_it'].nunique() < 2:
+                logger.info("Not enough data to train model.", extra={
+                    "event": "model_not_trained", "model": MODEL_NAME, "rows": len(df),
+                })
+                return "not enough logged tasks to train"
+
+            preprocessor = ColumnTransformer(transformers=[
+                ('num', 'passthrough', NUMERICAL_FEATURES),
+                ('cat', OneHotEncoder(handle_unknown='ignore'), CATEGORICAL_FEATURES),
+            ])
+            model = Pipeline(steps=[
+                ('preprocessor', preprocessor),
+                ('classifier', LogisticRegression(solver='liblinear')),
+            ])
+            model.fit(df[FEATURES], df['did_it'].astype(int))
+
+            version = model_store.publish(MODEL_NAME, {
+                "model": model, "data_version": seen, "rows": len(df), "trained_at": time.time(),
+            })
+            with self._load_lock:
+                self.model = model
+                self.data_version = seen
+                self.version = version
+        logger.info("Model trained successfully.", extra={
+            "event": "model_trained", "model": MODEL_NAME, "rows": len(df), "version": version,
+        })
+        return f"published version {version} ({len(df)} tasks)"
+
+    def _refresh(self):
+        """
+        Loads the live model and asks for a retrain if the data moved on since
+        it was trained (or there is none). Never waits for training.
+        """
+        self.load_current()
+        current = data_version()
+        if self.model is not None and self.data_version == current:
+            return
+        requested_version, requested_at = self._requested
+        if requested_version == current or time.monotonic() - requested_at < config.FOLLOW_THROUGH_RETRAIN_SECONDS:
+            return
+        self._requested = (current, time.monotonic())
+        logger.info("Retraining follow-through model", extra={
+            "event": "model_auto_retrain", "model": MODEL_NAME,
+            "data_version": current, "model_data_version": self.data_version,
+        })
+        if not jobs.runner.trigger(JOB_NAME):
+            # No job scheduler in this process (PRAXABLE_JOBS=0)
+            threading.Thread(target=self.train, name="follow-through-train", daemon=True).start()
+
+    @profiling.profiled("follow_through.score_plan")
+    def score_plan(self, tasks):
+        """
+        Scores a day's tasks (dicts with "task" and the FEATURES) with one
+        model call. Returns one {"task", "probability", "level", "title",
+        "nudge"} per task, in order; the probability is NEUTRAL_PROBABILITY
+        for all of them while there is no model.
+        """
+        import numpy as np
+        import pandas as pd
+
+        self._refresh()
+        model = self.model
+        if not tasks:
+            return []
+        if model is None:
+            probabilities = np.full(len(tasks), NEUTRAL_PROBABILITY)
+        else:
+            frame = pd.DataFrame({feature: [task.get(feature) for task in tasks] for feature in FEATURES})
+            probabilities = model.predict_proba(frame)[:, 1]
+        levels = nudge_levels(probabilities)
+
+        return [
+            {
+                "task": task["task"],
+                "probability": round(probability, 3),
+                "level": level,
+                "title": NUDGES[level][0],
+                "nudge": NUDGES[level][1].format(task=task["task"]),
+            }
+            for task, probability, level in zip(tasks, probabilities.tolist(), levels.tolist())
+        ]
+
+
+# Create a global instance to be used by the API
+follow_through = FollowThroughModel()
+
+jobs.runner.register(jobs.Job(
+    JOB_NAME, follow_through.train, lease=1800.0,
+    description="Retrains the follow-through model once tasks changed (asked for by POST /predict/follow-through)",
+))
@@ -0,0 +1,102 @@
+"""
+HTTP Caching Helpers
+
+Conditional GET support for the read-heavy endpoints. Validators come from
+data_manager's data version counter, so checking whether a client's copy is
+still fresh never touches the task database (with several workers it is one
+lookup in the shared state file):
+
+    etag, last_modified = http_cache.validators("tasks")
+    cached = http_cache.not_modified(request, etag, last_modified)
+    if cached:
+        return cached          # 304, empty body
+    ...build the response and attach http_cache.headers(etag, last_modified)
+"""
+
+import hashlib
+import json
+import os
+import uuid
+from email.utils import formatdate, parsedate_to_datetime
+
+from fastapi import Request, Response
+
+from . import config
+from . import data_manager
+from . import shared_state
+
+# The version counter lives in memory, so it restarts at 0 with the process.
+# Mixing in a per-process id keeps an old ETag from matching new data.
+BOOT_ID = uuid.uuid4().hex[:8]
+
+# Data baked into the code only changes on deploy; every worker of one deploy
+# sees the same source files, so their newest mtime is the same everywhere
+_PACKAGE_DIR = os.path.dirname(os.path.abspath(__file__))
+DEPLOY_TIME = max(os.path.getmtime(os.path.join(_PACKAGE_DIR, f)) for f in os.listdir(_PACKAGE_DIR) if f.endswith(".py"))
+_static_etags = {}
+
+
+def static_validators(resource, content):
+    """
+    Returns (etag, last_modified) for data baked into the code (e.g. the
+    activity catalog). The ETag is a hash of `content`, computed once per
+    process, so every worker and every restart of the same code agree on it.
+    """
+    etag = _static_etags.get(resource)
+    if etag is None:
+        digest = hashlib.sha1(json.dumps(content, sort_keys=True, default=str).encode()).hexdigest()[:16]
+        etag = _static_etags[resource] = f'W/"{resource}-{digest}"'
+    return etag, DEPLOY_TIME
+
+
+def validators(resource):
+    """
+    Returns (etag, last_modified) for a resource.
+    Read these BEFORE querying, so a write that races with the query can only
+    make the ETag look older than the data, never newer.
+    """
+    version, last_modified = data_manager.get_data_version()
+    # A shared counter survives restarts and is the same in every worker, so its
+    # ETags must be too (and must not depend on which worker answered)
+    origin = shared_state.instance_id() if config.WORKER_MODE == "multi" else BOOT_ID
+    return f'W/"{resource}-{origin}-{version}"', last_modified
+
+
+def headers(etag, last_modified):
+    """Caching headers to attach to a full (200) response."""
+    return {
+        "ETag": etag,
+        "Last-Modified": formatdate(last_modified, usegmt=True),
+        # Clients may keep a copy but must revalidate it before use
+        "Cache-Control": "no-cache",
+    }
+
+
+def _etag_matches(header_value, etag):
+    if header_value.strip() == "*":
+        return True
+    # Weak comparison: ignore the W/ prefix on both sides
+    wanted = etag.removeprefix("W/")
+    return any(tag.strip().removeprefix("W/") == wanted for tag in header_value.split(","))
+
+
+def not_modified(request: Request, etag, last_modified):
+    """Returns a 304 response if the client's copy is current, else None."""
+    if_none_match = request.headers.get("if-none-match")
+    if if_none_match is not None:
+        if _etag_matches(if_none_match, etag):
+            return Response(status_code=304, headers=headers(etag, last_modified))
+        return None
+
+    # If-Modified-Since is only consulted when there is no If-None-Match
+    if_modified_since = request.headers.get("if-modified-since")
+    if if_modified_since:
+        try:
+            since = parsedate_to_datetime(if_modified_since).timestamp()
+        except (TypeError, ValueError):
+            return None
+        # HTTP dates have one-second resolution, the data version doesn't: a
+        # write later in the second the client's copy is dated must not be hidden
+        if last_modified < since:
+            return Response(status_code=304, headers=headers(etag, last_modified))
+    return None
@@ -0,0 +1,300 @@
+"""
+Background Jobs Module
+
+Periodic and on-demand background work (retraining, refreshing the calendar
+cache, database maintenance) run by a scheduler thread inside the API
+process, instead of inside requests or at startup.
+
+- A Job is a function plus when to run it: every `interval` seconds, daily at
+  `daily_at` ("HH:MM" local time), or only when trigger()ed. Each scheduled
+  time gets a random delay of up to `jitter` seconds.
+- The schedule lives in the `jobs` table of the task database, so all workers
+  share it. A worker runs a due job only after taking its lease (a
+  conditional UPDATE), so each run happens exactly once across workers.
+  While the job runs, the scheduler thread renews the lease on its polls once
+  a third of it has passed (so `lease` must be several poll intervals long),
+  and a job may run for as long as it needs; a lease left behind by a crashed
+  worker expires within `lease` seconds of its last renewal.
+- trigger() makes a job due now. Triggers that arrive while the job is running
+  are folded into one more run once it finishes.
+
+Modules register their own jobs (see predictor.py, calendar_service.py and
+data_manager.py); GET /jobs shows their state.
+"""
+
+import datetime
+import logging
+import os
+import random
+import socket
+import sqlite3
+import threading
+import time
+import uuid
+
+from . import config
+from . import metrics
+
+logger = logging.getLogger(__name__)
+
+
+def _iso(timestamp):
+    if timestamp is None:
+        return None
+    return datetime.datetime.fromtimestamp(timestamp, datetime.timezone.utc).isoformat(timespec="seconds")
+
+
+class Job:
+    """
+    A unit of background work. `func()` may return a short text describing
+    what it did, shown in GET /jobs; raising marks the run as failed.
+    """
+
+    def __init__(self, name, func, interval=None, daily_at=None, jitter=0.0, lease=600.0, description=""):
+        self.name = name
+        self.func = func
+        self.interval = interval
+        self.daily_at = daily_at
+        self.jitter = jitter
+        self.lease = lease
+        self.description = description
+
+    @property
+    def schedule(self):
+        if self.interval:
+            return f"every {self.interval:g}s"
+        if self.daily_at:
+            return f"daily at {self.daily_at}"
+        return "on trigger"
+
+    def next_run(self, now):
+        """Epoch seconds of the next scheduled run after `now`, or None for trigger-only jobs."""
+        if self.interval:
+            base = now + self.interval
+        elif self.daily_at:
+            hour, minute = (int(part) for part in self.daily_at.split(":"))
+            local_now = datetime.datetime.fromtimestamp(now)
+            at = local_now.replace(hour=hour, minute=minute, second=0, microsecond=0)
+            if at <= local_now:
+                at += datetime.timedelta(days=1)
+            base = at.timestamp()
+        else:
+            return None
+        return base + random.uniform(0, self.jitter)
+
+
+class JobRunner:
+    """
+    Runs registered jobs when they are due (see the module docstring).
+
+    Args:
+        db_path: Callable returning the database path.
+    """
+
+    def __init__(self, db_path, poll_interval=5.0):
+        self.db_path = db_path
+        self.poll_interval = poll_interval
+        self.owner = f"{socket.gethostname()}:{os.getpid()}:{uuid.uuid4().hex[:6]}"
+        self.jobs = {}
+        self._running = {}
+        self._renewed = {}          # Job name -> when this worker last renewed its lease
+        self._lock = threading.Lock()
+        self._wake = threading.Event()
+        self._thread = None
+        self._stopped = False
+
+    def _connect(self):
+        return sqlite3.connect(self.db_path(), timeout=30.0, isolation_level=None)
+
+    def register(self, job):
+        if job.name in self.jobs:
+            raise ValueError(f"Job {job.name!r} is already registered")
+        self.jobs[job.name] = job
+        return job
+
+    @property
+    def started(self):
+        return self._thread is not None
+
+    def start(self):
+        """Adds any new jobs to the shared schedule and starts the scheduler thread."""
+        if self._thread is not None:
+            return
+        now = time.time()
+        conn = self._connect()
+        try:
+            conn.executemany(
+                "INSERT OR IGNORE INTO jobs (name, next_run_at) VALUES (?, ?)",
+                [(job.name, job.next_run(now)) for job in self.jobs.values()]
+            )
+        finally:
+            conn.close()
+        self._stopped = False
+        self._thread = threading.Thread(target=self._loop, name="praxable-jobs", daemon=True)
+        self._thread.start()
+        logger.info("Job scheduler started", extra={"event": "jobs_started", "jobs": sorted(self.jobs)})
+
+    def stop(self, timeout=5.0):
+        self._stopped = True
+        self._wake.set()
+        if self._thread is not None:
+            self._thread.join(timeout)
+        self._thread = None
+        with self._lock:
+            interrupted = list(self._running)
+        if interrupted:
+            # Jobs still running die with the process: free their leases so the
+            # next worker to poll reruns them rather than waiting for expiry
+            conn = self._connect()
+            try:
+                conn.execute("UPDATE jobs SET lease_owner = NULL, lease_expires_at = NULL WHERE lease_owner = ?", (self.owner,))
+            finally:
+                conn.close()
+
+    def trigger(self, name):
+        """
+        Makes job `name` due now (on whichever worker gets to it first).
+        Returns False if the scheduler isn't running in this process.
+        """
+        if name not in self.jobs:
+            raise KeyError(name)
+        if self._thread is None:
+            return False
+        conn = self._connect()
+        try:
+            conn.execute("UPDATE jobs SET next_run_at = ? WHERE name = ?", (time.time(), name))
+        finally:
+            conn.close()
+        self._wake.set()
+        return True
+
+    def _loop(self):
+        while not self._stopped:
+            try:
+                self.run_pending()
+            except sqlite3.Error:
+                logger.exception("Job scheduler could not read the schedule", extra={"event": "jobs_poll_failed"})
+            # Workers poll at slightly different moments
+            self._wake.wait(self.poll_interval * random.uniform(0.8, 1.2))
+            self._wake.clear()
+
+    def _renew_leases(self, conn, now):
+        """Extends the leases of this worker's running jobs once a third of them has passed."""
+        with self._lock:
+            due = [name for name in self._running if now - self._renewed.get(name, now) >= self.jobs[name].lease / 3]
+        for name in due:
+            renewed = conn.execute(
+                "UPDATE jobs SET lease_expires_at = ? WHERE name = ? AND lease_owner = ?",
+                (now + self.jobs[name].lease, name, self.owner)
+            ).rowcount
+            with self._lock:
+                if name in self._running:
+                    self._renewed[name] = now
+            if not renewed:
+                logger.warning("Job lost its lease while running", extra={"event": "job_lease_lost", "job": name})
+
+    def run_pending(self):
+        """Renews the leases of running jobs and starts every due job that isn't running anywhere else."""
+        now = time.time()
+        conn = self._connect()
+        try:
+            self._renew_leases(conn, now)
+            # A plain read first, so an idle poll never takes the write lock
+            due = [row[0] for row in conn.execute(
+                "SELECT name FROM jobs WHERE next_run_at <= ? AND (lease_expires_at IS NULL OR lease_expires_at < ?)",
+                (now, now)
+            )]
+            for name in due:
+                job = self.jobs.get(name)
+                with self._lock:
+                    if job is None or name in self._running:
+                        continue
+                acquired = conn.execute("""
+                    UPDATE jobs SET lease_owner = ?, lease_expires_at = ?, last_started_at = ?
+                    WHERE name = ? AND next_run_at <= ?
+                      AND (lease_expires_at IS NULL OR lease_expires_at < ?)
+                """, (self.owner, now + job.lease, now, job.name, now, now)).rowcount
+                if acquired:
+                    thread = threading.Thread(target=self._run, args=(job, now), name=f"praxable-job-{job.name}", daemon=True)
+                    with self._lock:
+                        self._running[job.name] = thread
+                        self._renewed[job.name] = now
+                    thread.start()
+        finally:
+            conn.close()
+
+    def _run(self, job, started_at):
+        logger.info("Job started", extra={"event": "job_started", "job": job.name})
+        start = time.perf_counter()
+        try:
+            detail = job.func()
+            status = "ok"
+        except Exception as e:
+            detail = f"{type(e).__name__}: {e}"
+            status = "failed"
+            logger.exception("Job failed", extra={"event": "job_failed", "job": job.name})
+        duration = time.perf_counter() - start
+        metrics.JOB_RUNS.labels(job.name, status).inc()
+        metrics.JOB_DURATION.labels(job.name).observe(duration)
+        try:
+            conn = self._connect()
+            try:
+                # A trigger that came in during the run (next_run_at moved past
+                # the start) is kept, so the job runs once more
+                conn.execute("""
+                    UPDATE jobs SET
+                        next_run_at = CASE WHEN next_run_at > ? THEN next_run_at ELSE ? END,
+                        lease_owner = NULL, lease_expires_at = NULL,
+                        last_finished_at = ?, last_status = ?, last_detail = ?, last_duration = ?,
+                        runs = runs + 1, failures = failures + ?
+                    WHERE name = ? AND lease_owner = ?
+                """, (
+                    started_at, job.next_run(time.time()), time.time(), status,
+                    None if detail is None else str(detail)[:500], duration,
+                    int(status == "failed"), job.name, self.owner,
+                ))
+            finally:
+                conn.close()
+        except sqlite3.Error:
+            logger.exception("Could not record job run", extra={"event": "job_record_failed", "job": job.name})
+        finally:
+            with self._lock:
+                self._running.pop(job.name, None)
+                self._renewed.pop(job.name, None)
+        logger.info("Job finished", extra={
+            "event": "job_finished", "job": job.name, "status": status, "duration_ms": round(duration * 1000, 1)
+        })
+        self._wake.set()
+
+    def status(self):
+        """Every registered job with its schedule and last run, for GET /jobs."""
+        conn = self._connect()
+        try:
+            conn.row_factory = sqlite3.Row
+            rows = {row["name"]: dict(row) for row in conn.execute("SELECT * FROM jobs")}
+        finally:
+            conn.close()
+        now = time.time()
+        result = []
+        for name, job in sorted(self.jobs.items()):
+            row = rows.get(name, {})
+            lease_expires_at = row.get("lease_expires_at")
+            result.append({
+                "name": name,
+                "description": job.description,
+                "schedule": job.schedule,
+                "running": bool(lease_expires_at and lease_expires_at > now),
+                "running_on": row.get("lease_owner"),
+                "next_run_at": _iso(row.get("next_run_at")),
+                "last_started_at": _iso(row.get("last_started_at")),
+                "last_finished_at": _iso(row.get("last_finished_at")),
+                "last_status": row.get("last_status"),
+                "last_detail": row.get("last_detail"),
+                "last_duration_ms": None if row.get("last_duration") is None else round(row["last_duration"] * 1000, 1),
+                "runs": row.get("runs", 0),
+                "failures": row.get("failures", 0),
+            })
+        return result
+
+
+runner = JobRunner(db_path=lambda: config.DB_PATH, poll_interval=config.JOBS_POLL_SECONDS)
@@ -0,0 +1,124 @@
+"""
+Live Updates Module
+
+Pushes analytics changes to dashboards over Server-Sent Events (GET
+/analytics/stream) instead of having them poll /analytics/alignment.
+
+Every connection shares the same work. analytics.AlignmentStats builds one
+delta per batch of change events. The hub serializes it once and the event
+loop appends the same bytes to each client's queue, so 1000 open dashboards
+cost one computation plus 1000 queue appends per change.
+
+A client first gets a `snapshot` event (the /analytics/alignment payload plus
+the seq it reflects), then `delta` events. A client whose queue fills up
+(it is reading slower than changes arrive) has its backlog dropped and gets
+a fresh snapshot instead.
+"""
+
+import asyncio
+import logging
+
+import orjson
+
+from . import analytics
+from . import config
+from . import metrics
+
+logger = logging.getLogger(__name__)
+
+_RESYNC = object()       # Queued in place of a dropped backlog
+_HEARTBEAT = b": ping\n\n"
+
+
+def _frame(event, data):
+    return b"event: " + event.encode() + b"\ndata: " + orjson.dumps(data) + b"\n\n"
+
+
+class LiveHub:
+    """Fans analytics deltas out to the connected SSE clients of this worker."""
+
+    def __init__(self, stats, queue_size=100, heartbeat=15.0):
+        self.stats = stats
+        self.queue_size = queue_size
+        self.heartbeat = heartbeat
+        self._clients = set()
+        self._loop = None
+        self._heartbeat_task = None
+        self._snapshot = (None, None)   # (seq, frame), rebuilt when the stats move on
+        stats.add_listener(self.publish)
+
+    @property
+    def connections(self):
+        return len(self._clients)
+
+    def _bind(self, loop):
+        """Attaches the hub to the event loop serving the clients (on first connection)."""
+        if self._loop is loop:
+            return
+        self._loop = loop
+        self._heartbeat_task = loop.create_task(self._send_heartbeats())
+
+    def publish(self, delta):
+        """Called from the event bus thread with each delta; hands one frame to the loop."""
+        loop = self._loop
+        if loop is None or not self._clients:
+            return
+        frame = _frame("delta", delta)
+        try:
+            loop.call_soon_threadsafe(self._fan_out, frame)
+        except RuntimeError:
+            pass    # The loop has closed (shutdown)
+
+    def _fan_out(self, frame):
+        for queue in self._clients:
+            try:
+                queue.put_nowait(frame)
+            except asyncio.QueueFull:
+                while not queue.empty():
+                    queue.get_nowait()
+                queue.put_nowait(_RESYNC)
+                metrics.LIVE_RESYNCS.inc()
+
+    async def _send_heartbeats(self):
+        # Keeps proxies from closing idle streams; one timer for every client
+        while True:
+            await asyncio.sleep(self.heartbeat)
+            self._fan_out(_HEARTBEAT)
+
+    def _snapshot_frame(self):
+        seq, total_tasks, breakdown = self.stats.snapshot()
+        if self._snapshot[0] != seq:
+            self._snapshot = (seq, _frame("snapshot", {
+                "seq": seq, "total_tasks": total_tasks, "breakdown": breakdown
+            }))
+        return self._snapshot[1]
+
+    async def stream(self):
+        """SSE frames for one client, until it disconnects."""
+        self._bind(asyncio.get_running_loop())
+        queue = asyncio.Queue(maxsize=self.queue_size)
+        # Registered before the snapshot is taken: a change made in between
+        # arrives as a delta too, which is harmless since deltas hold totals
+        self._clients.add(queue)
+        metrics.LIVE_CONNECTIONS.inc()
+        try:
+            yield self._snapshot_frame()
+            while True:
+                frame = await queue.get()
+                yield self._snapshot_frame() if frame is _RESYNC else frame
+        finally:
+            self._clients.discard(queue)
+            metrics.LIVE_CONNECTIONS.dec()
+
+    def stop(self):
+        if self._heartbeat_task is not None:
+            self._heartbeat_task.cancel()
+        self._heartbeat_task = None
+        self._loop = None
+
+
+hub = LiveHub(
+    analytics.alignment_stats,
+    queue_size=config.LIVE_CLIENT_QUEUE_SIZE,
+    heartbeat=config.LIVE_HEARTBEAT_SECONDS,
+)
@@ -0,0 +1,383 @@
+"""
+LLM Client Module
+
+A thin resilience layer between the planner and Gemini:
+
+- A global semaphore caps how many Gemini calls run at once. Callers that
+  can't get a slot within LLM_QUEUE_TIMEOUT are turned away instead of piling up.
+- Every attempt has a deadline. Transient failures are retried with
+  exponential backoff and full jitter.
+- A circuit breaker opens after consecutive failures, so while Gemini is down
+  requests fail fast (HTTP 503 + Retry-After) instead of waiting on timeouts.
+
+Anything with a `generate_content(content, **kwargs)` method can be driven by
+the client, which is how FakeModel lets us exercise all of this offline.
+"""
+
+import random
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor, TimeoutError as FutureTimeoutError
+from typing import Any, Dict
+
+from . import config
+from . import metrics
+from . import profiling
+
+# HTTP status codes (as exposed on google.api_core exceptions) worth retrying
+RETRYABLE_STATUS_CODES = {408, 429, 500, 502, 503, 504}
+
+_END = object()   # What stream() pulls once the model's chunks run out
+
+
+class LLMUnavailableError(Exception):
+    """Raised when Gemini can't be called right now. Maps to HTTP 503."""
+
+    def __init__(self, message, retry_after=1.0):
+        super().__init__(message)
+        self.retry_after = retry_after
+
+
+class TransientLLMError(Exception):
+    """A failure that is worth retrying (used by FakeModel)."""
+
+
+def _is_retryable(exc):
+    if isinstance(exc, (TimeoutError, FutureTimeoutError, ConnectionError, TransientLLMError)):
+        return True
+    return getattr(exc, "code", None) in RETRYABLE_STATUS_CODES
+
+
+class CircuitBreaker:
+    """
+    Classic three-state breaker.
+    closed -> open after `failure_threshold` consecutive failures,
+    open -> half_open after `reset_timeout` seconds,
+    half_open -> closed on the first success (or back to open on failure).
+    """
+
+    CLOSED = "closed"
+    OPEN = "open"
+    HALF_OPEN = "half_open"
+
+    def __init__(self, failure_threshold=5, reset_timeout=30.0):
+        self.failure_threshold = failure_threshold
+        self.reset_timeout = reset_timeout
+        self._state = self.CLOSED
+        self._failures = 0
+        self._opened_at = 0.0
+        self._trial_in_flight = False
+        self._lock = threading.Lock()
+
+    @property
+    def state(self):
+        with self._lock:
+            self._maybe_half_open()
+            return self._state
+
+    def _maybe_half_open(self):
+        if self._state == self.OPEN and time.monotonic() - self._opened_at >= self.reset_timeout:
+            self._state = self.HALF_OPEN
+            self._trial_in_flight = False
+
+    def allow(self):
+        """Returns True if a call may go through right now."""
+        with self._lock:
+            self._maybe_half_open()
+            if self._state == self.CLOSED:
+                return True
+            if self._state == self.HALF_OPEN and not self._trial_in_flight:
+                # Let exactly one trial call probe whether Gemini recovered
+                self._trial_in_flight = True
+                return True
+            return False
+
+    def retry_after(self):
+        """Seconds until the breaker will let a trial call through."""
+        with self._lock:
+            if self._state != self.OPEN:
+                return 1.0
+            return max(1.0, self.reset_timeout - (time.monotonic() - self._opened_at))
+
+    def cancel_trial(self):
+        """Frees the half-open trial slot when the call never reached Gemini."""
+        with self._lock:
+            self._trial_in_flight = False
+
+    def record_success(self):
+        with self._lock:
+            self._state = self.CLOSED
+            self._failures = 0
+            self._trial_in_flight = False
+
+    def record_failure(self):
+        with self._lock:
+            self._failures += 1
+            if self._state == self.HALF_OPEN or self._failures >= self.failure_threshold:
+                self._state = self.OPEN
+                self._opened_at = time.monotonic()
+                self._trial_in_flight = False
+
+
+class LLMClient:
+    def __init__(
+        self,
+        max_concurrency=None,
+        queue_timeout=None,
+        call_timeout=None,
+        max_retries=None,
+        backoff_base=None,
+        backoff_max=None,
+        breaker=None,
+    ):
+        self.max_concurrency = max_concurrency or config.LLM_MAX_CONCURRENCY
+        self.queue_timeout = config.LLM_QUEUE_TIMEOUT if queue_timeout is None else queue_timeout
+        self.call_timeout = call_timeout or config.LLM_CALL_TIMEOUT
+        self.max_retries = config.LLM_MAX_RETRIES if max_retries is None else max_retries
+        self.backoff_base = config.LLM_BACKOFF_BASE if backoff_base is None else backoff_base
+        self.backoff_max = config.LLM_BACKOFF_MAX if backoff_max is None else backoff_max
+        self.breaker = breaker or CircuitBreaker(
+            failure_threshold=config.LLM_BREAKER_FAILURE_THRESHOLD,
+            reset_timeout=config.LLM_BREAKER_RESET_SECONDS,
+        )
+
+        self._slots = threading.BoundedSemaphore(self.max_concurrency)
+        # Attempts that time out keep running in the background, so the pool
+        # is sized to the semaphore: a slot is only freed when its call returns.
+        self._executor = ThreadPoolExecutor(
+            max_workers=self.max_concurrency, thread_name_prefix="llm"
+        )
+        self._lock = threading.Lock()
+        self._in_flight = 0
+        self._queued = 0
+        self._counters = {
+            "calls": 0,
+            "successes": 0,
+            "failures": 0,
+            "retries": 0,
+            "timeouts": 0,
+            "rejected_breaker_open": 0,
+            "rejected_queue_full": 0,
+        }
+
+    # --- Internal helpers ---
+
+    def _count(self, name, amount=1):
+        with self._lock:
+            self._counters[name] += amount
+        metrics.LLM_EVENTS.labels(name).inc(amount)
+
+    def _acquire_slot(self):
+        with self._lock:
+            self._queued += 1
+        try:
+            acquired = self._slots.acquire(timeout=self.queue_timeout)
+        finally:
+            with self._lock:
+                self._queued -= 1
+        if not acquired:
+            self._count("rejected_queue_full")
+            raise LLMUnavailableError("Too many AI requests in flight, try again shortly.", retry_after=1.0)
+        with self._lock:
+            self._in_flight += 1
+
+    def _release_slot(self, _future=None):
+        with self._lock:
+            self._in_flight -= 1
+        self._slots.release()
+
+    def _backoff(self, attempt):
+        """Exponential backoff with full jitter."""
+        cap = min(self.backoff_max, self.backoff_base * (2 ** attempt))
+        return random.uniform(0, cap)
+
+    def check_available(self):
+        """Raises LLMUnavailableError right away if the breaker is open."""
+        if self.breaker.state == CircuitBreaker.OPEN:
+            self._count("rejected_breaker_open")
+            raise LLMUnavailableError(
+                "AI service is temporarily unavailable.", retry_after=self.breaker.retry_after()
+            )
+
+    # --- Public API ---
+
+    @profiling.profiled("llm_client.generate")
+    def generate(self, model, content, **kwargs):
+        """
+        Calls model.generate_content(content, **kwargs) under the concurrency
+        limit, deadline, retry policy and circuit breaker.
+        """
+        self._count("calls")
+        last_error = None
+
+        for attempt in range(self.max_retries + 1):
+            if not self.breaker.allow():
+                self._count("rejected_breaker_open")
+                raise LLMUnavailableError(
+                    "AI service is temporarily unavailable.", retry_after=self.breaker.retry_after()
+                )
+
+            try:
+                self._acquire_slot()
+            except LLMUnavailableError:
+                self.breaker.cancel_trial()
+                raise
+            future = self._executor.submit(model.generate_content, content, **kwargs)
+            future.add_done_callback(self._release_slot)
+            started = time.perf_counter()
+
+            try:
+                result = future.result(timeout=self.call_timeout)
+                metrics.LLM_LATENCY.labels("generate", "success").observe(time.perf_counter() - started)
+                self.breaker.record_success()
+                self._count("successes")
+                return result
+            except FutureTimeoutError as e:
+                metrics.LLM_LATENCY.labels("generate", "timeout").observe(time.perf_counter() - started)
+                metrics.LLM_ERRORS.labels("Timeout").inc()
+                self._count("timeouts")
+                last_error = e
+            except Exception as e:
+                metrics.LLM_LATENCY.labels("generate", "error").observe(time.perf_counter() - started)
+                metrics.LLM_ERRORS.labels(type(e).__name__).inc()
+                last_error = e
+                if not _is_retryable(e):
+                    # Bad requests are our fault, not Gemini's: don't trip the
+                    # breaker, but free the half-open trial for the next caller
+                    self.breaker.cancel_trial()
+                    self._count("failures")
+                    raise
+
+            self.breaker.record_failure()
+            if attempt < self.max_retries:
+                self._count("retries")
+                time.sleep(self._backoff(attempt))
+
+        self._count("failures")
+        raise LLMUnavailableError(
+            f"AI service did not respond: {last_error!r}",
+            retry_after=max(1.0, self.breaker.retry_after()),
+        )
+
+    def stream(self, model, content, **kwargs):
+        """
+        Streaming variant of generate(). Yields the model's chunks.
+        Streams are not retried, since chunks may already have reached the caller.
+        The request and every chunk must arrive within call_timeout, or the
+        stream fails with LLMUnavailableError.
+        """
+        self._count("calls")
+        if not self.breaker.allow():
+            self._count("rejected_breaker_open")
+            raise LLMUnavailableError(
+                "AI service is temporarily unavailable.", retry_after=self.breaker.retry_after()
+            )
+
+        try:
+            self._acquire_slot()
+        except LLMUnavailableError:
+            self.breaker.cancel_trial()
+            raise
+        started = time.perf_counter()
+        settled = False
+        # The SDK's iterator blocks, so the request and each chunk are pulled in
+        # the pool under a deadline. A pull that times out keeps running there,
+        # and the slot is only freed once it returns (as in generate()).
+        pending = self._executor.submit(lambda: iter(model.generate_content(content, stream=True, **kwargs)))
+        try:
+            chunks = pending.result(timeout=self.call_timeout)
+            while True:
+                pending = self._executor.submit(next, chunks, _END)
+                chunk = pending.result(timeout=self.call_timeout)
+                if chunk is _END:
+                    break
+                yield chunk
+        except FutureTimeoutError as e:
+            metrics.LLM_LATENCY.labels("stream", "timeout").observe(time.perf_counter() - started)
+            metrics.LLM_ERRORS.labels("Timeout").inc()
+            self._count("timeouts")
+            self.breaker.record_failure()
+            settled = True
+            self._count("failures")
+            raise LLMUnavailableError(
+                f"AI service stopped responding: {e!r}", retry_after=max(1.0, self.breaker.retry_after())
+            ) from e
+        except Exception as e:
+            metrics.LLM_LATENCY.labels("stream", "error").observe(time.perf_counter() - started)
+            metrics.LLM_ERRORS.labels(type(e).__name__).inc()
+            if _is_retryable(e):
+                self.breaker.record_failure()
+                settled = True
+            self._count("failures")
+            raise
+        else:
+            metrics.LLM_LATENCY.labels("stream", "success").observe(time.perf_counter() - started)
+            self.breaker.record_success()
+            settled = True
+            self._count("successes")
+        finally:
+            if not settled:
+                # Bad request, or the caller stopped reading (GeneratorExit):
+                # says nothing about Gemini's health
+                self.breaker.cancel_trial()
+            pending.add_done_callback(self._release_slot)
+
+    def metrics(self) -> Dict[str, Any]:
+        """Snapshot of in-flight/queued calls, breaker state and counters."""
+        with self._lock:
+            snapshot = {
+                "in_flight": self._in_flight,
+                "queued": self._queued,
+                "max_concurrency": self.max_concurrency,
+                **self._counters,
+            }
+        snapshot["breaker_state"] = self.breaker.state
+        return snapshot
+
+
+class FakeModel:
+    """
+    Offline stand-in for genai.GenerativeModel.
+
+    Args:
+        reply: The text every successful call returns.
+        latency: Seconds each call takes.
+        error_rate: Probability (0-1) that a call raises TransientLLMError.
+    """
+
+    def __init__(self, reply='{"tasks": []}', latency=0.0, error_rate=0.0, seed=None):
+        self.reply = reply
+        self.latency = latency
+        self.error_rate = error_rate
+        self.calls = 0
+        self._random = random.Random(seed)
+
+    class _Response:
+        def __init__(self, text):
+            self.text = text
+
+    def generate_content(self, content, stream=False, **kwargs):
+        self.calls += 1
+        if self.latency:
+            time.sleep(self.latency)
+        if self._random.random() < self.error_rate:
+            raise TransientLLMError("Simulated Gemini failure")
+        if stream:
+            step = 16
+            return [self._Response(self.reply[i:i + step]) for i in range(0, len(self.reply), step)]
+        return self._Response(self.reply)
+
+
+# Create a global instance shared by every planner request
+client = LLMClient()
+
+# Live client state for /metrics, read at scrape time
+metrics.Gauge("praxable_llm_in_flight", "Gemini calls currently running.").set_function(
+    lambda: client._in_flight
+)
+metrics.Gauge("praxable_llm_queued", "Gemini calls waiting for a free slot.").set_function(
+    lambda: client._queued
+)
+metrics.Gauge("praxable_llm_breaker_open", "1 while the circuit breaker is open.").set_function(
+    lambda: 1 if client.breaker.state == CircuitBreaker.OPEN else 0
+)
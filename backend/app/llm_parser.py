@@ -1,33 +1,24 @@
-import os
-import google.generativeai as genai
 import json
-from dotenv import load_dotenv
+import logging
 
-# Load environment variables from the .env file in the 'backend' directory
-load_dotenv()
+from . import config
+from . import llm_client
+from . import profiling
+from .model_registry import registry
 
-def get_structured_plan(user_input, core_values, free_slots, audio_file=None):
-    """
-    Sends user input, core values, AND free time slots to the AI.
-    """
-    try:
-        api_key = os.getenv("GEMINI_API_KEY")
-        if not api_key:
-            raise ValueError("GEMINI_API_KEY not found in .env file.")
-        genai.configure(api_key=api_key)
-    except Exception as e:
-        print(f"Error configuring API: {e}")
-        return None
+logger = logging.getLogger(__name__)
 
+def _build_prompt(user_input, core_values, free_slots):
+    """Builds the master prompt from the user's input, values and free slots."""
     # Format free slots into a readable string for the AI
     slots_text = "\n".join([
-        f"- {s['start']} to {s['end']} ({s['duration_minutes']} mins)" 
+        f"- {s['start']} to {s['end']} ({s['duration_minutes']} mins)"
         for s in free_slots
     ])
 
-    master_prompt = f"""
+    return f"""
     You are an expert planning assistant for the 'Praxable' app.
-    
+
     CONTEXT:
     1. User's Core Values: {', '.join(core_values)}
     2. User's Input (Intentions): "{user_input}"
@@ -53,26 +44,224 @@ def get_structured_plan(user_input, core_values, free_slots, audio_file=None):
         }}
       ]
     }}
-    
+
     Do not include markdown formatting. Return raw JSON.
     """
 
+def _build_intent_prompt(user_input, core_values):
+    """
+    Builds the prompt for get_task_intents(): Gemini only says what the tasks
+    are; plan_optimizer decides when they happen.
+    """
+    return f"""
+    You are an expert planning assistant for the 'Praxable' app.
+
+    CONTEXT:
+    1. User's Core Values: {', '.join(core_values)}
+    2. User's Input (Intentions): "{user_input}"
+
+    INSTRUCTIONS:
+    Analyze the user's input (text or audio) to identify the tasks they want to do today.
+    Do not schedule them; only describe each task.
+    - Estimate how long each task takes in minutes if the user didn't say.
+    - Only give a start time if the user asked for a specific one (e.g., "at 5pm" -> "17:00").
+    - If audio is provided, prioritize the audio content.
+
+    OUTPUT FORMAT (JSON ONLY):
+    {{
+      "tasks": [
+        {{
+          "task_name": "String",
+          "task_type": "Category",
+          "aligned_value": "Value Name",
+          "duration_minutes": Number,
+          "start_time": "HH:MM" or null
+        }}
+      ]
+    }}
+
+    Do not include markdown formatting. Return raw JSON.
+    """
+
+def _build_content(prompt, audio_file=None, audio_mime_type='audio/wav'):
+    """Builds the multimodal content list sent to Gemini."""
+    content = [prompt]
+    if audio_file:
+        # audio_file is expected to be bytes
+        blob = {'mime_type': audio_mime_type, 'data': audio_file}
+        content.append(blob)
+    return content
+
+def _parse_plan_text(text):
+    """Strips markdown fences from a model reply and parses it as JSON."""
+    json_response_text = text.strip().replace('```json', '').replace('```', '')
+    return json.loads(json_response_text)
+
+def _generate_json(prompt, audio_file=None, audio_mime_type='audio/wav'):
+    """Sends a prompt (plus optional audio) to Gemini and parses the JSON reply. None if that failed."""
+    # The configured model is created once and reused across requests
+    model = registry.get_model()
+    if model is None:
+        return None
+
     try:
-        # Use Gemini 2.0 Flash which supports multimodal input
-        model = genai.GenerativeModel('gemini-2.0-flash')
-        
-        content = [master_prompt]
-        if audio_file:
-            # audio_file is expected to be bytes
-            blob = {'mime_type': 'audio/wav', 'data': audio_file}
-            content.append(blob)
-
-        response = model.generate_content(content)
-        
-        json_response_text = response.text.strip().replace('```json', '').replace('```', '')
-        structured_data = json.loads(json_response_text)
+        content = _build_content(prompt, audio_file, audio_mime_type)
+
+        # Goes through the shared client: concurrency limit, deadline, retries, breaker
+        response = llm_client.client.generate(
+            model, content, request_options={"timeout": config.LLM_CALL_TIMEOUT}
+        )
+
+        structured_data = _parse_plan_text(response.text)
         return structured_data
 
-    except Exception as e:
-        print(f"AI Error: {e}")
-        return None
\ No newline at end of file
+    except llm_client.LLMUnavailableError:
+        raise
+    except Exception:
+        logger.exception("AI Error", extra={"event": "plan_generation_failed"})
+        return None
+
+@profiling.profiled()
+def get_structured_plan(user_input, core_values, free_slots, audio_file=None, audio_mime_type='audio/wav'):
+    """
+    Sends user input, core values, AND free time slots to the AI.
+
+    Raises llm_client.LLMUnavailableError when Gemini is overloaded or failing,
+    so the API can answer with a fast 503 instead of a generic error.
+    """
+    master_prompt = _build_prompt(user_input, core_values, free_slots)
+    return _generate_json(master_prompt, audio_file, audio_mime_type)
+
+@profiling.profiled()
+def get_task_intents(user_input, core_values, audio_file=None, audio_mime_type='audio/wav'):
+    """
+    Asks the AI only what the user wants to do: {"tasks": [{task_name,
+    task_type, aligned_value, duration_minutes, start_time}]}, without
+    placing anything (see plan_optimizer.place_plan).
+
+    Raises llm_client.LLMUnavailableError like get_structured_plan.
+    """
+    return _generate_json(_build_intent_prompt(user_input, core_values), audio_file, audio_mime_type)
+
+
+class TaskStreamParser:
+    """
+    Incrementally parses the model's JSON reply as it streams in.
+
+    The reply looks like {"tasks": [{...}, {...}]}. We don't wait for the
+    closing brackets: as soon as one task object inside the "tasks" array is
+    balanced, it is decoded and handed back to the caller.
+    """
+
+    def __init__(self):
+        self._buffer = ""
+        self._pos = 0              # Next character of the buffer to scan
+        self._in_array = False     # Have we seen '"tasks": ['?
+        self._done = False         # Have we seen the closing ']'?
+        self._depth = 0            # Brace depth inside the current task object
+        self._in_string = False
+        self._escape = False
+        self._obj_start = None
+
+    def feed(self, chunk):
+        """Adds a chunk of text and returns the list of tasks completed by it."""
+        self._buffer += chunk
+        tasks = []
+
+        if self._done:
+            return tasks
+
+        if not self._in_array:
+            key_pos = self._buffer.find('"tasks"')
+            if key_pos == -1:
+                return tasks
+            bracket_pos = self._buffer.find('[', key_pos)
+            if bracket_pos == -1:
+                return tasks
+            self._in_array = True
+            self._pos = bracket_pos + 1
+
+        buf = self._buffer
+        i = self._pos
+        while i < len(buf):
+            ch = buf[i]
+            if self._in_string:
+                if self._escape:
+                    self._escape = False
+                elif ch == '\\':
+                    self._escape = True
+                elif ch == '"':
+                    self._in_string = False
+            elif ch == '"':
+                self._in_string = True
+            elif ch == '{':
+                if self._depth == 0:
+                    self._obj_start = i
+                self._depth += 1
+            elif ch == '}':
+                self._depth -= 1
+                if self._depth == 0 and self._obj_start is not None:
+                    try:
+                        tasks.append(json.loads(buf[self._obj_start:i + 1]))
+                    except json.JSONDecodeError as e:
+                        logger.warning(
+                            "Skipping malformed task in stream", extra={"event": "stream_task_malformed", "error": str(e)}
+                        )
+                    self._obj_start = None
+            elif ch == ']' and self._depth == 0:
+                self._done = True
+                i += 1
+                break
+            i += 1
+
+        self._pos = i
+        return tasks
+
+    @property
+    def text(self):
+        """The full text received so far."""
+        return self._buffer
+
+    @property
+    def saw_tasks(self):
+        """True once the "tasks" array has been located in the stream."""
+        return self._in_array
+
+
+def stream_structured_plan(user_input, core_values, free_slots, audio_file=None, audio_mime_type='audio/wav'):
+    """
+    Same as get_structured_plan, but streams the reply from Gemini and yields
+    each task dict as soon as it has been fully generated.
+
+    Raises RuntimeError if the model could not be reached or produced no tasks.
+    """
+    model = registry.get_model()
+    if model is None:
+        raise RuntimeError("Gemini API is not configured.")
+
+    master_prompt = _build_prompt(user_input, core_values, free_slots)
+    content = _build_content(master_prompt, audio_file, audio_mime_type)
+
+    parser = TaskStreamParser()
+    response = llm_client.client.stream(
+        model, content, request_options={"timeout": config.LLM_CALL_TIMEOUT}
+    )
+    for chunk in response:
+        try:
+            text = chunk.text
+        except ValueError:
+            # Chunks without text parts (e.g. safety metadata) are skipped
+            continue
+        for task in parser.feed(text):
+            yield task
+
+    if not parser.saw_tasks:
+        # The model ignored the format; fall back to parsing the whole reply
+        try:
+            plan = _parse_plan_text(parser.text)
+        except json.JSONDecodeError as e:
+            raise RuntimeError(f"AI returned invalid JSON: {e}")
+        if not isinstance(plan, dict) or "tasks" not in plan:
+            raise RuntimeError("AI failed to generate a valid plan.")
+        for task in plan["tasks"]:
+            yield task
@@ -0,0 +1,282 @@
+"""
+Local Planner Parser Module
+
+A rule-based fast path for short, simple planner inputs such as
+"gym at 6pm, read 30 min". It pulls out task names, durations and explicit
+times with regular expressions, matches each task to one of the user's core
+values, and places the tasks into today's free slots with plan_optimizer.
+
+Every plan comes with a confidence score. The API only trusts the local plan
+when the confidence is high; anything ambiguous still goes to Gemini.
+"""
+
+import re
+from typing import Any, Dict, List, Optional, Tuple
+
+from . import config
+from . import plan_optimizer
+from . import profiling
+from . import recommendations
+
+MAX_SIMPLE_INPUT_WORDS = 40   # Longer inputs are rarely "simple"
+MAX_TASK_NAME_WORDS = 6
+
+# Words that usually mean the input has conditions or reasoning we can't handle
+COMPLEX_MARKERS = {
+    "if", "unless", "maybe", "because", "depending", "either", "or", "instead",
+    "before", "after", "until", "while", "except", "not", "don't", "cant", "can't",
+}
+
+# Relative time words we can't map to a slot reliably; Gemini handles these better
+VAGUE_TIME_MARKERS = {
+    "morning", "afternoon", "evening", "tonight", "night", "lunch", "breakfast",
+    "later", "soon", "tomorrow", "weekend", "early", "late", "sometime",
+}
+
+# Separators between tasks: commas, semicolons, new lines, "and", "then"
+SPLIT_PATTERN = re.compile(r"\s*(?:,|;|\n|\band then\b|\bthen\b|\band\b|\balso\b)\s*", re.IGNORECASE)
+
+# e.g. "at 6pm", "at 18:30", "6:15 am", "7pm", "at noon"
+TIME_PATTERN = re.compile(
+    r"\b(?:at\s+)?(?:(noon|midday|midnight)|(\d{1,2}):(\d{2})\s*(am|pm)?|(\d{1,2})\s*(am|pm)|at\s+(\d{1,2}))\b",
+    re.IGNORECASE
+)
+
+# e.g. "30 min", "1.5 hours", "2h", "45m", "for an hour", "half an hour"
+DURATION_PATTERN = re.compile(
+    r"\b(?:for\s+)?(?:(\d+(?:\.\d+)?)\s*(hours?|hrs?|h|minutes?|mins?|m)\b|(half an hour)|(an hour|one hour))",
+    re.IGNORECASE
+)
+
+FILLER_PATTERN = re.compile(
+    r"^(?:i\s+)?(?:need to|have to|want to|wanna|gotta|should|must|will|i'll|going to|plan to|to)\s+",
+    re.IGNORECASE
+)
+
+# Keyword -> task type. The types match the ones used in the Streamlit log form.
+TASK_TYPE_KEYWORDS = {
+    "Exercise": ["gym", "run", "jog", "workout", "lift", "swim", "yoga", "bike", "cycle", "walk", "hike", "exercise", "train", "stretch"],
+    "Learning": ["read", "study", "learn", "course", "lecture", "podcast", "practice", "homework", "book"],
+    "Deep Work": ["write", "code", "report", "project", "essay", "research", "design", "plan", "focus", "thesis", "draft"],
+    "Chore": ["clean", "laundry", "dishes", "groceries", "shop", "cook", "tidy", "organize", "errand", "vacuum", "pay"],
+    "Creative": ["paint", "draw", "music", "guitar", "piano", "sing", "journal", "photograph", "craft"],
+    "Social": ["call", "meet", "dinner", "lunch", "coffee", "friend", "mom", "dad", "family", "date", "visit"],
+    "Rest": ["nap", "meditate", "rest", "relax", "sleep", "breathe"],
+    "Shallow Work": ["email", "emails", "admin", "inbox", "meeting", "slack"],
+}
+
+# Fallback hints linking a task type to value names commonly used for it.
+# Checked after the catalog-derived hints below.
+TYPE_VALUE_HINTS = {
+    "Exercise": ["health", "energy", "strength", "discipline", "fitness"],
+    "Learning": ["growth", "learning", "knowledge", "curiosity", "wisdom"],
+    "Deep Work": ["career", "productivity", "purpose", "discipline", "growth", "achievement"],
+    "Chore": ["order", "clarity", "self-care", "responsibility", "home"],
+    "Creative": ["creativity", "expression", "art", "joy", "flow"],
+    "Social": ["connection", "relationships", "family", "love", "community", "friendship"],
+    "Rest": ["rest", "peace", "balance", "mindfulness", "health", "self-care"],
+    "Shallow Work": ["career", "productivity", "responsibility"],
+}
+
+
+def _catalog_value_hints() -> Dict[str, List[str]]:
+    """Maps task keywords to value names using the activity catalog."""
+    hints = {}
+    for activity in recommendations.get_all_activities():
+        for word in re.findall(r"[a-z]+", activity["name"].lower()):
+            if len(word) > 3:
+                hints.setdefault(word, [])
+                hints[word].extend(v.lower() for v in activity["aligned_values"])
+    return hints
+
+
+CATALOG_VALUE_HINTS = _catalog_value_hints()
+
+
+# --- Parsing helpers ---
+
+def _to_minutes(hhmm: str) -> int:
+    hours, minutes = hhmm.split(":")
+    return int(hours) * 60 + int(minutes)
+
+
+def _to_hhmm(minutes: int) -> str:
+    return f"{minutes // 60:02d}:{minutes % 60:02d}"
+
+
+def _extract_time(segment: str) -> Tuple[Optional[int], str]:
+    """Returns (minutes since midnight, segment without the time phrase)."""
+    match = TIME_PATTERN.search(segment)
+    if not match:
+        return None, segment
+
+    word, hh, mm, ampm1, h_only, ampm2, bare_at = match.groups()
+    if word:
+        minutes = 0 if word.lower() == "midnight" else 12 * 60
+    else:
+        hour = int(hh or h_only or bare_at)
+        minute = int(mm) if mm else 0
+        ampm = (ampm1 or ampm2 or "").lower()
+        if hour > 23 or minute > 59:
+            return None, segment
+        if ampm == "pm" and hour < 12:
+            hour += 12
+        elif ampm == "am" and hour == 12:
+            hour = 0
+        elif not ampm and 1 <= hour <= 6:
+            # "gym at 6" almost always means the evening
+            hour += 12
+        minutes = hour * 60 + minute
+
+    return minutes, (segment[:match.start()] + " " + segment[match.end():]).strip()
+
+
+def _extract_duration(segment: str) -> Tuple[Optional[int], str]:
+    """Returns (duration in minutes, segment without the duration phrase)."""
+    match = DURATION_PATTERN.search(segment)
+    if not match:
+        return None, segment
+
+    amount, unit, half_hour, one_hour = match.groups()
+    if half_hour:
+        minutes = 30
+    elif one_hour:
+        minutes = 60
+    else:
+        value = float(amount)
+        minutes = value * 60 if unit.lower().startswith("h") else value
+    return int(round(minutes)), (segment[:match.start()] + " " + segment[match.end():]).strip()
+
+
+def _classify(words: List[str]) -> Optional[str]:
+    for task_type, keywords in TASK_TYPE_KEYWORDS.items():
+        for word in words:
+            if any(word == k or word.startswith(k) for k in keywords):
+                return task_type
+    return None
+
+
+def _match_value(words: List[str], task_type: Optional[str], core_values: List[str]) -> Optional[str]:
+    """Picks the core value that best fits the task, or None."""
+    by_lower = {v.lower(): v for v in core_values}
+
+    # 1. The user named the value outright ("read for growth")
+    for word in words:
+        if word in by_lower:
+            return by_lower[word]
+
+    # 2. Values the activity catalog associates with these words
+    for word in words:
+        for hint in CATALOG_VALUE_HINTS.get(word, []):
+            if hint in by_lower:
+                return by_lower[hint]
+
+    # 3. Values usually linked to this kind of task
+    for hint in TYPE_VALUE_HINTS.get(task_type, []):
+        if hint in by_lower:
+            return by_lower[hint]
+    return None
+
+
+def _parse_segment(segment: str, core_values: List[str]) -> Optional[Dict[str, Any]]:
+    start, rest = _extract_time(segment)
+    duration, rest = _extract_duration(rest)
+
+    name = FILLER_PATTERN.sub("", rest.strip(" .!")).strip()
+    name = re.sub(r"\s+(?:for|at|in the|this)$", "", name, flags=re.IGNORECASE).strip()
+    if not name:
+        return None
+
+    words = re.findall(r"[a-z'-]+", name.lower())
+    task_type = _classify(words)
+    aligned_value = _match_value(words, task_type, core_values)
+
+    confidence = 1.0
+    if task_type is None:
+        confidence -= 0.35
+    if aligned_value is None:
+        confidence -= 0.35
+    if start is None and duration is None:
+        confidence -= 0.1
+    if len(words) > MAX_TASK_NAME_WORDS:
+        confidence -= 0.3
+
+    return {
+        "task_name": name[0].upper() + name[1:],
+        "task_type": task_type or "Shallow Work",
+        "aligned_value": aligned_value or (core_values[0] if core_values else ""),
+        "start": start,
+        "duration": duration or config.PLAN_DEFAULT_DURATION_MINUTES,
+        "confidence": confidence,
+    }
+
+
+# --- Scheduling ---
+
+def _place_tasks(tasks: List[Dict[str, Any]], free_slots: List[Dict[str, Any]], scorer=None) -> bool:
+    """
+    Places the tasks with plan_optimizer. Tasks with an explicit time must
+    fall inside a free slot at that time; the rest go wherever the most tasks
+    fit and, given a `scorer`, the predicted fulfillment is highest.
+    Sets task['placed'] = (start, end). Returns False if any task didn't fit.
+    """
+    placements, _ = plan_optimizer.optimize(tasks, free_slots, scorer=scorer)
+    for task, placed in zip(tasks, placements):
+        if placed is not None:
+            task["placed"] = placed
+    return all(placed is not None for placed in placements)
+
+
+# --- Public API ---
+
+@profiling.profiled()
+def parse_plan(user_input: str, core_values: List[str], free_slots: List[Dict[str, Any]], scorer=None) -> Dict[str, Any]:
+    """
+    Builds a plan without calling the AI. `scorer` is passed on to
+    plan_optimizer.optimize() (e.g. plan_optimizer.fulfillment_scorer()).
+
+    Returns:
+        {"tasks": [...], "confidence": float between 0 and 1}
+        Tasks use the same shape as the AI planner's output.
+    """
+    text = (user_input or "").strip()
+    words = re.findall(r"[a-z']+", text.lower())
+    if not text or len(words) > MAX_SIMPLE_INPUT_WORDS:
+        return {"tasks": [], "confidence": 0.0}
+
+    confidence = 1.0
+    if COMPLEX_MARKERS.intersection(words):
+        confidence -= 0.5
+    if VAGUE_TIME_MARKERS.intersection(words):
+        confidence -= 0.5
+
+    tasks = []
+    for segment in SPLIT_PATTERN.split(text):
+        if segment and segment.strip():
+            task = _parse_segment(segment.strip(), core_values)
+            if task:
+                tasks.append(task)
+
+    if not tasks:
+        return {"tasks": [], "confidence": 0.0}
+
+    if not _place_tasks(tasks, free_slots, scorer):
+        confidence -= 0.5
+
+    confidence = min([confidence] + [t["confidence"] for t in tasks])
+
+    plan = []
+    for task in tasks:
+        if "placed" not in task:
+            continue
+        start, end = task["placed"]
+        plan.append({
+            "task_name": task["task_name"],
+            "task_type": task["task_type"],
+            "aligned_value": task["aligned_value"],
+            "time_preference": f"{_to_hhmm(start)} - {_to_hhmm(end)}",
+        })
+
+    # Keep the plan in chronological order, like the AI does
+    plan.sort(key=lambda t: t["time_preference"])
+    return {"tasks": plan, "confidence": round(max(confidence, 0.0), 2)}
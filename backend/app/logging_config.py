@@ -0,0 +1,211 @@
+"""
+Logging Module
+
+Structured JSON logs that stay off the request path:
+
+- Modules log through the standard `logging` API
+  (`logger = logging.getLogger(__name__)`).
+- The package's logger ("app") hands records to a QueueHandler, which only puts them on
+  an in-memory queue. A QueueListener thread formats each record as one JSON
+  line and writes it to stdout, so slow terminals or pipes never block a request.
+  If the queue ever fills up, new records are dropped (and counted in /metrics)
+  rather than making the request wait.
+- Every record carries the current request id. RequestIdMiddleware takes it
+  from the X-Request-ID header (or generates one) and echoes it on the response.
+- Levels can be set per module (config.LOG_LEVELS), and high-volume events can
+  be sampled (config.LOG_SAMPLE_RATES, keyed by the record's `event`).
+
+Usage:
+    logger.info("Logged task", extra={"event": "task_logged", "task": name})
+"""
+
+import atexit
+import contextvars
+import datetime
+import logging
+import logging.handlers
+import queue
+import random
+import sys
+import uuid
+
+import orjson
+
+from . import config
+from . import metrics
+
+REQUEST_ID_HEADER = b"x-request-id"
+
+# The package every module logs under: "app" with `uvicorn app.main:app`,
+# "backend.app" with `uvicorn backend.app.main:app`
+PACKAGE = __name__.rpartition(".")[0]
+
+# The id of the request being handled in this context ("-" outside requests).
+# Starlette copies the context into threadpool workers, so sync code sees it too.
+request_id_var = contextvars.ContextVar("request_id", default="-")
+
+# Attributes every LogRecord has; anything else came from `extra=` and is logged as a field
+_RESERVED_ATTRS = set(vars(logging.LogRecord("", 0, "", 0, "", (), None))) | {"message", "asctime"}
+
+_listener = None
+
+
+def get_request_id():
+    return request_id_var.get()
+
+
+class JSONFormatter(logging.Formatter):
+    """One JSON object per line: time, level, logger, request id, message, extra fields."""
+
+    def format(self, record):
+        entry = {
+            "ts": datetime.datetime.fromtimestamp(record.created, datetime.timezone.utc).isoformat(timespec="milliseconds"),
+            "level": record.levelname,
+            "logger": record.name,
+            "request_id": getattr(record, "request_id", "-"),
+            "message": record.getMessage(),
+        }
+        for key, value in record.__dict__.items():
+            if key not in _RESERVED_ATTRS and key not in entry:
+                entry[key] = value
+        if record.exc_info:
+            entry["exc_info"] = self.formatException(record.exc_info)
+        elif record.exc_text:
+            entry["exc_info"] = record.exc_text
+        return orjson.dumps(entry, default=str).decode()
+
+
+class RequestContextFilter(logging.Filter):
+    """Stamps the request id on the record while we're still in the caller's context."""
+
+    def filter(self, record):
+        record.request_id = request_id_var.get()
+        return True
+
+
+class SamplingFilter(logging.Filter):
+    """
+    Keeps only a share of the records for high-volume events.
+    Warnings and errors are never dropped.
+    """
+
+    def __init__(self, sample_rates):
+        super().__init__()
+        self.sample_rates = dict(sample_rates)
+
+    def filter(self, record):
+        if record.levelno >= logging.WARNING:
+            return True
+        rate = self.sample_rates.get(getattr(record, "event", None))
+        if rate is None:
+            return True
+        if random.random() < rate:
+            record.sample_rate = rate
+            return True
+        return False
+
+
+class _QueueHandler(logging.handlers.QueueHandler):
+    def enqueue(self, record):
+        # Never block a request on logging: if the writer thread has fallen
+        # this far behind (stdout stuck), drop the record and count it.
+        try:
+            self.queue.put_nowait(record)
+        except queue.Full:
+            metrics.LOG_RECORDS_DROPPED.inc()
+
+    def prepare(self, record):
+        # The stock prepare() copies the record and formats the whole message in
+        # the calling thread. The listener's JSONFormatter does that work instead;
+        # here we only resolve the message args and swap the traceback object
+        # for text so the record is safe to hand to another thread. (This is the
+        # app logger's only handler, so editing the record in place is fine.)
+        if record.exc_info:
+            record.exc_text = logging.Formatter().formatException(record.exc_info)
+            record.exc_info = None
+        record.msg = record.getMessage()
+        record.args = None
+        return record
+
+
+def setup_logging(stream=None):
+    """
+    Routes the package's loggers through the background queue. Safe to call more
+    than once; only the first call does anything.
+    """
+    global _listener
+    if _listener is not None:
+        return
+
+    output = logging.StreamHandler(stream or sys.stdout)
+    output.setFormatter(JSONFormatter())
+
+    log_queue = queue.Queue(maxsize=config.LOG_QUEUE_SIZE)
+    handler = _QueueHandler(log_queue)
+    handler.addFilter(RequestContextFilter())
+    handler.addFilter(SamplingFilter(config.LOG_SAMPLE_RATES))
+
+    # The JSON lines don't include thread or process info, so skip collecting it per record
+    logging.logThreads = False
+    logging.logProcesses = False
+    logging.logMultiprocessing = False
+
+    app_logger = logging.getLogger(PACKAGE)
+    app_logger.setLevel(config.LOG_LEVEL)
+    app_logger.addHandler(handler)
+    # Our JSON lines shouldn't be printed a second time by uvicorn's root handlers
+    app_logger.propagate = False
+
+    for name, level in config.LOG_LEVELS.items():
+        # Keys are written as "app.<module>"; the package may be imported as "backend.app"
+        if name == "app" or name.startswith("app."):
+            name = PACKAGE + name[len("app"):]
+        logging.getLogger(name).setLevel(level)
+
+    _listener = logging.handlers.QueueListener(log_queue, output)
+    _listener.start()
+    # Drain whatever is still queued when the process exits
+    atexit.register(stop_logging)
+
+
+def stop_logging():
+    global _listener
+    if _listener is not None:
+        _listener.stop()
+        _listener = None
+
+
+class RequestIdMiddleware:
+    """
+    Plain ASGI middleware that gives every HTTP request an id: the client's
+    X-Request-ID if it sent one, otherwise a new random one. The id is put in
+    request_id_var for the logs and returned in the X-Request-ID response header.
+    """
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        request_id = None
+        for name, value in scope["headers"]:
+            if name == REQUEST_ID_HEADER:
+                request_id = value.decode("latin-1")[:64]
+                break
+        request_id = request_id or uuid.uuid4().hex[:16]
+        token = request_id_var.set(request_id)
+
+        async def send_wrapper(message):
+            if message["type"] == "http.response.start":
+                headers = list(message.get("headers", []))
+                headers.append((REQUEST_ID_HEADER, request_id.encode("latin-1")))
+                message = {**message, "headers": headers}
+            await send(message)
+
+        try:
+            await self.app(scope, receive, send_wrapper)
+        finally:
+            request_id_var.reset(token)
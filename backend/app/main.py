@@ -1,9 +1,13 @@
-from fastapi import FastAPI, HTTPException
+from fastapi import FastAPI, HTTPException, Query, Request, Response
 from fastapi.middleware.cors import CORSMiddleware
-from pydantic import BaseModel
-from typing import List
-import pandas as pd
+from fastapi.responses import StreamingResponse, JSONResponse
+from fastapi.concurrency import run_in_threadpool
+from pydantic import BaseModel, Field, ValidationError
+from typing import Any, Dict, List, Literal
+import asyncio
+import datetime
 import json 
+import logging
 import math
 
 
@@ -12,11 +16,33 @@ import math
 # for the data_manager and llm_parser modules.
 from . import data_manager
 from . import llm_parser
-from .predictor import predictor
+from .predictor import predictor, retrain_on_feedback
+from .follow_through import follow_through
 from . import calendar_service
 from . import scheduler
 from . import recommendations
-
+from . import audio
+from . import local_parser
+from . import plan_optimizer
+from . import config
+from .responses import FastJSONResponse
+from . import http_cache
+from . import llm_client
+from . import metrics
+from . import logging_config
+from . import profiling
+from . import write_queue
+from . import event_bus
+from . import analytics
+from . import live
+from . import jobs
+from .model_registry import ENV_PATH, registry
+
+
+# --- Logging ---
+# Structured JSON logs from a background thread; see logging_config.py
+logging_config.setup_logging()
+logger = logging.getLogger(__name__)
 
 # --- FastAPI App Initialization ---
 app = FastAPI(
@@ -41,15 +67,62 @@ app.add_middleware(
     allow_headers=["*"],  # Allow all headers
 )
 
+# --- Metrics Middleware ---
+# Times every request per route template; see GET /metrics
+app.add_middleware(metrics.MetricsMiddleware)
+
+# --- Profiling ---
+# Span trees for sampled or X-Debug-Profile requests; see GET /debug/slow-requests
+app.add_middleware(profiling.ProfilingMiddleware)
+
+# --- Request IDs ---
+# Added last so it runs first: every log line (and the response) carries the id
+app.add_middleware(logging_config.RequestIdMiddleware)
+
+# --- LLM Overload Handling ---
+# When Gemini is failing (breaker open) or every slot is busy, answer fast with
+# 503 + Retry-After instead of letting requests pile up behind slow calls.
+@app.exception_handler(llm_client.LLMUnavailableError)
+async def llm_unavailable_handler(request, exc):
+    return JSONResponse(
+        status_code=503,
+        content={"detail": str(exc)},
+        headers={"Retry-After": str(int(math.ceil(exc.retry_after)))}
+    )
+
+# --- Write Queue Backpressure ---
+# Too many writes already waiting for the writer thread (see write_queue.py)
+@app.exception_handler(write_queue.WriteQueueFullError)
+async def write_queue_full_handler(request, exc):
+    return JSONResponse(
+        status_code=503,
+        content={"detail": str(exc)},
+        headers={"Retry-After": str(int(math.ceil(exc.retry_after)))}
+    )
+
 # --- App Startup Event ---
 # This code runs once when the API server starts up.
 # It's the perfect place to initialize our database.
 @app.on_event("startup")
 def on_startup():
-    print("API is starting up...")
+    logger.info("API is starting up...")
     data_manager.initialize_database()
-    print("Database initialized.")
-    predictor.train()
+    logger.info("Database initialized.")
+    # Loads the saved model (or trains one) without holding up startup; see config.MODEL_WARMUP
+    predictor.start_warm_up()
+    # Derived state kept up to date from change events; see event_bus.py
+    event_bus.bus.subscribe(analytics.alignment_stats)
+    event_bus.bus.subscribe(retrain_on_feedback)
+    # Retraining, calendar refreshes and nightly maintenance; see GET /jobs
+    if config.JOBS_ENABLED:
+        jobs.runner.start()
+
+
+@app.on_event("shutdown")
+def on_shutdown():
+    jobs.runner.stop()
+    live.hub.stop()
+    event_bus.bus.stop()
 
 
 # --- Pydantic Models for Data Validation ---
@@ -75,11 +148,14 @@ class Task(BaseModel):
 
 class PlannerResponse(BaseModel):
     tasks: List[Task]
+    source: str = "llm"  # "local" when the rule-based fast path served the plan
 
     # ... (after PlannerResponse class)
 
 # Model for creating a task from the manual form
 class TaskCreate(BaseModel):
+    # Normally an ISO date ("2025-06-01"); any other text ("Monday") is
+    # accepted as before and stored verbatim (see task_codec.encode_date)
     date: str
     task: str
     task_type: str
@@ -123,6 +199,33 @@ class PredictionRequest(BaseModel):
 class PredictionResponse(BaseModel):
     predicted_fulfillment: float | None
 
+class FollowThroughTask(BaseModel):
+    task: str
+    task_type: str
+    location: str = ""
+    dread_level: int = Field(3, ge=1, le=10)
+    # Defaults to the plan's own value
+    mood_before: int | None = Field(None, ge=1, le=10)
+    sleep_quality: int | None = Field(None, ge=1, le=10)
+    energy_level: int | None = Field(None, ge=1, le=10)
+
+class FollowThroughRequest(BaseModel):
+    tasks: List[FollowThroughTask] = Field(..., max_length=config.FOLLOW_THROUGH_MAX_TASKS)
+    mood_before: int = Field(5, ge=1, le=10)
+    sleep_quality: int = Field(7, ge=1, le=10)
+    energy_level: int = Field(6, ge=1, le=10)
+
+class FollowThroughPrediction(BaseModel):
+    task: str
+    probability: float
+    level: Literal["strong", "medium", "boost"]
+    title: str
+    nudge: str
+
+class FollowThroughResponse(BaseModel):
+    version: str | None       # Follow-through model version (None: not trained yet)
+    tasks: List[FollowThroughPrediction]
+
 class CalendarEvent(BaseModel):
     summary: str
     start: str
@@ -164,10 +267,17 @@ class RecommendationResponse(BaseModel):
 
 # GET endpoint to fetch all values
 @app.get("/values", response_model=List[ValueResponse])
-async def get_all_values():
+async def get_all_values(request: Request, response: Response):
     """
     Retrieves a list of all user-defined core values.
+    Supports conditional GET (If-None-Match / If-Modified-Since).
     """
+    etag, last_modified = http_cache.validators("values")
+    cached = http_cache.not_modified(request, etag, last_modified)
+    if cached:
+        return cached
+    response.headers.update(http_cache.headers(etag, last_modified))
+
     values = data_manager.get_values()
     # We must convert the list of strings into a list of ValueResponse objects
     # to match the response_model.
@@ -190,7 +300,7 @@ async def add_new_value(value: ValueCreate):
     
 # ... (after the @app.post("/values") function)
 
-@app.delete("/values/{value_name}", status_code=204)
+@app.delete("/values/{value_name:path}", status_code=204)
 async def delete_existing_value(value_name: str):
     """
     Deletes a core value from the database.
@@ -208,28 +318,90 @@ async def delete_existing_value(value_name: str):
 async def generate_plan(request: PlannerRequest):
     """
     1. Gets free time slots from Google Calendar.
-    2. Sends user text + free slots to AI.
-    3. Returns a schedule that fits the user's life.
+    2. Tries the local rule-based parser; simple inputs are planned right here.
+    3. Otherwise asks the AI what the tasks are (not when).
+    4. Places them in the free slots with plan_optimizer, so the schedule
+       fits the user's life and the predicted fulfillment is highest.
     """
     # 1. Get Real-Time Availability
     free_slots = scheduler.get_free_slots()
-    
-    # 2. Call AI with context
-    plan = llm_parser.get_structured_plan(
-        user_input=request.user_input, 
+
+    # 2. Fast path: no Gemini round trip for inputs like "gym at 6pm, read 30 min"
+    # (the optimizer asks the model for predictions, so off the event loop)
+    local_plan = await run_in_threadpool(_try_local_plan, request.user_input, request.core_values, free_slots)
+    if local_plan:
+        return local_plan
+
+    # 3. Call AI for the tasks
+    # (in a worker thread, so a slow Gemini call never blocks the event loop)
+    intents = await run_in_threadpool(
+        llm_parser.get_task_intents,
+        user_input=request.user_input,
         core_values=request.core_values,
-        free_slots=free_slots # Pass the slots here
     )
-    
-    if not plan or "tasks" not in plan:
+
+    # 4. Schedule them locally
+    return await run_in_threadpool(_place_llm_plan, intents, free_slots)
+
+def _try_local_plan(user_input, core_values, free_slots):
+    """Returns the local parser's plan if it is confident enough, else None."""
+    local_plan = local_parser.parse_plan(
+        user_input, core_values, free_slots, scorer=plan_optimizer.fulfillment_scorer(predictor)
+    )
+    if local_plan["tasks"] and local_plan["confidence"] >= config.LOCAL_PARSER_MIN_CONFIDENCE:
+        return {"tasks": local_plan["tasks"], "source": "local"}
+    return None
+
+def _place_llm_plan(intents, free_slots):
+    """Places the tasks the AI extracted (see llm_parser.get_task_intents) into the free slots."""
+    if not intents or not isinstance(intents.get("tasks"), list):
         raise HTTPException(status_code=500, detail="AI failed to generate a valid plan.")
-    
-    return plan
+    tasks = [task for task in intents["tasks"] if isinstance(task, dict)]
+    plan = plan_optimizer.place_plan(tasks, free_slots, scorer=plan_optimizer.fulfillment_scorer(predictor))
+    return {"tasks": plan, "source": "llm"}
 
 from fastapi import UploadFile, File, Form
 
+async def _prepare_audio(audio_file):
+    """
+    Reads an uploaded recording (size-capped, see audio.read_upload) and
+    shrinks it for Gemini (mono, 16 kHz, silence trimmed, duration capped).
+    Returns None when no file was uploaded.
+    """
+    if not audio_file:
+        return None
+    try:
+        raw = await audio.read_upload(audio_file)
+        if not raw:
+            return None
+        # Decoding and resampling are CPU-bound; keep them off the event loop
+        processed = await run_in_threadpool(audio.preprocess, raw)
+    except audio.AudioTooLargeError as e:
+        raise HTTPException(status_code=413, detail=str(e))
+    except audio.UnsupportedAudioError as e:
+        raise HTTPException(status_code=415, detail=str(e))
+
+    logger.info("Audio preprocessed", extra={
+        "event": "audio_preprocessed",
+        "original_bytes": processed.original_bytes,
+        "sent_bytes": len(processed.data),
+        "bytes_saved": processed.bytes_saved,
+        "mime_type": processed.mime_type,
+    })
+    return processed
+
+def _audio_headers(processed):
+    """Response headers reporting how much the audio stage saved."""
+    if processed is None:
+        return {}
+    return {
+        "X-Audio-Original-Bytes": str(processed.original_bytes),
+        "X-Audio-Bytes-Saved": str(processed.bytes_saved),
+    }
+
 @app.post("/planner/generate_with_audio", response_model=PlannerResponse)
 async def generate_plan_with_audio(
+    response: Response,
     audio_file: UploadFile = File(None),
     user_input: str = Form(""),
     core_values: str = Form(...) # Expecting a JSON string of values
@@ -243,107 +415,227 @@ async def generate_plan_with_audio(
     except:
         values_list = []
 
-    # Read audio file bytes if present
-    audio_bytes = None
-    if audio_file:
-        audio_bytes = await audio_file.read()
+    # Read and preprocess the recording if present
+    processed = await _prepare_audio(audio_file)
+    response.headers.update(_audio_headers(processed))
 
     # Get free slots for context
     free_slots = scheduler.get_free_slots()
 
-    # Call AI
-    plan = llm_parser.get_structured_plan(
+    # Text-only requests can take the local fast path
+    if processed is None:
+        local_plan = await run_in_threadpool(_try_local_plan, user_input, values_list, free_slots)
+        if local_plan:
+            return local_plan
+
+    # Call AI for the tasks, then schedule them locally
+    intents = await run_in_threadpool(
+        llm_parser.get_task_intents,
         user_input=user_input,
         core_values=values_list,
-        free_slots=free_slots,
-        audio_file=audio_bytes
+        audio_file=processed.data if processed else None,
+        audio_mime_type=processed.mime_type if processed else 'audio/wav'
     )
-    
-    if not plan or "tasks" not in plan:
-        raise HTTPException(status_code=500, detail="AI failed to generate a valid plan.")
-    
-    return plan
+    return await run_in_threadpool(_place_llm_plan, intents, free_slots)
+
+# --- Streaming Planner (Server-Sent Events) ---
 
-# ... (at the end of the file)
-import pandas as pd # Add pandas to your imports at the top of the file
+def _sse(event, data):
+    """Formats one Server-Sent Event frame."""
+    return f"event: {event}\ndata: {json.dumps(data)}\n\n"
+
+def _plan_event_stream(user_input, core_values, free_slots, audio_bytes=None, audio_mime_type='audio/wav'):
+    """
+    Yields SSE frames: one 'task' event per task as soon as Gemini finishes it,
+    then a final 'done' event (or an 'error' event if the AI call failed).
+    """
+    count = 0
+    try:
+        for raw_task in profiling.profiled_iter("llm_parser.stream_structured_plan", llm_parser.stream_structured_plan(
+            user_input=user_input,
+            core_values=core_values,
+            free_slots=free_slots,
+            audio_file=audio_bytes,
+            audio_mime_type=audio_mime_type
+        )):
+            try:
+                task = Task(**raw_task).model_dump()
+            except Exception as e:
+                logger.warning("Skipping invalid task from AI", extra={"event": "stream_task_invalid", "error": str(e)})
+                continue
+            count += 1
+            yield _sse("task", task)
+    except llm_client.LLMUnavailableError as e:
+        yield _sse("error", {"detail": str(e), "retry_after": e.retry_after})
+        return
+    except Exception:
+        logger.exception("AI Streaming Error", extra={"event": "plan_stream_failed"})
+        yield _sse("error", {"detail": "AI failed to generate a valid plan."})
+        return
+
+    yield _sse("done", {"count": count, "source": "llm"})
+
+def _local_event_stream(plan):
+    """Yields SSE frames for a plan the local parser already built."""
+    for task in plan["tasks"]:
+        yield _sse("task", task)
+    yield _sse("done", {"count": len(plan["tasks"]), "source": "local"})
+
+# The generator is synchronous (the Gemini SDK streams with a blocking iterator),
+# so Starlette iterates it in a worker thread and the event loop stays free.
+SSE_HEADERS = {"Cache-Control": "no-cache", "X-Accel-Buffering": "no"}
+
+@app.post("/planner/generate/stream")
+async def generate_plan_stream(request: PlannerRequest):
+    """
+    Streaming version of /planner/generate.
+    Emits each task as a Server-Sent Event the moment it has been generated.
+    """
+    free_slots = scheduler.get_free_slots()
+
+    local_plan = await run_in_threadpool(_try_local_plan, request.user_input, request.core_values, free_slots)
+    if local_plan:
+        return StreamingResponse(
+            _local_event_stream(local_plan),
+            media_type="text/event-stream",
+            headers=SSE_HEADERS
+        )
+
+    # Fail fast with a proper 503 before the stream (and its 200 status) starts
+    llm_client.client.check_available()
+    return StreamingResponse(
+        _plan_event_stream(request.user_input, request.core_values, free_slots),
+        media_type="text/event-stream",
+        headers=SSE_HEADERS
+    )
+
+@app.post("/planner/generate_with_audio/stream")
+async def generate_plan_with_audio_stream(
+    audio_file: UploadFile = File(None),
+    user_input: str = Form(""),
+    core_values: str = Form(...)
+):
+    """
+    Streaming version of /planner/generate_with_audio.
+    """
+    llm_client.client.check_available()
+    try:
+        values_list = json.loads(core_values)
+    except:
+        values_list = []
+
+    processed = await _prepare_audio(audio_file)
+
+    return StreamingResponse(
+        _plan_event_stream(
+            user_input,
+            values_list,
+            scheduler.get_free_slots(),
+            audio_bytes=processed.data if processed else None,
+            audio_mime_type=processed.mime_type if processed else 'audio/wav'
+        ),
+        media_type="text/event-stream",
+        headers={**SSE_HEADERS, **_audio_headers(processed)}
+    )
 
 # --- API Endpoints for Tasks ---
 
 
 @app.get("/tasks", response_model=List[TaskResponse])
-async def get_all_tasks_endpoint():
-    """Retrieves all tasks from the database."""
-    tasks_df = data_manager.get_all_tasks()
-    
-    # --- THE PLATINUM FIX ---
-    # We use the JSON library to sanitize the data.
-    # df.to_json() automatically converts NaN to null.
-    # json.loads() automatically converts null to None.
-    # This guarantees Pydantic gets exactly what it wants.
-    return json.loads(tasks_df.to_json(orient="records"))
+async def get_all_tasks_endpoint(
+    request: Request,
+    limit: int | None = Query(None, ge=1, le=10000),
+    offset: int = Query(0, ge=0),
+    start_date: datetime.date | None = None,
+    end_date: datetime.date | None = None
+):
+    """
+    Retrieves tasks from the database, newest first.
+    Pass limit/offset to page through large histories, and start_date/end_date
+    (inclusive) to only get tasks from a date range.
+    """
+    etag, last_modified = http_cache.validators("tasks")
+    cached = http_cache.not_modified(request, etag, last_modified)
+    if cached:
+        return cached
+
+    # Rows come straight from sqlite (NULLs are already None) and are encoded
+    # with orjson, skipping the DataFrame round trip and response validation.
+    return FastJSONResponse(
+        data_manager.get_task_rows(limit=limit, offset=offset, start_date=start_date, end_date=end_date),
+        headers=http_cache.headers(etag, last_modified)
+    )
 
 @app.post("/tasks", response_model=TaskResponse, status_code=201)
 async def create_task_endpoint(task: TaskCreate):
     """Creates a new task in the database."""
     task_dict = task.model_dump()
     
-    # Log to database (data_manager.log_task expects a dict)
-    data_manager.log_task(task_dict)
+    # Log to database (data_manager.log_task expects a dict). Awaiting the
+    # future keeps the event loop free while the write waits for its commit.
+    task_id = await asyncio.wrap_future(data_manager.submit_log_task(task_dict))
     
-    # Return the created task with an ID
-    import time
-    task_dict['id'] = int(time.time() * 1000)
-    task_dict['mood_after'] = None
-    task_dict['fulfillment_score'] = None
-    return task_dict
-
-@app.post("/tasks/{task_id}/feedback", response_model=TaskResponse, status_code=200)
+    # Return the created task as stored (times normalized, see task_codec.py),
+    # the same way GET /tasks and GET /sync will show it
+    return await run_in_threadpool(data_manager.get_task, task_id)
+
+class BulkTaskResponse(BaseModel):
+    created: int
+
+@app.post("/tasks/bulk", response_model=BulkTaskResponse, status_code=201)
+async def create_tasks_bulk_endpoint(tasks: List[TaskCreate]):
+    """Creates many tasks at once, in a single database transaction."""
+    if len(tasks) > 1000:
+        raise HTTPException(status_code=413, detail="At most 1000 tasks per request.")
+    # Awaited like POST /tasks: the commit (or the write queue) never blocks the event loop
+    created = await asyncio.wrap_future(data_manager.submit_log_tasks([task.model_dump() for task in tasks]))
+    return {"created": created}
+
+@app.post("/tasks/{task_id}/feedback", status_code=200)
 async def save_task_feedback_endpoint(task_id: int, feedback: TaskFeedback):
     """Updates a task as 'done' and saves the post-task feedback."""
-    data_manager.update_task_with_feedback(
+    await asyncio.wrap_future(data_manager.submit_task_feedback(
         task_id=task_id,
         mood_after=feedback.mood_after,
         fulfillment_score=feedback.fulfillment_score
-    )
+    ))
     return {"message": "Feedback submitted successfully"} # A real app would return the updated task
 
 # ... (at the end of file)
 
 @app.get("/analytics/alignment", response_model=AnalyticsResponse)
-async def get_alignment_analytics():
+async def get_alignment_analytics(request: Request, response: Response):
     """
     Calculates statistics on how tasks align with core values.
     """
-    # 1. Get all data
-    df = data_manager.get_all_tasks()
-
-    if df.empty:
-        return {"total_tasks": 0, "breakdown": []}
-
-    # 2. Ensure numeric columns are numbers (just in case)
-    df['fulfillment_score'] = pd.to_numeric(df['fulfillment_score'], errors='coerce').fillna(0)
-
-    # 3. Group by 'aligned_value'
-    # We count tasks and calculate average fulfillment for each value
-    stats = df.groupby('aligned_value').agg(
-        task_count=('id', 'count'),
-        avg_fulfillment=('fulfillment_score', 'mean')
-    ).reset_index()
-
-    # 4. Format data for Pydantic
-    breakdown = []
-    for _, row in stats.iterrows():
-        breakdown.append({
-            "value_name": row['aligned_value'],
-            "task_count": int(row['task_count']),
-            "avg_fulfillment": float(row['avg_fulfillment'])
-        })
+    # 0. Nothing changed since the client's copy? Skip the work entirely.
+    etag, last_modified = http_cache.validators("analytics")
+    cached = http_cache.not_modified(request, etag, last_modified)
+    if cached:
+        return cached
+    response.headers.update(http_cache.headers(etag, last_modified))
+
+    # 1. Count and average per value: kept current from change events, or
+    #    grouped by the database while the subscriber is behind (or not running)
+    if await run_in_threadpool(event_bus.bus.caught_up, analytics.alignment_stats.name, 0.5):
+        total_tasks, breakdown = analytics.alignment_stats.get()
+    else:
+        total_tasks, breakdown = await run_in_threadpool(data_manager.get_alignment_stats)
 
     return {
-        "total_tasks": len(df),
+        "total_tasks": total_tasks,
         "breakdown": breakdown
     }
 
+@app.get("/analytics/stream")
+async def stream_alignment_analytics():
+    """
+    Live version of /analytics/alignment, as Server-Sent Events: a 'snapshot'
+    event, then a 'delta' event with the changed values and task ids whenever
+    tasks change (see live.py).
+    """
+    return StreamingResponse(live.hub.stream(), media_type="text/event-stream", headers=SSE_HEADERS)
+
 @app.post("/predict/fulfillment", response_model=PredictionResponse)
 async def predict_fulfillment(request: PredictionRequest):
     """
@@ -357,6 +649,23 @@ async def predict_fulfillment(request: PredictionRequest):
     )
     return {"predicted_fulfillment": score}
 
+@app.post("/predict/follow-through", response_model=FollowThroughResponse)
+async def predict_follow_through(request: FollowThroughRequest):
+    """
+    Predicts how likely each task of a day's plan is to get done, with a nudge
+    for each, in one model call. Task fields left out take the plan's mood,
+    sleep and energy. Until a model is trained every task gets 0.5.
+    """
+    day = {"mood_before": request.mood_before, "sleep_quality": request.sleep_quality,
+           "energy_level": request.energy_level}
+    tasks = [
+        {**day, **task.model_dump(exclude_none=True)}
+        for task in request.tasks
+    ]
+    # Reads the model store and the database, and may call into scikit-learn
+    scored = await run_in_threadpool(follow_through.score_plan, tasks)
+    return FastJSONResponse({"version": follow_through.version, "tasks": scored})
+
 
 @app.get("/calendar/today", response_model=List[CalendarEvent])
 async def get_calendar_events():
@@ -386,10 +695,16 @@ async def add_calendar_event(event: CalendarEvent):
 # --- API Endpoints for Activity Recommendations ---
 
 @app.get("/recommendations/activities", response_model=List[ActivityResponse])
-async def get_all_activities_endpoint():
+async def get_all_activities_endpoint(request: Request):
     """Fetches all available activities from the activity database."""
+    # The catalog is defined in code, so its validators only change on deploy
     activities = recommendations.get_all_activities()
-    return activities
+    etag, last_modified = http_cache.static_validators("activities", activities)
+    cached = http_cache.not_modified(request, etag, last_modified)
+    if cached:
+        return cached
+
+    return FastJSONResponse(activities, headers=http_cache.headers(etag, last_modified))
 
 @app.post("/recommendations/suggest", response_model=List[RecommendationResponse])
 @app.post("/recommendations/suggest", response_model=List[RecommendationResponse])
@@ -411,7 +726,7 @@ async def get_activity_recommendations(request: RecommendationRequest):
         predictor=predictor,
         context=context
     )
-    return recommendations_list
+    return FastJSONResponse(recommendations_list)
 
 # --- API Endpoints for History & Retraining ---
 
@@ -424,14 +739,106 @@ class TaskUpdate(BaseModel):
 async def update_task(task_id: int, updates: TaskUpdate):
     """Updates a task's details."""
     update_dict = updates.model_dump(exclude_unset=True)
-    data_manager.update_task_details(task_id, update_dict)
+    future = data_manager.submit_task_update(task_id, update_dict)
+    if future is not None:
+        await asyncio.wrap_future(future)
     return {"message": "Task updated successfully"}
 
-@app.post("/predict/retrain", status_code=200)
+@app.post("/predict/retrain", status_code=202)
 async def retrain_model():
-    """Triggers a manual retraining of the ML model."""
-    predictor.train()
-    return {"message": "Model retraining triggered", "is_trained": predictor.is_trained}
+    """
+    Triggers a manual retraining of the ML model, as the "retrain_model"
+    background job: its outcome shows up in GET /jobs, not in this response.
+    """
+    if await run_in_threadpool(jobs.runner.trigger, "retrain_model"):
+        return {"message": "Model retraining triggered; see GET /jobs", "job": "retrain_model"}
+    # No job scheduler in this process (PRAXABLE_JOBS=0): train right here
+    trained = await run_in_threadpool(predictor.train)
+    return {"message": "Model retrained" if trained else "Not enough rated tasks to train", "job": None}
+
+# --- Background Jobs ---
+
+@app.get("/jobs")
+async def get_jobs():
+    """Every background job: its schedule, whether it is running, and how its last run went."""
+    return {"jobs": await run_in_threadpool(jobs.runner.status)}
+
+@app.post("/jobs/{name}/run", status_code=202)
+async def run_job(name: str):
+    """Makes a background job due now."""
+    if name not in jobs.runner.jobs:
+        raise HTTPException(status_code=404, detail=f"Unknown job '{name}'")
+    if not await run_in_threadpool(jobs.runner.trigger, name):
+        raise HTTPException(status_code=503, detail="The job scheduler is not running")
+    return {"message": f"Job '{name}' scheduled"}
+
+# --- API Endpoints for Delta Sync ---
+# Offline-first clients keep a local copy and a revision cursor. GET /sync
+# returns only what changed after the cursor; POST /sync uploads the edits
+# made while offline. See data_manager.get_changes / apply_sync_mutations.
+
+class SyncMutation(BaseModel):
+    key: str = Field(min_length=1, max_length=128)  # Idempotency key, unique per mutation
+    op: Literal["create_task", "update_task", "task_feedback", "delete_task", "add_value", "delete_value"]
+    task_id: int | None = None
+    task_key: str | None = None     # Key of an earlier create_task, for tasks created offline
+    base_revision: int | None = None
+    data: Dict[str, Any] = {}
+
+class SyncRequest(BaseModel):
+    mutations: List[SyncMutation]
+
+# The payload each op carries, validated like the matching endpoint's body
+_SYNC_PAYLOADS = {
+    "create_task": TaskCreate,
+    "update_task": TaskUpdate,
+    "task_feedback": TaskFeedback,
+    "add_value": ValueCreate,
+    "delete_value": ValueCreate,
+}
+
+@app.get("/sync")
+async def get_sync_changes(
+    since: int = Query(0, ge=0),
+    limit: int = Query(config.SYNC_PAGE_SIZE, ge=1, le=5000)
+):
+    """
+    Returns the tasks and values changed or deleted after revision `since`
+    (0 = everything), plus the revision to pass next time. Keep calling while
+    has_more is true.
+    """
+    try:
+        changes = await run_in_threadpool(data_manager.get_changes, since=since, limit=limit)
+    except data_manager.SyncCursorError as e:
+        # The client synced against a different database; it has to start over from 0
+        raise HTTPException(status_code=410, detail=str(e))
+    return FastJSONResponse(changes)
+
+@app.post("/sync")
+async def push_sync_mutations(request: SyncRequest):
+    """
+    Applies a batch of offline mutations in order and returns one result per
+    mutation. Retrying a batch is safe: mutations whose key was already
+    applied are not applied again.
+    """
+    if len(request.mutations) > config.SYNC_MAX_MUTATIONS:
+        raise HTTPException(status_code=413, detail=f"At most {config.SYNC_MAX_MUTATIONS} mutations per request.")
+
+    results = [None] * len(request.mutations)
+    valid = []
+    for index, mutation in enumerate(request.mutations):
+        model = _SYNC_PAYLOADS.get(mutation.op)
+        try:
+            data = model(**mutation.data).model_dump(exclude_unset=model is TaskUpdate) if model else {}
+        except ValidationError as e:
+            results[index] = {"key": mutation.key, "status": "error", "detail": str(e)}
+            continue
+        valid.append((index, {**mutation.model_dump(), "data": data}))
+
+    applied = await run_in_threadpool(data_manager.apply_sync_mutations, [m for _, m in valid]) if valid else []
+    for (index, _), result in zip(valid, applied):
+        results[index] = result
+    return FastJSONResponse({"results": results})
 
 # --- API Endpoints for Configuration ---
 
@@ -444,20 +851,15 @@ class ConfigRequest(BaseModel):
 @app.get("/config/status")
 async def get_config_status():
     """Checks if the API key is configured."""
-    import os
-    from dotenv import load_dotenv
-    
-    # Reload env to be sure
-    load_dotenv(override=True)
-    
-    api_key = os.getenv("GEMINI_API_KEY")
+    # The registry loaded .env at startup and follows /config/api-key (on any
+    # worker), so there's no need to re-read the file on every request.
+    api_key = registry.api_key
     return {"is_configured": bool(api_key), "key_preview": api_key[:4] + "..." if api_key else None}
 
 @app.post("/config/api-key")
 async def set_api_key(config: ConfigRequest):
     """Sets the API key in the .env file and environment."""
     import os
-    from dotenv import load_dotenv
     
     if not config.api_key.startswith("AIza"):
         # Basic validation for Google API keys
@@ -466,13 +868,12 @@ async def set_api_key(config: ConfigRequest):
     # 1. Update current environment
     os.environ["GEMINI_API_KEY"] = config.api_key
     
-    # 2. Persist to .env file
-    env_path = os.path.join(os.path.dirname(__file__), "..", ".env")
+    # 2. Persist to .env file (other workers read the new key from it)
     
     # Read existing lines
     lines = []
-    if os.path.exists(env_path):
-        with open(env_path, "r") as f:
+    if os.path.exists(ENV_PATH):
+        with open(ENV_PATH, "r") as f:
             lines = f.readlines()
             
     # Filter out existing key
@@ -481,11 +882,38 @@ async def set_api_key(config: ConfigRequest):
     # Add new key
     lines.append(f"GEMINI_API_KEY={config.api_key}\n")
     
-    with open(env_path, "w") as f:
+    with open(ENV_PATH, "w") as f:
         f.writelines(lines)
         
-    # Reload specific modules that rely on it
-    import google.generativeai as genai
-    genai.configure(api_key=config.api_key)
+    # 3. Rebuild the shared Gemini client and model with the new key, and
+    #    have the other workers pick it up (see model_registry.py)
+    registry.set_api_key(config.api_key)
     
-    return {"status": "success", "message": "API Key updated successfully"}
\ No newline at end of file
+    return {"status": "success", "message": "API Key updated successfully"}
+
+
+# --- API Endpoints for LLM Client Health ---
+
+@app.get("/llm/metrics")
+async def get_llm_metrics():
+    """In-flight and queued Gemini calls, circuit breaker state and counters."""
+    return llm_client.client.metrics()
+
+
+# --- API Endpoint for Prometheus ---
+
+@app.get("/metrics", include_in_schema=False)
+async def get_metrics():
+    """Request, database, model, calendar and LLM metrics in the Prometheus text format."""
+    return Response(content=metrics.render(), media_type=metrics.CONTENT_TYPE)
+
+
+# --- API Endpoint for Slow Request Profiles ---
+
+@app.get("/debug/slow-requests")
+async def get_slow_requests(limit: int = Query(default=None, ge=1)):
+    """
+    Span trees of recent slow requests (and of every request sent with
+    X-Debug-Profile: 1), newest first.
+    """
+    return FastJSONResponse(profiling.get_slow_requests(limit))
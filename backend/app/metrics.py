@@ -0,0 +1,437 @@
+"""
+Metrics Module
+
+Counters and latency histograms for the API, rendered in the Prometheus text
+format by GET /metrics. Kept deliberately small (no prometheus_client
+dependency) and cheap enough to leave on in production:
+
+- A labelled metric resolves its label values to a child once; after that an
+  update is one lock and one integer/float add.
+- Histograms only bump the bucket an observation lands in (found with bisect).
+  The cumulative counts Prometheus expects are summed up at scrape time.
+- Timers use time.perf_counter().
+
+Everything registers itself in REGISTRY when it is created, so other modules
+just define or import the metrics they need.
+"""
+
+import bisect
+import functools
+import threading
+import time
+from typing import Callable, List, Sequence, Tuple
+
+CONTENT_TYPE = "text/plain; version=0.0.4; charset=utf-8"
+
+# Bucket bounds (seconds) for the different kinds of work we time
+HTTP_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+DB_BUCKETS = (0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0)
+MODEL_BUCKETS = (0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.5, 1.0, 5.0, 30.0)
+LLM_BUCKETS = (0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 20.0, 30.0, 60.0)
+
+
+def _format_value(value):
+    if value == float("inf"):
+        return "+Inf"
+    if isinstance(value, float) and value.is_integer():
+        return str(int(value))
+    return repr(value)
+
+
+def _escape(value):
+    return str(value).replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+
+def _label_text(names, values, extra=""):
+    pairs = [f'{n}="{_escape(v)}"' for n, v in zip(names, values)]
+    if extra:
+        pairs.append(extra)
+    return "{" + ",".join(pairs) + "}" if pairs else ""
+
+
+class Registry:
+    def __init__(self):
+        self._metrics = []
+        self._lock = threading.Lock()
+
+    def register(self, metric):
+        with self._lock:
+            if any(m.name == metric.name for m in self._metrics):
+                raise ValueError(f"Metric {metric.name} is already registered")
+            self._metrics.append(metric)
+        return metric
+
+    def render(self) -> str:
+        """The current value of every metric, in the Prometheus text format."""
+        with self._lock:
+            metrics = list(self._metrics)
+        lines = []
+        for metric in metrics:
+            lines.append(f"# HELP {metric.name} {metric.documentation}")
+            lines.append(f"# TYPE {metric.name} {metric.kind}")
+            lines.extend(metric.samples())
+        return "\n".join(lines) + "\n"
+
+
+REGISTRY = Registry()
+
+
+class _Metric:
+    kind = "untyped"
+
+    def __init__(self, name, documentation, labelnames: Sequence[str] = (), registry=REGISTRY):
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = tuple(labelnames)
+        self._children = {}
+        self._children_lock = threading.Lock()
+        if not self.labelnames:
+            self._children[()] = self._new_child()
+        if registry is not None:
+            registry.register(self)
+
+    def _new_child(self):
+        raise NotImplementedError
+
+    def labels(self, *values, **labels):
+        """Returns the child for one set of label values (created on first use)."""
+        key = values if values else tuple(labels[n] for n in self.labelnames)
+        child = self._children.get(key)
+        if child is None:
+            if len(key) != len(self.labelnames):
+                raise ValueError(f"{self.name} expects labels {self.labelnames}")
+            with self._children_lock:
+                child = self._children.setdefault(key, self._new_child())
+        return child
+
+    def _items(self) -> List[Tuple[Tuple[str, ...], object]]:
+        with self._children_lock:
+            items = [(tuple(str(v) for v in key), child) for key, child in self._children.items()]
+        return sorted(items, key=lambda item: item[0])
+
+    def samples(self) -> List[str]:
+        raise NotImplementedError
+
+
+# --- Counters ---
+
+class _CounterChild:
+    __slots__ = ("value", "_lock")
+
+    def __init__(self):
+        self.value = 0.0
+        self._lock = threading.Lock()
+
+    def inc(self, amount=1.0):
+        with self._lock:
+            self.value += amount
+
+
+class Counter(_Metric):
+    """A value that only goes up (requests served, cache hits, errors...)."""
+
+    kind = "counter"
+
+    def _new_child(self):
+        return _CounterChild()
+
+    def inc(self, amount=1.0):
+        self._children[()].inc(amount)
+
+    def samples(self):
+        return [
+            f"{self.name}{_label_text(self.labelnames, key)} {_format_value(child.value)}"
+            for key, child in self._items()
+        ]
+
+
+# --- Gauges ---
+
+class _GaugeChild:
+    __slots__ = ("value", "function", "_lock")
+
+    def __init__(self):
+        self.value = 0.0
+        self.function = None
+        self._lock = threading.Lock()
+
+    def set(self, value):
+        self.value = value
+
+    def inc(self, amount=1.0):
+        with self._lock:
+            self.value += amount
+
+    def dec(self, amount=1.0):
+        self.inc(-amount)
+
+    def set_function(self, function: Callable[[], float]):
+        """Reads the value from function() at scrape time instead."""
+        self.function = function
+
+    def get(self):
+        return self.function() if self.function else self.value
+
+
+class Gauge(_Metric):
+    """A value that goes up and down (requests in progress, model trained...)."""
+
+    kind = "gauge"
+
+    def _new_child(self):
+        return _GaugeChild()
+
+    def set(self, value):
+        self._children[()].set(value)
+
+    def inc(self, amount=1.0):
+        self._children[()].inc(amount)
+
+    def dec(self, amount=1.0):
+        self._children[()].dec(amount)
+
+    def set_function(self, function):
+        self._children[()].set_function(function)
+
+    def samples(self):
+        return [
+            f"{self.name}{_label_text(self.labelnames, key)} {_format_value(float(child.get()))}"
+            for key, child in self._items()
+        ]
+
+
+# --- Histograms ---
+
+class _HistogramChild:
+    __slots__ = ("bounds", "counts", "sum", "_lock")
+
+    def __init__(self, bounds):
+        self.bounds = bounds
+        # One slot per bucket plus one for +Inf; cumulated when rendered
+        self.counts = [0] * (len(bounds) + 1)
+        self.sum = 0.0
+        self._lock = threading.Lock()
+
+    def observe(self, value):
+        index = bisect.bisect_left(self.bounds, value)
+        with self._lock:
+            self.counts[index] += 1
+            self.sum += value
+
+    def time(self):
+        return _Timer(self)
+
+    def snapshot(self):
+        with self._lock:
+            return list(self.counts), self.sum
+
+
+class _Timer:
+    """Context manager that observes the elapsed time on exit."""
+
+    __slots__ = ("_child", "_start")
+
+    def __init__(self, child):
+        self._child = child
+
+    def __enter__(self):
+        self._start = time.perf_counter()
+        return self
+
+    def __exit__(self, *exc_info):
+        self._child.observe(time.perf_counter() - self._start)
+        return False
+
+
+class Histogram(_Metric):
+    """Latency distribution with fixed buckets, plus a running sum and count."""
+
+    kind = "histogram"
+
+    def __init__(self, name, documentation, labelnames=(), buckets=HTTP_BUCKETS, registry=REGISTRY):
+        self.buckets = tuple(sorted(float(b) for b in buckets))
+        super().__init__(name, documentation, labelnames, registry)
+
+    def _new_child(self):
+        return _HistogramChild(self.buckets)
+
+    def observe(self, value):
+        self._children[()].observe(value)
+
+    def time(self, **labels):
+        """Times a `with` block: `with HIST.time(query="get_values"): ...`"""
+        child = self.labels(**labels) if labels else self._children[()]
+        return _Timer(child)
+
+    def samples(self):
+        lines = []
+        for key, child in self._items():
+            counts, total = child.snapshot()
+            cumulative = 0
+            for bound, count in zip(self.buckets + (float("inf"),), counts):
+                cumulative += count
+                le = 'le="' + _format_value(bound) + '"'
+                lines.append(f"{self.name}_bucket{_label_text(self.labelnames, key, le)} {cumulative}")
+            lines.append(f"{self.name}_sum{_label_text(self.labelnames, key)} {_format_value(total)}")
+            lines.append(f"{self.name}_count{_label_text(self.labelnames, key)} {cumulative}")
+        return lines
+
+
+def timed(histogram: Histogram, **labels):
+    """Decorator that records every call's duration in `histogram`."""
+    def decorator(func):
+        child = histogram.labels(**labels) if labels else histogram._children[()]
+
+        @functools.wraps(func)
+        def wrapper(*args, **kwargs):
+            start = time.perf_counter()
+            try:
+                return func(*args, **kwargs)
+            finally:
+                child.observe(time.perf_counter() - start)
+        return wrapper
+    return decorator
+
+
+# --- HTTP ---
+
+HTTP_REQUESTS = Counter(
+    "praxable_http_requests_total", "HTTP requests served.", ["method", "route", "status"]
+)
+HTTP_LATENCY = Histogram(
+    "praxable_http_request_duration_seconds",
+    "Time from receiving a request to sending the last byte of its response.",
+    ["method", "route"], buckets=HTTP_BUCKETS,
+)
+HTTP_IN_PROGRESS = Gauge("praxable_http_requests_in_progress", "HTTP requests currently being served.")
+
+
+class MetricsMiddleware:
+    """
+    Plain ASGI middleware (no BaseHTTPMiddleware overhead) that times every
+    HTTP request. Requests are labelled by their route template
+    ("/tasks/{task_id}/feedback"), not the raw path, so the number of series
+    stays bounded; anything that matched no route is counted as "unmatched".
+    """
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        status = 500
+        start = time.perf_counter()
+
+        async def send_wrapper(message):
+            nonlocal status
+            if message["type"] == "http.response.start":
+                status = message["status"]
+            await send(message)
+
+        HTTP_IN_PROGRESS.inc()
+        try:
+            await self.app(scope, receive, send_wrapper)
+        finally:
+            elapsed = time.perf_counter() - start
+            HTTP_IN_PROGRESS.dec()
+            route = scope.get("route")
+            path = getattr(route, "path", None) or "unmatched"
+            method = scope["method"]
+            HTTP_LATENCY.labels(method, path).observe(elapsed)
+            HTTP_REQUESTS.labels(method, path, status).inc()
+
+
+# --- Database ---
+
+DB_QUERY_LATENCY = Histogram(
+    "praxable_db_query_duration_seconds",
+    "Time spent in each data_manager query, including connecting and committing.",
+    ["query"], buckets=DB_BUCKETS,
+)
+WRITE_QUEUE_PENDING = Gauge("praxable_write_queue_pending", "Writes waiting for the write queue's writer thread.")
+WRITE_QUEUE_REJECTED = Counter(
+    "praxable_write_queue_rejected_total", "Writes turned away because the write queue was full."
+)
+WRITE_BATCH_SIZE = Histogram(
+    "praxable_write_batch_size", "Writes committed together in one write queue transaction.",
+    buckets=(1, 2, 4, 8, 16, 32, 64, 128, 256),
+)
+WRITE_COMMIT_LATENCY = Histogram(
+    "praxable_write_commit_duration_seconds", "Time per write queue transaction, including the commit.",
+    buckets=DB_BUCKETS,
+)
+
+
+# --- Event bus ---
+
+EVENTS_DELIVERED = Counter(
+    "praxable_events_delivered_total", "Change events handled, by subscriber.", ["subscriber"]
+)
+EVENT_HANDLER_ERRORS = Counter(
+    "praxable_event_handler_errors_total", "Change events a subscriber failed to handle (retried).", ["subscriber"]
+)
+LIVE_CONNECTIONS = Gauge("praxable_live_connections", "Clients connected to GET /analytics/stream.")
+LIVE_RESYNCS = Counter(
+    "praxable_live_resyncs_total", "Times a slow live client's backlog was replaced with a fresh snapshot."
+)
+
+
+# --- Background jobs ---
+
+JOB_RUNS = Counter("praxable_job_runs_total", "Background job runs, by job and outcome.", ["job", "status"])
+JOB_DURATION = Histogram(
+    "praxable_job_duration_seconds", "Time spent in each background job run.", ["job"], buckets=MODEL_BUCKETS,
+)
+
+
+# --- Fulfillment predictor ---
+
+MODEL_TRAIN_LATENCY = Histogram(
+    "praxable_model_train_duration_seconds", "Time spent (re)training the fulfillment model.",
+    buckets=(0.01, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0, 60.0),
+)
+MODEL_INFERENCE_LATENCY = Histogram(
+    "praxable_model_inference_duration_seconds", "Time per fulfillment prediction.",
+    buckets=MODEL_BUCKETS,
+)
+MODEL_ERRORS = Counter("praxable_model_errors_total", "Fulfillment predictions that raised an error.")
+MODEL_TRAINED = Gauge("praxable_model_trained", "1 if the fulfillment model is trained, 0 otherwise.")
+
+
+# --- Google Calendar ---
+
+CALENDAR_CACHE_HITS = Counter("praxable_calendar_cache_hits_total", "Today's events served from the cache.")
+CALENDAR_CACHE_MISSES = Counter("praxable_calendar_cache_misses_total", "Today's events fetched from Google.")
+CALENDAR_API_LATENCY = Histogram(
+    "praxable_calendar_api_duration_seconds", "Time per Google Calendar API call.",
+    ["call"], buckets=HTTP_BUCKETS,
+)
+
+
+# --- Gemini ---
+
+LLM_LATENCY = Histogram(
+    "praxable_llm_call_duration_seconds",
+    "Time per Gemini attempt (generate) or full stream, by outcome.",
+    ["mode", "outcome"], buckets=LLM_BUCKETS,
+)
+LLM_EVENTS = Counter(
+    "praxable_llm_events_total",
+    "LLM client events: calls, successes, failures, retries, timeouts and rejections.",
+    ["event"],
+)
+LLM_ERRORS = Counter("praxable_llm_errors_total", "Failed Gemini attempts, by error type.", ["error"])
+
+
+# --- Logging ---
+
+LOG_RECORDS_DROPPED = Counter(
+    "praxable_log_records_dropped_total", "Log records dropped because the log queue was full."
+)
+
+
+def render() -> str:
+    return REGISTRY.render()
@@ -0,0 +1,457 @@
+"""
+Schema Migrations Module
+
+The database schema is versioned with SQLite's `PRAGMA user_version`.
+Each migration is a function registered with @migration(version); migrate()
+runs the ones newer than the database, in order, inside a single transaction,
+so a database is always at exactly one known version. Once released, a
+migration must never change; add a new one instead.
+
+    Version 1: the original tables (tasks with free-form TEXT columns, core_values)
+    Version 2: normalized task storage (see task_codec.py)
+    Version 3: change log and idempotency keys for delta sync (GET/POST /sync)
+    Version 4: outbox for the change event bus (see event_bus.py)
+    Version 5: shared schedule for background jobs (see jobs.py)
+    Version 6: the `tasks` view reads dates verbatim and takes writes from
+               the legacy app (app_old.py, src/)
+"""
+
+import logging
+import sqlite3
+
+from . import task_codec
+
+logger = logging.getLogger(__name__)
+
+MIGRATIONS = []
+
+
+def migration(version):
+    """Registers a migration function taking an open connection."""
+    def decorator(func):
+        MIGRATIONS.append((version, func))
+        MIGRATIONS.sort(key=lambda item: item[0])
+        return func
+    return decorator
+
+
+def latest_version():
+    return MIGRATIONS[-1][0]
+
+
+def migrate(db_path):
+    """
+    Brings the database at db_path up to the latest version.
+    Returns (version_before, version_after).
+    """
+    conn = sqlite3.connect(db_path, isolation_level=None)
+    try:
+        # IMMEDIATE takes the write lock now: with several workers starting at
+        # once, one migrates and the others wait, then find nothing to do
+        conn.execute("BEGIN IMMEDIATE")
+        current = conn.execute("PRAGMA user_version").fetchone()[0]
+        if current > latest_version():
+            conn.execute("ROLLBACK")
+            raise RuntimeError(
+                f"Database {db_path} is at schema version {current}, newer than this code ({latest_version()})"
+            )
+        try:
+            for version, func in MIGRATIONS:
+                if version > current:
+                    func(conn)
+                    # user_version is part of the database header, so it commits (or rolls back) with the rest
+                    conn.execute(f"PRAGMA user_version = {version}")
+                    logger.info("Applied migration", extra={"event": "migration_applied", "version": version})
+            conn.execute("COMMIT")
+        except Exception:
+            conn.execute("ROLLBACK")
+            raise
+        after = conn.execute("PRAGMA user_version").fetchone()[0]
+        if after > current and conn.execute("PRAGMA auto_vacuum").fetchone()[0] != 2:
+            # Incremental auto-vacuum lets the nightly maintenance job return
+            # free pages a few at a time; switching to it takes one full VACUUM
+            conn.execute("PRAGMA auto_vacuum = INCREMENTAL")
+            conn.execute("VACUUM")
+        elif after > current and conn.execute("PRAGMA freelist_count").fetchone()[0]:
+            # A migration rewrote a table; give the freed pages back to the file system
+            conn.execute("VACUUM")
+        return current, after
+    finally:
+        conn.close()
+
+
+# --- Migrations ---
+
+@migration(1)
+def _create_original_tables(conn):
+    # The schema every database had before migrations existed; IF NOT EXISTS
+    # makes this a no-op on those databases and creates it on new ones.
+    conn.execute('''
+        CREATE TABLE IF NOT EXISTS tasks (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            date TEXT NOT NULL,
+            task TEXT NOT NULL,
+            task_type TEXT,
+            aligned_value TEXT,
+            dread_level INTEGER,
+            location TEXT,
+            planned_time TEXT,
+            actual_time TEXT,
+            did_it INTEGER NOT NULL,
+            mood_before INTEGER,
+            sleep_quality INTEGER,
+            energy_level INTEGER,
+            mood_after INTEGER,
+            fulfillment_score INTEGER
+        )
+    ''')
+    conn.execute('''
+        CREATE TABLE IF NOT EXISTS core_values (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            value_name TEXT NOT NULL UNIQUE
+        )
+    ''')
+
+
+@migration(2)
+def _normalize_tasks(conn):
+    # Lookup tables for the repeated strings. core_values doubles as the
+    # lookup for aligned_value; values removed by the user (or only ever
+    # mentioned by a task) are archived rather than deleted, so tasks keep them.
+    conn.execute("CREATE TABLE task_types (id INTEGER PRIMARY KEY, name TEXT NOT NULL UNIQUE)")
+    conn.execute("CREATE TABLE locations (id INTEGER PRIMARY KEY, name TEXT NOT NULL UNIQUE)")
+    conn.execute("ALTER TABLE core_values ADD COLUMN archived INTEGER NOT NULL DEFAULT 0")
+
+    conn.execute('''
+        CREATE TABLE task_entries (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            day INTEGER,                    -- days since 1970-01-01
+            task TEXT NOT NULL,
+            task_type_id INTEGER REFERENCES task_types(id),
+            value_id INTEGER REFERENCES core_values(id),
+            location_id INTEGER REFERENCES locations(id),
+            dread_level INTEGER,
+            planned_start INTEGER,          -- minutes since midnight
+            planned_end INTEGER,            -- only for ranges ("19:00 - 20:00")
+            planned_text TEXT,              -- only when planned_time isn't a clock time
+            actual_minute INTEGER,
+            actual_text TEXT,
+            did_it INTEGER NOT NULL,
+            mood_before INTEGER,
+            sleep_quality INTEGER,
+            energy_level INTEGER,
+            mood_after INTEGER,
+            fulfillment_score INTEGER,
+            date_text TEXT                  -- only when date isn't exactly an ISO date
+        )
+    ''')
+
+    # Copy the old rows over in chunks, keeping their ids
+    unparsed_dates = []
+    rows = conn.execute("SELECT * FROM tasks ORDER BY id")
+    columns = [col[0] for col in rows.description]
+    insert_sql = f"INSERT INTO task_entries VALUES ({', '.join('?' * 19)})"
+    ids = {}
+    while chunk := rows.fetchmany(10000):
+        batch = []
+        for row in chunk:
+            task = dict(zip(columns, row))
+            day, date_text = task_codec.encode_date(task["date"])
+            if day is None:
+                unparsed_dates.append(task["id"])
+            planned_start, planned_end, planned_text = task_codec.encode_time(task["planned_time"], allow_range=True)
+            actual_minute, _, actual_text = task_codec.encode_time(task["actual_time"])
+            batch.append((
+                task["id"], day, task["task"],
+                task_codec.lookup_id(conn, "task_types", task["task_type"], ids),
+                task_codec.lookup_id(conn, "core_values", task["aligned_value"], ids),
+                task_codec.lookup_id(conn, "locations", task["location"], ids),
+                task["dread_level"], planned_start, planned_end, planned_text, actual_minute, actual_text,
+                task["did_it"], task["mood_before"], task["sleep_quality"], task["energy_level"],
+                task["mood_after"], task["fulfillment_score"], date_text,
+            ))
+        conn.executemany(insert_sql, batch)
+    if unparsed_dates:
+        logger.warning(
+            "Tasks with unreadable dates were migrated with their date text only",
+            extra={"event": "migration_unparsed_dates", "task_ids": unparsed_dates[:100], "count": len(unparsed_dates)}
+        )
+
+    # Carry the AUTOINCREMENT counter over too, so ids of deleted tasks are never reused
+    conn.execute("DELETE FROM sqlite_sequence WHERE name = 'task_entries'")
+    conn.execute("UPDATE sqlite_sequence SET name = 'task_entries' WHERE name = 'tasks'")
+    conn.execute("DROP TABLE tasks")
+    conn.execute("CREATE INDEX task_entries_day ON task_entries (day)")
+
+    # Reads keep the original shape: same name, same columns, same strings
+    conn.execute(f'''
+        CREATE VIEW tasks AS
+        SELECT
+            t.id,
+            {task_codec.date_sql("t.day", "t.date_text")} AS date,
+            t.task,
+            tt.name AS task_type,
+            v.value_name AS aligned_value,
+            t.dread_level,
+            l.name AS location,
+            {task_codec.time_sql("t.planned_start", "t.planned_text", end="t.planned_end")} AS planned_time,
+            {task_codec.time_sql("t.actual_minute", "t.actual_text")} AS actual_time,
+            t.did_it,
+            t.mood_before,
+            t.sleep_quality,
+            t.energy_level,
+            t.mood_after,
+            t.fulfillment_score
+        FROM task_entries t
+        LEFT JOIN task_types tt ON tt.id = t.task_type_id
+        LEFT JOIN core_values v ON v.id = t.value_id
+        LEFT JOIN locations l ON l.id = t.location_id
+    ''')
+
+
+@migration(3)
+def _add_change_log(conn):
+    # One row per task or value that ever existed, holding the revision of
+    # its latest change: every change takes a new, higher revision (AUTOINCREMENT
+    # never reuses one) and replaces the entity's previous row, so the log
+    # stays as big as the data and GET /sync?since=N is a range scan.
+    conn.execute('''
+        CREATE TABLE change_log (
+            revision INTEGER PRIMARY KEY AUTOINCREMENT,
+            entity TEXT NOT NULL,           -- 'task' or 'value'
+            entity_id INTEGER NOT NULL,
+            deleted INTEGER NOT NULL DEFAULT 0,
+            UNIQUE (entity, entity_id)
+        )
+    ''')
+    # Triggers, so every write path is covered (data_manager, the write queue, migrations)
+    for trigger in (
+        """CREATE TRIGGER task_entries_inserted AFTER INSERT ON task_entries BEGIN
+            INSERT OR REPLACE INTO change_log (entity, entity_id, deleted) VALUES ('task', NEW.id, 0);
+        END""",
+        """CREATE TRIGGER task_entries_updated AFTER UPDATE ON task_entries BEGIN
+            INSERT OR REPLACE INTO change_log (entity, entity_id, deleted) VALUES ('task', NEW.id, 0);
+        END""",
+        """CREATE TRIGGER task_entries_deleted AFTER DELETE ON task_entries BEGIN
+            INSERT OR REPLACE INTO change_log (entity, entity_id, deleted) VALUES ('task', OLD.id, 1);
+        END""",
+        # Values are synced by name; archiving one is a delete as far as clients
+        # are concerned, and values only ever created archived are never sent
+        """CREATE TRIGGER core_values_inserted AFTER INSERT ON core_values WHEN NEW.archived = 0 BEGIN
+            INSERT OR REPLACE INTO change_log (entity, entity_id, deleted) VALUES ('value', NEW.id, 0);
+        END""",
+        """CREATE TRIGGER core_values_updated AFTER UPDATE OF archived ON core_values
+        WHEN NEW.archived != OLD.archived BEGIN
+            INSERT OR REPLACE INTO change_log (entity, entity_id, deleted) VALUES ('value', NEW.id, NEW.archived);
+        END""",
+    ):
+        # One statement at a time: executescript() would commit the migration's transaction
+        conn.execute(trigger)
+    # Everything that exists now is "changed" as of this migration
+    conn.execute("INSERT INTO change_log (entity, entity_id) SELECT 'value', id FROM core_values WHERE archived = 0 ORDER BY id")
+    conn.execute("INSERT INTO change_log (entity, entity_id) SELECT 'task', id FROM task_entries ORDER BY id")
+
+    # Offline mutations already applied, by the client's idempotency key, with
+    # the result that was returned; a retried POST /sync gets the same answer.
+    conn.execute('''
+        CREATE TABLE sync_mutations (
+            key TEXT PRIMARY KEY,
+            result BLOB NOT NULL,
+            applied_at REAL NOT NULL
+        )
+    ''')
+    conn.execute("CREATE INDEX sync_mutations_applied_at ON sync_mutations (applied_at)")
+
+
+@migration(4)
+def _add_outbox(conn):
+    # Change events for the in-process event bus (event_bus.py), written in
+    # the same transaction as the change itself, so a committed change always
+    # has its event and a rolled back one never does.
+    conn.execute('''
+        CREATE TABLE outbox (
+            seq INTEGER PRIMARY KEY AUTOINCREMENT,
+            type TEXT NOT NULL,
+            payload BLOB NOT NULL,          -- JSON
+            created_at REAL NOT NULL
+        )
+    ''')
+    # How far each durable subscriber got, plus whatever state it keeps
+    # between events; both are saved together after each delivered batch.
+    conn.execute('''
+        CREATE TABLE outbox_cursors (
+            subscriber TEXT PRIMARY KEY,
+            seq INTEGER NOT NULL,
+            state BLOB
+        )
+    ''')
+
+
+@migration(5)
+def _add_jobs(conn):
+    # One row per background job (jobs.py), shared by every worker: when it
+    # is next due, who holds the lease to run it, and how its last run went.
+    conn.execute('''
+        CREATE TABLE jobs (
+            name TEXT PRIMARY KEY,
+            next_run_at REAL,               -- NULL: runs only when triggered
+            lease_owner TEXT,
+            lease_expires_at REAL,
+            last_started_at REAL,
+            last_finished_at REAL,
+            last_status TEXT,               -- 'ok' or 'failed'
+            last_detail TEXT,               -- What the job reported, or the error
+            last_duration REAL,
+            runs INTEGER NOT NULL DEFAULT 0,
+            failures INTEGER NOT NULL DEFAULT 0
+        )
+    ''')
+
+
+# SQL that encodes one of the `tasks` view's text columns the way task_codec
+# does. Only text that reads back unchanged is encoded (ISO dates, "HH:MM"
+# and "HH:MM - HH:MM"); anything else is kept verbatim.
+def _day_sql(value):
+    iso = f"substr(trim({value}), 1, 10)"
+    return f"CASE WHEN date({iso}) = {iso} THEN CAST(julianday({iso}) - 2440587.5 AS INTEGER) END"
+
+
+def _date_text_sql(value):
+    return f"CASE WHEN date({value}) IS NOT NULL AND date({value}) = {value} THEN NULL ELSE {value} END"
+
+
+def _clock_glob(value):
+    return f"({value} GLOB '[0-2][0-9]:[0-5][0-9]' AND {value} <= '23:59')"
+
+
+def _range_glob(value):
+    return (f"({value} GLOB '[0-2][0-9]:[0-5][0-9] - [0-2][0-9]:[0-5][0-9]'"
+            f" AND substr({value}, 1, 5) <= '23:59' AND substr({value}, 9, 5) <= '23:59')")
+
+
+def _minute_sql(text, offset=1):
+    return f"(CAST(substr({text}, {offset}, 2) AS INTEGER) * 60 + CAST(substr({text}, {offset + 3}, 2) AS INTEGER))"
+
+
+def _time_sql(value, allow_range=False):
+    """(start, end, text) SQL for a time column."""
+    clock = _clock_glob(value)
+    start = f"CASE WHEN {clock} THEN {_minute_sql(value)}"
+    end = "NULL"
+    verbatim = clock
+    if allow_range:
+        ranged = _range_glob(value)
+        start += f" WHEN {ranged} THEN {_minute_sql(value)}"
+        end = f"CASE WHEN {ranged} THEN {_minute_sql(value, offset=9)} END"
+        verbatim = f"({clock} OR {ranged})"
+    return f"{start} END", end, f"CASE WHEN {verbatim} THEN NULL ELSE {value} END"
+
+
+def _lookup_sql(table, value):
+    column = task_codec.LOOKUP_TABLES[table]
+    return f"(SELECT id FROM {table} WHERE {column} = {value})"
+
+
+def _ensure_lookups_sql():
+    # OR IGNORE also skips NULL names (NOT NULL), which then stay NULL ids
+    return """
+            INSERT OR IGNORE INTO task_types (name) VALUES (NEW.task_type);
+            INSERT OR IGNORE INTO locations (name) VALUES (NEW.location);
+            INSERT OR IGNORE INTO core_values (value_name, archived) VALUES (NEW.aligned_value, 1);"""
+
+
+def _outbox_sql(event_type, payload, when="1"):
+    # Same events data_manager emits, so derived state (analytics, retraining)
+    # follows legacy writes too
+    return (f"INSERT INTO outbox (type, payload, created_at) "
+            f"SELECT '{event_type}', {payload}, (julianday('now') - 2440587.5) * 86400.0 WHERE {when};")
+
+
+@migration(6)
+def _add_legacy_writes(conn):
+    # Dates that aren't exactly ISO dates read back verbatim (date_text)
+    conn.execute("DROP VIEW tasks")
+    conn.execute(f'''
+        CREATE VIEW tasks AS
+        SELECT
+            t.id,
+            {task_codec.date_sql("t.day", "t.date_text")} AS date,
+            t.task,
+            tt.name AS task_type,
+            v.value_name AS aligned_value,
+            t.dread_level,
+            l.name AS location,
+            {task_codec.time_sql("t.planned_start", "t.planned_text", end="t.planned_end")} AS planned_time,
+            {task_codec.time_sql("t.actual_minute", "t.actual_text")} AS actual_time,
+            t.did_it,
+            t.mood_before,
+            t.sleep_quality,
+            t.energy_level,
+            t.mood_after,
+            t.fulfillment_score
+        FROM task_entries t
+        LEFT JOIN task_types tt ON tt.id = t.task_type_id
+        LEFT JOIN core_values v ON v.id = t.value_id
+        LEFT JOIN locations l ON l.id = t.location_id
+    ''')
+
+    # The legacy app still writes the old `tasks` table: INSERT, UPDATE and
+    # DELETE on the view are carried out on task_entries instead
+    planned_start, planned_end, planned_text = _time_sql("NEW.planned_time", allow_range=True)
+    actual_minute, _, actual_text = _time_sql("NEW.actual_time")
+    encoded = {
+        "day": _day_sql("NEW.date"),
+        "date_text": _date_text_sql("NEW.date"),
+        "task": "NEW.task",
+        "task_type_id": _lookup_sql("task_types", "NEW.task_type"),
+        "value_id": _lookup_sql("core_values", "NEW.aligned_value"),
+        "location_id": _lookup_sql("locations", "NEW.location"),
+        "dread_level": "NEW.dread_level",
+        "planned_start": planned_start,
+        "planned_end": planned_end,
+        "planned_text": planned_text,
+        "actual_minute": actual_minute,
+        "actual_text": actual_text,
+        **{field: f"NEW.{field}" for field in (
+            "did_it", "mood_before", "sleep_quality", "energy_level", "mood_after", "fulfillment_score")},
+    }
+    changed_fields = " UNION ALL ".join(
+        f"SELECT '{field}' AS name WHERE NEW.{field} IS NOT OLD.{field}"
+        for field in ("date", "task", "task_type", "aligned_value", "dread_level", "location", "planned_time",
+                      "actual_time", "did_it", "mood_before", "sleep_quality", "energy_level", "mood_after",
+                      "fulfillment_score")
+    )
+    created = _outbox_sql("task_created", """json_object(
+                'task_id', last_insert_rowid(),
+                'aligned_value', NEW.aligned_value, 'fulfillment_score', NEW.fulfillment_score)""")
+    updated = _outbox_sql("task_updated", f"""json_object(
+                'task_id', OLD.id,
+                'fields', json((SELECT json_group_array(name) FROM ({changed_fields}))),
+                'aligned_value', NEW.aligned_value, 'fulfillment_score', NEW.fulfillment_score,
+                'previous', json_object('aligned_value', OLD.aligned_value, 'fulfillment_score', OLD.fulfillment_score))""")
+    deleted = _outbox_sql("task_deleted", """json_object(
+                'task_id', OLD.id, 'aligned_value', OLD.aligned_value, 'fulfillment_score', OLD.fulfillment_score)""")
+    value_deleted = _outbox_sql("value_deleted", "json_object('value_name', OLD.value_name)", when="OLD.archived = 0")
+    columns, values = ", ".join(encoded), ", ".join(encoded.values())
+    assignments = ", ".join(f"{column} = {sql}" for column, sql in encoded.items())
+    for trigger in (
+        f"""CREATE TRIGGER tasks_insert INSTEAD OF INSERT ON tasks BEGIN{_ensure_lookups_sql()}
+            INSERT INTO task_entries (id, {columns}) VALUES (NEW.id, {values});
+            {created}
+        END""",
+        f"""CREATE TRIGGER tasks_update INSTEAD OF UPDATE ON tasks BEGIN{_ensure_lookups_sql()}
+            UPDATE task_entries SET {assignments} WHERE id = OLD.id;
+            {updated}
+        END""",
+        f"""CREATE TRIGGER tasks_delete INSTEAD OF DELETE ON tasks BEGIN
+            DELETE FROM task_entries WHERE id = OLD.id;
+            {deleted}
+        END""",
+        # Deleting a value would leave its tasks without one: archive it instead
+        f"""CREATE TRIGGER core_values_delete BEFORE DELETE ON core_values BEGIN
+            UPDATE core_values SET archived = 1 WHERE id = OLD.id;
+            {value_deleted}
+            SELECT RAISE(IGNORE);
+        END""",
+    ):
+        conn.execute(trigger)
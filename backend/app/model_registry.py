@@ -0,0 +1,105 @@
+"""
+Model Registry Module
+
+Keeps one configured Gemini client and GenerativeModel warm for the whole
+process. Previously every planner call re-read the API key, called
+genai.configure() and built a new GenerativeModel; now that happens once,
+and again only when the key is changed through /config/api-key.
+
+google.generativeai itself is only imported when the first model is built,
+so it doesn't slow down API startup.
+
+With several workers (config.WORKER_MODE = "multi") a key set on one worker
+is published through shared_state: every worker checks the "api_key"
+counter when it uses the key and, when it moved, re-reads the key from .env.
+"""
+
+import logging
+import os
+import threading
+
+from dotenv import dotenv_values, load_dotenv
+
+from . import config
+from . import shared_state
+
+logger = logging.getLogger(__name__)
+
+# Load environment variables from the .env file in the 'backend' directory (once)
+load_dotenv()
+ENV_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", ".env")
+
+
+class ModelRegistry:
+    def __init__(self, model_name=None):
+        self.model_name = model_name or config.GEMINI_MODEL_NAME
+        self._api_key = os.getenv("GEMINI_API_KEY")
+        self._model = None
+        self._key_version = 0       # The shared "api_key" counter the key is current for
+        self._lock = threading.Lock()
+
+    @property
+    def api_key(self):
+        self._refresh()
+        return self._api_key
+
+    @property
+    def is_configured(self):
+        return bool(self.api_key)
+
+    def _refresh(self):
+        """Picks up a key set through another worker's /config/api-key (multi mode only)."""
+        if config.WORKER_MODE != "multi":
+            return
+        version = shared_state.get_counter("api_key")[0]
+        if version == self._key_version:
+            return
+        with self._lock:
+            if version == self._key_version:
+                return
+            api_key = dotenv_values(ENV_PATH).get("GEMINI_API_KEY")
+            if api_key and api_key != self._api_key:
+                self._api_key = api_key
+                self._model = None      # Rebuilt with the new key on next use
+                logger.info("API key changed on another worker", extra={"event": "api_key_reloaded"})
+            self._key_version = version
+
+    def get_model(self):
+        """
+        Returns the shared GenerativeModel, building it on first use.
+        Returns None if no API key is configured.
+        """
+        self._refresh()
+        model = self._model
+        if model is not None:
+            return model
+
+        with self._lock:
+            if self._model is None:
+                if not self._api_key:
+                    logger.error("Error configuring API: GEMINI_API_KEY not found in .env file.")
+                    return None
+                self._model = self._build_model(self._api_key)
+            return self._model
+
+    def set_api_key(self, api_key):
+        """
+        Swaps in a new API key (already saved to .env) and rebuilds the client
+        and model eagerly. In multi mode the other workers then load it too.
+        """
+        with self._lock:
+            self._api_key = api_key
+            self._model = self._build_model(api_key)
+            if config.WORKER_MODE == "multi":
+                # Bumped after .env was written, so whoever sees the new count reads the new key
+                self._key_version = shared_state.bump_counter("api_key")
+
+    def _build_model(self, api_key):
+        import google.generativeai as genai
+
+        genai.configure(api_key=api_key)
+        return genai.GenerativeModel(self.model_name)
+
+
+# Create a global instance shared by every request
+registry = ModelRegistry()
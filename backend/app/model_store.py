@@ -0,0 +1,116 @@
+"""
+Model Store Module
+
+Versioned model artifacts shared through the filesystem, so that every API
+worker serves the same model and none of them retrains just because it started:
+
+    data/models/
+        predictor-20250601T120000-4242-1a2b3c.joblib
+        predictor-20250601T130500-4243-9f8e7d.joblib
+        predictor.current        <- name of the live version
+
+- publish() writes a new version file and then swaps the pointer file, both
+  with an atomic rename, so readers never see half a file.
+- Workers poll current_version() (one tiny file read) and load() a version
+  they don't have yet. Files are never modified once written.
+- training_lock() is a cross-process file lock, so when there is no model yet
+  only one worker trains while the others wait and load its result.
+- Only the newest MODEL_KEEP_VERSIONS files are kept.
+"""
+
+import contextlib
+import logging
+import os
+import time
+import uuid
+
+try:
+    import fcntl
+except ImportError:  # Windows: single-worker only, no cross-process lock needed
+    fcntl = None
+
+from . import config
+
+logger = logging.getLogger(__name__)
+
+
+def _path(filename):
+    return os.path.join(config.MODEL_DIR, filename)
+
+
+def _pointer_path(name):
+    return _path(f"{name}.current")
+
+
+def current_version(name):
+    """The live version of a model, or None if none has been published."""
+    try:
+        with open(_pointer_path(name)) as f:
+            return f.read().strip() or None
+    except FileNotFoundError:
+        return None
+
+
+def load(name, version):
+    """Loads a published version. Returns the artifact dict given to publish()."""
+    import joblib  # Installed with scikit-learn; only needed once there's a model
+
+    return joblib.load(_path(f"{name}-{version}.joblib"))
+
+
+def _write_atomic(path, write):
+    tmp_path = f"{path}.{os.getpid()}.tmp"
+    try:
+        write(tmp_path)
+        os.replace(tmp_path, path)
+    finally:
+        if os.path.exists(tmp_path):
+            os.remove(tmp_path)
+
+
+def publish(name, artifact):
+    """
+    Saves `artifact` (a dict holding the model and its metadata) as a new
+    version and makes it the live one. Returns the new version string.
+    """
+    import joblib
+
+    os.makedirs(config.MODEL_DIR, exist_ok=True)
+    version = f"{time.strftime('%Y%m%dT%H%M%S')}-{os.getpid()}-{uuid.uuid4().hex[:6]}"
+    _write_atomic(_path(f"{name}-{version}.joblib"), lambda tmp: joblib.dump(artifact, tmp))
+
+    def write_pointer(tmp):
+        with open(tmp, "w") as f:
+            f.write(version)
+    _write_atomic(_pointer_path(name), write_pointer)
+
+    logger.info("Published model version", extra={"event": "model_published", "model": name, "version": version})
+    _prune(name, keep=version)
+    return version
+
+
+def _prune(name, keep):
+    """Deletes all but the newest MODEL_KEEP_VERSIONS versions (never `keep`)."""
+    prefix, suffix = f"{name}-", ".joblib"
+    files = [f for f in os.listdir(config.MODEL_DIR) if f.startswith(prefix) and f.endswith(suffix)]
+    files.sort(key=lambda f: os.path.getmtime(_path(f)), reverse=True)
+    for filename in files[config.MODEL_KEEP_VERSIONS:]:
+        if filename != f"{prefix}{keep}{suffix}":
+            with contextlib.suppress(OSError):
+                # Another worker may have pruned it already
+                os.remove(_path(filename))
+
+
+@contextlib.contextmanager
+def training_lock(name):
+    """Held by the one process that trains `name`; other processes block here."""
+    if fcntl is None:
+        yield
+        return
+    os.makedirs(config.MODEL_DIR, exist_ok=True)
+    with open(_path(f"{name}.lock"), "w") as lock_file:
+        fcntl.flock(lock_file, fcntl.LOCK_EX)
+        try:
+            yield
+        finally:
+            fcntl.flock(lock_file, fcntl.LOCK_UN)
@@ -0,0 +1,28 @@
+"""
+Nudge Messages
+
+The title and message for each nudge level ("strong", "medium", "boost"),
+with "{task}" standing for the task's name. follow_through.py serves them
+with its scores and the old Streamlit app's src/nudger.py shows them too, so
+this module imports nothing: src/nudger.py loads the file on its own.
+"""
+
+NUDGES = {
+    "strong": (
+        "Strong Nudge",
+        "The model predicts a low follow-through chance for '{task}'. "
+        "Try breaking it down. What is the absolute smallest first step you can take? "
+        "Or, try the 5-Minute Rule: just start it for five minutes."
+    ),
+    "medium": (
+        "Gentle Reminder",
+        "You're on the fence for '{task}'. "
+        "To boost your chances, consider 'temptation bundling.' "
+        "Can you pair this task with something you enjoy, like listening to a podcast?"
+    ),
+    "boost": (
+        "Confidence Boost",
+        "You're in a great position to tackle '{task}'. "
+        "The conditions look right. Lean into that momentum and get it done!"
+    ),
+}
@@ -0,0 +1,251 @@
+"""
+Plan Optimizer Module
+
+Decides when each planned task happens: places the tasks into today's free
+slots so that as many of them as possible fit and, among those placements,
+the predicted fulfillment is highest. Gemini (or the local parser) only says
+what the tasks are.
+
+- Every task has a duration and may have a fixed start ("gym at 6pm"). A
+  fixed task can only go at that time, and only if it lies in a free slot.
+- Flexible tasks may start at a slot's start, every
+  PLAN_OPTIMIZER_STEP_MINUTES after it, or as late as still fits.
+- A placement is worth PLACEMENT_VALUE (so fitting one more task always wins)
+  plus the predicted fulfillment of the task at that start hour. A fixed
+  task's placement is worth more than all flexible placements together, so a
+  requested time is never given up to fit untimed tasks. All (task, hour)
+  pairs are scored with one predictor.predict_many() call.
+- Branch-and-bound over the tasks, most constrained first: each task's best
+  placements are tried first, and a branch is cut as soon as the remaining
+  tasks (their best placements, and no more of them than fit in the free
+  minutes left) can't beat the best plan so far. The search starts from a
+  greedy best-fit plan (its starts are added to the candidates, so it is
+  scored like any other plan), so one cut short after PLAN_OPTIMIZER_BUDGET_MS
+  still returns a plan at least that good. Among equally good plans the one
+  the search reaches first wins, which is the one with the earlier starts.
+"""
+
+import bisect
+import time
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+from . import config
+from . import profiling
+from . import task_codec
+
+PLACEMENT_VALUE = 100.0     # More than any fulfillment score (1-10)
+NEUTRAL_SCORE = 5.0         # A placement's score when there is no trained model
+DEFAULT_CONTEXT = {"energy_level": 5, "mood_before": 5}   # Model inputs a plan doesn't know
+UNSCHEDULED = "Unscheduled"
+
+
+def _to_minutes(hhmm: str) -> int:
+    hours, minutes = hhmm.split(":")
+    return int(hours) * 60 + int(minutes)
+
+
+def _to_hhmm(minutes: int) -> str:
+    return f"{minutes // 60:02d}:{minutes % 60:02d}"
+
+
+def fulfillment_scorer(predictor, context: Optional[Dict[str, Any]] = None) -> Callable:
+    """
+    A scorer for optimize(): predicts the fulfillment of every (task, hour)
+    pair it is given with one predictor.predict_many() call. Returns None
+    when the model isn't available, and optimize() then has no preference.
+    """
+    context = {**DEFAULT_CONTEXT, **(context or {})}
+
+    def score(pairs):
+        return predictor.predict_many([
+            {"task_type": task.get("task_type"), "aligned_value": task.get("aligned_value"),
+             "planned_hour": hour, **context}
+            for task, hour in pairs
+        ])
+    return score
+
+
+def _fits(start: int, duration: int, intervals: List[Tuple[int, int]]) -> bool:
+    return any(slot_start <= start and start + duration <= slot_end for slot_start, slot_end in intervals)
+
+
+def _starts(task: Dict[str, Any], intervals: List[Tuple[int, int]], step: int) -> List[int]:
+    """Every start time worth trying for the task."""
+    duration, fixed = task["duration"], task.get("start")
+    if fixed is not None:
+        return [fixed] if _fits(fixed, duration, intervals) else []
+    starts = []
+    for slot_start, slot_end in intervals:
+        latest = slot_end - duration
+        if latest < slot_start:
+            continue
+        starts.extend(range(slot_start, latest + 1, step))
+        if (latest - slot_start) % step:
+            starts.append(latest)
+    return starts
+
+
+def _best_fit(tasks: List[Dict[str, Any]], intervals: List[Tuple[int, int]]) -> List[Optional[Tuple[int, int]]]:
+    """Fixed tasks first, then the rest longest first into the free gap they leave the least of."""
+    gaps = sorted(list(interval) for interval in intervals)
+    placements: List[Optional[Tuple[int, int]]] = [None] * len(tasks)
+
+    def reserve(index, start, end):
+        gap_start, gap_end = gaps.pop(index)
+        gaps.extend(gap for gap in ([gap_start, start], [end, gap_end]) if gap[1] > gap[0])
+        gaps.sort()
+
+    fixed = [i for i, task in enumerate(tasks) if task.get("start") is not None]
+    flexible = sorted((i for i, task in enumerate(tasks) if task.get("start") is None), key=lambda i: -tasks[i]["duration"])
+    for i in fixed + flexible:
+        duration, start = tasks[i]["duration"], tasks[i].get("start")
+        fits = [(gap_end - gap_start - duration, j) for j, (gap_start, gap_end) in enumerate(gaps)
+                if (start is None and gap_end - gap_start >= duration)
+                or (start is not None and gap_start <= start and start + duration <= gap_end)]
+        if fits:
+            j = min(fits)[1]
+            start = gaps[j][0] if start is None else start
+            reserve(j, start, start + duration)
+            placements[i] = (start, start + duration)
+    return placements
+
+
+@profiling.profiled()
+def optimize(tasks: List[Dict[str, Any]], free_slots: List[Dict[str, Any]], scorer: Optional[Callable] = None,
+             budget_ms: Optional[float] = None, step: Optional[int] = None) -> Tuple[List[Optional[Tuple[int, int]]], bool]:
+    """
+    Finds the best non-overlapping placement of `tasks` in `free_slots`
+    (scheduler.get_free_slots()' format).
+
+    Args:
+        tasks: Dicts with "duration" (minutes), optionally "start" (minutes
+            since midnight; the task must go exactly there) and whatever
+            `scorer` reads ("task_type" and "aligned_value" for fulfillment_scorer()).
+        scorer: Called once with [(task, start hour), ...]; returns a score per
+            pair, or None for no preference.
+
+    Returns:
+        (placements, complete): one (start, end) in minutes, or None if the
+        task couldn't be placed, per task in input order; and False if the
+        time budget ran out before the search proved the plan best.
+    """
+    # The budget covers scoring too
+    deadline = time.perf_counter() + (config.PLAN_OPTIMIZER_BUDGET_MS if budget_ms is None else budget_ms) / 1000
+    step = step or config.PLAN_OPTIMIZER_STEP_MINUTES
+    intervals = [(_to_minutes(s["start"]), _to_minutes(s["end"])) for s in free_slots]
+    starts = [_starts(task, intervals, step) for task in tasks]
+    greedy = {i: placed for i, placed in enumerate(_best_fit(tasks, intervals)) if placed is not None}
+    for i, (start, _) in greedy.items():
+        if start not in starts[i]:
+            starts[i].append(start)
+
+    # One scorer call covers every hour any candidate starts in
+    pairs = sorted({(i, start // 60) for i, task_starts in enumerate(starts) for start in task_starts})
+    scores = scorer([(tasks[i], hour) for i, hour in pairs]) if scorer and pairs else None
+    fulfillment = dict(zip(pairs, scores)) if scores else {}
+    # More than every flexible placement together could be worth
+    fixed_bonus = len(tasks) * (PLACEMENT_VALUE + max([NEUTRAL_SCORE, *fulfillment.values()]))
+
+    # Each task's placements as (value, start, end), best first, earlier start first on ties
+    options = [
+        sorted(((PLACEMENT_VALUE + fulfillment.get((i, start // 60), NEUTRAL_SCORE)
+                 + (fixed_bonus if tasks[i].get("start") is not None else 0.0), start, start + tasks[i]["duration"])
+                for start in task_starts), key=lambda option: (-option[0], option[1]))
+        for i, task_starts in enumerate(starts)
+    ]
+    # Fewest choices first (fixed tasks have one), then longest
+    order = sorted(range(len(tasks)), key=lambda i: (len(options[i]), -tasks[i]["duration"]))
+    # What the tasks from order[k] on could still add at most: each one's best
+    # placement; and no more of them fit than their shortest durations allow
+    bound = [0.0] * (len(order) + 1)
+    extra = [0.0] * (len(order) + 1)
+    shortest = [[0]] * (len(order) + 1)     # prefix sums of the placeable durations, shortest first
+    for k in range(len(order) - 1, -1, -1):
+        task_options = options[order[k]]
+        bound[k] = bound[k + 1] + (task_options[0][0] if task_options else 0.0)
+        extra[k] = extra[k + 1] + (task_options[0][0] - PLACEMENT_VALUE if task_options else 0.0)
+        durations = sorted(tasks[i]["duration"] for i in order[k:] if options[i])
+        shortest[k] = [0] + [sum(durations[:n + 1]) for n in range(len(durations))]
+    free_minutes = sum(slot_end - slot_start for slot_start, slot_end in intervals)
+
+    def upper(k, used):
+        fit = bisect.bisect_right(shortest[k], free_minutes - used) - 1
+        return min(bound[k], fit * PLACEMENT_VALUE + extra[k])
+
+    chosen: Dict[int, Tuple[int, int]] = {}
+    option_values = [{start: value for value, start, _ in task_options} for task_options in options]
+    # Seeded a hair below the greedy plan's value, so the first plan the search
+    # finds that is just as good replaces it: the search tries earlier starts
+    # first, and a later equal plan never replaces an earlier one
+    best = {"value": sum(option_values[i][start] for i, (start, _) in greedy.items()) - 1e-9,
+            "plan": greedy, "complete": True}
+
+    def search(k, value, used):
+        """Returns False once the time budget is spent."""
+        if k == len(order):
+            if value > best["value"]:
+                best.update(value=value, plan=dict(chosen))
+            return True
+        if time.perf_counter() > deadline:
+            best["complete"] = False
+            return False
+        i = order[k]
+        if options[i] and value + upper(k, used) > best["value"]:
+            duration = tasks[i]["duration"]
+            rest = upper(k + 1, used + duration)
+            for option_value, start, end in options[i]:
+                if value + option_value + rest <= best["value"]:
+                    break
+                if any(start < placed_end and placed_start < end for placed_start, placed_end in chosen.values()):
+                    continue
+                chosen[i] = (start, end)
+                keep_going = search(k + 1, value + option_value, used + duration)
+                del chosen[i]
+                if not keep_going:
+                    return False
+        # Or leave this task out
+        if value + upper(k + 1, used) > best["value"]:
+            return search(k + 1, value, used)
+        return True
+
+    search(0, 0.0, 0)
+    return [best["plan"].get(i) for i in range(len(tasks))], best["complete"]
+
+
+@profiling.profiled()
+def place_plan(tasks: List[Dict[str, Any]], free_slots: List[Dict[str, Any]], scorer: Optional[Callable] = None,
+               budget_ms: Optional[float] = None) -> List[Dict[str, Any]]:
+    """
+    Turns parsed tasks (task_name, task_type, aligned_value, duration_minutes
+    and an optional requested start_time "HH:MM") into the planner's tasks,
+    with time_preference "HH:MM - HH:MM", in chronological order.
+
+    A requested time is kept when it lies in a free slot; otherwise the task
+    is placed like one without a time. Tasks that don't fit anywhere come
+    last, with time_preference "Unscheduled".
+    """
+    intervals = [(_to_minutes(s["start"]), _to_minutes(s["end"])) for s in free_slots]
+    candidates = []
+    for task in tasks:
+        try:
+            duration = int(task.get("duration_minutes") or config.PLAN_DEFAULT_DURATION_MINUTES)
+        except (TypeError, ValueError):
+            duration = config.PLAN_DEFAULT_DURATION_MINUTES
+        duration = max(duration, 1)
+        start = task_codec.parse_clock(str(task.get("start_time") or ""))
+        if start is not None and not _fits(start, duration, intervals):
+            start = None
+        candidates.append({**task, "duration": duration, "start": start})
+
+    placements, _ = optimize(candidates, free_slots, scorer=scorer, budget_ms=budget_ms)
+
+    plan = []
+    for task, placed in zip(candidates, placements):
+        plan.append({
+            "task_name": task.get("task_name") or "Task",
+            "task_type": task.get("task_type") or "",
+            "aligned_value": task.get("aligned_value") or "",
+            "time_preference": f"{_to_hhmm(placed[0])} - {_to_hhmm(placed[1])}" if placed else UNSCHEDULED,
+        })
+    plan.sort(key=lambda t: (t["time_preference"] == UNSCHEDULED, t["time_preference"]))
+    return plan
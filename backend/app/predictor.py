@@ -1,21 +1,161 @@
-import pandas as pd
-import numpy as np
-from sklearn.ensemble import RandomForestRegressor
-from sklearn.preprocessing import OneHotEncoder
-from sklearn.compose import ColumnTransformer
-from sklearn.pipeline import Pipeline
+"""
+Fulfillment Predictor
+
+A RandomForest that predicts how fulfilling a task will be from its type,
+value, energy, mood and the hour it is planned for. predict_many() scores
+many candidates in one call (see plan_optimizer.py).
+
+pandas and scikit-learn take over a second to import, so they are loaded on
+first use. Every successful training run is published to the model store
+(see model_store.py) and every worker process serves the live version from
+there: on startup warm_up() loads it instead of retraining, and a background
+poller picks up versions published later (e.g. by /predict/retrain on another
+worker) within config.MODEL_POLL_SECONDS. How warm-up runs is set by
+config.MODEL_WARMUP.
+
+RetrainOnFeedback keeps the model from going stale: it counts change events
+that add or alter training rows and, once there are enough of them, triggers
+the "retrain_model" background job (see jobs.py), which trains on one worker.
+"""
+
+import logging
+import threading
+import time
+
+from . import config
 from . import data_manager
+from . import event_bus
+from . import jobs
+from . import metrics
+from . import model_store
+from . import profiling
+from . import task_codec
+
+logger = logging.getLogger(__name__)
+
+MODEL_NAME = "predictor"
+
+# Models published before the planned hour was a feature keep using these
+BASE_FEATURES = ['task_type', 'aligned_value', 'energy_level', 'mood_before']
+FEATURES = BASE_FEATURES + ['planned_hour']
+
+def _planned_hour(planned_time):
+    """Start hour of a planned_time ("19:00 - 20:00", "7pm"), or None if it isn't a clock time."""
+    if not isinstance(planned_time, str):
+        return None
+    minutes = task_codec.encode_time(planned_time, allow_range=True)[0]
+    return None if minutes is None else minutes // 60
 
 class FulfillmentPredictor:
     def __init__(self):
         self.model = None
+        self.features = FEATURES
+        self.version = None
         self.is_trained = False
+        self._warm_up_lock = threading.Lock()
+        self._warm_up_started = False
+        self._load_lock = threading.Lock()
+        self._poller = None
+
+    # --- Warm-up ---
+
+    def start_warm_up(self):
+        """
+        Gets the model ready according to config.MODEL_WARMUP and starts polling
+        for new versions. Called from the API's startup hook.
+          "background": load or train in a daemon thread; startup doesn't wait
+          "eager":      load or train right here, before the first request
+          "lazy":       do nothing now; the first predict() warms up
+        """
+        mode = config.MODEL_WARMUP
+        if mode == "eager":
+            self.warm_up()
+        elif mode == "background":
+            with self._warm_up_lock:
+                self._warm_up_started = True
+            threading.Thread(target=self._load_or_train, name="predictor-warm-up", daemon=True).start()
+        self._start_poller()
 
+    def warm_up(self):
+        """Loads the live model, or trains one if there is none. Only the first call does anything."""
+        with self._warm_up_lock:
+            if self._warm_up_started:
+                return
+            self._warm_up_started = True
+        self._load_or_train()
+
+    def _load_or_train(self):
+        if self.load_current():
+            return
+        # Several workers starting at once: one trains, the rest wait and load its model
+        with model_store.training_lock(MODEL_NAME):
+            if not self.load_current():
+                self.train()
+
+    def load_current(self):
+        """
+        Makes sure the live model version is the one in memory, loading it if
+        needed. Returns False if no model has been published yet.
+        """
+        version = model_store.current_version(MODEL_NAME)
+        if version is None:
+            return False
+        if version == self.version:
+            return True
+        with self._load_lock:
+            if version == self.version:
+                return True
+            try:
+                artifact = model_store.load(MODEL_NAME, version)
+            except Exception:
+                logger.exception("Could not load model", extra={"event": "model_load_failed", "version": version})
+                return False
+            self.model = artifact["model"]
+            self.features = artifact.get("features", BASE_FEATURES)
+            self.version = version
+            self.is_trained = True
+        metrics.MODEL_TRAINED.set(1)
+        logger.info("Loaded model.", extra={
+            "event": "model_loaded", "version": version,
+            "rows": artifact.get("rows"), "trained_at": artifact.get("trained_at"),
+        })
+        return True
+
+    def _start_poller(self):
+        if self._poller is not None or config.MODEL_POLL_SECONDS <= 0:
+            return
+        self._poller = threading.Thread(target=self._poll, name="predictor-poller", daemon=True)
+        self._poller.start()
+
+    def _poll(self):
+        while True:
+            time.sleep(config.MODEL_POLL_SECONDS)
+            try:
+                self.load_current()
+            except Exception:
+                logger.exception("Model poll failed", extra={"event": "model_poll_failed"})
+
+    # --- Training and inference ---
+
+    @profiling.profiled("predictor.train")
     def train(self):
         """
         Fetches data from the database and trains the model 
-        to predict 'fulfillment_score'.
+        to predict 'fulfillment_score'. Returns False if there weren't enough
+        rated tasks; the model in use (if any) then stays in use.
         """
+        with metrics.MODEL_TRAIN_LATENCY.time():
+            trained = self._train()
+        metrics.MODEL_TRAINED.set(1 if self.is_trained else 0)
+        return trained
+
+    def _train(self):
+        from sklearn.compose import ColumnTransformer
+        from sklearn.ensemble import RandomForestRegressor
+        from sklearn.impute import SimpleImputer
+        from sklearn.pipeline import Pipeline
+        from sklearn.preprocessing import OneHotEncoder
+
         df = data_manager.get_all_tasks()
         
         # 1. Filter for completed tasks with a fulfillment score
@@ -24,15 +164,16 @@ class FulfillmentPredictor:
         
         # We need enough data to train
         if len(train_df) < 5:
-            print("Not enough data to train model.")
-            self.is_trained = False
-            return
+            # Keep serving the published model (as every other worker does)
+            logger.info("Not enough data to train model.", extra={"event": "model_not_trained", "rows": len(train_df)})
+            return False
 
         # 2. Define Features (X) and Target (y)
         # We want to predict 'fulfillment_score' based on these inputs:
-        features = ['task_type', 'aligned_value', 'energy_level', 'mood_before']
+        features = FEATURES
         target = 'fulfillment_score'
 
+        train_df = train_df.assign(planned_hour=train_df['planned_time'].map(_planned_hour).astype(float))
         X = train_df[features]
         y = train_df[target]
 
@@ -44,42 +185,146 @@ class FulfillmentPredictor:
         preprocessor = ColumnTransformer(
             transformers=[
                 ('cat', OneHotEncoder(handle_unknown='ignore'), categorical_features),
-                ('num', 'passthrough', numerical_features)
+                ('num', 'passthrough', numerical_features),
+                # Plans like "Morning" have no hour; they (and predictions without
+                # one) get the usual hour instead
+                ('hour', SimpleImputer(strategy='median', keep_empty_features=True), ['planned_hour'])
             ]
         )
 
         # 4. Build Pipeline
-        self.model = Pipeline(steps=[
+        model = Pipeline(steps=[
             ('preprocessor', preprocessor),
             ('regressor', RandomForestRegressor(n_estimators=100))
         ])
 
-        # 5. Train
-        self.model.fit(X, y)
-        self.is_trained = True
-        print("Model trained successfully.")
+        # 5. Train, then share it with every worker through the model store
+        model.fit(X, y)
+        version = model_store.publish(MODEL_NAME, {
+            "model": model, "features": features, "rows": len(train_df), "trained_at": time.time()
+        })
+        with self._load_lock:
+            self.model = model
+            self.features = features
+            self.version = version
+            self.is_trained = True
+        logger.info("Model trained successfully.", extra={"event": "model_trained", "rows": len(train_df), "version": version})
+        return True
 
-    def predict(self, task_type, aligned_value, energy_level, mood_before):
+    def _ready(self):
+        if not self.is_trained:
+            if self._warm_up_started:
+                # Still warming up (or there wasn't enough data); don't hold the request up
+                return False
+            self.warm_up()
+        return self.is_trained
+
+    @profiling.profiled("predictor.predict")
+    def predict(self, task_type, aligned_value, energy_level, mood_before, planned_hour=None):
         """
         Predicts fulfillment score for a hypothetical task.
         """
-        if not self.is_trained:
+        scores = self._predict_rows([{
+            'task_type': task_type,
+            'aligned_value': aligned_value,
+            'energy_level': energy_level,
+            'mood_before': mood_before,
+            'planned_hour': planned_hour,
+        }])
+        return None if scores is None else scores[0]
+
+    @profiling.profiled("predictor.predict_many")
+    def predict_many(self, rows):
+        """
+        Predicts fulfillment scores for many hypothetical tasks in one model call.
+        `rows` are dicts with the predict() arguments as keys. Returns a list of
+        scores, or None if the model isn't available.
+        """
+        if not rows:
+            return []
+        return self._predict_rows(rows)
+
+    def _predict_rows(self, rows):
+        if not self._ready():
             return None
 
-        # Create a DataFrame for the single input
+        import pandas as pd
+
+        model, features = self.model, self.features
         input_data = pd.DataFrame({
-            'task_type': [task_type],
-            'aligned_value': [aligned_value],
-            'energy_level': [energy_level],
-            'mood_before': [mood_before]
+            feature: [row.get(feature) for row in rows] for feature in features
         })
+        if 'planned_hour' in input_data:
+            input_data['planned_hour'] = input_data['planned_hour'].astype(float)
 
         try:
-            prediction = self.model.predict(input_data)
-            return round(prediction[0], 1) # Return score rounded to 1 decimal
-        except Exception as e:
-            print(f"Prediction error: {e}")
+            with metrics.MODEL_INFERENCE_LATENCY.time():
+                prediction = model.predict(input_data)
+            return [round(float(score), 1) for score in prediction] # Scores rounded to 1 decimal
+        except Exception:
+            metrics.MODEL_ERRORS.inc()
+            logger.exception("Prediction error", extra={"event": "prediction_failed"})
             return None
 
 # Create a global instance to be used by the API
-predictor = FulfillmentPredictor()
\ No newline at end of file
+predictor = FulfillmentPredictor()
+
+
+# --- Retraining on new feedback ---
+
+# Task fields the model trains on (besides the fulfillment_score target)
+_FEATURE_FIELDS = {'task_type', 'aligned_value', 'energy_level', 'mood_before', 'fulfillment_score'}
+
+class RetrainOnFeedback(event_bus.Subscriber):
+    """
+    Triggers a retrain once `threshold` training rows were added, changed or
+    removed since the last one. Durable, so the count survives restarts.
+    """
+
+    name = "predictor_retrain"
+    durable = True
+
+    def __init__(self, predictor, threshold):
+        self.predictor = predictor
+        self.threshold = threshold
+        self.pending = 0
+
+    def get_state(self):
+        return {"pending": self.pending}
+
+    def set_state(self, state):
+        self.pending = (state or {}).get("pending", 0)
+
+    def handle(self, event):
+        payload = event.payload
+        if event.type in (event_bus.TASK_CREATED, event_bus.TASK_DELETED):
+            changed = payload["fulfillment_score"] is not None
+        elif event.type == event_bus.FEEDBACK_RECORDED:
+            changed = payload["fulfillment_score"] != payload["previous"]["fulfillment_score"]
+        elif event.type == event_bus.TASK_UPDATED:
+            rated = payload["fulfillment_score"] is not None or payload["previous"]["fulfillment_score"] is not None
+            changed = rated and bool(_FEATURE_FIELDS.intersection(payload["fields"]))
+        else:
+            changed = False
+        if not changed:
+            return
+        self.pending += 1
+        if self.pending >= self.threshold:
+            logger.info("Retraining after new feedback", extra={"event": "model_auto_retrain", "changes": self.pending})
+            if not jobs.runner.trigger("retrain_model"):
+                # No job scheduler in this process (PRAXABLE_JOBS=0): train right here
+                self.predictor.train()
+            self.pending = 0
+
+retrain_on_feedback = RetrainOnFeedback(predictor, config.MODEL_RETRAIN_AFTER_LABELS)
+
+
+def _retrain():
+    if not predictor.train():
+        return "not enough rated tasks to train"
+    return f"published version {predictor.version}"
+
+jobs.runner.register(jobs.Job(
+    "retrain_model", _retrain, lease=1800.0,
+    description="Retrains the fulfillment model (after new feedback, or POST /predict/retrain)",
+))
\ No newline at end of file
@@ -0,0 +1,221 @@
+"""
+Profiling Module
+
+Opt-in, per-request span trees for finding out where a slow request spent its
+time (calendar fetch, predictor loop, database, Gemini...).
+
+- ProfilingMiddleware profiles a sampled share of requests
+  (config.PROFILE_SAMPLE_RATE, off by default) plus any request sent with the
+  `X-Debug-Profile: 1` header.
+- Code marks interesting work with `with profiling.span("name"):` or the
+  `@profiling.profiled("name")` decorator. Outside a profiled request a span
+  is a single contextvar lookup, so the instrumentation stays in place.
+- Profiles of requests slower than config.SLOW_REQUEST_THRESHOLD_MS (and of
+  every debug-header request) go into a small ring buffer, served newest
+  first by GET /debug/slow-requests.
+
+Spans started from threadpool code (run_in_threadpool, StreamingResponse
+iterators) attach to the right parent, because Starlette copies the request's
+context into the worker thread.
+"""
+
+import collections
+import contextvars
+import functools
+import random
+import threading
+import time
+from typing import Any, Dict, List, Optional
+
+from . import config
+from . import logging_config
+
+DEBUG_HEADER = b"x-debug-profile"
+
+# The innermost open span of the request being profiled (None when not profiling)
+_current_span = contextvars.ContextVar("profiling_span", default=None)
+
+
+class Span:
+    __slots__ = ("name", "start", "end", "children", "profile", "_token")
+
+    def __init__(self, name, profile):
+        self.name = name
+        self.profile = profile
+        self.start = time.perf_counter()
+        self.end = None
+        self.children = []
+        self._token = None
+
+    @property
+    def duration(self):
+        return (self.end or time.perf_counter()) - self.start
+
+    def __enter__(self):
+        self._token = _current_span.set(self)
+        return self
+
+    def __exit__(self, *exc_info):
+        self.end = time.perf_counter()
+        _current_span.reset(self._token)
+        return False
+
+    def to_dict(self, origin):
+        return {
+            "name": self.name,
+            "start_ms": round((self.start - origin) * 1000, 3),
+            "duration_ms": round(self.duration * 1000, 3),
+            "children": [child.to_dict(origin) for child in self.children],
+        }
+
+
+class _NoopSpan:
+    """Returned by span() outside a profiled request."""
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        return False
+
+
+_NOOP_SPAN = _NoopSpan()
+
+
+class Profile:
+    """All spans of one request."""
+
+    def __init__(self, method, path, forced):
+        self.method = method
+        self.path = path
+        self.forced = forced
+        self.started_at = time.time()
+        self.span_count = 0
+        self.dropped_spans = 0
+        self.root = Span(f"{method} {path}", self)
+
+    def to_dict(self, route, status, request_id):
+        return {
+            "request_id": request_id,
+            "method": self.method,
+            "path": self.path,
+            "route": route,
+            "status": status,
+            "started_at": self.started_at,
+            "duration_ms": round(self.root.duration * 1000, 3),
+            "forced": self.forced,
+            "dropped_spans": self.dropped_spans,
+            "spans": self.root.to_dict(self.root.start),
+        }
+
+
+def span(name):
+    """
+    Context manager timing a block as a child of the current span.
+    Does nothing (and costs almost nothing) when the request isn't profiled.
+    """
+    parent = _current_span.get()
+    if parent is None:
+        return _NOOP_SPAN
+    profile = parent.profile
+    if profile.span_count >= config.PROFILE_MAX_SPANS:
+        # e.g. a predictor call per activity; keep the tree readable and bounded
+        profile.dropped_spans += 1
+        return _NOOP_SPAN
+    profile.span_count += 1
+    child = Span(name, profile)
+    parent.children.append(child)
+    return child
+
+
+def profiled(name=None):
+    """Decorator version of span(); the span name defaults to module.function."""
+    def decorator(func):
+        span_name = name or f"{func.__module__.rsplit('.', 1)[-1]}.{func.__name__}"
+
+        @functools.wraps(func)
+        def wrapper(*args, **kwargs):
+            if _current_span.get() is None:
+                return func(*args, **kwargs)
+            with span(span_name):
+                return func(*args, **kwargs)
+        return wrapper
+    return decorator
+
+
+def profiled_iter(name, iterable):
+    """
+    Times a whole iterator, from its first item to its last, as one span.
+    StreamingResponse pulls each item in a fresh copy of the context, so the
+    span is not made "current" (spans opened inside attach to its parent).
+    """
+    child = span(name)
+    try:
+        yield from iterable
+    finally:
+        if isinstance(child, Span):
+            child.end = time.perf_counter()
+
+
+# --- Slow request ring buffer ---
+
+_slow_requests = collections.deque(maxlen=config.SLOW_REQUEST_BUFFER_SIZE)
+_slow_requests_lock = threading.Lock()
+
+
+def record(profile_dict):
+    with _slow_requests_lock:
+        _slow_requests.append(profile_dict)
+
+
+def get_slow_requests(limit=None) -> List[Dict[str, Any]]:
+    """Captured profiles, newest first."""
+    with _slow_requests_lock:
+        items = list(_slow_requests)
+    items.reverse()
+    return items[:limit] if limit else items
+
+
+def clear_slow_requests():
+    with _slow_requests_lock:
+        _slow_requests.clear()
+
+
+class ProfilingMiddleware:
+    """
+    Plain ASGI middleware that profiles sampled or debug-header requests and
+    keeps the slow ones. Requests that aren't profiled only pay for the
+    sampling check.
+    """
+
+    def __init__(self, app, sample_rate: Optional[float] = None, threshold_ms: Optional[float] = None):
+        self.app = app
+        self.sample_rate = config.PROFILE_SAMPLE_RATE if sample_rate is None else sample_rate
+        self.threshold = (config.SLOW_REQUEST_THRESHOLD_MS if threshold_ms is None else threshold_ms) / 1000
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        forced = any(name == DEBUG_HEADER and value not in (b"0", b"") for name, value in scope["headers"])
+        if not forced and not (self.sample_rate and random.random() < self.sample_rate):
+            await self.app(scope, receive, send)
+            return
+
+        profile = Profile(scope["method"], scope["path"], forced)
+        status = 500
+
+        async def send_wrapper(message):
+            nonlocal status
+            if message["type"] == "http.response.start":
+                status = message["status"]
+            await send(message)
+
+        try:
+            with profile.root:
+                await self.app(scope, receive, send_wrapper)
+        finally:
+            if forced or profile.root.duration >= self.threshold:
+                route = getattr(scope.get("route"), "path", None)
+                record(profile.to_dict(route, status, logging_config.get_request_id()))
@@ -6,6 +6,7 @@ to suggest activities based on user values and available free time.
 """
 
 from typing import List, Dict, Any
+from . import profiling
 from . import scheduler
 
 # Activity Database
@@ -181,6 +182,7 @@ def get_all_activities() -> List[Dict[str, Any]]:
     return ACTIVITIES
 
 
+@profiling.profiled()
 def get_recommendations(
     value_names: List[str], 
     min_duration: int = 0,
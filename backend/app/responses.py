@@ -0,0 +1,20 @@
+"""
+Fast JSON Responses
+
+The large list endpoints (/tasks, /recommendations/...) return their rows
+through FastJSONResponse instead of the default pipeline. Returning a Response
+object directly skips FastAPI's response-model validation and jsonable_encoder
+pass, and orjson does the encoding in C. The endpoints still declare their
+response_model, so the OpenAPI docs are unchanged.
+"""
+
+import orjson
+from fastapi.responses import Response
+
+
+class FastJSONResponse(Response):
+    media_type = "application/json"
+
+    def render(self, content) -> bytes:
+        # NaN/inf become null, numpy scalars and arrays are handled natively
+        return orjson.dumps(content, option=orjson.OPT_SERIALIZE_NUMPY)
@@ -1,17 +1,19 @@
 from datetime import datetime, timedelta
 from . import calendar_service
+from . import profiling
 
 def parse_time(iso_string):
     """Converts Google's time format to a Python datetime object."""
     # Google sends time like: '2025-11-26T14:00:00-05:00'
     return datetime.fromisoformat(iso_string)
 
+@profiling.profiled()
 def get_free_slots():
     """
     Calculates free time slots for the rest of the day.
     """
-    # 1. Get Hard Anchors from Google
-    events = calendar_service.get_todays_events()
+    # 1. Get Hard Anchors from Google (only when they are busy, not what they are)
+    busy = calendar_service.get_todays_busy()
     
     # 2. Define the boundaries of the "Day"
     now = datetime.now().astimezone() # Make sure it's timezone aware
@@ -24,11 +26,11 @@ def get_free_slots():
     # 3. Sort events by start time (Crucial for the logic)
     # We only care about events that end AFTER right now
     future_events = []
-    for e in events:
-        start = parse_time(e['start'])
-        end = parse_time(e['end'])
+    for interval in busy:
+        start = parse_time(interval['start'])
+        end = parse_time(interval['end'])
         if end > now:
-            future_events.append((start, end, e['summary']))
+            future_events.append((start, end))
     
     # Sort by start time
     future_events.sort(key=lambda x: x[0])
@@ -37,7 +39,7 @@ def get_free_slots():
     free_slots = []
     current_pointer = now
 
-    for event_start, event_end, summary in future_events:
+    for event_start, event_end in future_events:
         # If there is space between where we are and the next event
         # (We define a usable slot as at least 15 minutes)
         if event_start > current_pointer + timedelta(minutes=15):
@@ -0,0 +1,124 @@
+"""
+Shared State Module
+
+State that every worker process has to agree on when the API runs with
+several workers (config.WORKER_MODE = "multi"):
+
+- counters, e.g. the data version behind ETags (data_manager.get_data_version)
+- small TTL caches, e.g. today's calendar events
+
+Both live in a small SQLite file of their own (config.SHARED_STATE_PATH) in
+WAL mode, so readers never wait for writers and none of this contends with the
+task database. Each thread keeps one open connection, so a read is a single
+indexed lookup (tens of microseconds).
+
+In "single" mode none of this is used; the same state stays in process memory.
+"""
+
+import os
+import sqlite3
+import threading
+import time
+import uuid
+
+import orjson
+
+from . import config
+
+_local = threading.local()
+_instance = {}
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS meta (key TEXT PRIMARY KEY, value TEXT NOT NULL);
+CREATE TABLE IF NOT EXISTS counters (
+    name TEXT PRIMARY KEY,
+    value INTEGER NOT NULL,
+    updated_at REAL NOT NULL
+);
+CREATE TABLE IF NOT EXISTS cache (
+    key TEXT PRIMARY KEY,
+    value BLOB NOT NULL,
+    expires_at REAL NOT NULL
+);
+"""
+
+
+def _connection():
+    conn = getattr(_local, "conn", None)
+    if conn is None:
+        os.makedirs(os.path.dirname(config.SHARED_STATE_PATH) or ".", exist_ok=True)
+        # Autocommit: every statement below is its own small transaction
+        conn = sqlite3.connect(config.SHARED_STATE_PATH, timeout=5.0, isolation_level=None)
+        conn.execute("PRAGMA journal_mode = WAL")
+        conn.execute("PRAGMA synchronous = NORMAL")
+        conn.executescript(_SCHEMA)
+        # First process to get here names this shared state; later ones keep that name
+        conn.execute("INSERT OR IGNORE INTO meta VALUES ('instance_id', ?)", (uuid.uuid4().hex[:8],))
+        conn.execute("INSERT OR IGNORE INTO meta VALUES ('created_at', ?)", (repr(time.time()),))
+        _local.conn = conn
+    return conn
+
+
+def _meta():
+    if not _instance:
+        rows = dict(_connection().execute("SELECT key, value FROM meta"))
+        _instance.update(instance_id=rows["instance_id"], created_at=float(rows["created_at"]))
+    return _instance
+
+
+def instance_id():
+    """
+    Random id of this shared state file; identical in every worker and stable
+    across restarts (for as long as the file exists).
+    """
+    return _meta()["instance_id"]
+
+
+# --- Counters ---
+
+def get_counter(name):
+    """Returns (value, updated_at). A counter that was never bumped is 0."""
+    row = _connection().execute("SELECT value, updated_at FROM counters WHERE name = ?", (name,)).fetchone()
+    if row is None:
+        return 0, _meta()["created_at"]
+    return row
+
+
+def bump_counter(name):
+    """Adds one to a counter and returns the new value."""
+    now = time.time()
+    row = _connection().execute(
+        """
+        INSERT INTO counters (name, value, updated_at) VALUES (?, 1, ?)
+        ON CONFLICT(name) DO UPDATE SET value = value + 1, updated_at = excluded.updated_at
+        RETURNING value
+        """,
+        (name, now),
+    ).fetchone()
+    return row[0]
+
+
+# --- TTL cache ---
+
+def cache_get(key):
+    """The cached value for key, or None if it is missing or expired."""
+    row = _connection().execute(
+        "SELECT value FROM cache WHERE key = ? AND expires_at > ?", (key, time.time())
+    ).fetchone()
+    return orjson.loads(row[0]) if row else None
+
+
+def cache_set(key, value, ttl):
+    """Stores a JSON-serializable value for ttl seconds."""
+    conn = _connection()
+    now = time.time()
+    conn.execute(
+        "INSERT OR REPLACE INTO cache (key, value, expires_at) VALUES (?, ?, ?)",
+        (key, orjson.dumps(value), now + ttl),
+    )
+    # Keep the table small; expired rows are otherwise only ever overwritten
+    conn.execute("DELETE FROM cache WHERE expires_at <= ?", (now,))
+
+
+def cache_delete(key):
+    _connection().execute("DELETE FROM cache WHERE key = ?", (key,))
@@ -0,0 +1,199 @@
+"""
+Task Codec Module
+
+How task fields are stored in the normalized `task_entries` table (see
+migrations.py) and turned back into the API's strings by the `tasks` view:
+
+- date:         INTEGER days since 1970-01-01 ("2025-06-01" -> 20240). A date
+                given any other way ("2025-06-01T09:00", "Monday") is also
+                kept verbatim in date_text, which is NULL otherwise, so it
+                reads back exactly as it was written.
+- planned_time: INTEGER minutes since midnight ("09:30" -> 570). Plans are
+                often ranges ("19:00 - 20:00"), so the end goes in a second
+                column. Anything that isn't a clock time ("Morning", "") is
+                kept verbatim in a *_text column, which is NULL otherwise.
+- actual_time:  same as planned_time, without the range.
+- task_type, location and aligned_value: small integer ids into the
+  task_types, locations and core_values lookup tables.
+"""
+
+import datetime
+import functools
+import re
+
+_EPOCH = datetime.date(1970, 1, 1)
+
+_CLOCK = re.compile(r"^\s*(\d{1,2})(?::(\d{2}))?(?::\d{2})?\s*([aApP][mM])?\s*$")
+_RANGE = re.compile(r"\s*(?:-|–|to)\s*")
+
+# Lookup table -> its name column
+LOOKUP_TABLES = {"task_types": "name", "locations": "name", "core_values": "value_name"}
+
+
+def to_epoch_day(value):
+    """A date or ISO date string (a time part is ignored) as days since 1970-01-01."""
+    if isinstance(value, datetime.datetime):
+        value = value.date()
+    if not isinstance(value, datetime.date):
+        value = datetime.date.fromisoformat(str(value).strip()[:10])
+    return (value - _EPOCH).days
+
+
+def encode_date(value):
+    """
+    Returns (day, text) for a date field: the epoch day if one can be read
+    from it (see to_epoch_day), and the original text unless it is exactly
+    that day's ISO date.
+    """
+    if value is None:
+        return None, None
+    try:
+        day = to_epoch_day(value)
+    except (TypeError, ValueError):
+        return None, str(value)
+    if isinstance(value, datetime.date) and not isinstance(value, datetime.datetime):
+        return day, None
+    text = str(value)
+    return day, None if text == day_text(day) else text
+
+
+def parse_clock(text):
+    """'9:30', '09:30:00' or '7pm' -> minutes since midnight; None if it isn't a clock time."""
+    match = _CLOCK.match(text)
+    if not match:
+        return None
+    hour, minute, meridiem = int(match.group(1)), int(match.group(2) or 0), match.group(3)
+    if meridiem:
+        if not 1 <= hour <= 12:
+            return None
+        hour = hour % 12 + (12 if meridiem.lower() == "pm" else 0)
+    elif match.group(2) is None:
+        # A bare number isn't a time
+        return None
+    if hour > 23 or minute > 59:
+        return None
+    return hour * 60 + minute
+
+
+def encode_time(value, allow_range=False):
+    """
+    Returns (start_minute, end_minute, text) for a time field. Exactly one of
+    start_minute / text is set (both None for a missing value); end_minute is
+    only set for ranges.
+    """
+    if value is None:
+        return None, None, None
+    text = str(value)
+    start = parse_clock(text)
+    if start is not None:
+        return start, None, None
+    if allow_range:
+        parts = _RANGE.split(text.strip())
+        if len(parts) == 2:
+            start, end = parse_clock(parts[0]), parse_clock(parts[1])
+            if start is not None and end is not None:
+                return start, end, None
+    return None, None, text
+
+
+def lookup_id(conn, table, name, cache=None):
+    """
+    The id of `name` in a lookup table, adding it if needed. Values that tasks
+    mention but the user never added are stored as archived core values, so
+    they don't show up in the user's list.
+
+    `cache` is an optional dict to remember ids in while encoding a batch
+    within one transaction (ids never change, but a new database may reuse them).
+    """
+    if name is None:
+        return None
+    if cache is not None:
+        key = (table, name)
+        if key not in cache:
+            cache[key] = lookup_id(conn, table, name)
+        return cache[key]
+    column = LOOKUP_TABLES[table]
+    row = conn.execute(f"SELECT id FROM {table} WHERE {column} = ?", (name,)).fetchone()
+    if row:
+        return row[0]
+    if table == "core_values":
+        cursor = conn.execute("INSERT INTO core_values (value_name, archived) VALUES (?, 1)", (name,))
+    else:
+        cursor = conn.execute(f"INSERT INTO {table} ({column}) VALUES (?)", (name,))
+    return cursor.lastrowid
+
+
+# --- Decoding ---
+# The same strings the `tasks` view produces, built in Python. Reading
+# task_entries directly and decoding here is faster than going through the
+# view for large reads: there are only a few hundred distinct days and at most
+# 1440 clock times, so every string is formatted once and then shared.
+
+@functools.lru_cache(maxsize=4096)
+def day_text(day):
+    return None if day is None else (_EPOCH + datetime.timedelta(days=day)).isoformat()
+
+
+@functools.lru_cache(maxsize=2048)
+def clock_text(minute):
+    return f"{minute // 60:02d}:{minute % 60:02d}"
+
+
+def time_text(minute, text, end=None):
+    """The API string for a stored time (see encode_time)."""
+    if minute is None:
+        return text
+    if end is None:
+        return clock_text(minute)
+    return f"{clock_text(minute)} - {clock_text(end)}"
+
+
+def lookup_names(conn):
+    """{table: {id: name}} for every lookup table."""
+    return {
+        table: dict(conn.execute(f"SELECT id, {column} FROM {table}"))
+        for table, column in LOOKUP_TABLES.items()
+    }
+
+
+def decode_row(row, names):
+    """A task_entries row (all columns, in table order) as the API's task dict."""
+    (task_id, day, task, task_type_id, value_id, location_id, dread_level,
+     planned_start, planned_end, planned_text, actual_minute, actual_text,
+     did_it, mood_before, sleep_quality, energy_level, mood_after, fulfillment_score, date_text) = row
+    return {
+        "id": task_id,
+        "date": day_text(day) if date_text is None else date_text,
+        "task": task,
+        "task_type": names["task_types"].get(task_type_id),
+        "aligned_value": names["core_values"].get(value_id),
+        "dread_level": dread_level,
+        "location": names["locations"].get(location_id),
+        "planned_time": time_text(planned_start, planned_text, planned_end),
+        "actual_time": time_text(actual_minute, actual_text),
+        "did_it": did_it,
+        "mood_before": mood_before,
+        "sleep_quality": sleep_quality,
+        "energy_level": energy_level,
+        "mood_after": mood_after,
+        "fulfillment_score": fulfillment_score,
+    }
+
+
+# SQL expressions that turn the stored columns back into the API's strings
+def _clock_sql(column):
+    return f"printf('%02d:%02d', {column} / 60, {column} % 60)"
+
+
+def time_sql(minute, text, end=None):
+    """SQL for a time column of the `tasks` view."""
+    formatted = _clock_sql(minute)
+    if end is not None:
+        formatted = f"{formatted} || CASE WHEN {end} IS NULL THEN '' ELSE ' - ' || {_clock_sql(end)} END"
+    return f"CASE WHEN {minute} IS NULL THEN {text} ELSE {formatted} END"
+
+
+def date_sql(day, text=None):
+    """SQL for the date column of the `tasks` view."""
+    iso = f"date({day} * 86400, 'unixepoch')"
+    return iso if text is None else f"COALESCE({text}, {iso})"
@@ -0,0 +1,194 @@
+"""
+Write Queue Module
+
+Group commit for small writes (config.WRITE_QUEUE_ENABLED). Every committed
+SQLite transaction costs an fsync, and the fsync is most of the time a
+single-row insert or update takes. Writes are therefore run by one writer
+thread, and everything that queued up while it committed the previous group
+goes into the next transaction together, sharing one fsync. The busier it
+gets, the bigger the groups; a lone write is committed right away
+(batch_window can add a short wait for more writes instead):
+
+- submit(func, *args) queues func(conn, *args) and returns a Future. The
+  future resolves only once the transaction containing the write has been
+  committed, i.e. the write is durable.
+- Each write runs inside its own SAVEPOINT, so a failing write rolls back on
+  its own and fails its own future; the rest of the group still commits.
+- The queue is bounded. When it is full, submit() waits up to
+  WRITE_QUEUE_PUT_TIMEOUT and then raises WriteQueueFullError (HTTP 503 +
+  Retry-After) instead of letting requests pile up without limit.
+
+With several workers each process has its own writer; SQLite's file lock
+serializes their transactions.
+"""
+
+import atexit
+import logging
+import queue
+import sqlite3
+import threading
+import time
+from concurrent.futures import Future
+
+from . import logging_config
+from . import metrics
+
+logger = logging.getLogger(__name__)
+
+_STOP = object()
+
+
+class WriteQueueFullError(Exception):
+    """Raised when the write queue has no room. Maps to HTTP 503."""
+
+    def __init__(self, message, retry_after=1.0):
+        super().__init__(message)
+        self.retry_after = retry_after
+
+
+class WriteQueue:
+    """
+    One writer thread draining a bounded queue of writes in grouped
+    transactions. The thread starts on the first submit().
+
+    Args:
+        db_path: Callable returning the database path (read per group, so a
+            changed config.DB_PATH is picked up).
+        on_commit: Called with the number of writes after each committed group.
+    """
+
+    def __init__(self, db_path, on_commit=None, max_pending=1000, batch_window=0.0,
+                 max_batch=256, put_timeout=1.0):
+        self.db_path = db_path
+        self.on_commit = on_commit
+        self.batch_window = batch_window
+        self.max_batch = max_batch
+        self.put_timeout = put_timeout
+        self._queue = queue.Queue(maxsize=max_pending)
+        self._thread = None
+        self._start_lock = threading.Lock()
+        self._conn = None
+        self._conn_path = None
+
+    def pending(self):
+        return self._queue.qsize()
+
+    def submit(self, func, *args):
+        """
+        Queues func(conn, *args) and returns a Future with its return value
+        (or exception), set once the write is committed.
+        """
+        self._ensure_started()
+        future = Future()
+        item = (func, args, future, logging_config.get_request_id())
+        try:
+            self._queue.put(item, timeout=self.put_timeout)
+        except queue.Full:
+            metrics.WRITE_QUEUE_REJECTED.inc()
+            raise WriteQueueFullError("Too many writes pending, try again shortly.") from None
+        return future
+
+    def _ensure_started(self):
+        if self._thread is not None:
+            return
+        with self._start_lock:
+            if self._thread is None:
+                self._thread = threading.Thread(target=self._run, name="praxable-writer", daemon=True)
+                self._thread.start()
+                atexit.register(self.stop)
+
+    def stop(self, timeout=5.0):
+        """Commits whatever is queued, then stops the writer thread."""
+        with self._start_lock:
+            thread, self._thread = self._thread, None
+        if thread is None:
+            return
+        self._queue.put(_STOP)
+        thread.join(timeout)
+
+    # --- Writer thread ---
+
+    def _run(self):
+        while True:
+            batch, stop = self._next_batch()
+            if batch:
+                self._commit(batch)
+            if stop:
+                break
+        if self._conn is not None:
+            self._conn.close()
+            self._conn = None
+
+    def _next_batch(self):
+        """Blocks for the first write, then takes whatever else is queued (waiting up to batch_window)."""
+        item = self._queue.get()
+        if item is _STOP:
+            return [], True
+        batch = [item]
+        deadline = time.monotonic() + self.batch_window
+        while len(batch) < self.max_batch:
+            remaining = deadline - time.monotonic()
+            try:
+                item = self._queue.get(timeout=remaining) if remaining > 0 else self._queue.get_nowait()
+            except queue.Empty:
+                break
+            if item is _STOP:
+                return batch, True
+            batch.append(item)
+        return batch, False
+
+    def _connection(self):
+        path = self.db_path()
+        if self._conn is None or self._conn_path != path:
+            if self._conn is not None:
+                self._conn.close()
+            # Autocommit mode: the transaction and savepoints below are explicit
+            self._conn = sqlite3.connect(path, timeout=30.0, isolation_level=None)
+            self._conn_path = path
+        return self._conn
+
+    def _commit(self, batch):
+        results = []
+        try:
+            conn = self._connection()
+            with metrics.WRITE_COMMIT_LATENCY.time():
+                conn.execute("BEGIN IMMEDIATE")
+                try:
+                    for func, args, future, request_id in batch:
+                        results.append(self._apply(conn, func, args, request_id))
+                    conn.execute("COMMIT")
+                except BaseException:
+                    conn.execute("ROLLBACK")
+                    raise
+        except Exception as exc:
+            logger.exception("Write group failed", extra={"event": "write_group_failed", "size": len(batch)})
+            for _, _, future, _ in batch:
+                future.set_exception(exc)
+            return
+
+        metrics.WRITE_BATCH_SIZE.observe(len(batch))
+        committed = sum(1 for ok, _ in results if ok)
+        if committed and self.on_commit:
+            self.on_commit(committed)
+        for (_, _, future, _), (ok, value) in zip(batch, results):
+            if ok:
+                future.set_result(value)
+            else:
+                future.set_exception(value)
+
+    def _apply(self, conn, func, args, request_id):
+        """Runs one write in a savepoint. Returns (True, result) or (False, exception)."""
+        # Log lines from the write carry the id of the request that queued it
+        token = logging_config.request_id_var.set(request_id)
+        conn.execute("SAVEPOINT write")
+        try:
+            result = func(conn, *args)
+        except Exception as exc:
+            conn.execute("ROLLBACK TO write")
+            conn.execute("RELEASE write")
+            return False, exc
+        else:
+            conn.execute("RELEASE write")
+            return True, result
+        finally:
+            logging_config.request_id_var.reset(token)
@@ -0,0 +1,36 @@
+import os
+import sys
+
+import pytest
+
+BACKEND_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+# Make the backend's 'app' package importable, the same way uvicorn sees it
+if BACKEND_DIR not in sys.path:
+    sys.path.insert(0, BACKEND_DIR)
+
+# No scheduler thread or model warm-up in tests (config reads these on import)
+os.environ.setdefault("PRAXABLE_JOBS", "0")
+os.environ.setdefault("PRAXABLE_MODEL_WARMUP", "lazy")
+
+
+@pytest.fixture
+def database(tmp_path, monkeypatch):
+    """A fresh, fully migrated task database in a temporary directory."""
+    from app import config, data_manager
+
+    monkeypatch.setattr(config, "DATA_DIR", str(tmp_path))
+    monkeypatch.setattr(config, "DB_PATH", str(tmp_path / "praxable.db"))
+    monkeypatch.setattr(config, "MODEL_DIR", str(tmp_path / "models"))
+    data_manager.initialize_database()
+    return config.DB_PATH
+
+
+@pytest.fixture
+def client(database):
+    """The API on the temporary database, without its startup hooks (no event bus, jobs or warm-up)."""
+    from fastapi.testclient import TestClient
+
+    from app import main
+
+    return TestClient(main.app)
@@ -0,0 +1,44 @@
+"""
+Conditional GET: a 304 must never hide a write the client hasn't seen.
+
+    python -m pytest backend/tests
+"""
+
+from email.utils import formatdate
+
+from starlette.requests import Request
+
+from app import http_cache
+
+
+def conditional_request(**headers):
+    return Request({
+        "type": "http", "method": "GET", "path": "/values",
+        "headers": [(name.replace("_", "-").lower().encode(), value.encode()) for name, value in headers.items()],
+    })
+
+
+def test_if_modified_since_ignores_the_rest_of_the_second():
+    # The client's copy is dated 12:00:11; the data changed at 12:00:11.4
+    since = 1_700_000_011.0
+    request = conditional_request(If_Modified_Since=formatdate(since, usegmt=True))
+    assert http_cache.not_modified(request, 'W/"values-x-2"', since + 0.4) is None
+    assert http_cache.not_modified(request, 'W/"values-x-1"', since - 0.6).status_code == 304
+
+
+def test_if_none_match_takes_precedence():
+    request = conditional_request(If_None_Match='W/"values-x-1"', If_Modified_Since=formatdate(0, usegmt=True))
+    assert http_cache.not_modified(request, 'W/"values-x-1"', 1_700_000_000.0).status_code == 304
+    assert http_cache.not_modified(request, 'W/"values-x-2"', 1.0) is None
+
+
+def test_write_right_after_a_response_is_not_a_304(client):
+    assert client.post("/values", json={"value_name": "Health"}).status_code == 201
+    first = client.get("/values")
+    assert client.post("/values", json={"value_name": "Growth"}).status_code == 201
+
+    again = client.get("/values", headers={"If-Modified-Since": first.headers["Last-Modified"]})
+    assert again.status_code == 200
+    assert again.json() == [{"value_name": "Health"}, {"value_name": "Growth"}]
+    # Nothing changed since this response
+    assert client.get("/values", headers={"If-None-Match": again.headers["ETag"]}).status_code == 304
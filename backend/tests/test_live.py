@@ -0,0 +1,73 @@
+"""
+Fan-out of analytics deltas to many GET /analytics/stream clients on one
+worker: 1000 LiveHub clients, a few task writes, and every client must get
+every delta, in order.
+
+    python -m pytest backend/tests
+"""
+
+import asyncio
+import time
+
+import orjson
+
+from app import analytics, data_manager, event_bus, live
+
+CLIENTS = 1000
+WRITES = 10
+
+NEW_TASK = {
+    "date": "2025-06-01", "task": "Fan-out", "task_type": "Deep Work", "aligned_value": "Career",
+    "dread_level": 3, "location": "Home", "planned_time": "09:00", "actual_time": "00:00",
+    "did_it": 0, "mood_before": 5, "sleep_quality": 7, "energy_level": 6,
+}
+
+
+async def watch(hub, frames, connected):
+    """One client: keeps every SSE frame it is sent."""
+    async for frame in hub.stream():
+        event, data = frame.split(b"\n", 2)[:2]
+        frames.append((event.removeprefix(b"event: ").decode(), orjson.loads(data.removeprefix(b"data: "))))
+        connected.set()
+
+
+async def fan_out(hub, n_clients, n_writes, timeout=30.0):
+    """Connects n_clients, logs n_writes tasks one at a time; returns each client's deltas and the ids written."""
+    received = [[] for _ in range(n_clients)]
+    connected = [asyncio.Event() for _ in range(n_clients)]
+    clients = [asyncio.create_task(watch(hub, frames, ready)) for frames, ready in zip(received, connected)]
+    try:
+        await asyncio.wait_for(asyncio.gather(*(ready.wait() for ready in connected)), timeout)
+        assert hub.connections == n_clients
+        task_ids = []
+        for _ in range(n_writes):
+            task_ids.append(await asyncio.to_thread(data_manager.log_task, NEW_TASK))
+            # Each write is delivered (and fanned out) before the next one
+            deadline = time.monotonic() + timeout
+            while not all(frames and frames[-1][0] == "delta" and task_ids[-1] in frames[-1][1]["tasks"]["created"]
+                          for frames in received):
+                assert time.monotonic() < deadline, "a client is missing a delta"
+                await asyncio.sleep(0.01)
+    finally:
+        for client in clients:
+            client.cancel()
+        await asyncio.gather(*clients, return_exceptions=True)
+    return [[data for event, data in frames if event == "delta"] for frames in received], task_ids
+
+
+def test_every_client_gets_every_delta(database):
+    event_bus.bus.subscribe(analytics.alignment_stats)
+    published = []
+    analytics.alignment_stats.add_listener(published.append)
+    try:
+        deltas, task_ids = asyncio.run(fan_out(live.hub, CLIENTS, WRITES))
+    finally:
+        analytics.alignment_stats.remove_listener(published.append)
+        live.hub.stop()
+        event_bus.bus.stop()
+
+    assert [task_id for delta in published for task_id in delta["tasks"]["created"]] == task_ids
+    assert published[-1]["total_tasks"] == WRITES
+    # The same deltas, in the same order, at every client
+    assert all(client_deltas == published for client_deltas in deltas)
+    assert live.hub.connections == 0
@@ -0,0 +1,87 @@
+"""
+Offline checks that LLMClient always settles the circuit breaker's half-open
+trial, driven by fake models instead of Gemini:
+
+    python -m pytest backend/tests
+"""
+
+import threading
+import time
+
+import pytest
+
+from app.llm_client import CircuitBreaker, FakeModel, LLMClient, LLMUnavailableError
+
+
+class BadRequestModel:
+    """Fails every call with an error that isn't worth retrying."""
+
+    def generate_content(self, content, stream=False, **kwargs):
+        raise ValueError("Invalid request")
+
+
+class HangingModel:
+    """Sends one chunk, then never another until released."""
+
+    def __init__(self):
+        self.release = threading.Event()
+
+    def generate_content(self, content, stream=False, **kwargs):
+        def chunks():
+            yield FakeModel._Response('{"tasks": [')
+            self.release.wait()
+            yield FakeModel._Response("]}")
+        return chunks()
+
+
+def half_open_client(**kwargs):
+    """A client whose breaker has just gone half-open."""
+    breaker = CircuitBreaker(failure_threshold=1, reset_timeout=0.01)
+    breaker.record_failure()
+    time.sleep(0.02)
+    assert breaker.state == CircuitBreaker.HALF_OPEN
+    return LLMClient(max_retries=0, backoff_base=0, breaker=breaker, **kwargs)
+
+
+def test_generate_bad_request_releases_half_open_trial():
+    client = half_open_client()
+    with pytest.raises(ValueError):
+        client.generate(BadRequestModel(), "plan my day")
+
+    assert client.generate(FakeModel(reply="ok"), "plan my day").text == "ok"
+    assert client.breaker.state == CircuitBreaker.CLOSED
+
+
+def test_stream_bad_request_releases_half_open_trial():
+    client = half_open_client()
+    with pytest.raises(ValueError):
+        list(client.stream(BadRequestModel(), "plan my day"))
+
+    assert "".join(chunk.text for chunk in client.stream(FakeModel(reply="ok"), "plan my day")) == "ok"
+    assert client.breaker.state == CircuitBreaker.CLOSED
+
+
+def test_stream_abandoned_by_caller_releases_trial_and_slot():
+    client = half_open_client(max_concurrency=1)
+    stream = client.stream(FakeModel(reply="x" * 64), "plan my day")
+    next(stream)
+    stream.close()   # Client disconnected: GeneratorExit inside the stream
+
+    assert client.generate(FakeModel(reply="ok"), "plan my day").text == "ok"
+    assert client.metrics()["in_flight"] == 0
+
+
+def test_stream_stalled_chunk_times_out():
+    client = LLMClient(max_concurrency=1, queue_timeout=0, call_timeout=0.1, max_retries=0)
+    model = HangingModel()
+    stream = client.stream(model, "plan my day")
+    next(stream)
+    with pytest.raises(LLMUnavailableError):
+        next(stream)
+
+    # The stalled pull still holds the only slot until it returns
+    with pytest.raises(LLMUnavailableError):
+        client.generate(FakeModel(), "plan my day")
+    model.release.set()
+    time.sleep(0.05)
+    assert client.generate(FakeModel(reply="ok"), "plan my day").text == "ok"
@@ -0,0 +1,117 @@
+"""
+Migrating a database made by the original app (a free-form `tasks` table, no
+user_version) through every migration, and the legacy app's writes after.
+
+    python -m pytest backend/tests
+"""
+
+import sqlite3
+
+import pytest
+
+from app import migrations
+
+# What the original data_manager.initialize_database() created
+BASELINE_SCHEMA = [
+    '''CREATE TABLE tasks (
+        id INTEGER PRIMARY KEY AUTOINCREMENT,
+        date TEXT NOT NULL,
+        task TEXT NOT NULL,
+        task_type TEXT,
+        aligned_value TEXT,
+        dread_level INTEGER,
+        location TEXT,
+        planned_time TEXT,
+        actual_time TEXT,
+        did_it INTEGER NOT NULL,
+        mood_before INTEGER,
+        sleep_quality INTEGER,
+        energy_level INTEGER,
+        mood_after INTEGER,
+        fulfillment_score INTEGER
+    )''',
+    '''CREATE TABLE core_values (
+        id INTEGER PRIMARY KEY AUTOINCREMENT,
+        value_name TEXT NOT NULL UNIQUE
+    )''',
+]
+
+COLUMNS = ["id", "date", "task", "task_type", "aligned_value", "dread_level", "location", "planned_time",
+           "actual_time", "did_it", "mood_before", "sleep_quality", "energy_level", "mood_after", "fulfillment_score"]
+
+# Every field the way the original app stored it, and how it must read back
+ROWS = [
+    (1, "2025-06-01", "Gym", "Health", "Health", 6, "Gym", "07:00", "07:15", 1, 5, 7, 6, 8, 9),
+    (2, "2025-06-02", "Write", "Work", "Growth", 3, "Home", "19:00 - 20:00", "Evening", 0, 4, 6, 5, None, None),
+    (3, "Monday", "Call mum", None, "Family", None, None, "Morning", "", 1, None, None, None, None, None),
+    (4, "2025-06-03T09:00", "Read", "Leisure", "Unlisted value", 2, "Cafe", "", None, 1, 7, 8, 7, 6, 7),
+]
+
+
+@pytest.fixture
+def baseline_db(tmp_path):
+    path = str(tmp_path / "praxable.db")
+    conn = sqlite3.connect(path)
+    for statement in BASELINE_SCHEMA:
+        conn.execute(statement)
+    conn.executemany("INSERT INTO core_values (value_name) VALUES (?)", [("Health",), ("Growth",), ("Family",)])
+    conn.executemany(f"INSERT INTO tasks VALUES ({', '.join('?' * len(COLUMNS))})", ROWS)
+    # A deleted task: its id must never be handed out again
+    conn.execute("INSERT INTO tasks (date, task, did_it) VALUES ('2025-06-04', 'Deleted', 0)")
+    conn.execute("DELETE FROM tasks WHERE task = 'Deleted'")
+    conn.commit()
+    conn.close()
+    return path
+
+
+def read_tasks(path):
+    conn = sqlite3.connect(path)
+    try:
+        return conn.execute(f"SELECT {', '.join(COLUMNS)} FROM tasks ORDER BY id").fetchall()
+    finally:
+        conn.close()
+
+
+def test_baseline_rows_round_trip(baseline_db):
+    assert migrations.migrate(baseline_db) == (0, migrations.latest_version())
+    assert read_tasks(baseline_db) == ROWS
+
+    conn = sqlite3.connect(baseline_db)
+    try:
+        # Stored normalized, not as text
+        assert conn.execute("SELECT day, planned_start, planned_end, date_text FROM task_entries WHERE id = 2").fetchone() \
+            == (20241, 1140, 1200, None)
+        assert conn.execute("SELECT day, date_text FROM task_entries WHERE id = 3").fetchone() == (None, "Monday")
+        # Values only tasks mention are kept, archived
+        assert conn.execute("SELECT value_name, archived FROM core_values ORDER BY id").fetchall() == [
+            ("Health", 0), ("Growth", 0), ("Family", 0), ("Unlisted value", 1)]
+        assert conn.execute("SELECT seq FROM sqlite_sequence WHERE name = 'task_entries'").fetchone() == (5,)
+    finally:
+        conn.close()
+
+    # Running it again finds nothing to do
+    assert migrations.migrate(baseline_db) == (migrations.latest_version(), migrations.latest_version())
+    assert read_tasks(baseline_db) == ROWS
+
+
+def test_legacy_writes_go_through_the_view(baseline_db):
+    migrations.migrate(baseline_db)
+    conn = sqlite3.connect(baseline_db)
+    try:
+        conn.execute(f"INSERT INTO tasks ({', '.join(COLUMNS[1:])}) VALUES ({', '.join('?' * (len(COLUMNS) - 1))})",
+                     ("2025-06-05", "Swim", "Health", "Health", 4, "Pool", "18:00", None, 0, 6, 7, 7, None, None))
+        conn.execute("UPDATE tasks SET did_it = 1, mood_after = 8, actual_time = '18:10' WHERE task = 'Swim'")
+        conn.execute("DELETE FROM tasks WHERE id = 3")
+        conn.execute("DELETE FROM core_values WHERE value_name = 'Growth'")
+        conn.commit()
+
+        assert conn.execute("SELECT id, date, planned_time, actual_time, did_it, mood_after FROM tasks WHERE task = 'Swim'") \
+            .fetchone() == (6, "2025-06-05", "18:00", "18:10", 1, 8)
+        assert [row[0] for row in conn.execute("SELECT id FROM tasks ORDER BY id")] == [1, 2, 4, 6]
+        # Deleting a value archives it, so task 2 keeps it
+        assert conn.execute("SELECT archived FROM core_values WHERE value_name = 'Growth'").fetchone() == (1,)
+        assert conn.execute("SELECT aligned_value FROM tasks WHERE id = 2").fetchone() == ("Growth",)
+        assert [row[0] for row in conn.execute("SELECT type FROM outbox ORDER BY seq")] == [
+            "task_created", "task_updated", "task_deleted", "value_deleted"]
+    finally:
+        conn.close()
@@ -0,0 +1,53 @@
+"""
+An API key set through one worker's /config/api-key reaches the other
+workers in multi mode.
+
+    python -m pytest backend/tests
+"""
+
+import threading
+
+import pytest
+
+from app import config, model_registry, shared_state
+
+
+class Registry(model_registry.ModelRegistry):
+    """Builds a stand-in for the Gemini model, so nothing talks to Google."""
+
+    def _build_model(self, api_key):
+        return ("model", api_key)
+
+
+@pytest.fixture
+def multi_mode(tmp_path, monkeypatch):
+    monkeypatch.setattr(config, "WORKER_MODE", "multi")
+    monkeypatch.setattr(config, "SHARED_STATE_PATH", str(tmp_path / "shared_state.db"))
+    monkeypatch.setattr(shared_state, "_local", threading.local())
+    monkeypatch.setattr(shared_state, "_instance", {})
+    env_path = tmp_path / ".env"
+    env_path.write_text("OTHER_SETTING=1\nGEMINI_API_KEY=AIza-old\n")
+    monkeypatch.setattr(model_registry, "ENV_PATH", str(env_path))
+    monkeypatch.setenv("GEMINI_API_KEY", "AIza-old")
+    return env_path
+
+
+def test_key_set_on_one_worker_reaches_the_others(multi_mode):
+    receiving, other = Registry(), Registry()
+    assert other.get_model() == ("model", "AIza-old")
+
+    # What POST /config/api-key does on the receiving worker
+    multi_mode.write_text("OTHER_SETTING=1\nGEMINI_API_KEY=AIza-new\n")
+    receiving.set_api_key("AIza-new")
+
+    assert receiving.api_key == "AIza-new"
+    assert other.api_key == "AIza-new"
+    assert other.get_model() == ("model", "AIza-new")
+
+
+def test_single_mode_never_reads_shared_state(monkeypatch):
+    monkeypatch.setattr(config, "WORKER_MODE", "single")
+    monkeypatch.setattr(shared_state, "get_counter", lambda name: pytest.fail("shared state read"))
+    registry = Registry()
+    registry.set_api_key("AIza-new")
+    assert registry.api_key == "AIza-new"
@@ -0,0 +1,77 @@
+"""
+Where plan_optimizer puts planned tasks: requested times, tasks that don't
+fit, ties, the time budget and the fulfillment scores.
+
+    python -m pytest backend/tests
+"""
+
+from app import config, plan_optimizer
+
+
+def slots(*ranges):
+    return [{"start": start, "end": end} for start, end in ranges]
+
+
+def placed(plan):
+    return {task["task_name"]: task["time_preference"] for task in plan}
+
+
+def test_requested_time_wins_over_untimed_tasks():
+    plan = plan_optimizer.place_plan([
+        {"task_name": "a", "start_time": "13:00", "duration_minutes": 60},
+        {"task_name": "b", "duration_minutes": 120},
+        {"task_name": "c", "duration_minutes": 120},
+        {"task_name": "d", "duration_minutes": "soon"},
+    ], slots(("08:00", "12:00"), ("13:00", "14:00")))
+    assert placed(plan) == {
+        "a": "13:00 - 14:00", "b": "08:00 - 10:00", "c": "10:00 - 12:00", "d": plan_optimizer.UNSCHEDULED,
+    }
+    # Unscheduled tasks come last
+    assert plan[-1]["task_name"] == "d"
+
+
+def test_requested_time_outside_free_slots_is_placed_like_any_task():
+    plan = plan_optimizer.place_plan([{"task_name": "gym", "start_time": "12:30", "duration_minutes": 45}],
+                                     slots(("08:00", "12:00")))
+    assert placed(plan) == {"gym": "08:00 - 08:45"}
+
+
+def test_default_duration():
+    plan = plan_optimizer.place_plan([{"task_name": "read"}], slots(("08:00", "12:00")))
+    assert placed(plan) == {"read": f"08:00 - 08:{config.PLAN_DEFAULT_DURATION_MINUTES:02d}"}
+
+
+def test_ties_go_to_the_earlier_start():
+    # The greedy seed would take the snug 18:30 gap; without a model every start is as good
+    plan = plan_optimizer.place_plan([{"task_name": "read", "duration_minutes": 30}],
+                                     slots(("08:00", "12:00"), ("18:30", "19:00")))
+    assert placed(plan) == {"read": "08:00 - 08:30"}
+
+
+def test_fulfillment_picks_the_hour():
+    def scorer(pairs):
+        return [9.0 if hour == 10 else 4.0 for _, hour in pairs]
+
+    placements, complete = plan_optimizer.optimize([{"duration": 30}], slots(("08:00", "12:00")), scorer=scorer)
+    assert complete
+    assert placements == [(600, 630)]
+
+
+def test_greedy_seed_is_scored_like_the_search():
+    # The greedy seed starts at 08:10, off the hourly grid; the model dislikes 08:xx
+    def scorer(pairs):
+        return [1.0 if hour == 8 else 9.0 for _, hour in pairs]
+
+    placements, complete = plan_optimizer.optimize([{"duration": 30}], slots(("08:10", "10:00")), scorer=scorer, step=60)
+    assert complete
+    assert placements[0][0] >= 540
+
+
+def test_spent_budget_still_returns_the_greedy_plan():
+    tasks = [{"duration": 25 + 5 * (i % 4)} for i in range(12)]
+    placements, complete = plan_optimizer.optimize(tasks, slots(("08:00", "12:00"), ("13:00", "17:00")), budget_ms=0)
+    assert not complete
+    assert all(placement is not None for placement in placements)
+    # No two tasks overlap
+    ordered = sorted(placements)
+    assert all(end <= next_start for (_, end), (next_start, _) in zip(ordered, ordered[1:]))
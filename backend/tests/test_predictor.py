@@ -0,0 +1,47 @@
+"""
+A retrain that finds too little data keeps the published model in use.
+
+    python -m pytest backend/tests
+"""
+
+import sqlite3
+
+from app import data_manager
+from app.predictor import FulfillmentPredictor
+
+RATED_TASK = {
+    "date": "2025-06-01", "task": "Gym", "task_type": "Health", "aligned_value": "Health",
+    "dread_level": 6, "location": "Gym", "planned_time": "07:00", "actual_time": "07:15",
+    "did_it": 1, "mood_before": 5, "sleep_quality": 7, "energy_level": 6, "mood_after": 8,
+}
+
+
+def test_too_little_data_keeps_the_published_model(database):
+    data_manager.log_tasks([{**RATED_TASK, "fulfillment_score": score} for score in (3, 5, 6, 8, 9, 7)])
+    predictor = FulfillmentPredictor()
+    assert predictor.train()
+    version = predictor.version
+
+    # e.g. a sync deleted most of the rated tasks
+    conn = sqlite3.connect(database)
+    conn.execute("DELETE FROM task_entries WHERE id > 2")
+    conn.commit()
+    conn.close()
+
+    assert not predictor.train()
+    assert predictor.is_trained
+    assert predictor.load_current() and predictor.version == version
+    assert predictor.predict("Health", "Health", 6, 5, planned_hour=7) is not None
+
+
+def test_retrain_endpoint_points_to_the_job(client, monkeypatch):
+    from app import jobs
+
+    # No scheduler here: trains in the request and says how it went
+    assert client.post("/predict/retrain").json() == {"message": "Not enough rated tasks to train", "job": None}
+
+    monkeypatch.setattr(jobs.runner, "trigger", lambda name: True)
+    answer = client.post("/predict/retrain")
+    assert answer.status_code == 202
+    assert answer.json()["job"] == "retrain_model"
+    assert "is_trained" not in answer.json()
@@ -0,0 +1,123 @@
+"""
+Delta sync (GET/POST /sync): idempotent retries, offline-created tasks
+referenced by key, conflicts against base_revision and paging.
+
+    python -m pytest backend/tests
+"""
+
+NEW_TASK = {
+    "date": "2025-06-01", "task": "Gym", "task_type": "Health", "aligned_value": "Health",
+    "dread_level": 6, "location": "Gym", "planned_time": "07:00", "actual_time": "07:15",
+    "did_it": 1, "mood_before": 5, "sleep_quality": 7, "energy_level": 6,
+}
+
+
+def push(client, *mutations):
+    response = client.post("/sync", json={"mutations": list(mutations)})
+    assert response.status_code == 200
+    return response.json()["results"]
+
+
+def revision_of(client, task_id):
+    changes = client.get("/sync").json()
+    [task] = [task for task in changes["tasks"] if task["id"] == task_id]
+    return changes["revision"]
+
+
+def test_retried_batch_is_not_applied_twice(client):
+    batch = [
+        {"key": "create-1", "op": "create_task", "data": NEW_TASK},
+        {"key": "value-1", "op": "add_value", "data": {"value_name": "Health"}},
+    ]
+    first = push(client, *batch)
+    assert [result["status"] for result in first] == ["applied", "applied"]
+
+    again = push(client, *batch)
+    assert again == [{**result, "duplicate": True} for result in first]
+    assert len(client.get("/tasks").json()) == 1
+    assert client.get("/values").json() == [{"value_name": "Health"}]
+
+
+def test_offline_created_task_is_found_by_its_key(client):
+    create, feedback = push(
+        client,
+        {"key": "create-1", "op": "create_task", "data": NEW_TASK},
+        {"key": "feedback-1", "op": "task_feedback", "task_key": "create-1",
+         "data": {"mood_after": 8, "fulfillment_score": 9}},
+    )
+    assert create["status"] == feedback["status"] == "applied"
+    assert feedback["task_id"] == create["task_id"]
+    # A later batch can still point at it by key
+    [update] = push(client, {"key": "update-1", "op": "update_task", "task_key": "create-1",
+                             "data": {"aligned_value": "Growth"}})
+    assert update["status"] == "applied"
+    [task] = client.get("/tasks").json()
+    assert (task["mood_after"], task["fulfillment_score"], task["aligned_value"]) == (8, 9, "Growth")
+
+
+def test_bad_mutation_fails_alone(client):
+    bad_key, bad_payload, good = push(
+        client,
+        {"key": "feedback-1", "op": "task_feedback", "task_key": "never-sent",
+         "data": {"mood_after": 8, "fulfillment_score": 9}},
+        {"key": "create-1", "op": "create_task", "data": {"task": "No date"}},
+        {"key": "create-2", "op": "create_task", "data": NEW_TASK},
+    )
+    assert bad_key["status"] == bad_payload["status"] == "error"
+    assert good["status"] == "applied"
+    assert len(client.get("/tasks").json()) == 1
+    # Errors aren't remembered: a fixed retry with the same key is applied
+    [retried] = push(client, {"key": "create-1", "op": "create_task", "data": NEW_TASK})
+    assert retried["status"] == "applied" and "duplicate" not in retried
+
+
+def test_server_edit_after_base_revision_is_a_conflict(client):
+    task_id = client.post("/tasks", json=NEW_TASK).json()["id"]
+    seen = revision_of(client, task_id)
+    assert client.patch(f"/tasks/{task_id}", json={"fulfillment_score": 4}).status_code == 200
+
+    [conflict] = push(client, {"key": "update-1", "op": "update_task", "task_id": task_id,
+                               "base_revision": seen, "data": {"fulfillment_score": 9}})
+    assert conflict["status"] == "conflict"
+    assert conflict["revision"] > seen and not conflict["deleted"]
+    assert client.get("/tasks").json()[0]["fulfillment_score"] == 4
+
+    # Against the revision that has the server's edit, it goes through
+    [applied] = push(client, {"key": "update-2", "op": "update_task", "task_id": task_id,
+                              "base_revision": conflict["revision"], "data": {"fulfillment_score": 9}})
+    assert applied["status"] == "applied" and applied["revision"] > conflict["revision"]
+    assert client.get("/tasks").json()[0]["fulfillment_score"] == 9
+
+
+def test_deleted_task_conflicts_except_for_another_delete(client):
+    task_id = client.post("/tasks", json=NEW_TASK).json()["id"]
+    [deleted] = push(client, {"key": "delete-1", "op": "delete_task", "task_id": task_id})
+    assert deleted["status"] == "applied"
+
+    update, delete_again = push(
+        client,
+        {"key": "update-1", "op": "update_task", "task_id": task_id, "data": {"fulfillment_score": 9}},
+        {"key": "delete-2", "op": "delete_task", "task_id": task_id},
+    )
+    assert update["status"] == "conflict" and update["deleted"]
+    assert delete_again["status"] == "applied"
+    assert client.get("/sync").json()["deleted_tasks"] == [task_id]
+
+
+def test_changes_are_paged(client):
+    client.post("/tasks/bulk", json=[{**NEW_TASK, "task": f"Task {i}"} for i in range(5)])
+    client.post("/values", json={"value_name": "Health"})
+
+    seen, since, pages = [], 0, 0
+    while True:
+        page = client.get("/sync", params={"since": since, "limit": 2}).json()
+        seen += [task["task"] for task in page["tasks"]] + page["values"]
+        since, pages = page["revision"], pages + 1
+        if not page["has_more"]:
+            break
+    assert seen == [f"Task {i}" for i in range(5)] + ["Health"]
+    assert pages == 3
+
+    # Up to date: nothing more; a cursor from another database starts over
+    assert client.get("/sync", params={"since": since}).json()["tasks"] == []
+    assert client.get("/sync", params={"since": since + 1}).status_code == 410
@@ -0,0 +1,43 @@
+"""
+Task endpoints answer with tasks as stored, the same way every read shows them.
+
+    python -m pytest backend/tests
+"""
+
+NEW_TASK = {
+    "date": "2025-06-01", "task": "Gym", "task_type": "Health", "aligned_value": "Health",
+    "dread_level": 6, "location": "Gym", "planned_time": "7pm", "actual_time": "7:15pm",
+    "did_it": 1, "mood_before": 5, "sleep_quality": 7, "energy_level": 6,
+}
+
+
+def test_create_task_returns_the_stored_task(client):
+    created = client.post("/tasks", json=NEW_TASK)
+    assert created.status_code == 201
+    task = created.json()
+    assert task["planned_time"] == "19:00"
+    assert task["actual_time"] == "19:15"
+    assert task["mood_after"] is None
+    assert client.get("/tasks").json() == [task]
+    assert client.get("/sync").json()["tasks"] == [task]
+
+
+def test_create_task_keeps_text_dates_and_times(client):
+    task = client.post("/tasks", json={**NEW_TASK, "date": "Monday", "planned_time": "Morning"}).json()
+    assert (task["date"], task["planned_time"]) == ("Monday", "Morning")
+
+
+def test_bulk_create(client):
+    created = client.post("/tasks/bulk", json=[{**NEW_TASK, "task": f"Task {i}"} for i in range(3)])
+    assert created.status_code == 201
+    assert created.json() == {"created": 3}
+    assert [task["task"] for task in client.get("/tasks").json()] == ["Task 2", "Task 1", "Task 0"]
+    assert client.post("/tasks/bulk", json=[]).json() == {"created": 0}
+
+
+def test_alignment_falls_back_to_the_database(client):
+    # No event bus subscriber runs here, so the endpoint groups the tasks itself
+    client.post("/tasks/bulk", json=[NEW_TASK, {**NEW_TASK, "aligned_value": "Growth"}])
+    stats = client.get("/analytics/alignment").json()
+    assert stats["total_tasks"] == 2
+    assert sorted(row["value_name"] for row in stats["breakdown"]) == ["Growth", "Health"]
@@ -0,0 +1,114 @@
+"""
+Shared helpers for the benchmark scripts.
+
+Every script in this folder is run from the repository root, e.g.:
+    python benchmarks/bench_planner_overhead.py
+"""
+
+import math
+import os
+import statistics
+import sys
+import time
+
+REPO_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+BACKEND_DIR = os.path.join(REPO_ROOT, "backend")
+
+# Make the backend's 'app' package importable, the same way uvicorn sees it
+if BACKEND_DIR not in sys.path:
+    sys.path.insert(0, BACKEND_DIR)
+
+
+def time_calls(fn, repeat=1000, warmup=10):
+    """Calls fn() repeatedly and returns per-call timings in microseconds."""
+    for _ in range(warmup):
+        fn()
+    timings = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        fn()
+        timings.append((time.perf_counter() - start) * 1e6)
+    return timings
+
+
+def summarize(timings):
+    """Returns p50/p95/mean for a list of timings."""
+    ordered = sorted(timings)
+    return {
+        "p50": round(statistics.median(ordered), 2),
+        "p95": round(ordered[max(0, math.ceil(len(ordered) * 0.95) - 1)], 2),
+        "mean": round(statistics.fmean(ordered), 2),
+    }
+
+
+def print_table(title, rows, unit="us"):
+    """Prints {name: summary} rows as a small aligned table."""
+    print(f"\n{title}")
+    print(f"{'case':<40} {'p50':>12} {'p95':>12} {'mean':>12}")
+    for name, stats in rows.items():
+        print(f"{name:<40} {stats['p50']:>10.2f}{unit} {stats['p95']:>10.2f}{unit} {stats['mean']:>10.2f}{unit}")
+
+
+def pin_clock(hhmm="08:00"):
+    """
+    Makes the scheduler believe it is `hhmm` today, so free-slot work (which
+    only looks at the rest of the day) doesn't depend on when the benchmark runs.
+    """
+    import datetime
+    from app import scheduler
+
+    hour, minute = (int(part) for part in hhmm.split(":"))
+    real_datetime = datetime.datetime
+
+    class PinnedDatetime(real_datetime):
+        @classmethod
+        def now(cls, tz=None):
+            return real_datetime.now(tz).replace(hour=hour, minute=minute, second=0, microsecond=0)
+
+    scheduler.datetime = PinnedDatetime
+
+
+def free_port():
+    """Asks the OS for an unused TCP port."""
+    import socket
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        return sock.getsockname()[1]
+
+
+def start_server(workdir, port=None, llm_latency=0.0, calendar_events=None, clock=None, timeout=60,
+                 env=None, poll_interval=0.2):
+    """
+    Starts the stubbed API (see _serve.py) in a subprocess with `workdir` as
+    its working directory, waits until it answers, and returns (process, base_url).
+    `env` adds environment variables for the server. Call process.terminate() when done.
+    """
+    import subprocess
+    import urllib.request
+
+    port = port or free_port()
+    command = [sys.executable, os.path.join(os.path.dirname(__file__), "_serve.py"),
+               "--port", str(port), "--llm-latency", str(llm_latency)]
+    if calendar_events is not None:
+        command += ["--calendar-events", str(calendar_events)]
+    if clock:
+        command += ["--clock", clock]
+    process = subprocess.Popen(
+        command,
+        cwd=workdir,
+        env={**os.environ, **(env or {})},
+        stdout=subprocess.DEVNULL,
+        stderr=subprocess.DEVNULL,
+    )
+    base_url = f"http://127.0.0.1:{port}"
+    deadline = time.time() + timeout
+    while time.time() < deadline:
+        try:
+            urllib.request.urlopen(f"{base_url}/values", timeout=1)
+            return process, base_url
+        except OSError:
+            if process.poll() is not None:
+                raise RuntimeError("API server exited during startup")
+            time.sleep(poll_interval)
+    process.terminate()
+    raise RuntimeError("API server did not start in time")
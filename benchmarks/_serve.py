@@ -0,0 +1,71 @@
+"""
+Runs the Praxable API under uvicorn with its external services stubbed out:
+Google Calendar returns a fixed set of events and Gemini is a FakeModel.
+The database lives in the current working directory (data/praxable.db).
+
+Used by the HTTP benchmarks through _common.start_server(); can also be run by hand:
+    cd /tmp/bench && python /path/to/benchmarks/_serve.py --port 8765
+"""
+
+import argparse
+import datetime
+import json
+
+import _common  # noqa: F401  (sets up sys.path)
+
+import uvicorn
+
+from app import calendar_service, llm_client, main
+from app.model_registry import registry
+
+# Serves both prompts: the streaming planner's (time_preference) and /planner/generate's
+# task intents (duration_minutes, start_time)
+FAKE_REPLY = json.dumps({"tasks": [
+    {"task_name": "Deep work block", "task_type": "Deep Work", "aligned_value": "Career",
+     "time_preference": "09:00 - 11:00", "duration_minutes": 120, "start_time": None},
+    {"task_name": "Gym", "task_type": "Exercise", "aligned_value": "Health",
+     "time_preference": "18:00 - 19:00", "duration_minutes": 60, "start_time": "18:00"},
+]})
+
+
+def fake_events():
+    """A few meetings spread over today, in the same shape calendar_service returns."""
+    today = datetime.datetime.now().astimezone().replace(minute=0, second=0, microsecond=0)
+    events = []
+    for hour, length in [(9, 30), (11, 60), (14, 45), (16, 30)]:
+        start = today.replace(hour=hour)
+        events.append({
+            "summary": "Meeting",
+            "start": start.isoformat(),
+            "end": (start + datetime.timedelta(minutes=length)).isoformat(),
+        })
+    return events
+
+
+def install_stubs(llm_latency=0.0, calendar_events=None):
+    """calendar_events: number of synthetic events for today (default: the four above)."""
+    if calendar_events is None:
+        events = fake_events
+    else:
+        import synthetic
+        generated = synthetic.generate_calendar(calendar_events)
+        events = lambda: list(generated)
+    # Stub the Google calls themselves so the calendar cache still runs
+    calendar_service._fetch_todays_events = events
+    calendar_service._fetch_todays_busy = lambda: [{"start": e["start"], "end": e["end"]} for e in events()]
+    registry._model = llm_client.FakeModel(reply=FAKE_REPLY, latency=llm_latency)
+    registry._api_key = registry._api_key or "AIza-benchmark"
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--port", type=int, default=8765)
+    parser.add_argument("--llm-latency", type=float, default=0.0)
+    parser.add_argument("--calendar-events", type=int, default=None)
+    parser.add_argument("--clock", default=None, help="Pin the scheduler's clock to HH:MM today")
+    args = parser.parse_args()
+
+    install_stubs(args.llm_latency, args.calendar_events)
+    if args.clock:
+        _common.pin_clock(args.clock)
+    uvicorn.run(main.app, host="127.0.0.1", port=args.port, log_level="warning")
@@ -0,0 +1,78 @@
+"""
+Benchmark: free slots for many users at once (batch_scheduler) vs calling
+scheduler.get_free_slots() once per user.
+
+Every user gets a synthetic calendar (synthetic.generate_calendar, events may
+overlap). The loop stubs calendar_service.get_todays_busy with each user's
+events and pins the scheduler's clock to the batch window's start, so both
+sides answer the same question; the script checks that they find the same
+slots for every user before timing anything.
+
+Batch timings are split into parsing the ISO strings (busy_minutes), the
+NumPy part (occupancy matrix and free runs) and building the slot dicts.
+
+    python benchmarks/bench_batch_scheduler.py
+    python benchmarks/bench_batch_scheduler.py --users 1000 10000 100000 --events 30
+"""
+
+import argparse
+import time
+
+from _common import pin_clock
+
+import synthetic
+
+from app import batch_scheduler, calendar_service, config, scheduler
+
+
+def loop_free_slots(calendars):
+    original = calendar_service.get_todays_busy
+    results = []
+    try:
+        for events in calendars:
+            calendar_service.get_todays_busy = lambda events=events: events
+            results.append(scheduler.get_free_slots())
+    finally:
+        calendar_service.get_todays_busy = original
+    return results
+
+
+def best_of(fn, repeat):
+    """Fastest of `repeat` runs, in seconds, and the last result."""
+    best = float("inf")
+    for _ in range(repeat):
+        start = time.perf_counter()
+        result = fn()
+        best = min(best, time.perf_counter() - start)
+    return best, result
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Compare batch free-slot search with the per-user loop.")
+    parser.add_argument("--users", type=int, nargs="+", default=[1000, 10000])
+    parser.add_argument("--events", type=int, default=20, help="Events per user")
+    parser.add_argument("--repeat", type=int, default=3)
+    args = parser.parse_args()
+
+    pin_clock(config.BATCH_DAY_START)
+    print(f"\nFree slots {config.BATCH_DAY_START}-{config.BATCH_DAY_END}, {args.events} events per user, best of {args.repeat}")
+    print(f"{'users':>8} {'loop':>10} {'batch':>10} {'speedup':>8} {'parse':>9} {'numpy':>9} {'dicts':>9} {'users/s':>11}")
+    for n_users in args.users:
+        calendars = [synthetic.generate_calendar(args.events, seed=i) for i in range(n_users)]
+
+        loop_seconds, expected = best_of(lambda: loop_free_slots(calendars), args.repeat)
+        batch_seconds, actual = best_of(lambda: batch_scheduler.free_slots(calendars), args.repeat)
+        if actual != expected:
+            bad = next(i for i, (a, b) in enumerate(zip(actual, expected)) if a != b)
+            raise SystemExit(f"Slots differ for user {bad}: {actual[bad]} != {expected[bad]}")
+
+        parse_seconds, (users, starts, ends) = best_of(lambda: batch_scheduler.busy_minutes(calendars), args.repeat)
+        numpy_seconds, _ = best_of(lambda: batch_scheduler.free_runs_for(users, starts, ends, n_users), args.repeat)
+        dict_seconds = max(batch_seconds - parse_seconds - numpy_seconds, 0.0)
+        print(f"{n_users:>8,} {loop_seconds * 1000:>8.0f}ms {batch_seconds * 1000:>8.0f}ms"
+              f" {loop_seconds / batch_seconds:>7.1f}x {parse_seconds * 1000:>7.0f}ms {numpy_seconds * 1000:>7.1f}ms"
+              f" {dict_seconds * 1000:>7.0f}ms {n_users / batch_seconds:>11,.0f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,105 @@
+"""
+Benchmark: busy intervals from FreeBusy vs full events from events().list.
+
+Runs both of calendar_service's Google calls against the local fake Calendar
+API (fake_google_calendar.py, through the real googleapiclient) and compares
+bytes on the wire and latency per refresh, for one and for several calendars
+(events().list needs one call per calendar, FreeBusy one call for all of them).
+It also checks that scheduler.get_free_slots finds the same slots either way.
+
+    python benchmarks/bench_calendar_freebusy.py
+    python benchmarks/bench_calendar_freebusy.py --events 5 50 200 --calendars 3 --rtt 0.05
+"""
+
+import argparse
+
+from _common import print_table, summarize, time_calls
+
+import fake_google_calendar
+import synthetic
+
+from app import calendar_service, config, scheduler
+
+
+def calendar_ids(n):
+    return ["primary"] + [f"team{i}@group.calendar.google.com" for i in range(1, n)]
+
+
+def list_all(ids):
+    """What the events path costs for `ids`: one events().list per calendar."""
+    calendar_service._fetch_todays_events()     # primary, exactly as the backend fetches it
+    service = calendar_service.get_calendar_service()
+    time_min, time_max = calendar_service._local_day_bounds()
+    for calendar_id in ids[1:]:
+        service.events().list(calendarId=calendar_id, timeMin=time_min, timeMax=time_max,
+                              singleEvents=True, orderBy="startTime").execute()
+
+
+def same_slots():
+    """scheduler.get_free_slots from full events vs from FreeBusy (primary calendar only)."""
+    original = calendar_service.get_todays_busy
+    try:
+        calendar_service.get_todays_busy = calendar_service._fetch_todays_events
+        from_events = scheduler.get_free_slots()
+        calendar_service.get_todays_busy = calendar_service._fetch_todays_busy
+        from_busy = scheduler.get_free_slots()
+    finally:
+        calendar_service.get_todays_busy = original
+    return from_events == from_busy, from_events
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Compare FreeBusy with events().list.")
+    parser.add_argument("--events", type=int, nargs="+", default=[5, 20, 100], help="Events per calendar")
+    parser.add_argument("--calendars", type=int, default=3)
+    parser.add_argument("--rtt", type=float, default=0.0, help="Seconds of simulated network latency per call")
+    parser.add_argument("--repeat", type=int, default=30)
+    args = parser.parse_args()
+
+    original_service, original_calendars = calendar_service.get_calendar_service, config.CALENDAR_BUSY_CALENDARS
+    print(f"\nBytes per refresh: gzipped as sent (uncompressed); rtt {args.rtt * 1000:.0f}ms per call")
+    print(f"{'case':<32} {'events.list':>22} {'freebusy':>16} {'ratio':>8}")
+    latency_rows = {}
+    try:
+        for n_events in args.events:
+            for n_calendars in sorted({1, args.calendars}):
+                ids = calendar_ids(n_calendars)
+                server, base_url = fake_google_calendar.start(
+                    {cid: synthetic.generate_calendar(n_events, seed=i) for i, cid in enumerate(ids)},
+                    latency=args.rtt,
+                )
+                service = fake_google_calendar.service(base_url)
+                calendar_service.get_calendar_service = lambda: service
+                config.CALENDAR_BUSY_CALENDARS = ids
+                try:
+                    if n_calendars == 1:
+                        ok, _ = same_slots()
+                        if not ok:
+                            raise SystemExit(f"Free slots differ with {n_events} events")
+                    fake = server.fake
+                    fake.reset_counters()
+                    list_all(ids)
+                    busy = calendar_service._fetch_todays_busy()
+                    list_bytes, busy_bytes = fake.bytes_sent["events.list"], fake.bytes_sent["freebusy.query"]
+                    list_raw, busy_raw = fake.raw_bytes["events.list"], fake.raw_bytes["freebusy.query"]
+                    name = f"{n_events} events x {n_calendars} calendar(s)"
+                    print(f"{name:<32} {list_bytes:>8,}B ({list_raw:>9,}B) {busy_bytes:>5,}B ({busy_raw:>6,}B)"
+                          f" {list_bytes / busy_bytes:>7.1f}x")
+                    assert busy is not None
+                    latency_rows[f"events.list  {name}"] = summarize(
+                        time_calls(lambda: list_all(ids), repeat=args.repeat, warmup=2))
+                    latency_rows[f"freebusy     {name}"] = summarize(
+                        time_calls(calendar_service._fetch_todays_busy, repeat=args.repeat, warmup=2))
+                finally:
+                    server.shutdown()
+                    server.server_close()
+    finally:
+        calendar_service.get_calendar_service = original_service
+        config.CALENDAR_BUSY_CALENDARS = original_calendars
+    print_table("Latency per refresh (fetch + parse)", {
+        name: {key: value / 1000 for key, value in stats.items()} for name, stats in latency_rows.items()
+    }, unit="ms")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,125 @@
+"""
+Benchmark: API time spent per Streamlit page render, before and after the
+pooled session / parallel calls / read cache in src/api_client.py.
+
+A stub API server (no database, fixed latency per request) stands in for the
+backend so the numbers only reflect client-side behaviour.
+
+    python benchmarks/bench_client_render.py [--latency-ms 25] [--renders 20]
+
+"before"      plain requests.get per call, new connection each time, sequential
+"after/cold"  shared keep-alive session, independent calls in parallel, empty cache
+"after/warm"  same, rerun within READ_CACHE_TTL (what most widget changes trigger)
+"""
+
+import argparse
+import json
+import logging
+import sys
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import _common
+from _common import summarize
+
+sys.path.insert(0, _common.REPO_ROOT)
+# Streamlit warns loudly when used outside `streamlit run`; that's expected here
+logging.getLogger("streamlit").setLevel(logging.ERROR)
+
+import requests
+
+from src import api_client
+
+PAYLOADS = {
+    "/values": [{"value_name": v} for v in ["Health", "Growth", "Connection"]],
+    "/tasks": [{"id": i, "task": f"Task {i}", "did_it": i % 2, "aligned_value": "Health"} for i in range(200)],
+    "/analytics/alignment": {"total_tasks": 200, "breakdown": [{"value_name": "Health", "task_count": 200, "avg_fulfillment": 6.5}]},
+    "/calendar/today": [{"summary": "Standup", "start": "2025-01-01T09:00:00", "end": "2025-01-01T09:15:00"}],
+    "/scheduler/free": [{"start": "09:15", "end": "22:00", "duration_minutes": 765}],
+}
+
+
+def make_handler(latency):
+    class StubHandler(BaseHTTPRequestHandler):
+        protocol_version = "HTTP/1.1"  # allow keep-alive
+        # Headers and body are written separately; without TCP_NODELAY a reused
+        # connection hits the Nagle/delayed-ACK stall (~40 ms) on every response
+        disable_nagle_algorithm = True
+
+        def do_GET(self):
+            time.sleep(latency)
+            body = json.dumps(PAYLOADS[self.path]).encode()
+            self.send_response(200)
+            self.send_header("Content-Type", "application/json")
+            self.send_header("Content-Length", str(len(body)))
+            self.end_headers()
+            self.wfile.write(body)
+
+        def log_message(self, *args):
+            pass
+
+    return StubHandler
+
+
+PAGES = {
+    "Log & Review": ["/values", "/tasks"],
+    "Dashboard": ["/analytics/alignment"],
+}
+
+CLIENT_CALLS = {
+    "Log & Review": [api_client.get_values, api_client.get_all_tasks],
+    "Dashboard": [api_client.get_alignment_analytics],
+}
+
+
+def render_before(base_url, page):
+    for path in PAGES[page]:
+        response = requests.get(f"{base_url}{path}")
+        response.raise_for_status()
+        response.json()
+
+
+def render_after(page, cold):
+    if cold:
+        api_client._cached_get.clear()
+    api_client.run_parallel(*CLIENT_CALLS[page])
+
+
+def measure(fn, renders):
+    timings = []
+    for _ in range(renders):
+        start = time.perf_counter()
+        fn()
+        timings.append((time.perf_counter() - start) * 1000)
+    return summarize(timings)
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--latency-ms", type=float, default=25)
+    parser.add_argument("--renders", type=int, default=20)
+    args = parser.parse_args()
+
+    server = ThreadingHTTPServer(("127.0.0.1", 0), make_handler(args.latency_ms / 1000))
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    base_url = f"http://127.0.0.1:{server.server_port}"
+    api_client.BASE_URL = base_url
+
+    print(f"Stub API latency: {args.latency_ms} ms per request")
+    print(f"{'page':<14} {'case':<12} {'p50 (ms)':>10} {'p95 (ms)':>10}")
+    for page in PAGES:
+        cases = {
+            "before": lambda: render_before(base_url, page),
+            "after/cold": lambda: render_after(page, cold=True),
+            "after/warm": lambda: render_after(page, cold=False),
+        }
+        for name, fn in cases.items():
+            stats = measure(fn, args.renders)
+            print(f"{page:<14} {name:<12} {stats['p50']:>10.1f} {stats['p95']:>10.1f}")
+
+    server.shutdown()
+
+
+if __name__ == "__main__":
+    main()
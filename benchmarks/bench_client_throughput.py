@@ -0,0 +1,86 @@
+"""
+Benchmark: request throughput of the async client against a local uvicorn server.
+
+Compares a plain sequential requests.Session loop with AsyncPraxableClient at
+a few concurrency levels, for a read endpoint (GET /values), a write endpoint
+(POST /tasks) and bulk inserts (POST /tasks/bulk).
+
+    python benchmarks/bench_client_throughput.py [--requests 2000]
+"""
+
+import argparse
+import asyncio
+import sys
+import tempfile
+import time
+
+import _common
+from _common import start_server
+
+sys.path.insert(0, _common.REPO_ROOT)
+
+import requests
+
+from praxable_client import AsyncPraxableClient
+
+TASK = {
+    "date": "2025-01-01", "task": "Benchmark task", "task_type": "Deep Work",
+    "aligned_value": "Career", "dread_level": 3, "location": "Home",
+    "planned_time": "09:00", "actual_time": "00:00", "did_it": 0,
+    "mood_before": 5, "sleep_quality": 7, "energy_level": 6,
+}
+
+
+def sequential(base_url, n, method, path, payload=None):
+    with requests.Session() as session:
+        start = time.perf_counter()
+        for _ in range(n):
+            session.request(method, f"{base_url}{path}", json=payload).raise_for_status()
+        return n / (time.perf_counter() - start)
+
+
+async def concurrent(base_url, n, concurrency, call):
+    async with AsyncPraxableClient(base_url, concurrency=concurrency, max_connections=concurrency) as client:
+        start = time.perf_counter()
+        await asyncio.gather(*(call(client) for _ in range(n)))
+        return n / (time.perf_counter() - start)
+
+
+async def bulk(base_url, n):
+    async with AsyncPraxableClient(base_url) as client:
+        start = time.perf_counter()
+        created = await client.create_tasks([TASK] * n)
+        assert created == n
+        return n / (time.perf_counter() - start)
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--requests", type=int, default=2000)
+    parser.add_argument("--concurrency", type=int, nargs="+", default=[1, 8, 32])
+    args = parser.parse_args()
+    n = args.requests
+
+    with tempfile.TemporaryDirectory() as workdir:
+        process, base_url = start_server(workdir)
+        try:
+            print(f"{'case':<36} {'req/s':>10}")
+            print(f"{'GET /values  requests (sequential)':<36} {sequential(base_url, n, 'GET', '/values'):>10.0f}")
+            for c in args.concurrency:
+                rate = asyncio.run(concurrent(base_url, n, c, lambda client: client.get_values()))
+                print(f"{f'GET /values  async (concurrency={c})':<36} {rate:>10.0f}")
+
+            print(f"{'POST /tasks  requests (sequential)':<36} {sequential(base_url, n, 'POST', '/tasks', TASK):>10.0f}")
+            for c in args.concurrency:
+                rate = asyncio.run(concurrent(base_url, n, c, lambda client: client.create_task(TASK)))
+                print(f"{f'POST /tasks  async (concurrency={c})':<36} {rate:>10.0f}")
+
+            rate = asyncio.run(bulk(base_url, n * 10))
+            print(f"{'POST /tasks/bulk  (tasks/s)':<36} {rate:>10.0f}")
+        finally:
+            process.terminate()
+            process.wait()
+
+
+if __name__ == "__main__":
+    main()
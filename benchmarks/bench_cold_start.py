@@ -0,0 +1,168 @@
+"""
+Benchmark: API cold start.
+
+Every number comes from a fresh Python process, the way a scale-to-zero
+deployment or a recycled worker sees it:
+
+  - import:  `import app.main` in a new interpreter, plus a check that none of
+             the heavy libraries (pandas, numpy, sklearn, Gemini and Google
+             client libraries) got pulled in at import time
+  - startup: process start -> first answered request, under uvicorn with the
+             external services stubbed (see _serve.py), and process start ->
+             first real fulfillment prediction. Three cases:
+               first boot      no saved model; it is trained in the background
+               restart         the model saved by the first boot is loaded
+               eager training  no saved model, startup waits for training
+                               (what every start used to cost)
+
+For CI, pass budgets; the script exits with status 1 if a budget is exceeded
+or a heavy library is imported by app.main:
+
+    python benchmarks/bench_cold_start.py
+    python benchmarks/bench_cold_start.py --max-import-ms 1500 --max-startup-ms 4000 --output cold_start.json
+"""
+
+import argparse
+import json
+import os
+import shutil
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+import urllib.request
+
+import _common
+from _common import start_server
+
+import synthetic
+
+# Libraries that must only load when a request needs them
+HEAVY_MODULES = [
+    "pandas", "numpy", "sklearn", "scipy",
+    "google.generativeai", "googleapiclient", "google.oauth2", "google.auth",
+]
+
+IMPORT_SNIPPET = """
+import json, sys, time
+start = time.perf_counter()
+import app.main
+elapsed = (time.perf_counter() - start) * 1000
+print(json.dumps({"ms": elapsed, "heavy": [m for m in %r if m in sys.modules]}))
+""" % (HEAVY_MODULES,)
+
+PREDICTION = {"task_type": "Exercise", "aligned_value": "Health", "energy_level": 6, "mood_before": 5}
+
+
+def measure_import(runs):
+    timings, heavy = [], set()
+    for _ in range(runs):
+        output = subprocess.run(
+            [sys.executable, "-c", IMPORT_SNIPPET],
+            cwd=_common.BACKEND_DIR, capture_output=True, text=True, check=True,
+        ).stdout
+        result = json.loads(output.strip().splitlines()[-1])
+        timings.append(result["ms"])
+        heavy.update(result["heavy"])
+    return {"p50_ms": round(statistics.median(timings), 1), "runs": len(timings), "heavy_imported": sorted(heavy)}
+
+
+def _wait_for_prediction(base_url, started, timeout):
+    request = urllib.request.Request(
+        f"{base_url}/predict/fulfillment", data=json.dumps(PREDICTION).encode(),
+        headers={"Content-Type": "application/json"}, method="POST",
+    )
+    deadline = time.perf_counter() + timeout
+    while time.perf_counter() < deadline:
+        with urllib.request.urlopen(request, timeout=timeout) as response:
+            if json.loads(response.read())["predicted_fulfillment"] is not None:
+                return (time.perf_counter() - started) * 1000
+        time.sleep(0.02)
+    return None
+
+
+def boot(workdir, warmup_mode, timeout):
+    """Starts the API once; returns ms until it answers and ms until it predicts."""
+    started = time.perf_counter()
+    process, base_url = start_server(
+        workdir, env={"PRAXABLE_MODEL_WARMUP": warmup_mode}, poll_interval=0.01, timeout=timeout,
+    )
+    try:
+        ready_ms = (time.perf_counter() - started) * 1000
+        predict_ms = _wait_for_prediction(base_url, started, timeout)
+    finally:
+        process.terminate()
+        process.wait()
+    return ready_ms, predict_ms
+
+
+def measure_startup(n_tasks, runs, timeout):
+    workdir = tempfile.mkdtemp(prefix="praxable-cold-")
+    models = os.path.join(workdir, "data", "models")
+    cases = {"first boot": [], "restart": [], "eager training": []}
+    try:
+        synthetic.fill_database(os.path.join(workdir, "data", "praxable.db"), n_tasks)
+        for _ in range(runs):
+            shutil.rmtree(models, ignore_errors=True)
+            cases["first boot"].append(boot(workdir, "background", timeout))
+            cases["restart"].append(boot(workdir, "background", timeout))
+            shutil.rmtree(models)
+            cases["eager training"].append(boot(workdir, "eager", timeout))
+    finally:
+        shutil.rmtree(workdir, ignore_errors=True)
+
+    results = {}
+    for name, samples in cases.items():
+        predict = [p for _, p in samples if p is not None]
+        results[name] = {
+            "ready_p50_ms": round(statistics.median(r for r, _ in samples), 1),
+            "first_prediction_p50_ms": round(statistics.median(predict), 1) if predict else None,
+        }
+    return results
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Measure API import and startup time.")
+    parser.add_argument("--runs", type=int, default=3)
+    parser.add_argument("--tasks", type=int, default=5000, help="Synthetic tasks in the database")
+    parser.add_argument("--timeout", type=float, default=120)
+    parser.add_argument("--skip-startup", action="store_true", help="Only measure the import")
+    parser.add_argument("--max-import-ms", type=float, default=None)
+    parser.add_argument("--max-startup-ms", type=float, default=None, help="Budget for 'restart' until ready")
+    parser.add_argument("--output", default=None, help="Also write the results as JSON")
+    args = parser.parse_args()
+
+    results = {"import": measure_import(args.runs)}
+    print(f"\nimport app.main: {results['import']['p50_ms']:.0f} ms (p50 of {args.runs})")
+    print(f"heavy modules imported: {', '.join(results['import']['heavy_imported']) or 'none'}")
+
+    if not args.skip_startup:
+        results["startup"] = measure_startup(args.tasks, args.runs, args.timeout)
+        print(f"\nStartup with {args.tasks} tasks (p50 of {args.runs})")
+        print(f"{'case':<20} {'ready':>12} {'first prediction':>18}")
+        for name, stats in results["startup"].items():
+            predict = stats["first_prediction_p50_ms"]
+            predict = f"{predict:>16.0f}ms" if predict is not None else f"{'n/a':>18}"
+            print(f"{name:<20} {stats['ready_p50_ms']:>10.0f}ms {predict}")
+
+    if args.output:
+        with open(args.output, "w") as f:
+            json.dump(results, f, indent=2)
+
+    failures = []
+    if results["import"]["heavy_imported"]:
+        failures.append(f"app.main imports {', '.join(results['import']['heavy_imported'])}")
+    if args.max_import_ms is not None and results["import"]["p50_ms"] > args.max_import_ms:
+        failures.append(f"import took {results['import']['p50_ms']:.0f} ms (budget {args.max_import_ms:.0f})")
+    if args.max_startup_ms is not None and "startup" in results:
+        ready = results["startup"]["restart"]["ready_p50_ms"]
+        if ready > args.max_startup_ms:
+            failures.append(f"restart took {ready:.0f} ms to answer (budget {args.max_startup_ms:.0f})")
+    for failure in failures:
+        print(f"FAIL: {failure}")
+    sys.exit(1 if failures else 0)
+
+
+if __name__ == "__main__":
+    main()
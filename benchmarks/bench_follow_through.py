@@ -0,0 +1,108 @@
+"""
+Benchmark: scoring a day's plan for follow-through the way app_old.py did vs
+follow_through.score_plan().
+
+app_old.py retrained src/predictor.py's model on every Streamlit rerun and
+then scored one task at a time (a one-row DataFrame, predict_proba, then
+src/nudger.generate_nudge). The backend trains once per data version and
+scores the whole plan with one predict_proba call. The script fills a
+synthetic database with --history tasks, publishes a model, checks the
+per-task loop and the batch call agree, then times, per plan size:
+
+    rerun          retrain + per-task loop (app_old.py)
+    per-task loop  the served model, one predict_proba per task
+    score_plan     the served model, one call for the plan (incl. the data version check)
+
+    python benchmarks/bench_follow_through.py
+    python benchmarks/bench_follow_through.py --history 20000 --plan-sizes 5 20 100 --repeat 50
+"""
+
+import argparse
+import contextlib
+import io
+import os
+import random
+import shutil
+import tempfile
+
+import numpy as np
+
+from _common import REPO_ROOT, print_table, summarize, time_calls
+
+import sys
+if REPO_ROOT not in sys.path:
+    sys.path.insert(0, REPO_ROOT)
+
+import synthetic
+
+from app import config, data_manager
+from app.follow_through import follow_through
+from src import nudger
+from src.predictor import Predictor
+
+
+def random_plan(rng, size):
+    context = {"mood_before": rng.randint(1, 10), "sleep_quality": rng.randint(1, 10),
+               "energy_level": rng.randint(1, 10)}
+    plan = []
+    for _ in range(size):
+        task_type = rng.choice(synthetic.TASK_TYPES)
+        plan.append({"task": rng.choice(synthetic.TASK_NAMES[task_type]), "task_type": task_type,
+                     "location": rng.choice(synthetic.LOCATIONS), "dread_level": rng.randint(1, 10), **context})
+    return plan
+
+
+def rerun(plan):
+    """What one app_old.py rerun did for the model: retrain, then score task by task."""
+    import pandas as pd
+
+    predictor = Predictor()
+    with contextlib.redirect_stdout(io.StringIO()):
+        predictor.train(data_manager.get_all_tasks())
+    return [nudger.generate_nudge(predictor.predict_probability(pd.DataFrame([task])), task) for task in plan]
+
+
+def per_task_loop(plan):
+    import pandas as pd
+
+    model = follow_through.model
+    return [float(model.predict_proba(pd.DataFrame([task]))[:, 1][0]) for task in plan]
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Compare per-task follow-through scoring with score_plan().")
+    parser.add_argument("--history", type=int, default=5000, help="Synthetic tasks the model is trained on")
+    parser.add_argument("--plan-sizes", type=int, nargs="+", default=[5, 20, 100])
+    parser.add_argument("--repeat", type=int, default=20)
+    args = parser.parse_args()
+
+    workdir = tempfile.mkdtemp(prefix="praxable-follow-")
+    original_db, original_models = config.DB_PATH, config.MODEL_DIR
+    try:
+        config.DB_PATH = os.path.join(workdir, "praxable.db")
+        config.MODEL_DIR = os.path.join(workdir, "models")
+        synthetic.fill_database(config.DB_PATH, args.history)
+        print(f"\ntrain: {follow_through.train()}")
+        print(f"train again: {follow_through.train()}")
+
+        rng = random.Random(0)
+        for size in args.plan_sizes:
+            plan = random_plan(rng, size)
+            batch = [task["probability"] for task in follow_through.score_plan(plan)]
+            if not np.allclose(batch, per_task_loop(plan), atol=5e-4):
+                raise SystemExit(f"score_plan and the per-task loop disagree for a plan of {size}")
+
+            rows = {
+                "rerun (app_old.py)": summarize(time_calls(lambda: rerun(plan), repeat=max(args.repeat // 4, 1), warmup=1)),
+                "per-task loop": summarize(time_calls(lambda: per_task_loop(plan), repeat=args.repeat, warmup=2)),
+                "score_plan": summarize(time_calls(lambda: follow_through.score_plan(plan), repeat=args.repeat, warmup=2)),
+            }
+            print_table(f"Plan of {size} tasks, {args.history} tasks of history",
+                        {name: {k: v / 1000 for k, v in stats.items()} for name, stats in rows.items()}, unit="ms")
+    finally:
+        config.DB_PATH, config.MODEL_DIR = original_db, original_models
+        shutil.rmtree(workdir, ignore_errors=True)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,161 @@
+"""
+Benchmark: pushing analytics changes to many dashboards over GET /analytics/stream.
+
+Starts the API (one uvicorn worker, see _serve.py), opens --clients SSE
+connections, then logs --writes tasks one at a time and measures how long it
+takes until every client has received the delta for each write. Fails (exit
+status 1) if any client misses a delta. The same check runs in-process (1000
+LiveHub clients, no sockets) with the tests: backend/tests/test_live.py.
+
+For comparison it also times one polling round: every client asking
+/analytics/alignment once, which is what the dashboards did on each refresh.
+
+    python benchmarks/bench_live_fanout.py
+    python benchmarks/bench_live_fanout.py --clients 2000 --writes 20
+"""
+
+import argparse
+import asyncio
+import http.client
+import json
+import os
+import shutil
+import sys
+import tempfile
+import time
+import urllib.request
+from urllib.parse import urlparse
+
+from _common import start_server, summarize
+
+import synthetic
+
+NEW_TASK = {
+    "date": "2025-06-01", "task": "Benchmark task", "task_type": "Deep Work",
+    "aligned_value": "Career", "dread_level": 3, "location": "Home",
+    "planned_time": "09:00", "actual_time": "00:00", "did_it": 0,
+    "mood_before": 5, "sleep_quality": 7, "energy_level": 6,
+}
+
+
+class Client:
+    """One raw SSE connection; records when each delta frame arrives."""
+
+    def __init__(self):
+        self.deltas = []
+        self.connected = asyncio.Event()
+
+    async def run(self, host, port):
+        reader, writer = await asyncio.open_connection(host, port)
+        writer.write(f"GET /analytics/stream HTTP/1.1\r\nHost: {host}\r\n\r\n".encode())
+        await writer.drain()
+        await reader.readuntil(b"\r\n\r\n")     # response headers
+        try:
+            while True:
+                # Each frame ends with a blank line; the chunked-encoding size
+                # lines in between never contain one
+                frame = await reader.readuntil(b"\n\n")
+                if b"event: snapshot" in frame:
+                    self.connected.set()
+                elif b"event: delta" in frame:
+                    self.deltas.append(time.perf_counter())
+        except (asyncio.IncompleteReadError, ConnectionError, asyncio.CancelledError):
+            pass
+        finally:
+            writer.close()
+
+
+def log_task(base_url):
+    request = urllib.request.Request(
+        f"{base_url}/tasks", data=json.dumps(NEW_TASK).encode(),
+        headers={"Content-Type": "application/json"}, method="POST"
+    )
+    urllib.request.urlopen(request).read()
+
+
+def polling_round(base_url, n_clients):
+    """Seconds for n_clients GET /analytics/alignment requests, one after another on a keep-alive connection."""
+    url = urlparse(base_url)
+    conn = http.client.HTTPConnection(url.hostname, url.port)
+    start = time.perf_counter()
+    for _ in range(n_clients):
+        conn.request("GET", "/analytics/alignment")
+        conn.getresponse().read()
+    elapsed = time.perf_counter() - start
+    conn.close()
+    return elapsed
+
+
+def live_connections(base_url):
+    text = urllib.request.urlopen(f"{base_url}/metrics").read().decode()
+    for line in text.splitlines():
+        if line.startswith("praxable_live_connections "):
+            return int(float(line.split()[1]))
+    return None
+
+
+async def run(base_url, n_clients, n_writes):
+    url = urlparse(base_url)
+    clients = [Client() for _ in range(n_clients)]
+    tasks = []
+    start = time.perf_counter()
+    for client in clients:
+        tasks.append(asyncio.create_task(client.run(url.hostname, url.port)))
+        await asyncio.sleep(0)
+    await asyncio.wait_for(asyncio.gather(*(client.connected.wait() for client in clients)), 120)
+    connect_seconds = time.perf_counter() - start
+    connected = await asyncio.to_thread(live_connections, base_url)
+
+    latencies, missed = [], 0
+    for i in range(n_writes):
+        sent = time.perf_counter()
+        await asyncio.to_thread(log_task, base_url)
+        deadline = time.perf_counter() + 10
+        while time.perf_counter() < deadline and any(len(c.deltas) <= i for c in clients):
+            await asyncio.sleep(0.005)
+        for client in clients:
+            if len(client.deltas) > i:
+                latencies.append((client.deltas[i] - sent) * 1000)
+            else:
+                missed += 1
+                client.deltas.append(float("inf"))   # keep the indices aligned
+    for task in tasks:
+        task.cancel()
+    await asyncio.gather(*tasks, return_exceptions=True)
+    return connect_seconds, connected, latencies, missed
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Check analytics fan-out to many SSE clients on one worker.")
+    parser.add_argument("--clients", type=int, default=1000)
+    parser.add_argument("--writes", type=int, default=10)
+    parser.add_argument("--tasks", type=int, default=10000, help="Tasks in the database before the run")
+    args = parser.parse_args()
+
+    workdir = tempfile.mkdtemp(prefix="praxable-live-")
+    process = None
+    try:
+        synthetic.fill_database(os.path.join(workdir, "data", "praxable.db"), args.tasks)
+        process, base_url = start_server(workdir)
+        poll_seconds = polling_round(base_url, args.clients)
+        connect_seconds, connected, latencies, missed = asyncio.run(run(base_url, args.clients, args.writes))
+    finally:
+        if process:
+            process.terminate()
+            process.wait()
+        shutil.rmtree(workdir, ignore_errors=True)
+
+    stats = summarize(latencies or [0])
+    print(f"\n{args.clients} SSE clients on one worker, {args.writes} task writes")
+    print(f"  connected (server gauge):        {connected} in {connect_seconds:.1f}s")
+    print(f"  deltas delivered:                {len(latencies)} of {args.clients * args.writes}")
+    print(f"  write -> delta at every client:  p50 {stats['p50']:.1f}ms  p95 {stats['p95']:.1f}ms"
+          f"  max {max(latencies, default=0):.1f}ms")
+    print(f"  one polling round instead:       {args.clients} requests, {poll_seconds * 1000:.0f}ms")
+    if missed or connected != args.clients:
+        print(f"FAILED: {missed} deltas missed, {connected} of {args.clients} clients connected")
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
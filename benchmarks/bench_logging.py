@@ -0,0 +1,75 @@
+"""
+Benchmark: caller-side cost of the old print() lines vs the queued JSON logger.
+
+Each case emits the line data_manager writes for every logged task. stdout is
+a pipe drained by a child process (like uvicorn under a process manager or
+docker), either as fast as it can or slowly (a busy terminal or log shipper).
+print() pays for the write in the request thread, and blocks outright once
+the pipe buffer is full; the logger only builds the record and queues it.
+
+    python benchmarks/bench_logging.py
+"""
+
+import logging
+import subprocess
+import sys
+
+import _common  # noqa: F401  (sets up sys.path)
+from _common import print_table, summarize, time_calls
+
+from app import config, logging_config
+
+REPEAT = 20_000
+
+SINK = """
+import os, sys, time
+delay = float(sys.argv[1])
+while os.read(0, 4096):
+    if delay:
+        time.sleep(delay)
+"""
+
+
+def run(reader_delay):
+    sink = subprocess.Popen([sys.executable, "-c", SINK, str(reader_delay)], stdin=subprocess.PIPE)
+    # Line-buffered text stream on the pipe, like a real stdout
+    out = open(sink.stdin.fileno(), "w", buffering=1, closefd=False)
+
+    config.LOG_SAMPLE_RATES = {"task_logged_sampled": 0.1}
+    logging_config.setup_logging(stream=out)
+    logger = logging.getLogger("app.data_manager")
+
+    def print_line():
+        print(f"Logged task to database: {'Gym'}", file=out)
+
+    def log_line():
+        logger.info("Logged task to database", extra={"event": "task_logged", "task": "Gym"})
+
+    def log_sampled():
+        logger.info("Logged task to database", extra={"event": "task_logged_sampled", "task": "Gym"})
+
+    def log_filtered():
+        logger.debug("Logged task to database", extra={"event": "task_logged", "task": "Gym"})
+
+    rows = {
+        "print() (old)": summarize(time_calls(print_line, repeat=REPEAT)),
+        "logger.info() via queue": summarize(time_calls(log_line, repeat=REPEAT)),
+        "logger.info() sampled at 10%": summarize(time_calls(log_sampled, repeat=REPEAT)),
+        "logger.debug() below level": summarize(time_calls(log_filtered, repeat=REPEAT)),
+    }
+
+    # Detach without waiting for a slow reader to drain everything
+    app_logger = logging.getLogger("app")
+    for handler in list(app_logger.handlers):
+        app_logger.removeHandler(handler)
+    logging_config._listener.stop()
+    logging_config._listener = None
+    out.close()
+    sink.kill()
+    sink.wait()
+    return rows
+
+
+if __name__ == "__main__":
+    print_table(f"Fast reader: per-call cost in the calling thread ({REPEAT} calls)", run(0.0))
+    print_table(f"Slow reader (4KB per 20ms): per-call cost in the calling thread ({REPEAT} calls)", run(0.02))
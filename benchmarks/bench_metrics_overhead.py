@@ -0,0 +1,106 @@
+"""
+Benchmark: what the /metrics instrumentation costs on the hot path.
+
+- The raw primitives: a counter increment, a histogram observation and a
+  timed() call around an empty function.
+- A full request through the FastAPI app (in-process, via httpx's ASGI
+  transport) with MetricsMiddleware in the stack vs the same app without it.
+  The endpoint is GET /values, which also runs one timed data_manager query.
+
+    python benchmarks/bench_metrics_overhead.py
+"""
+
+import asyncio
+import os
+import tempfile
+import time
+
+import _common  # noqa: F401  (sets up sys.path)
+from _common import print_table, summarize, time_calls
+
+import httpx
+
+from app import config, data_manager, metrics
+from app import main
+
+REQUESTS = 500
+ROUNDS = 10
+
+
+def bench_primitives():
+    counter = metrics.Counter("bench_counter_total", "bench", registry=None)
+    histogram = metrics.Histogram("bench_seconds", "bench", ["route"], registry=None)
+    child = histogram.labels("/values")
+
+    @metrics.timed(histogram, route="/timed")
+    def timed_noop():
+        pass
+
+    def noop():
+        pass
+
+    rows = {
+        "function call (baseline)": summarize(time_calls(noop, repeat=100_000)),
+        "counter.inc()": summarize(time_calls(counter.inc, repeat=100_000)),
+        "histogram.observe()": summarize(time_calls(lambda: child.observe(0.003), repeat=100_000)),
+        "histogram.labels(...).observe()": summarize(
+            time_calls(lambda: histogram.labels("/values").observe(0.003), repeat=100_000)
+        ),
+        "timed() empty function": summarize(time_calls(timed_noop, repeat=100_000)),
+    }
+    print_table("Metric primitives", rows)
+
+
+def _app_without_middleware():
+    """main.app's middleware stack minus MetricsMiddleware."""
+    app = main.app
+    saved = list(app.user_middleware)
+    app.user_middleware = [m for m in saved if m.cls is not metrics.MetricsMiddleware]
+    app.middleware_stack = None
+    stack = app.build_middleware_stack()
+    app.user_middleware = saved
+    app.middleware_stack = None
+    return stack
+
+
+async def _time_requests(asgi_app):
+    transport = httpx.ASGITransport(app=asgi_app)
+    timings = []
+    async with httpx.AsyncClient(transport=transport, base_url="http://bench") as client:
+        for _ in range(20):
+            await client.get("/values")
+        for _ in range(REQUESTS):
+            start = time.perf_counter()
+            await client.get("/values")
+            timings.append((time.perf_counter() - start) * 1e6)
+    return timings
+
+
+def bench_requests():
+    plain = _app_without_middleware()
+    instrumented = main.app.build_middleware_stack()
+
+    rows = {}
+    # Interleave runs so drift (GC, caches) hits both sides equally
+    results = {"without MetricsMiddleware": [], "with MetricsMiddleware": []}
+    for _ in range(ROUNDS):
+        results["without MetricsMiddleware"] += asyncio.run(_time_requests(plain))
+        results["with MetricsMiddleware"] += asyncio.run(_time_requests(instrumented))
+    for name, timings in results.items():
+        rows[name] = summarize(timings)
+    print_table(f"GET /values in-process ({REQUESTS * ROUNDS} requests each)", rows)
+
+    overhead = rows["with MetricsMiddleware"]["p50"] - rows["without MetricsMiddleware"]["p50"]
+    print(f"\nMiddleware overhead at p50: {overhead:.1f}us per request")
+
+
+if __name__ == "__main__":
+    with tempfile.TemporaryDirectory() as workdir:
+        config.DATA_DIR = workdir
+        config.DB_PATH = os.path.join(workdir, "bench.db")
+        data_manager.initialize_database()
+        for name in ["Health", "Growth", "Connection", "Career", "Creativity"]:
+            data_manager.add_value(name)
+
+        bench_primitives()
+        bench_requests()
@@ -0,0 +1,148 @@
+"""
+Benchmark: placing planned tasks with plan_optimizer vs the greedy best-fit
+the local parser used before.
+
+Trains the fulfillment model on a synthetic history, then plans --plans
+random days: a synthetic calendar's free slots (scheduler.get_free_slots,
+clock pinned to 07:00) and 3-12 tasks, some at a fixed time. Both placers
+get the same tasks; the script compares how many tasks fit, the predicted
+fulfillment of the placed tasks and the time per plan, and counts plans
+where the search ran out of its PLAN_OPTIMIZER_BUDGET_MS budget.
+
+    python benchmarks/bench_plan_optimizer.py
+    python benchmarks/bench_plan_optimizer.py --plans 500 --max-tasks 20 --budget-ms 20
+"""
+
+import argparse
+import os
+import random
+import shutil
+import tempfile
+import time
+
+from _common import pin_clock, print_table, summarize
+
+import synthetic
+
+from app import calendar_service, config, plan_optimizer, scheduler
+
+TASKS = [(task_type, name, values[0]) for task_type, (_, _, values) in synthetic.TASK_PROFILES.items()
+         for name in synthetic.TASK_NAMES[task_type]]
+
+
+def legacy_place(tasks, free_slots):
+    """The local parser's old greedy best-fit: fixed tasks first, then longest first into the tightest gap."""
+    intervals = [[plan_optimizer._to_minutes(s["start"]), plan_optimizer._to_minutes(s["end"])] for s in free_slots]
+    placed = [None] * len(tasks)
+
+    def reserve(index, start, end):
+        slot_start, slot_end = intervals.pop(index)
+        if start - slot_start > 0:
+            intervals.append([slot_start, start])
+        if slot_end - end > 0:
+            intervals.append([end, slot_end])
+        intervals.sort()
+
+    for i, task in enumerate(tasks):
+        if task["start"] is None:
+            continue
+        start, end = task["start"], task["start"] + task["duration"]
+        for j, (slot_start, slot_end) in enumerate(intervals):
+            if slot_start <= start and end <= slot_end:
+                reserve(j, start, end)
+                placed[i] = (start, end)
+                break
+
+    for i in sorted((i for i, t in enumerate(tasks) if t["start"] is None), key=lambda i: -tasks[i]["duration"]):
+        best = None
+        for j, (slot_start, slot_end) in enumerate(intervals):
+            leftover = (slot_end - slot_start) - tasks[i]["duration"]
+            if leftover >= 0 and (best is None or leftover < best[1]):
+                best = (j, leftover)
+        if best is not None:
+            slot_start = intervals[best[0]][0]
+            reserve(best[0], slot_start, slot_start + tasks[i]["duration"])
+            placed[i] = (slot_start, slot_start + tasks[i]["duration"])
+    return placed
+
+
+def random_day(rng, seed, max_tasks):
+    events = synthetic.generate_calendar(rng.randint(2, 8), seed=seed)
+    calendar_service.get_todays_busy = lambda: events
+    free_slots = scheduler.get_free_slots()
+    tasks = []
+    for _ in range(rng.randint(3, max_tasks)):
+        task_type, name, value = rng.choice(TASKS)
+        fixed = rng.random() < 0.2
+        tasks.append({
+            "task_name": name, "task_type": task_type, "aligned_value": value,
+            "duration": rng.choice((15, 30, 30, 45, 60, 60, 90, 120)),
+            "start": rng.randrange(8 * 60, 21 * 60, 30) if fixed else None,
+        })
+    return tasks, free_slots
+
+
+def fulfillment(tasks, placements, scores):
+    return sum(scores[(i, placed[0] // 60)] for i, placed in enumerate(placements) if placed)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Compare plan_optimizer with greedy best-fit placement.")
+    parser.add_argument("--plans", type=int, default=200)
+    parser.add_argument("--max-tasks", type=int, default=12)
+    parser.add_argument("--budget-ms", type=float, default=config.PLAN_OPTIMIZER_BUDGET_MS)
+    parser.add_argument("--history", type=int, default=5000, help="Synthetic tasks the model is trained on")
+    args = parser.parse_args()
+
+    workdir = tempfile.mkdtemp(prefix="praxable-plan-")
+    original_busy, original_db = calendar_service.get_todays_busy, config.DB_PATH
+    try:
+        config.DB_PATH = os.path.join(workdir, "praxable.db")
+        synthetic.fill_database(config.DB_PATH, args.history)
+        from app.predictor import predictor
+        predictor.train()
+        scorer = plan_optimizer.fulfillment_scorer(predictor)
+        pin_clock("07:00")
+
+        rng = random.Random(0)
+        totals = {"greedy": [0, 0.0], "optimizer": [0, 0.0]}
+        timings = {"greedy": [], "optimizer": []}
+        n_tasks = better = worse = out_of_budget = 0
+        for seed in range(args.plans):
+            tasks, free_slots = random_day(rng, seed, args.max_tasks)
+            n_tasks += len(tasks)
+            # Every (task, hour) score, to judge both placements the same way
+            pairs = [(i, hour) for i in range(len(tasks)) for hour in range(24)]
+            scores = dict(zip(pairs, scorer([(tasks[i], hour) for i, hour in pairs])))
+
+            start = time.perf_counter()
+            greedy = legacy_place(tasks, free_slots)
+            timings["greedy"].append((time.perf_counter() - start) * 1000)
+            start = time.perf_counter()
+            optimized, complete = plan_optimizer.optimize(tasks, free_slots, scorer=scorer, budget_ms=args.budget_ms)
+            timings["optimizer"].append((time.perf_counter() - start) * 1000)
+
+            out_of_budget += not complete
+            results = {"greedy": greedy, "optimizer": optimized}
+            for name, placements in results.items():
+                totals[name][0] += sum(placed is not None for placed in placements)
+                totals[name][1] += fulfillment(tasks, placements, scores)
+            placed_counts = [sum(p is not None for p in results[name]) for name in ("optimizer", "greedy")]
+            difference = fulfillment(tasks, optimized, scores) - fulfillment(tasks, greedy, scores)
+            better += placed_counts[0] > placed_counts[1] or (placed_counts[0] == placed_counts[1] and difference > 1e-9)
+            worse += placed_counts[0] < placed_counts[1] or (placed_counts[0] == placed_counts[1] and difference < -1e-9)
+    finally:
+        calendar_service.get_todays_busy, config.DB_PATH = original_busy, original_db
+        shutil.rmtree(workdir, ignore_errors=True)
+
+    print(f"\n{args.plans} plans, {n_tasks} tasks, budget {args.budget_ms:g}ms")
+    print(f"{'placer':<12} {'tasks placed':>14} {'fulfillment / placed task':>27}")
+    for name, (placed, total) in totals.items():
+        print(f"{name:<12} {placed:>8} ({placed / n_tasks:>4.0%}) {total / max(placed, 1):>27.2f}")
+    print(f"optimizer better on {better} plans, worse on {worse}, out of budget on {out_of_budget}")
+    print_table("Time per plan (optimizer includes the batched model call)",
+                {name: summarize(values) for name, values in timings.items()}, unit="ms")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,91 @@
+"""
+Benchmark: fixed overhead of a planner call, before and after the model registry.
+
+Gemini itself is stubbed out (generate_content returns instantly), so the
+numbers only measure what we pay per request on top of the model call:
+reading the key, genai.configure(), building a GenerativeModel, the prompt,
+the client layer and JSON parsing. Also compares /config/status, which used
+to re-read .env on every request.
+
+Note: with generate_content stubbed this understates the win. In the real SDK
+genai.configure() drops the cached client, so the next call also has to open a
+fresh gRPC/HTTP channel to Gemini; the registry keeps that channel warm too.
+
+    python benchmarks/bench_planner_overhead.py
+"""
+
+import os
+
+import _common  # noqa: F401  (sets up sys.path)
+from _common import print_table, summarize, time_calls
+
+os.environ.setdefault("GEMINI_API_KEY", "AIza-benchmark-key")
+
+import google.generativeai as genai
+from dotenv import load_dotenv
+
+from app import config, llm_client, llm_parser
+from app.model_registry import ModelRegistry
+import app.llm_parser as parser_module
+
+REPLY = '{"tasks": [{"task_name": "Gym", "task_type": "Exercise", "aligned_value": "Health", "time_preference": "18:00 - 19:00"}]}'
+FREE_SLOTS = [
+    {"start": "09:00", "end": "12:00", "duration_minutes": 180},
+    {"start": "14:00", "end": "22:00", "duration_minutes": 480},
+]
+
+
+class _StubResponse:
+    text = REPLY
+
+
+def _stub_generate_content(self, content, **kwargs):
+    return _StubResponse()
+
+
+def legacy_get_structured_plan(user_input, core_values, free_slots):
+    """The pre-registry code path: configure + new model on every call."""
+    api_key = os.getenv("GEMINI_API_KEY")
+    genai.configure(api_key=api_key)
+    model = genai.GenerativeModel('gemini-2.0-flash')
+    content = llm_parser._build_content(llm_parser._build_prompt(user_input, core_values, free_slots))
+    response = llm_client.client.generate(
+        model, content, request_options={"timeout": config.LLM_CALL_TIMEOUT}
+    )
+    return llm_parser._parse_plan_text(response.text)
+
+
+def legacy_config_status():
+    load_dotenv(override=True)
+    api_key = os.getenv("GEMINI_API_KEY")
+    return {"is_configured": bool(api_key), "key_preview": api_key[:4] + "..." if api_key else None}
+
+
+def main():
+    # Only the network call is stubbed; configure() and model construction are real
+    genai.GenerativeModel.generate_content = _stub_generate_content
+
+    registry = ModelRegistry()
+    parser_module.registry = registry
+
+    def before():
+        legacy_get_structured_plan("gym at 6pm", ["Health"], FREE_SLOTS)
+
+    def after():
+        llm_parser.get_structured_plan("gym at 6pm", ["Health"], FREE_SLOTS)
+
+    def status_after():
+        api_key = registry.api_key
+        return {"is_configured": bool(api_key), "key_preview": api_key[:4] + "..." if api_key else None}
+
+    rows = {
+        "planner (configure + new model per call)": summarize(time_calls(before, repeat=500)),
+        "planner (warm registry model)": summarize(time_calls(after, repeat=500)),
+        "/config/status (load_dotenv per call)": summarize(time_calls(legacy_config_status, repeat=500)),
+        "/config/status (registry)": summarize(time_calls(status_after, repeat=500)),
+    }
+    print_table(f"Planner fixed overhead with a stubbed {config.GEMINI_MODEL_NAME}", rows)
+
+
+if __name__ == "__main__":
+    main()
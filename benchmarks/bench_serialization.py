@@ -0,0 +1,96 @@
+"""
+Benchmark: /tasks serialization, default pipeline vs the orjson fast path.
+
+"default" reproduces what the endpoint used to do: read a DataFrame,
+df.to_json() + json.loads() to clean NaNs, validate every row against
+List[TaskResponse], then encode with the standard json module.
+"fast" is the current path: sqlite tuples -> dicts -> orjson.
+
+    python benchmarks/bench_serialization.py [--sizes 1000 10000 100000]
+"""
+
+import argparse
+import json
+import os
+import random
+import tempfile
+import time
+from typing import List
+
+import _common  # noqa: F401  (sets up sys.path)
+
+import orjson
+from pydantic import TypeAdapter
+
+from app import config, data_manager
+from app.main import TaskResponse
+
+TASK_TYPES = ["Exercise", "Deep Work", "Chore", "Creative", "Learning", "Shallow Work"]
+VALUES = ["Health", "Growth", "Connection", "Career", "Creativity"]
+LOCATIONS = ["Home", "Office", "Gym", "Cafe", "Outside"]
+
+
+def fill_tasks(n):
+    """Inserts n random tasks into the current config.DB_PATH database."""
+    rng = random.Random(42)
+    tasks = []
+    for i in range(n):
+        done = rng.random() < 0.6
+        tasks.append({
+            "date": f"2025-{rng.randint(1, 12):02d}-{rng.randint(1, 28):02d}", "task": f"Task {i}",
+            "task_type": rng.choice(TASK_TYPES), "aligned_value": rng.choice(VALUES),
+            "dread_level": rng.randint(1, 10), "location": rng.choice(LOCATIONS),
+            "planned_time": f"{rng.randint(6, 21):02d}:00", "actual_time": "00:00", "did_it": int(done),
+            "mood_before": rng.randint(1, 10), "sleep_quality": rng.randint(1, 10),
+            "energy_level": rng.randint(1, 10),
+            "mood_after": rng.randint(1, 10) if done else None,
+            "fulfillment_score": rng.randint(1, 10) if done else None,
+        })
+    data_manager.log_tasks(tasks)
+
+
+ADAPTER = TypeAdapter(List[TaskResponse])
+
+
+def default_path():
+    tasks_df = data_manager.get_all_tasks()
+    records = json.loads(tasks_df.to_json(orient="records"))
+    validated = ADAPTER.validate_python(records)
+    return json.dumps(ADAPTER.dump_python(validated, mode="json")).encode()
+
+
+def fast_path():
+    return orjson.dumps(data_manager.get_task_rows(), option=orjson.OPT_SERIALIZE_NUMPY)
+
+
+def best_of(fn, repeat):
+    best = float("inf")
+    for _ in range(repeat):
+        start = time.perf_counter()
+        fn()
+        best = min(best, time.perf_counter() - start)
+    return best * 1000
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--sizes", type=int, nargs="+", default=[1_000, 10_000, 100_000])
+    parser.add_argument("--repeat", type=int, default=5)
+    args = parser.parse_args()
+
+    print(f"{'tasks':>8} {'default (ms)':>14} {'fast (ms)':>12} {'speedup':>9}")
+    for n in args.sizes:
+        with tempfile.TemporaryDirectory() as tmp:
+            config.DATA_DIR = tmp
+            config.DB_PATH = os.path.join(tmp, "praxable.db")
+            data_manager.initialize_database()
+            fill_tasks(n)
+
+            assert json.loads(default_path()) == json.loads(fast_path())
+            slow = best_of(default_path, args.repeat)
+            fast = best_of(fast_path, args.repeat)
+            print(f"{n:>8} {slow:>14.1f} {fast:>12.1f} {slow / fast:>8.1f}x")
+
+
+if __name__ == "__main__":
+    main()
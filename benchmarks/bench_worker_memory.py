@@ -0,0 +1,73 @@
+"""
+Benchmark: memory per API worker.
+
+With N workers every process holds its own copy of the Python runtime, the
+imported libraries and the fulfillment model, so total memory is roughly
+N x (resident size of one worker). This measures one worker's resident set
+(VmRSS, Linux only) for a few database sizes:
+
+  - idle:         just started, model not loaded (PRAXABLE_MODEL_WARMUP=lazy)
+  - model loaded: after the live model has been loaded (pandas, sklearn and
+                  the forest itself in memory)
+
+plus the size of the model file, which is what grows with the task history.
+
+    python benchmarks/bench_worker_memory.py
+    python benchmarks/bench_worker_memory.py --sizes 1000 10000 100000
+"""
+
+import argparse
+import os
+import shutil
+import tempfile
+
+import _common  # noqa: F401  (sets up sys.path)
+from _common import start_server
+
+import synthetic
+
+from app import model_store
+from app.predictor import MODEL_NAME, FulfillmentPredictor
+
+
+def rss_mb(pid):
+    with open(f"/proc/{pid}/status") as f:
+        for line in f:
+            if line.startswith("VmRSS:"):
+                return int(line.split()[1]) / 1024
+    return None
+
+
+def measure(workdir, warmup_mode):
+    process, _ = start_server(workdir, env={"PRAXABLE_MODEL_WARMUP": warmup_mode})
+    try:
+        return rss_mb(process.pid)
+    finally:
+        process.terminate()
+        process.wait()
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Measure resident memory of one API worker.")
+    parser.add_argument("--sizes", type=int, nargs="+", default=[1000, 10000, 50000])
+    args = parser.parse_args()
+
+    print(f"\n{'tasks':>8} {'idle':>10} {'model loaded':>14} {'model file':>12}")
+    for n_tasks in args.sizes:
+        workdir = tempfile.mkdtemp(prefix="praxable-mem-")
+        try:
+            synthetic.fill_database(os.path.join(workdir, "data", "praxable.db"), n_tasks)
+            # Publish the model up front so the server only has to load it
+            FulfillmentPredictor().train()
+            version = model_store.current_version(MODEL_NAME)
+            model_mb = os.path.getsize(os.path.join(workdir, "data", "models", f"{MODEL_NAME}-{version}.joblib")) / 2**20
+
+            idle = measure(workdir, "lazy")
+            loaded = measure(workdir, "eager")
+            print(f"{n_tasks:>8} {idle:>8.0f}MB {loaded:>12.0f}MB {model_mb:>10.1f}MB")
+        finally:
+            shutil.rmtree(workdir, ignore_errors=True)
+
+
+if __name__ == "__main__":
+    main()
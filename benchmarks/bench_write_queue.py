@@ -0,0 +1,91 @@
+"""
+Benchmark: write throughput with per-call commits vs the group-commit write queue.
+
+A burst of writes is issued by a number of concurrent callers, like request
+handlers logging the tasks of a plan or submitting feedback. Half the writes
+are log_task, half update_task_with_feedback. Every write waits until it is
+durable (committed) before the caller issues its next one.
+
+  - per-call commit: each write opens a connection and commits on its own
+                     (one fsync per write)
+  - write queue:     writes are grouped by the writer thread (one fsync per group)
+
+    python benchmarks/bench_write_queue.py
+    python benchmarks/bench_write_queue.py --writes 4000 --concurrency 1 8 32
+"""
+
+import argparse
+import os
+import shutil
+import tempfile
+import threading
+import time
+
+import _common  # noqa: F401  (sets up sys.path)
+
+import synthetic
+
+from app import config, data_manager, metrics
+
+
+def run(n_writes, concurrency, use_queue):
+    config.WRITE_QUEUE_ENABLED = use_queue
+    tasks = list(synthetic.generate_tasks(n_writes, seed=7))
+    next_index = iter(range(n_writes))
+    lock = threading.Lock()
+    task_ids = []
+
+    def caller():
+        while True:
+            with lock:
+                index = next(next_index, None)
+            if index is None:
+                return
+            if index % 2 == 0 or not task_ids:
+                task_ids.append(data_manager.log_task(tasks[index]))
+            else:
+                data_manager.update_task_with_feedback(task_ids[index % len(task_ids)], 7, 8)
+
+    threads = [threading.Thread(target=caller) for _ in range(concurrency)]
+    start = time.perf_counter()
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    return n_writes / (time.perf_counter() - start)
+
+
+def batch_totals():
+    """(groups committed, writes committed) by the write queue so far."""
+    counts, total = metrics.WRITE_BATCH_SIZE._children[()].snapshot()
+    return sum(counts), total
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Compare write throughput with and without the write queue.")
+    parser.add_argument("--writes", type=int, default=2000)
+    parser.add_argument("--concurrency", type=int, nargs="+", default=[1, 4, 16, 64])
+    args = parser.parse_args()
+
+    workdir = tempfile.mkdtemp(prefix="praxable-writes-")
+    try:
+        synthetic.fill_database(os.path.join(workdir, "data", "praxable.db"), 1000)
+        print(f"\n{args.writes} durable writes (half log_task, half feedback)")
+        print(f"{'callers':>8} {'per-call commit':>18} {'write queue':>14} {'speedup':>9} {'mean group':>11}")
+        for concurrency in args.concurrency:
+            direct = run(args.writes, concurrency, use_queue=False)
+            groups_before, writes_before = batch_totals()
+            queued = run(args.writes, concurrency, use_queue=True)
+            groups, writes = batch_totals()
+            mean_group = (writes - writes_before) / max(1, groups - groups_before)
+            print(
+                f"{concurrency:>8} {direct:>12.0f} w/s {queued:>10.0f} w/s {queued / direct:>8.1f}x"
+                f" {mean_group:>11.1f}"
+            )
+    finally:
+        data_manager._write_queue.stop()
+        shutil.rmtree(workdir, ignore_errors=True)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,251 @@
+"""
+A local stand-in for the two Google Calendar v3 endpoints the backend calls:
+
+  GET  /calendars/{id}/events   events().list: full event resources
+  POST /freeBusy                freebusy().query: busy intervals only
+
+Events are generated from the simple {"summary", "start", "end"} dicts that
+synthetic.generate_calendar() returns, padded out with what Google really
+sends (description, attendees, conference data, ...) so payload sizes are
+realistic. Responses are gzipped when the client asks for it, as Google's are,
+and the server counts the bytes it sends per endpoint.
+
+The real googleapiclient talks to it (see service()), so calendar_service's
+fetch code runs unchanged:
+
+    server, base_url = start({"primary": synthetic.generate_calendar(20)})
+    calendar_service.get_calendar_service = lambda: service(base_url)
+    ...
+    server.shutdown()
+
+    python benchmarks/fake_google_calendar.py --port 8090 --events 20   # serve until Ctrl+C
+"""
+
+import argparse
+import datetime
+import gzip
+import json
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs, unquote, urlparse
+
+import _common  # noqa: F401  (sets up sys.path)
+
+
+def _parse(value):
+    return datetime.datetime.fromisoformat(value.replace("Z", "+00:00"))
+
+
+def full_event(calendar_id, index, event):
+    """A Google Calendar event resource with the fields a typical meeting has."""
+    event_id = f"evt{index:05d}{calendar_id.split('@')[0][:8]}"
+    attendees = [
+        {"email": f"person{n}@example.com", "displayName": f"Person {n}",
+         "responseStatus": ("accepted", "needsAction", "tentative")[n % 3]}
+        for n in range(index % 6 + 2)
+    ]
+    attendees[0].update(organizer=True, self=True)
+    return {
+        "kind": "calendar#event",
+        "etag": f'"{3300000000000000 + index}"',
+        "id": event_id,
+        "status": "confirmed",
+        "htmlLink": f"https://www.google.com/calendar/event?eid={event_id}",
+        "created": "2025-01-06T09:12:44.000Z",
+        "updated": "2025-01-07T16:03:10.512Z",
+        "summary": event["summary"],
+        "description": (
+            "Agenda:\n1. Status updates from each workstream\n2. Risks and blockers\n"
+            "3. Decisions needed this week\n\nNotes doc: https://docs.google.com/document/d/"
+            f"{event_id}/edit\nPlease add your items before the meeting."
+        ),
+        "location": "Room 4.12 / Video call",
+        "creator": {"email": "person0@example.com", "self": True},
+        "organizer": {"email": "person0@example.com", "self": True},
+        "start": {"dateTime": event["start"], "timeZone": "America/Bogota"},
+        "end": {"dateTime": event["end"], "timeZone": "America/Bogota"},
+        "iCalUID": f"{event_id}@google.com",
+        "sequence": 0,
+        "attendees": attendees,
+        "hangoutLink": f"https://meet.google.com/{event_id[:3]}-{event_id[3:7]}-{event_id[7:10]}",
+        "conferenceData": {
+            "entryPoints": [
+                {"entryPointType": "video", "uri": f"https://meet.google.com/{event_id[:10]}", "label": f"meet.google.com/{event_id[:10]}"},
+                {"entryPointType": "phone", "uri": "tel:+1-555-0100", "label": "+1 555-0100", "pin": "123456789"},
+            ],
+            "conferenceSolution": {"key": {"type": "hangoutsMeet"}, "name": "Google Meet"},
+            "conferenceId": event_id[:10],
+        },
+        "reminders": {"useDefault": True},
+        "eventType": "default",
+    }
+
+
+def all_day_event(calendar_id, day):
+    """An all-day, 'free' (transparent) event, like a holiday or birthday."""
+    return {
+        "kind": "calendar#event", "id": f"allday{calendar_id[:8]}", "status": "confirmed",
+        "summary": "Company holiday", "transparency": "transparent",
+        "start": {"date": day.isoformat()}, "end": {"date": (day + datetime.timedelta(days=1)).isoformat()},
+    }
+
+
+class FakeCalendar:
+    def __init__(self, calendars, latency=0.0):
+        today = datetime.date.today()
+        self.latency = latency
+        self.events = {
+            calendar_id: [all_day_event(calendar_id, today)]
+            + [full_event(calendar_id, i, event) for i, event in enumerate(events)]
+            for calendar_id, events in calendars.items()
+        }
+        self.bytes_sent = {}    # as sent (gzipped if asked for)
+        self.raw_bytes = {}     # before compression
+        self.requests = {}
+        self._lock = threading.Lock()
+
+    def list_events(self, calendar_id, params):
+        items = self.events.get(calendar_id)
+        if items is None:
+            return 404, {"error": {"code": 404, "message": "Not Found"}}
+        time_min, time_max = _parse(params["timeMin"][0]), _parse(params["timeMax"][0])
+        selected = [
+            item for item in items
+            if "date" in item["start"]
+            or (_parse(item["end"]["dateTime"]) > time_min and _parse(item["start"]["dateTime"]) < time_max)
+        ]
+        selected.sort(key=lambda item: item["start"].get("dateTime") or item["start"]["date"])
+        return 200, {
+            "kind": "calendar#events", "etag": '"p32c9"', "summary": calendar_id,
+            "updated": "2025-01-07T16:03:10.512Z", "timeZone": "America/Bogota", "accessRole": "owner",
+            "defaultReminders": [{"method": "popup", "minutes": 10}], "items": selected,
+        }
+
+    def free_busy(self, body):
+        time_min, time_max = _parse(body["timeMin"]), _parse(body["timeMax"])
+        calendars = {}
+        for item in body.get("items", []):
+            events = self.events.get(item["id"])
+            if events is None:
+                calendars[item["id"]] = {"errors": [{"domain": "global", "reason": "notFound"}], "busy": []}
+                continue
+            busy = []
+            for event in events:
+                if event.get("transparency") == "transparent" or "dateTime" not in event["start"]:
+                    continue
+                start, end = _parse(event["start"]["dateTime"]), _parse(event["end"]["dateTime"])
+                if end > time_min and start < time_max:
+                    busy.append((max(start, time_min), min(end, time_max)))
+            # Google merges overlapping events and answers in UTC
+            merged = []
+            for start, end in sorted(busy):
+                if merged and start <= merged[-1][1]:
+                    merged[-1][1] = max(merged[-1][1], end)
+                else:
+                    merged.append([start, end])
+            calendars[item["id"]] = {"busy": [
+                {"start": _utc(start), "end": _utc(end)} for start, end in merged
+            ]}
+        return 200, {"kind": "calendar#freeBusy", "timeMin": body["timeMin"], "timeMax": body["timeMax"],
+                     "calendars": calendars}
+
+    def record(self, endpoint, size, raw_size):
+        with self._lock:
+            self.bytes_sent[endpoint] = self.bytes_sent.get(endpoint, 0) + size
+            self.raw_bytes[endpoint] = self.raw_bytes.get(endpoint, 0) + raw_size
+            self.requests[endpoint] = self.requests.get(endpoint, 0) + 1
+
+    def reset_counters(self):
+        with self._lock:
+            self.bytes_sent.clear()
+            self.raw_bytes.clear()
+            self.requests.clear()
+
+
+def _utc(moment):
+    return moment.astimezone(datetime.timezone.utc).strftime("%Y-%m-%dT%H:%M:%SZ")
+
+
+def _handler(fake):
+    class Handler(BaseHTTPRequestHandler):
+        protocol_version = "HTTP/1.1"
+        disable_nagle_algorithm = True   # headers and body go out as separate writes
+
+        def log_message(self, *args):
+            pass
+
+        def _reply(self, endpoint, status, payload):
+            body = json.dumps(payload, indent=1).encode()   # Google pretty-prints its JSON
+            raw_size = len(body)
+            headers = {"Content-Type": "application/json; charset=UTF-8"}
+            if "gzip" in self.headers.get("Accept-Encoding", ""):
+                body = gzip.compress(body)
+                headers["Content-Encoding"] = "gzip"
+            if fake.latency:
+                time.sleep(fake.latency)
+            self.send_response(status)
+            for name, value in headers.items():
+                self.send_header(name, value)
+            self.send_header("Content-Length", str(len(body)))
+            self.end_headers()
+            # Counted before sending, so the client never sees a reply that isn't counted yet
+            fake.record(endpoint, len(body), raw_size)
+            self.wfile.write(body)
+
+        def do_GET(self):
+            url = urlparse(self.path)
+            parts = url.path.strip("/").split("/")
+            if len(parts) == 3 and parts[0] == "calendars" and parts[2] == "events":
+                self._reply("events.list", *fake.list_events(unquote(parts[1]), parse_qs(url.query)))
+            else:
+                self._reply("unknown", 404, {"error": {"code": 404, "message": "Not Found"}})
+
+        def do_POST(self):
+            body = json.loads(self.rfile.read(int(self.headers.get("Content-Length", 0))) or b"{}")
+            if urlparse(self.path).path.rstrip("/") == "/freeBusy":
+                self._reply("freebusy.query", *fake.free_busy(body))
+            else:
+                self._reply("unknown", 404, {"error": {"code": 404, "message": "Not Found"}})
+
+    return Handler
+
+
+def start(calendars, port=0, latency=0.0):
+    """
+    Serves `calendars` ({calendar id: synthetic events}) on a background thread.
+    Returns (server, base_url); server.fake holds the byte counters.
+    """
+    fake = FakeCalendar(calendars, latency=latency)
+    server = ThreadingHTTPServer(("127.0.0.1", port), _handler(fake))
+    server.fake = fake
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server, f"http://127.0.0.1:{server.server_address[1]}/"
+
+
+def service(base_url):
+    """A googleapiclient Calendar service that talks to the fake server."""
+    from google.auth.credentials import AnonymousCredentials
+    from googleapiclient.discovery import build
+    return build("calendar", "v3", credentials=AnonymousCredentials(),
+                 client_options={"api_endpoint": base_url}, static_discovery=True)
+
+
+if __name__ == "__main__":
+    import synthetic
+
+    parser = argparse.ArgumentParser(description="Serve a fake Google Calendar API.")
+    parser.add_argument("--port", type=int, default=8090)
+    parser.add_argument("--events", type=int, default=20)
+    parser.add_argument("--calendars", nargs="+", default=["primary"])
+    parser.add_argument("--latency", type=float, default=0.0, help="Seconds added to every response")
+    args = parser.parse_args()
+    server, base_url = start(
+        {cid: synthetic.generate_calendar(args.events, seed=i) for i, cid in enumerate(args.calendars)},
+        port=args.port, latency=args.latency,
+    )
+    print(f"Fake Google Calendar at {base_url}")
+    try:
+        threading.Event().wait()
+    except KeyboardInterrupt:
+        server.shutdown()
@@ -0,0 +1,314 @@
+"""
+Benchmark suite: micro-benchmarks over synthetic data plus a local HTTP load test.
+
+For every --sizes N it fills a fresh database with N synthetic tasks
+(see synthetic.py) and times:
+  - data_manager queries (values, a page of tasks, all tasks, inserts, updates)
+  - scheduler.get_free_slots over a synthetic calendar
+  - recommendations.get_recommendations over a synthetic activity catalog
+  - predictor training and single predictions
+
+Then it starts the API under uvicorn (Google Calendar and Gemini stubbed,
+see _serve.py) and runs a mixed HTTP load test.
+
+Results are written as JSON (default benchmarks/results/<timestamp>.json) so
+runs can be compared over time; use --compare with an older file to print the
+change per case.
+
+    python benchmarks/run_suite.py
+    python benchmarks/run_suite.py --sizes 1000 100000 1000000 --http-requests 5000
+    python benchmarks/run_suite.py --compare benchmarks/results/<older>.json
+"""
+
+import argparse
+import concurrent.futures
+import datetime
+import json
+import os
+import platform
+import random
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+
+import _common
+from _common import pin_clock, start_server, summarize, time_calls
+
+import synthetic
+
+from app import calendar_service, data_manager, recommendations, scheduler
+from app.predictor import FulfillmentPredictor
+
+# Scheduler clock for every run, so results don't depend on the time of day
+CLOCK = "08:00"
+
+RESULTS_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "results")
+
+NEW_TASK = {
+    "date": "2025-06-01", "task": "Benchmark task", "task_type": "Deep Work",
+    "aligned_value": "Career", "dread_level": 3, "location": "Home",
+    "planned_time": "09:00", "actual_time": "00:00", "did_it": 0,
+    "mood_before": 5, "sleep_quality": 7, "energy_level": 6,
+}
+
+
+def _repeat_for(n_tasks, base):
+    """Fewer repetitions for the calls that scan the whole table."""
+    return max(3, base // max(1, n_tasks // 1000))
+
+
+def _case(timings):
+    stats = summarize(timings)
+    stats["n"] = len(timings)
+    return stats
+
+
+# --- Micro-benchmarks ---
+
+def bench_data_manager(n_tasks):
+    full_scan = _repeat_for(n_tasks, 200)
+    results = {
+        "get_values": _case(time_calls(data_manager.get_values, repeat=500)),
+        "get_task_rows(limit=100)": _case(time_calls(lambda: data_manager.get_task_rows(limit=100), repeat=500)),
+        "get_task_rows()": _case(time_calls(data_manager.get_task_rows, repeat=full_scan, warmup=1)),
+        "get_all_tasks() [DataFrame]": _case(time_calls(data_manager.get_all_tasks, repeat=full_scan, warmup=1)),
+        "log_task": _case(time_calls(lambda: data_manager.log_task(NEW_TASK), repeat=200)),
+        "log_tasks(1000)": _case(time_calls(lambda: data_manager.log_tasks([NEW_TASK] * 1000), repeat=10, warmup=1)),
+    }
+    rng = random.Random(1)
+    results["update_task_details"] = _case(time_calls(
+        lambda: data_manager.update_task_details(rng.randint(1, n_tasks), {"mood_after": rng.randint(1, 10)}),
+        repeat=200,
+    ))
+    return results
+
+
+def bench_scheduler(event_counts):
+    results = {}
+    original = calendar_service.get_todays_busy
+    try:
+        for n_events in event_counts:
+            events = synthetic.generate_calendar(n_events)
+            calendar_service.get_todays_busy = lambda: events
+            results[f"get_free_slots({n_events} events)"] = _case(time_calls(scheduler.get_free_slots, repeat=500))
+    finally:
+        calendar_service.get_todays_busy = original
+    return results
+
+
+def bench_predictor(n_tasks, max_train_tasks):
+    predictor = FulfillmentPredictor()
+    if n_tasks > max_train_tasks:
+        # A 100-tree forest on 1M rows takes many minutes; skip unless asked for
+        return predictor, {"skipped": f"more than --max-train-tasks={max_train_tasks} tasks"}
+    train_repeat = 1 if n_tasks >= 10_000 else 3
+    results = {"train": _case(time_calls(predictor.train, repeat=train_repeat, warmup=0))}
+    if predictor.is_trained:
+        results["predict"] = _case(time_calls(
+            lambda: predictor.predict("Exercise", "Health", 6, 5), repeat=200
+        ))
+    return predictor, results
+
+
+def bench_recommendations(predictor, catalog_sizes, n_events):
+    results = {}
+    events = synthetic.generate_calendar(n_events)
+    original_busy, original_catalog = calendar_service.get_todays_busy, recommendations.ACTIVITIES
+    calendar_service.get_todays_busy = lambda: events
+    try:
+        for size in catalog_sizes:
+            recommendations.ACTIVITIES = synthetic.generate_activities(size)
+            call = lambda: recommendations.get_recommendations(
+                ["Health", "Growth", "Joy"], predictor=predictor,
+                context={"energy_level": 5, "mood_before": 5},
+            )
+            results[f"get_recommendations({size} activities)"] = _case(
+                time_calls(call, repeat=10 if size <= 100 else 2, warmup=1)
+            )
+    finally:
+        calendar_service.get_todays_busy = original_busy
+        recommendations.ACTIVITIES = original_catalog
+    return results
+
+
+def run_micro(sizes, event_counts, catalog_sizes, max_train_tasks):
+    pin_clock(CLOCK)
+    micro = {}
+    for n_tasks in sizes:
+        with tempfile.TemporaryDirectory() as workdir:
+            db_path = os.path.join(workdir, "data", "praxable.db")
+            os.makedirs(os.path.dirname(db_path))
+            fill_seconds = synthetic.fill_database(db_path, n_tasks)
+            print(f"[{n_tasks} tasks] database filled in {fill_seconds:.1f}s", file=sys.stderr)
+
+            results = {"fill_seconds": round(fill_seconds, 3)}
+            results["data_manager"] = bench_data_manager(n_tasks)
+            results["scheduler"] = bench_scheduler(event_counts)
+            predictor, results["predictor"] = bench_predictor(n_tasks, max_train_tasks)
+            results["recommendations"] = bench_recommendations(predictor, catalog_sizes, event_counts[0])
+            micro[str(n_tasks)] = results
+    return micro
+
+
+# --- HTTP load test ---
+
+def _http_mix(base_url):
+    """(name, method, path, json body) for each request type, with a weight."""
+    return [
+        (30, "GET /values", "GET", "/values", None),
+        (20, "GET /tasks?limit=100", "GET", "/tasks?limit=100", None),
+        (15, "GET /scheduler/free", "GET", "/scheduler/free", None),
+        (10, "POST /recommendations/suggest", "POST", "/recommendations/suggest",
+         {"value_names": ["Health", "Growth"], "min_duration": 0}),
+        (10, "POST /tasks", "POST", "/tasks", NEW_TASK),
+        (10, "POST /planner/generate (local)", "POST", "/planner/generate",
+         {"user_input": "gym at 6pm, read 30 min", "core_values": ["Health", "Growth"]}),
+        (5, "POST /planner/generate (llm)", "POST", "/planner/generate",
+         {"user_input": "plan a balanced day if the weather is nice", "core_values": ["Health", "Growth"]}),
+    ]
+
+
+def run_http(n_tasks, n_requests, concurrency, n_events):
+    import requests
+
+    with tempfile.TemporaryDirectory() as workdir:
+        synthetic.fill_database(os.path.join(workdir, "data", "praxable.db"), n_tasks)
+        process, base_url = start_server(workdir, calendar_events=n_events, clock=CLOCK, timeout=600)
+        try:
+            mix = _http_mix(base_url)
+            rng = random.Random(7)
+            plan = rng.choices(mix, weights=[m[0] for m in mix], k=n_requests)
+            local = threading.local()
+
+            def one(item):
+                _, name, method, path, body = item
+                # One keep-alive session per worker thread
+                if not hasattr(local, "session"):
+                    local.session = requests.Session()
+                started = time.perf_counter()
+                response = local.session.request(method, base_url + path, json=body)
+                return name, response.status_code, (time.perf_counter() - started) * 1e6
+
+            # Warm up every request type once
+            for item in mix:
+                one(item)
+
+            started = time.perf_counter()
+            with concurrent.futures.ThreadPoolExecutor(max_workers=concurrency) as pool:
+                outcomes = list(pool.map(one, plan))
+            elapsed = time.perf_counter() - started
+        finally:
+            process.terminate()
+            process.wait()
+
+    by_name, errors = {}, 0
+    for name, status, micros in outcomes:
+        by_name.setdefault(name, []).append(micros)
+        if status >= 400:
+            errors += 1
+    return {
+        "tasks_in_db": n_tasks,
+        "requests": n_requests,
+        "concurrency": concurrency,
+        "calendar_events": n_events,
+        "elapsed_seconds": round(elapsed, 3),
+        "throughput_rps": round(n_requests / elapsed, 1),
+        "errors": errors,
+        "latency": {name: _case(timings) for name, timings in sorted(by_name.items())},
+    }
+
+
+# --- Output ---
+
+def _metadata(args):
+    try:
+        commit = subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"], cwd=_common.REPO_ROOT,
+            capture_output=True, text=True, timeout=10,
+        ).stdout.strip() or None
+    except (OSError, subprocess.SubprocessError):
+        commit = None
+    return {
+        "timestamp": datetime.datetime.now(datetime.timezone.utc).isoformat(timespec="seconds"),
+        "label": args.label,
+        "git_commit": commit,
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "cpu_count": os.cpu_count(),
+        "unit": "us",
+        "args": vars(args),
+    }
+
+
+def _flatten(results, prefix=""):
+    """{"a": {"b": {"p50": ...}}} -> {"a/b": {"p50": ...}} for every timing case."""
+    flat = {}
+    for key, value in results.items():
+        if isinstance(value, dict) and "p50" in value:
+            flat[prefix + key] = value
+        elif isinstance(value, dict):
+            flat.update(_flatten(value, f"{prefix}{key}/"))
+    return flat
+
+
+def compare(old_path, new_results):
+    with open(old_path) as f:
+        old = _flatten(json.load(f))
+    new = _flatten(new_results)
+    print(f"\n{'case':<80} {'old p50':>12} {'new p50':>12} {'change':>8}")
+    for case in sorted(set(old) & set(new)):
+        before, after = old[case]["p50"], new[case]["p50"]
+        change = (after - before) / before * 100 if before else 0.0
+        print(f"{case:<80} {before:>10.1f}us {after:>10.1f}us {change:>+7.1f}%")
+
+
+def print_summary(results):
+    for case, stats in _flatten(results).items():
+        print(f"{case:<80} p50 {stats['p50']:>12.1f}us  p95 {stats['p95']:>12.1f}us")
+    http = results.get("http")
+    if http:
+        print(f"\nHTTP: {http['throughput_rps']} req/s at concurrency {http['concurrency']}, {http['errors']} errors")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--sizes", type=int, nargs="+", default=[1000, 10000],
+                        help="Number of tasks in the database, one run per size (1k-1M)")
+    parser.add_argument("--events", type=int, nargs="+", default=[5, 50, 500],
+                        help="Calendar sizes for the scheduler benchmark")
+    parser.add_argument("--activities", type=int, nargs="+", default=[20, 200],
+                        help="Activity catalog sizes for the recommendations benchmark")
+    parser.add_argument("--max-train-tasks", type=int, default=100_000,
+                        help="Skip predictor training for larger databases (it dominates the run time)")
+    parser.add_argument("--http-tasks", type=int, default=10000, help="Tasks in the load-test database")
+    parser.add_argument("--http-requests", type=int, default=1000)
+    parser.add_argument("--http-concurrency", type=int, default=8)
+    parser.add_argument("--skip-http", action="store_true")
+    parser.add_argument("--label", default=None, help="Free-form note stored with the results")
+    parser.add_argument("--output", default=None, help="Where to write the JSON results")
+    parser.add_argument("--compare", default=None, help="An earlier results file to compare against")
+    args = parser.parse_args()
+
+    results = {"meta": _metadata(args)}
+    results["micro"] = run_micro(args.sizes, args.events, args.activities, args.max_train_tasks)
+    if not args.skip_http:
+        print("Running HTTP load test...", file=sys.stderr)
+        results["http"] = run_http(args.http_tasks, args.http_requests, args.http_concurrency, args.events[0])
+
+    output = args.output or os.path.join(
+        RESULTS_DIR, datetime.datetime.now().strftime("%Y%m%d-%H%M%S") + ".json"
+    )
+    os.makedirs(os.path.dirname(os.path.abspath(output)), exist_ok=True)
+    with open(output, "w") as f:
+        json.dump(results, f, indent=2)
+
+    print_summary(results)
+    print(f"\nResults written to {output}")
+    if args.compare:
+        compare(args.compare, results)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,194 @@
+"""
+Synthetic data for benchmarks and load tests.
+
+- generate_tasks(): task rows with realistic shapes. Task types have
+  different weights and usual times of day. Dread lowers the completion rate.
+  Sleep drives energy. Fulfillment is higher when a task serves one of the
+  values its type usually aligns with.
+- fill_database(): writes 1k-1M of those tasks (plus core values) into a
+  praxable.db through data_manager.log_tasks(), in large batches.
+- generate_calendar(): N timed events for today, in calendar_service's shape.
+- generate_activities(): an activity catalog of any size, in
+  recommendations.ACTIVITIES' shape.
+
+Everything is seeded, so the same arguments always give the same data.
+
+    python benchmarks/synthetic.py --tasks 100000 --db /tmp/bench/data/praxable.db
+"""
+
+import argparse
+import datetime
+import os
+import random
+import time
+
+import _common  # noqa: F401  (sets up sys.path)
+
+from app import config, data_manager
+
+CORE_VALUES = ["Health", "Growth", "Connection", "Career", "Creativity", "Peace", "Discipline", "Joy"]
+
+# task type -> (weight, usual hours, values it usually serves)
+TASK_PROFILES = {
+    "Deep Work":    (0.24, [9, 10, 11, 14, 15], ["Career", "Growth", "Discipline"]),
+    "Shallow Work": (0.18, [8, 12, 13, 16, 17], ["Career"]),
+    "Exercise":     (0.14, [6, 7, 17, 18, 19], ["Health", "Discipline"]),
+    "Learning":     (0.12, [8, 19, 20, 21], ["Growth", "Creativity"]),
+    "Chore":        (0.12, [8, 12, 18, 19], ["Peace", "Discipline"]),
+    "Social":       (0.09, [12, 18, 19, 20], ["Connection", "Joy"]),
+    "Creative":     (0.06, [10, 20, 21], ["Creativity", "Joy"]),
+    "Rest":         (0.05, [13, 15, 21, 22], ["Peace", "Health"]),
+}
+TASK_TYPES = list(TASK_PROFILES)
+TASK_WEIGHTS = [TASK_PROFILES[t][0] for t in TASK_TYPES]
+
+TASK_NAMES = {
+    "Deep Work": ["Write report", "Code review", "Project planning", "Research", "Draft proposal"],
+    "Shallow Work": ["Answer emails", "Team meeting", "Admin", "Inbox zero", "Invoices"],
+    "Exercise": ["Gym", "Run", "Yoga", "Swim", "Bike ride", "Walk"],
+    "Learning": ["Read a book", "Online course", "Language practice", "Podcast"],
+    "Chore": ["Laundry", "Groceries", "Clean kitchen", "Pay bills", "Cook dinner"],
+    "Social": ["Call mom", "Coffee with a friend", "Family dinner", "Meet up"],
+    "Creative": ["Guitar practice", "Sketching", "Journal", "Photography"],
+    "Rest": ["Nap", "Meditate", "Read fiction", "Stretch"],
+}
+LOCATIONS = ["Home", "Office", "Gym", "Cafe", "Outside", "Library"]
+
+def _clamp(value, low=1, high=10):
+    return max(low, min(high, int(round(value))))
+
+
+def generate_tasks(n, seed=0, days=365, end_date=None):
+    """Yields n task dicts (as data_manager.log_tasks() takes them), oldest first."""
+    rng = random.Random(seed)
+    end_date = end_date or datetime.date.today()
+    start_date = end_date - datetime.timedelta(days=days - 1)
+
+    for i in range(n):
+        task_type = rng.choices(TASK_TYPES, TASK_WEIGHTS)[0]
+        _, hours, usual_values = TASK_PROFILES[task_type]
+        # Mostly a value this type usually serves, sometimes anything
+        aligned = rng.choice(usual_values) if rng.random() < 0.8 else rng.choice(CORE_VALUES)
+
+        day = start_date + datetime.timedelta(days=i * days // n)
+        hour = rng.choice(hours)
+        minute = rng.choice((0, 0, 15, 30, 30, 45))
+
+        sleep = _clamp(rng.gauss(6.8, 1.6))
+        energy = _clamp(sleep * 0.6 + rng.gauss(2.5, 1.5))
+        mood_before = _clamp(rng.gauss(6, 1.8))
+        dread = _clamp(rng.expovariate(1 / 3.5))
+
+        # Dreaded tasks get skipped more; good sleep helps
+        done_probability = 0.85 - dread * 0.05 + (sleep - 7) * 0.03
+        did_it = rng.random() < done_probability
+
+        mood_after = fulfillment = None
+        actual_time = "00:00"
+        if did_it:
+            fulfillment = _clamp(
+                5 + (1.5 if aligned in usual_values else -1) + (energy - 5) * 0.3
+                - dread * 0.2 + rng.gauss(0, 1.3)
+            )
+            mood_after = _clamp(mood_before + (fulfillment - 5) * 0.5 + rng.gauss(0, 1))
+            late = max(0, int(rng.gauss(10, 15)))
+            actual_minutes = min(23 * 60 + 59, hour * 60 + minute + late)
+            actual_time = f"{actual_minutes // 60:02d}:{actual_minutes % 60:02d}"
+
+        yield {
+            "date": day.isoformat(), "task": rng.choice(TASK_NAMES[task_type]), "task_type": task_type,
+            "aligned_value": aligned, "dread_level": dread, "location": rng.choice(LOCATIONS),
+            "planned_time": f"{hour:02d}:{minute:02d}", "actual_time": actual_time, "did_it": int(did_it),
+            "mood_before": mood_before, "sleep_quality": sleep, "energy_level": energy,
+            "mood_after": mood_after, "fulfillment_score": fulfillment,
+        }
+
+
+def fill_database(db_path, n_tasks, seed=0, values=CORE_VALUES, batch_size=20000):
+    """
+    Creates (or extends) the database at db_path with n_tasks synthetic tasks
+    and the given core values. Returns the seconds it took.
+    """
+    started = time.perf_counter()
+    config.DATA_DIR = os.path.dirname(db_path) or "."
+    config.DB_PATH = db_path
+    config.MODEL_DIR = os.path.join(config.DATA_DIR, "models")
+    data_manager.initialize_database()
+
+    for value in values:
+        data_manager.add_value(value)
+    batch = []
+    for task in generate_tasks(n_tasks, seed=seed):
+        batch.append(task)
+        if len(batch) >= batch_size:
+            data_manager.log_tasks(batch)
+            batch.clear()
+    if batch:
+        data_manager.log_tasks(batch)
+    return time.perf_counter() - started
+
+
+def generate_calendar(n_events, seed=0, day=None, start_hour=7, end_hour=22):
+    """
+    n timed events spread over `day` (default today, local time), in the shape
+    calendar_service.get_todays_events() returns. Events may overlap, like real ones.
+    """
+    rng = random.Random(seed)
+    day = day or datetime.datetime.now().astimezone()
+    midnight = day.replace(hour=0, minute=0, second=0, microsecond=0)
+    events = []
+    for i in range(n_events):
+        start_minute = rng.randrange(start_hour * 60, end_hour * 60, 5)
+        length = rng.choice((15, 30, 30, 45, 60, 60, 90, 120))
+        start = midnight + datetime.timedelta(minutes=start_minute)
+        events.append({
+            "summary": f"Event {i}",
+            "start": start.isoformat(),
+            "end": (start + datetime.timedelta(minutes=length)).isoformat(),
+        })
+    events.sort(key=lambda e: e["start"])
+    return events
+
+
+# Catalog categories (as used in recommendations.ACTIVITIES) and the values they tend to serve
+ACTIVITY_CATEGORIES = {
+    "Physical": (["Health", "Discipline", "Energy"], ["Morning Jog", "Yoga", "HIIT Workout", "Walk", "Swim"], "🏃"),
+    "Mental": (["Growth", "Peace", "Clarity"], ["Meditation", "Reading", "Journaling", "Study Session"], "🧠"),
+    "Social": (["Connection", "Joy", "Family"], ["Call a Friend", "Family Dinner", "Volunteer"], "🤝"),
+    "Creative": (["Creativity", "Joy", "Expression"], ["Sketching", "Guitar Practice", "Creative Writing"], "🎨"),
+}
+
+
+def generate_activities(n, seed=0):
+    """An activity catalog of n entries, shaped like recommendations.ACTIVITIES."""
+    rng = random.Random(seed)
+    categories = list(ACTIVITY_CATEGORIES)
+    activities = []
+    for i in range(n):
+        category = rng.choice(categories)
+        usual_values, names, emoji = ACTIVITY_CATEGORIES[category]
+        aligned = rng.sample(usual_values, k=rng.randint(1, 3))
+        if rng.random() < 0.3:
+            aligned.append(rng.choice(CORE_VALUES))
+        activities.append({
+            "id": i + 1,
+            "name": f"{rng.choice(names)} #{i + 1}",
+            "duration_minutes": rng.choice((10, 15, 20, 30, 45, 60, 90)),
+            "aligned_values": sorted(set(aligned)),
+            "description": f"Synthetic {category.lower()} activity",
+            "category": category,
+            "emoji": emoji,
+        })
+    return activities
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Fill a praxable.db with synthetic tasks.")
+    parser.add_argument("--tasks", type=int, default=10000)
+    parser.add_argument("--db", default=os.path.join("data", "praxable.db"))
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+
+    os.makedirs(os.path.dirname(args.db) or ".", exist_ok=True)
+    seconds = fill_database(args.db, args.tasks, seed=args.seed)
+    print(f"Wrote {args.tasks} tasks to {args.db} in {seconds:.1f}s")
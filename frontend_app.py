@@ -144,44 +144,51 @@ if page == "Plan Your Day with AI":
 
     # --- AI Processing ---
     if submit_button and (user_input or audio_value):
-        with st.spinner("AI is thinking..."):
-            proposed_plan = api_client.generate_plan_with_audio(
-                user_input=user_input if user_input else "",
-                core_values=current_values,
-                audio_bytes=audio_value
+        # Tasks are streamed from the backend and rendered as soon as each one arrives
+        st.session_state.pop("proposed_tasks", None)
+        header = st.empty()
+        header.info("AI is thinking...")
+        streamed_tasks = []
+
+        for i, task in enumerate(api_client.stream_plan(
+            user_input=user_input if user_input else "",
+            core_values=current_values,
+            audio_bytes=audio_value
+        )):
+            if i == 0:
+                header.success("Here’s the AI-generated plan:")
+            streamed_tasks.append(task)
+
+            # --- GET PREDICTION ---
+            pred_score = api_client.get_predicted_fulfillment(
+                task_type=task.get('task_type'),
+                aligned_value=task.get('aligned_value'),
+                energy_level=current_energy,
+                mood_before=current_mood
             )
-        
-        if proposed_plan and "tasks" in proposed_plan:
-            st.success("Here’s the AI-generated plan:")
-            st.session_state.proposed_tasks = proposed_plan["tasks"]
-
-            for i, task in enumerate(st.session_state.proposed_tasks):
-                # --- GET PREDICTION ---
-                pred_score = api_client.get_predicted_fulfillment(
-                    task_type=task.get('task_type'),
-                    aligned_value=task.get('aligned_value'),
-                    energy_level=current_energy,
-                    mood_before=current_mood
-                )
-                st.markdown(f"**Task {i+1}: {task.get('task_name', 'N/A')}**")
-                st.markdown(f"> *Value:* **{task.get('aligned_value', 'N/A')}**")
-                st.markdown(f"> *Type:* {task.get('task_type', 'N/A')}")
-                st.markdown(f"> *Preferred Time:* {task.get('time_preference', 'N/A')}")
-                st.divider()
-                
-                # DISPLAY PREDICTION
-                if pred_score:
-                    if pred_score > 7:
-                        st.caption(f"🚀 **High Potential:** Predicted Fulfillment {pred_score}/10")
-                    elif pred_score < 5:
-                        st.caption(f"⚠️ **Warning:** Predicted Fulfillment only {pred_score}/10. Maybe adjust?")
-                    else:
-                        st.caption(f"ℹ️ Predicted Fulfillment: {pred_score}/10")
+            st.markdown(f"**Task {i+1}: {task.get('task_name', 'N/A')}**")
+            st.markdown(f"> *Value:* **{task.get('aligned_value', 'N/A')}**")
+            st.markdown(f"> *Type:* {task.get('task_type', 'N/A')}")
+            st.markdown(f"> *Preferred Time:* {task.get('time_preference', 'N/A')}")
+            st.divider()
+
+            # DISPLAY PREDICTION
+            if pred_score:
+                if pred_score > 7:
+                    st.caption(f"🚀 **High Potential:** Predicted Fulfillment {pred_score}/10")
+                elif pred_score < 5:
+                    st.caption(f"⚠️ **Warning:** Predicted Fulfillment only {pred_score}/10. Maybe adjust?")
                 else:
-                    st.caption("ℹ️ Not enough data to predict fulfillment yet.")
-                
-                st.divider()
+                    st.caption(f"ℹ️ Predicted Fulfillment: {pred_score}/10")
+            else:
+                st.caption("ℹ️ Not enough data to predict fulfillment yet.")
+
+            st.divider()
+
+        if streamed_tasks:
+            st.session_state.proposed_tasks = streamed_tasks
         else:
+            header.empty()
             st.error("The AI couldn’t generate a plan. Try rephrasing your input.")
 
     # --- Save To Log & Calendar ---
@@ -316,8 +323,11 @@ elif page == "Calendar":
 elif page == "Log & Review":
     st.title("📋 Log & Review Your Day")
 
-    # Fetch values via API for the dropdown
-    current_values = api_client.get_values()
+    # Fetch values (for the dropdown) and the task log via API, in parallel
+    current_values, all_tasks_df = api_client.run_parallel(
+        api_client.get_values,
+        api_client.get_all_tasks
+    )
     if not current_values:
         st.warning("Please go to 'Define Your Values' and add at least one value.")
         st.stop()
@@ -374,14 +384,13 @@ elif page == "Log & Review":
         # USE API CLIENT
         api_client.log_task(new_task)
         st.success(f"Logged: '{task_name}' via API!")
+        # The log fetched above doesn't have the new task yet
+        all_tasks_df = api_client.get_all_tasks()
 
     # --- Review Log via API ---
     st.divider()
     st.header("Review Your Log")
 
-    # USE API CLIENT
-    all_tasks_df = api_client.get_all_tasks()
-
     if all_tasks_df.empty:
         st.info("Your log is empty. Add a task above to begin.")
     else:
@@ -115,6 +115,11 @@ export default function PlannerScreen() {
                     sleep_quality: 7,
                 });
 
+                // Tasks that didn't fit in today's free time ("Unscheduled") are only logged
+                if (!/^\d/.test(task.time_preference)) {
+                    continue;
+                }
+
                 const now = new Date();
                 const [startHour, startMin] = task.time_preference.split(':').map(Number);
                 const startTime = new Date(now);
@@ -51,6 +51,53 @@ export interface Recommendation extends Activity {
     all_available_slots: FreeSlot[];
 }
 
+// Delta sync (GET/POST /sync)
+export interface SyncedTask {
+    id: number;
+    date: string;
+    task: string;
+    task_type: string | null;
+    aligned_value: string | null;
+    dread_level: number | null;
+    location: string | null;
+    planned_time: string | null;
+    actual_time: string | null;
+    did_it: number;
+    mood_before: number | null;
+    sleep_quality: number | null;
+    energy_level: number | null;
+    mood_after: number | null;
+    fulfillment_score: number | null;
+}
+
+export interface SyncChanges {
+    revision: number;       // Pass as `since` next time
+    has_more: boolean;      // Call again right away for the rest
+    tasks: SyncedTask[];    // Created or changed since the last sync
+    deleted_tasks: number[];
+    values: string[];
+    deleted_values: string[];
+}
+
+export interface SyncMutation {
+    key: string;            // Unique per mutation; retries reuse it
+    op: 'create_task' | 'update_task' | 'task_feedback' | 'delete_task' | 'add_value' | 'delete_value';
+    task_id?: number;
+    task_key?: string;      // Key of an earlier create_task, for tasks created offline
+    base_revision?: number; // The task's revision when it was last synced
+    data?: Record<string, unknown>;
+}
+
+export interface SyncResult {
+    key: string;
+    status: 'applied' | 'conflict' | 'error';
+    task_id?: number;
+    revision?: number;
+    deleted?: boolean;
+    duplicate?: boolean;
+    detail?: string;
+}
+
 // API client
 export const api = {
     // Core Values
@@ -183,4 +230,18 @@ export const api = {
         });
         return response.data;
     },
+
+    // Delta Sync: only what changed since `since` (0 = everything)
+    getChanges: async (since: number, limit?: number): Promise<SyncChanges> => {
+        const response = await axios.get(`${API_BASE}/sync`, {
+            params: { since, limit },
+        });
+        return response.data;
+    },
+
+    // Offline edits; safe to retry with the same keys
+    pushMutations: async (mutations: SyncMutation[]): Promise<SyncResult[]> => {
+        const response = await axios.post(`${API_BASE}/sync`, { mutations });
+        return response.data.results;
+    },
 };
@@ -0,0 +1,64 @@
+"""
+Praxable Python client.
+
+An async client built on httpx for batch jobs and integration scripts, plus a
+blocking wrapper for code that isn't async. Neither depends on Streamlit.
+
+    from praxable_client import AsyncPraxableClient
+
+    async with AsyncPraxableClient("http://127.0.0.1:8000") as client:
+        values = await client.get_values()
+        async for task in client.iter_tasks(page_size=500):
+            ...
+
+    from praxable_client import PraxableClient
+
+    with PraxableClient() as client:
+        client.create_tasks(tasks)
+"""
+
+from .client import AsyncPraxableClient, PraxableAPIError, DEFAULT_BASE_URL
+from .sync import PraxableClient
+from .models import (
+    Activity,
+    Analytics,
+    CalendarEvent,
+    FollowThrough,
+    FreeSlot,
+    Plan,
+    PlannedTask,
+    Prediction,
+    Recommendation,
+    SyncChanges,
+    SyncMutation,
+    SyncResult,
+    TaskCreate,
+    TaskFeedback,
+    TaskRecord,
+    TaskUpdate,
+    ValueBreakdown,
+)
+
+__all__ = [
+    "AsyncPraxableClient",
+    "PraxableClient",
+    "PraxableAPIError",
+    "DEFAULT_BASE_URL",
+    "Activity",
+    "Analytics",
+    "CalendarEvent",
+    "FollowThrough",
+    "FreeSlot",
+    "Plan",
+    "PlannedTask",
+    "Prediction",
+    "Recommendation",
+    "SyncChanges",
+    "SyncMutation",
+    "SyncResult",
+    "TaskCreate",
+    "TaskFeedback",
+    "TaskRecord",
+    "TaskUpdate",
+    "ValueBreakdown",
+]
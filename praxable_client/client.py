@@ -0,0 +1,254 @@
+"""
+Async client for the Praxable API.
+
+One AsyncPraxableClient holds a keep-alive connection pool (httpx) and a
+semaphore that caps how many requests are in flight. Independent calls can be
+issued together with asyncio.gather (or the gather() helper) and are
+pipelined over the pooled connections without exceeding that cap.
+"""
+
+import asyncio
+import urllib.parse
+from typing import Any, AsyncIterator, Awaitable, Dict, Iterable, List, Optional, Union
+
+import httpx
+
+from .models import (
+    Activity,
+    Analytics,
+    CalendarEvent,
+    FollowThrough,
+    FreeSlot,
+    Plan,
+    Prediction,
+    Recommendation,
+    SyncChanges,
+    SyncMutation,
+    SyncResult,
+    TaskCreate,
+    TaskFeedback,
+    TaskRecord,
+    TaskUpdate,
+)
+
+DEFAULT_BASE_URL = "http://127.0.0.1:8000"
+
+# The server refuses bulk requests bigger than this
+BULK_CHUNK_SIZE = 1000
+
+TaskLike = Union[TaskCreate, Dict[str, Any]]
+
+
+class PraxableAPIError(Exception):
+    """Raised when the API answers with an error status."""
+
+    def __init__(self, status_code: int, detail: Any, retry_after: Optional[float] = None):
+        super().__init__(f"HTTP {status_code}: {detail}")
+        self.status_code = status_code
+        self.detail = detail
+        self.retry_after = retry_after
+
+
+def _as_payload(model_or_dict):
+    if isinstance(model_or_dict, dict):
+        return model_or_dict
+    return model_or_dict.model_dump(exclude_unset=isinstance(model_or_dict, TaskUpdate))
+
+
+class AsyncPraxableClient:
+    """
+    Args:
+        base_url: Where the API lives.
+        concurrency: Maximum requests in flight from this client.
+        max_connections: Size of the keep-alive connection pool.
+        timeout: Per-request timeout in seconds.
+        transport: Optional httpx transport (e.g. httpx.ASGITransport(app) for in-process use).
+    """
+
+    def __init__(
+        self,
+        base_url: str = DEFAULT_BASE_URL,
+        *,
+        concurrency: int = 16,
+        max_connections: int = 16,
+        timeout: float = 30.0,
+        transport: Optional[httpx.AsyncBaseTransport] = None,
+    ):
+        self.base_url = base_url.rstrip("/")
+        self._semaphore = asyncio.Semaphore(concurrency)
+        self._http = httpx.AsyncClient(
+            base_url=self.base_url,
+            timeout=timeout,
+            limits=httpx.Limits(
+                max_connections=max_connections,
+                max_keepalive_connections=max_connections,
+            ),
+            transport=transport,
+        )
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, *exc_info):
+        await self.aclose()
+
+    async def aclose(self):
+        await self._http.aclose()
+
+    # --- Plumbing ---
+
+    async def _request(self, method: str, path: str, **kwargs) -> httpx.Response:
+        async with self._semaphore:
+            response = await self._http.request(method, path, **kwargs)
+        if response.status_code >= 400:
+            try:
+                detail = response.json().get("detail")
+            except ValueError:
+                detail = response.text
+            retry_after = response.headers.get("Retry-After")
+            raise PraxableAPIError(
+                response.status_code, detail, float(retry_after) if retry_after else None
+            )
+        return response
+
+    async def _json(self, method: str, path: str, **kwargs) -> Any:
+        return (await self._request(method, path, **kwargs)).json()
+
+    async def gather(self, *calls: Awaitable) -> List[Any]:
+        """Runs several client calls concurrently (still bounded by `concurrency`)."""
+        return list(await asyncio.gather(*calls))
+
+    # --- Core Values ---
+
+    async def get_values(self) -> List[str]:
+        return [item["value_name"] for item in await self._json("GET", "/values")]
+
+    async def add_value(self, value_name: str) -> None:
+        await self._request("POST", "/values", json={"value_name": value_name})
+
+    async def delete_value(self, value_name: str) -> None:
+        await self._request("DELETE", f"/values/{urllib.parse.quote(value_name, safe='')}")
+
+    # --- Tasks ---
+
+    async def list_tasks(self, limit: Optional[int] = None, offset: int = 0) -> List[TaskRecord]:
+        """One page of tasks, newest first."""
+        params = {"offset": offset}
+        if limit is not None:
+            params["limit"] = limit
+        rows = await self._json("GET", "/tasks", params=params)
+        return [TaskRecord.model_validate(row) for row in rows]
+
+    async def iter_tasks(self, page_size: int = 500) -> AsyncIterator[TaskRecord]:
+        """Walks every task page by page, newest first."""
+        offset = 0
+        while True:
+            page = await self.list_tasks(limit=page_size, offset=offset)
+            for task in page:
+                yield task
+            if len(page) < page_size:
+                return
+            offset += page_size
+
+    async def get_all_tasks(self, page_size: int = 500) -> List[TaskRecord]:
+        return [task async for task in self.iter_tasks(page_size=page_size)]
+
+    async def create_task(self, task: TaskLike) -> TaskRecord:
+        """Creates one task. Returns it as stored, with its new id."""
+        return TaskRecord.model_validate(await self._json("POST", "/tasks", json=_as_payload(task)))
+
+    async def create_tasks(self, tasks: Iterable[TaskLike]) -> int:
+        """
+        Creates many tasks through /tasks/bulk, split into server-sized chunks
+        that are sent concurrently. Returns how many were created.
+        """
+        payloads = [_as_payload(t) for t in tasks]
+        chunks = [payloads[i:i + BULK_CHUNK_SIZE] for i in range(0, len(payloads), BULK_CHUNK_SIZE)]
+        results = await asyncio.gather(*(
+            self._json("POST", "/tasks/bulk", json=chunk) for chunk in chunks
+        ))
+        return sum(result["created"] for result in results)
+
+    async def submit_feedback(self, task_id: int, feedback: Union[TaskFeedback, Dict[str, int]]) -> None:
+        await self._request("POST", f"/tasks/{task_id}/feedback", json=_as_payload(feedback))
+
+    async def submit_feedback_many(self, feedback_by_task: Dict[int, Union[TaskFeedback, Dict[str, int]]]) -> None:
+        """Sends feedback for many tasks concurrently."""
+        await asyncio.gather(*(
+            self.submit_feedback(task_id, feedback) for task_id, feedback in feedback_by_task.items()
+        ))
+
+    async def update_task(self, task_id: int, updates: Union[TaskUpdate, Dict[str, Any]]) -> None:
+        await self._request("PATCH", f"/tasks/{task_id}", json=_as_payload(updates))
+
+    # --- Delta Sync ---
+
+    async def get_changes(self, since: int = 0, limit: Optional[int] = None) -> SyncChanges:
+        """Tasks and values changed after revision `since`; pass the returned revision next time."""
+        params = {"since": since}
+        if limit is not None:
+            params["limit"] = limit
+        return SyncChanges.model_validate(await self._json("GET", "/sync", params=params))
+
+    async def push_mutations(self, mutations: Iterable[Union[SyncMutation, Dict[str, Any]]]) -> List[SyncResult]:
+        """Applies offline mutations; retrying with the same keys is safe."""
+        payload = {"mutations": [_as_payload(m) for m in mutations]}
+        result = await self._json("POST", "/sync", json=payload)
+        return [SyncResult.model_validate(item) for item in result["results"]]
+
+    # --- Planner ---
+
+    async def generate_plan(self, user_input: str, core_values: List[str]) -> Plan:
+        data = await self._json(
+            "POST", "/planner/generate", json={"user_input": user_input, "core_values": core_values}
+        )
+        return Plan.model_validate(data)
+
+    # --- Analytics & Prediction ---
+
+    async def get_alignment_analytics(self) -> Analytics:
+        return Analytics.model_validate(await self._json("GET", "/analytics/alignment"))
+
+    async def predict_fulfillment(
+        self, task_type: str, aligned_value: str, energy_level: int, mood_before: int
+    ) -> Optional[float]:
+        data = await self._json("POST", "/predict/fulfillment", json={
+            "task_type": task_type,
+            "aligned_value": aligned_value,
+            "energy_level": energy_level,
+            "mood_before": mood_before,
+        })
+        return Prediction.model_validate(data).predicted_fulfillment
+
+    async def predict_follow_through(
+        self, tasks: List[Dict[str, Any]], mood_before: int = 5, sleep_quality: int = 7, energy_level: int = 6
+    ) -> List[FollowThrough]:
+        """Follow-through chance and nudge for each task of a day's plan (task, task_type, location, dread_level)."""
+        data = await self._json("POST", "/predict/follow-through", json={
+            "tasks": tasks,
+            "mood_before": mood_before,
+            "sleep_quality": sleep_quality,
+            "energy_level": energy_level,
+        })
+        return [FollowThrough.model_validate(t) for t in data["tasks"]]
+
+    async def retrain(self) -> Dict[str, Any]:
+        return await self._json("POST", "/predict/retrain")
+
+    # --- Calendar & Recommendations ---
+
+    async def get_calendar_events(self) -> List[CalendarEvent]:
+        return [CalendarEvent.model_validate(e) for e in await self._json("GET", "/calendar/today")]
+
+    async def get_free_slots(self) -> List[FreeSlot]:
+        return [FreeSlot.model_validate(s) for s in await self._json("GET", "/scheduler/free")]
+
+    async def get_activities(self) -> List[Activity]:
+        return [Activity.model_validate(a) for a in await self._json("GET", "/recommendations/activities")]
+
+    async def suggest_activities(self, value_names: List[str], min_duration: int = 0) -> List[Recommendation]:
+        data = await self._json(
+            "POST", "/recommendations/suggest",
+            json={"value_names": value_names, "min_duration": min_duration}
+        )
+        return [Recommendation.model_validate(r) for r in data]
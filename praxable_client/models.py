@@ -0,0 +1,160 @@
+"""
+Typed models for the Praxable API.
+
+These mirror the Pydantic schemas in backend/app/main.py. They are duplicated
+on purpose so the client can be installed without the backend and its
+dependencies. Keep them in sync when the API changes.
+"""
+
+from typing import Any, Dict, List, Optional
+
+from pydantic import BaseModel
+
+
+# --- Planner ---
+
+class PlannedTask(BaseModel):
+    task_name: str
+    task_type: str
+    time_preference: str
+    aligned_value: str
+
+
+class Plan(BaseModel):
+    tasks: List[PlannedTask]
+    source: str = "llm"
+
+
+# --- Tasks ---
+
+class TaskCreate(BaseModel):
+    date: str
+    task: str
+    task_type: str
+    aligned_value: str
+    dread_level: int
+    location: str
+    planned_time: str
+    actual_time: str
+    did_it: int
+    mood_before: int
+    sleep_quality: int
+    energy_level: int
+
+
+class TaskRecord(BaseModel):
+    """A task as stored by the API (TaskResponse on the server)."""
+    id: int
+    date: Optional[str] = None
+    task: Optional[str] = None
+    task_type: Optional[str] = None
+    aligned_value: Optional[str] = None
+    dread_level: Optional[int] = None
+    location: Optional[str] = None
+    planned_time: Optional[str] = None
+    actual_time: Optional[str] = None
+    did_it: Optional[int] = None
+    mood_before: Optional[int] = None
+    sleep_quality: Optional[int] = None
+    energy_level: Optional[int] = None
+    mood_after: Optional[int] = None
+    fulfillment_score: Optional[int] = None
+
+
+class TaskFeedback(BaseModel):
+    mood_after: int
+    fulfillment_score: int
+
+
+class TaskUpdate(BaseModel):
+    mood_after: Optional[int] = None
+    fulfillment_score: Optional[int] = None
+    aligned_value: Optional[str] = None
+
+
+# --- Delta Sync ---
+
+class SyncChanges(BaseModel):
+    """What changed after a revision (GET /sync)."""
+    revision: int
+    has_more: bool
+    tasks: List[TaskRecord]
+    deleted_tasks: List[int]
+    values: List[str]
+    deleted_values: List[str]
+
+
+class SyncMutation(BaseModel):
+    key: str
+    op: str
+    task_id: Optional[int] = None
+    task_key: Optional[str] = None
+    base_revision: Optional[int] = None
+    data: Dict[str, Any] = {}
+
+
+class SyncResult(BaseModel):
+    key: str
+    status: str  # "applied", "conflict" or "error"
+    task_id: Optional[int] = None
+    revision: Optional[int] = None
+    deleted: Optional[bool] = None
+    duplicate: Optional[bool] = None
+    detail: Optional[str] = None
+
+
+# --- Analytics & Prediction ---
+
+class ValueBreakdown(BaseModel):
+    value_name: str
+    task_count: int
+    avg_fulfillment: float
+
+
+class Analytics(BaseModel):
+    total_tasks: int
+    breakdown: List[ValueBreakdown]
+
+
+class Prediction(BaseModel):
+    predicted_fulfillment: Optional[float] = None
+
+
+class FollowThrough(BaseModel):
+    task: str
+    probability: float
+    level: str  # "strong", "medium" or "boost"
+    title: str
+    nudge: str
+
+
+# --- Calendar & Recommendations ---
+
+class CalendarEvent(BaseModel):
+    summary: str
+    start: str
+    end: str
+
+
+class FreeSlot(BaseModel):
+    start: str
+    end: str
+    duration_minutes: int
+
+
+class Activity(BaseModel):
+    id: int
+    name: str
+    duration_minutes: int
+    aligned_values: List[str]
+    description: str
+    category: str
+    emoji: str
+
+
+class Recommendation(Activity):
+    matching_values: List[str]
+    match_score: float
+    predicted_fulfillment: Optional[float] = None
+    suggested_slot: FreeSlot
+    all_available_slots: List[FreeSlot]
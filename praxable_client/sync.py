@@ -0,0 +1,78 @@
+"""
+Blocking wrapper around AsyncPraxableClient.
+
+The async client runs on a private event loop in a background thread, so the
+connection pool stays warm between calls and the wrapper can be used from
+plain scripts (or threads) without any asyncio code.
+"""
+
+import asyncio
+import inspect
+import threading
+from typing import Any, Iterator
+
+from .client import AsyncPraxableClient, DEFAULT_BASE_URL
+from .models import TaskRecord
+
+
+class PraxableClient:
+    """
+    Exposes every AsyncPraxableClient method as a regular blocking call:
+
+        with PraxableClient() as client:
+            values = client.get_values()
+            for task in client.iter_tasks():
+                ...
+    """
+
+    def __init__(self, base_url: str = DEFAULT_BASE_URL, **kwargs):
+        self._loop = asyncio.new_event_loop()
+        self._thread = threading.Thread(target=self._loop.run_forever, name="praxable-client", daemon=True)
+        self._thread.start()
+        self._async = self._run(self._create(base_url, **kwargs))
+
+    @staticmethod
+    async def _create(base_url, **kwargs):
+        # Built on the client's own loop so httpx binds its pool there
+        return AsyncPraxableClient(base_url, **kwargs)
+
+    def _run(self, coroutine) -> Any:
+        return asyncio.run_coroutine_threadsafe(coroutine, self._loop).result()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+    def close(self):
+        if self._loop.is_closed():
+            return
+        self._run(self._async.aclose())
+        self._loop.call_soon_threadsafe(self._loop.stop)
+        self._thread.join()
+        self._loop.close()
+
+    def iter_tasks(self, page_size: int = 500) -> Iterator[TaskRecord]:
+        """Blocking version of AsyncPraxableClient.iter_tasks."""
+        offset = 0
+        while True:
+            page = self.list_tasks(limit=page_size, offset=offset)
+            yield from page
+            if len(page) < page_size:
+                return
+            offset += page_size
+
+    def __getattr__(self, name):
+        if name.startswith("_"):
+            raise AttributeError(name)
+        attr = getattr(self._async, name)
+        if not inspect.iscoroutinefunction(attr):
+            return attr
+
+        def blocking(*args, **kwargs):
+            return self._run(attr(*args, **kwargs))
+
+        blocking.__name__ = name
+        blocking.__doc__ = attr.__doc__
+        return blocking
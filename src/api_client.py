@@ -1,19 +1,100 @@
 import requests
 import streamlit as st
 import json
+import threading
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+from streamlit.runtime.scriptrunner import add_script_run_ctx, get_script_run_ctx
 
 # The base URL of our running FastAPI backend.
 # This is the address of our "kitchen".
 BASE_URL = "http://127.0.0.1:8000"
 
+# How long Streamlit may reuse a read result before asking the API again (seconds)
+READ_CACHE_TTL = 30
+
+# --- Shared HTTP Session ---
+# One pooled session for every call: connections are kept alive between
+# requests instead of opening a new TCP connection each time.
+# Idempotent requests are retried with backoff on connection errors and 502/503/504
+# (honouring the API's Retry-After header). POSTs are never retried automatically.
+_retry_policy = Retry(
+    total=3,
+    backoff_factor=0.3,
+    status_forcelist=[502, 503, 504],
+    allowed_methods=["GET", "HEAD", "DELETE"],
+    raise_on_status=False,
+)
+_session = requests.Session()
+_adapter = HTTPAdapter(pool_connections=4, pool_maxsize=16, max_retries=_retry_policy)
+_session.mount("http://", _adapter)
+_session.mount("https://", _adapter)
+
+# Local copies of read-only responses, keyed by URL: {url: (etag, payload)}.
+# The backend answers 304 Not Modified when our copy is still current,
+# so Streamlit reruns don't re-download (or make the server rebuild) the same data.
+_response_cache = {}
+
+def _conditional_get(url):
+    """GETs a URL, revalidating any local copy with If-None-Match."""
+    headers = {}
+    cached = _response_cache.get(url)
+    if cached:
+        headers["If-None-Match"] = cached[0]
+
+    response = _session.get(url, headers=headers)
+    if response.status_code == 304 and cached:
+        return cached[1]
+    response.raise_for_status()
+
+    payload = response.json()
+    etag = response.headers.get("ETag")
+    if etag:
+        _response_cache[url] = (etag, payload)
+    return payload
+
+@st.cache_data(ttl=READ_CACHE_TTL, show_spinner=False)
+def _cached_get(path):
+    """
+    Read calls are cached across Streamlit reruns for READ_CACHE_TTL seconds.
+    Errors are raised (not cached) so the public functions can report them.
+    """
+    return _conditional_get(f"{BASE_URL}{path}")
+
+def _invalidate_reads():
+    """Drops cached reads after a successful write so the next render is fresh."""
+    _cached_get.clear()
+
+def run_parallel(*calls):
+    """
+    Runs independent API calls at the same time and returns their results in order.
+    Each call is a zero-argument function, e.g. run_parallel(get_values, get_all_tasks).
+    """
+    results = [None] * len(calls)
+    ctx = get_script_run_ctx()
+
+    def worker(index, call):
+        results[index] = call()
+
+    threads = []
+    for i, call in enumerate(calls):
+        thread = threading.Thread(target=worker, args=(i, call))
+        # Lets st.error / st.cache_data inside the call work from the thread
+        add_script_run_ctx(thread, ctx)
+        thread.start()
+        threads.append(thread)
+    for thread in threads:
+        thread.join()
+    return results
+
 def get_values():
     """Sends a GET request to the /values endpoint of our API."""
     try:
-        response = requests.get(f"{BASE_URL}/values")
-        response.raise_for_status()  # This will raise an exception for bad responses (4xx or 5xx)
+        # Raises an exception for bad responses (4xx or 5xx)
+        values = _cached_get("/values")
         # The API returns a list of dictionaries, e.g., [{'value_name': 'Health'}].
         # We need to extract just the string names.
-        return [item['value_name'] for item in response.json()]
+        return [item['value_name'] for item in values]
     except requests.exceptions.RequestException as e:
         st.error(f"Error connecting to the API: {e}")
         return [] # Return an empty list on error
@@ -23,8 +104,9 @@ def add_value(value_name: str):
     try:
         # We need to send the data in the JSON format that our Pydantic model expects.
         payload = {"value_name": value_name}
-        response = requests.post(f"{BASE_URL}/values", json=payload)
+        response = _session.post(f"{BASE_URL}/values", json=payload)
         response.raise_for_status()
+        _invalidate_reads()
         return response.json() # Return the full response from the server
     except requests.exceptions.RequestException as e:
         st.error(f"Error connecting to the API: {e}")
@@ -36,8 +118,9 @@ def delete_value(value_name: str):
     """Sends a DELETE request to the /values/{value_name} endpoint."""
     try:
         # The value is part of the URL itself
-        response = requests.delete(f"{BASE_URL}/values/{value_name}")
+        response = _session.delete(f"{BASE_URL}/values/{value_name}")
         response.raise_for_status()
+        _invalidate_reads()
         return True # Return True on success
     except requests.exceptions.RequestException as e:
         st.error(f"Error connecting to the API: {e}")
@@ -52,7 +135,7 @@ def generate_plan_from_text(user_input: str, core_values: list):
             "user_input": user_input,
             "core_values": core_values
         }
-        response = requests.post(f"{BASE_URL}/planner/generate", json=payload)
+        response = _session.post(f"{BASE_URL}/planner/generate", json=payload)
         response.raise_for_status()
         return response.json()
     except requests.exceptions.RequestException as e:
@@ -72,7 +155,7 @@ def generate_plan_with_audio(user_input: str, core_values: list, audio_bytes=Non
         if audio_bytes:
             files["audio_file"] = ("audio.wav", audio_bytes, "audio/wav")
             
-        response = requests.post(f"{BASE_URL}/planner/generate_with_audio", data=data, files=files)
+        response = _session.post(f"{BASE_URL}/planner/generate_with_audio", data=data, files=files)
         response.raise_for_status()
         return response.json()
     except requests.exceptions.RequestException as e:
@@ -80,17 +163,68 @@ def generate_plan_with_audio(user_input: str, core_values: list, audio_bytes=Non
         return None
     
 
+def _iter_sse(response):
+    """Parses a Server-Sent Events response into (event, data) tuples."""
+    event, data_lines = "message", []
+    for line in response.iter_lines(decode_unicode=True):
+        if line is None:
+            continue
+        if line == "":
+            # A blank line terminates the current event
+            if data_lines:
+                yield event, json.loads("\n".join(data_lines))
+            event, data_lines = "message", []
+        elif line.startswith("event:"):
+            event = line[len("event:"):].strip()
+        elif line.startswith("data:"):
+            data_lines.append(line[len("data:"):].strip())
+
+def stream_plan(user_input: str, core_values: list, audio_bytes=None):
+    """
+    Streams a plan from the backend, yielding each task dict as soon as the AI
+    has generated it. Uses /planner/generate/stream (or the audio variant).
+    """
+    try:
+        if audio_bytes:
+            data = {
+                "user_input": user_input,
+                "core_values": json.dumps(core_values)
+            }
+            files = {"audio_file": ("audio.wav", audio_bytes, "audio/wav")}
+            response = _session.post(
+                f"{BASE_URL}/planner/generate_with_audio/stream",
+                data=data, files=files, stream=True
+            )
+        else:
+            payload = {"user_input": user_input, "core_values": core_values}
+            response = _session.post(
+                f"{BASE_URL}/planner/generate/stream", json=payload, stream=True
+            )
+        response.raise_for_status()
+
+        with response:
+            for event, data in _iter_sse(response):
+                if event == "task":
+                    yield data
+                elif event == "error":
+                    st.error(f"AI planner error: {data.get('detail')}")
+                    return
+                elif event == "done":
+                    return
+    except requests.exceptions.RequestException as e:
+        st.error(f"Error connecting to the AI planner: {e}")
+
+
 # ... (at the end of the file)
 import pandas as pd # Add pandas to your imports at the top of the file
 
 def get_all_tasks():
     """Fetches all tasks from the API and returns them as a DataFrame."""
     try:
-        response = requests.get(f"{BASE_URL}/tasks")
-        response.raise_for_status()
+        tasks = _cached_get("/tasks")
         # The API returns a list of dictionaries. Convert it to a DataFrame
         # because our Streamlit UI is already designed to work with one.
-        return pd.DataFrame(response.json())
+        return pd.DataFrame(tasks)
     except requests.exceptions.RequestException as e:
         st.error(f"Error connecting to the API: {e}")
         return pd.DataFrame() # Return an empty DataFrame on error
@@ -98,8 +232,9 @@ def get_all_tasks():
 def log_task(task_dict: dict):
     """Sends a POST request to create a new task."""
     try:
-        response = requests.post(f"{BASE_URL}/tasks", json=task_dict)
+        response = _session.post(f"{BASE_URL}/tasks", json=task_dict)
         response.raise_for_status()
+        _invalidate_reads()
         return response.json()
     except requests.exceptions.RequestException as e:
         st.error(f"Error connecting to the API: {e}")
@@ -109,8 +244,9 @@ def update_task_with_feedback(task_id: int, mood_after: int, fulfillment_score:
     """Sends a POST request to save feedback for a specific task."""
     try:
         payload = {"mood_after": mood_after, "fulfillment_score": fulfillment_score}
-        response = requests.post(f"{BASE_URL}/tasks/{task_id}/feedback", json=payload)
+        response = _session.post(f"{BASE_URL}/tasks/{task_id}/feedback", json=payload)
         response.raise_for_status()
+        _invalidate_reads()
         return response.json()
     except requests.exceptions.RequestException as e:
         st.error(f"Error connecting to the API: {e}")
@@ -120,9 +256,7 @@ def update_task_with_feedback(task_id: int, mood_after: int, fulfillment_score:
 def get_alignment_analytics():
     """Fetches analytics data from the backend."""
     try:
-        response = requests.get(f"{BASE_URL}/analytics/alignment")
-        response.raise_for_status()
-        return response.json()
+        return _cached_get("/analytics/alignment")
     except requests.exceptions.RequestException as e:
         st.error(f"Error connecting to analytics API: {e}")
         return None
@@ -136,7 +270,7 @@ def get_predicted_fulfillment(task_type, aligned_value, energy_level, mood_befor
             "energy_level": energy_level,
             "mood_before": mood_before
         }
-        response = requests.post(f"{BASE_URL}/predict/fulfillment", json=payload)
+        response = _session.post(f"{BASE_URL}/predict/fulfillment", json=payload)
         if response.status_code == 200:
             return response.json().get("predicted_fulfillment")
         return None
@@ -146,13 +280,19 @@ def get_predicted_fulfillment(task_type, aligned_value, energy_level, mood_befor
 def get_calendar_events():
     """Fetches today's calendar events from the backend."""
     try:
-        response = requests.get(f"{BASE_URL}/calendar/today")
-        response.raise_for_status()
-        return response.json()
+        return _cached_get("/calendar/today")
     except requests.exceptions.RequestException as e:
         st.error(f"Error fetching calendar events: {e}")
         return []
 
+def get_free_slots():
+    """Fetches the free time slots left today from the backend."""
+    try:
+        return _cached_get("/scheduler/free")
+    except requests.exceptions.RequestException as e:
+        st.error(f"Error fetching free time: {e}")
+        return []
+
 def add_calendar_event(summary, start_time, end_time):
     """Sends a request to add an event to the calendar."""
     try:
@@ -161,8 +301,9 @@ def add_calendar_event(summary, start_time, end_time):
             "start": start_time,
             "end": end_time
         }
-        response = requests.post(f"{BASE_URL}/calendar/events", json=payload)
+        response = _session.post(f"{BASE_URL}/calendar/events", json=payload)
         response.raise_for_status()
+        _invalidate_reads()
         return response.json()
     except requests.exceptions.RequestException as e:
         st.error(f"Error adding calendar event: {e}")
@@ -1,6 +1,17 @@
+import importlib.util
+import os
+
 # Import our configuration variables
 from src import config
 
+# The messages live with the backend, which serves the same nudges
+# (backend/app/nudges.py imports nothing, so it is loaded straight from its file)
+_NUDGES_PATH = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "backend", "app", "nudges.py")
+_spec = importlib.util.spec_from_file_location("praxable_nudges", _NUDGES_PATH)
+_nudges = importlib.util.module_from_spec(_spec)
+_spec.loader.exec_module(_nudges)
+NUDGES = _nudges.NUDGES
+
 def generate_nudge(probability, task_details):
     """
     Generates a contextual nudge based on the predicted probability and task details.
@@ -16,23 +27,15 @@ def generate_nudge(probability, task_details):
     
     # Check against the strong nudge threshold
     if probability < config.NUDGE_THRESHOLDS["strong"]:
-        return (
-            f"**Strong Nudge:** The model predicts a low follow-through chance for '{task_name}'. "
-            "Try breaking it down. What is the absolute smallest first step you can take? "
-            "Or, try the 5-Minute Rule: just start it for five minutes."
-        )
+        level = "strong"
     
     # Check against the medium nudge threshold
     elif probability < config.NUDGE_THRESHOLDS["medium"]:
-        return (
-            f"**Gentle Reminder:** You're on the fence for '{task_name}'. "
-            "To boost your chances, consider 'temptation bundling.' "
-            "Can you pair this task with something you enjoy, like listening to a podcast?"
-        )
+        level = "medium"
         
     # If probability is high, provide reinforcement
     else:
-        return (
-            f"**Confidence Boost:** You're in a great position to tackle '{task_name}'. "
-            "The conditions look right. Lean into that momentum and get it done!"
-        )
\ No newline at end of file
+        level = "boost"
+
+    title, message = NUDGES[level]
+    return f"**{title}:** " + message.format(task=task_name)
@@ -8,21 +8,18 @@ export function AnalyticsScreen() {
     const [analytics, setAnalytics] = useState<AnalyticsResponse | null>(null);
     const [isLoading, setIsLoading] = useState(true);
 
-    useEffect(() => {
-        loadAnalytics();
-    }, []);
-
-    const loadAnalytics = async () => {
-        setIsLoading(true);
-        try {
-            const data = await api.getAnalytics();
+    // Live: a snapshot now, then updated whenever tasks change
+    useEffect(() => api.subscribeAnalytics(
+        (data) => {
             setAnalytics(data);
-        } catch (error) {
-            console.error('Failed to load analytics:', error);
-        } finally {
+            setIsLoading(false);
+        },
+        undefined,
+        () => {
+            console.error('Analytics stream interrupted; reconnecting');
             setIsLoading(false);
         }
-    };
+    ), []);
 
     const getColorForIndex = (index: number): string => {
         const colors = [
@@ -16,12 +16,11 @@ export function DashboardScreen() {
         setGreeting(getGreeting());
     }, []);
 
+    // Task stats stay current without polling
+    useEffect(() => api.subscribeAnalytics(setAnalytics), []);
+
     const loadDashboardData = async () => {
         try {
-            // Load analytics
-            const analyticsData = await api.getAnalytics();
-            setAnalytics(analyticsData);
-
             // Load calendar for next event
             const events = await api.getCalendarEvents();
             // Simple logic: find first event that hasn't ended yet
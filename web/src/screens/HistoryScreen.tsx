@@ -45,7 +45,7 @@ export function HistoryScreen() {
             // Retrain model automatically after update to ensure recommendations adapt
             await api.retrainModel();
 
-            alert("Task updated and AI retrained! 🧠");
+            alert("Task updated; the AI is retraining in the background 🧠");
             setEditingTask(null);
             loadData(); // Refresh list
         } catch (error) {
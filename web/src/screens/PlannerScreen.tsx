@@ -100,15 +100,18 @@ export function PlannerScreen() {
             for (const task of generatedTasks) {
                 // Parse time preference (e.g., "19:00 - 20:00")
                 const [startTime, endTime] = task.time_preference.split(' - ');
-                // Build ISO datetime strings for today with the given times
-                const startDateTime = `${today}T${startTime}:00`;
-                const endDateTime = `${today}T${endTime}:00`;
-                // Add to calendar events
-                await api.addCalendarEvent(
-                    task.task_name,
-                    startDateTime,
-                    endDateTime
-                );
+                // Tasks that didn't fit in today's free time ("Unscheduled") are only logged
+                if (endTime) {
+                    // Build ISO datetime strings for today with the given times
+                    const startDateTime = `${today}T${startTime}:00`;
+                    const endDateTime = `${today}T${endTime}:00`;
+                    // Add to calendar events
+                    await api.addCalendarEvent(
+                        task.task_name,
+                        startDateTime,
+                        endDateTime
+                    );
+                }
                 // Log the task for tracking and completion
                 await api.logTask({
                     date: today,
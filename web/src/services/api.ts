@@ -9,12 +9,27 @@ import type {
     Recommendation,
     TaskData,
     AnalyticsResponse,
+    AnalyticsSnapshot,
+    AnalyticsDelta,
+    SyncChanges,
+    SyncMutation,
+    SyncResult,
 } from '../types';
 
 // Use environment variable or default to localhost (IPv4 explicit)
 const API_BASE = import.meta.env.VITE_API_BASE_URL || 'http://127.0.0.1:8000';
 console.log('API Service initialized with base URL:', API_BASE);
 
+// Folds a live analytics delta into the current numbers
+const applyAnalyticsDelta = (current: AnalyticsSnapshot, delta: AnalyticsDelta): AnalyticsSnapshot => {
+    const changed = new Set([...delta.removed_values, ...delta.values.map(v => v.value_name)]);
+    const breakdown = current.breakdown
+        .filter(v => !changed.has(v.value_name))
+        .concat(delta.values)
+        .sort((a, b) => a.value_name.localeCompare(b.value_name));
+    return { seq: delta.seq, total_tasks: delta.total_tasks, breakdown };
+};
+
 // API client with all endpoints
 export const api = {
     // Core Values
@@ -95,6 +110,32 @@ export const api = {
         return response.data;
     },
 
+    // Live analytics: onUpdate gets the numbers now and again after every change,
+    // onTasksChanged the ids of created/updated/deleted tasks. Returns a function
+    // that closes the stream. After an error (onError) EventSource reconnects by
+    // itself and starts over with a fresh snapshot.
+    subscribeAnalytics: (
+        onUpdate: (analytics: AnalyticsResponse) => void,
+        onTasksChanged?: (delta: AnalyticsDelta) => void,
+        onError?: () => void
+    ): (() => void) => {
+        const source = new EventSource(`${API_BASE}/analytics/stream`);
+        let current: AnalyticsSnapshot | null = null;
+        source.addEventListener('snapshot', (event) => {
+            current = JSON.parse((event as MessageEvent).data) as AnalyticsSnapshot;
+            onUpdate(current);
+        });
+        source.addEventListener('delta', (event) => {
+            const delta = JSON.parse((event as MessageEvent).data) as AnalyticsDelta;
+            if (!current || delta.seq <= current.seq) return;
+            current = applyAnalyticsDelta(current, delta);
+            onUpdate(current);
+            onTasksChanged?.(delta);
+        });
+        source.onerror = () => onError?.();
+        return () => source.close();
+    },
+
     // Predictions
     getPredictedFulfillment: async (
         taskType: string,
@@ -155,4 +196,18 @@ export const api = {
     retrainModel: async (): Promise<void> => {
         await axios.post(`${API_BASE}/predict/retrain`);
     },
+
+    // Delta Sync: only what changed since `since` (0 = everything)
+    getChanges: async (since: number, limit?: number): Promise<SyncChanges> => {
+        const response = await axios.get(`${API_BASE}/sync`, {
+            params: { since, limit },
+        });
+        return response.data;
+    },
+
+    // Offline edits; safe to retry with the same keys
+    pushMutations: async (mutations: SyncMutation[]): Promise<SyncResult[]> => {
+        const response = await axios.post(`${API_BASE}/sync`, { mutations });
+        return response.data.results;
+    },
 };
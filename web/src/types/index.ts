@@ -63,6 +63,43 @@ export interface TaskData {
     energy_level: number;
 }
 
+// Delta sync (GET/POST /sync)
+export interface SyncChanges {
+    revision: number;       // Pass as `since` next time
+    has_more: boolean;      // Call again right away for the rest
+    tasks: TaskData[];      // Created or changed since the last sync
+    deleted_tasks: number[];
+    values: string[];
+    deleted_values: string[];
+}
+
+export type SyncOp =
+    | 'create_task'
+    | 'update_task'
+    | 'task_feedback'
+    | 'delete_task'
+    | 'add_value'
+    | 'delete_value';
+
+export interface SyncMutation {
+    key: string;            // Unique per mutation; retries reuse it
+    op: SyncOp;
+    task_id?: number;
+    task_key?: string;      // Key of an earlier create_task, for tasks created offline
+    base_revision?: number; // The task's revision when it was last synced
+    data?: Record<string, unknown>;
+}
+
+export interface SyncResult {
+    key: string;
+    status: 'applied' | 'conflict' | 'error';
+    task_id?: number;
+    revision?: number;
+    deleted?: boolean;
+    duplicate?: boolean;
+    detail?: string;
+}
+
 export interface ValueBreakdown {
     value_name: string;
     task_count: number;
@@ -74,6 +111,24 @@ export interface AnalyticsResponse {
     breakdown: ValueBreakdown[];
 }
 
+// Live analytics (GET /analytics/stream)
+export interface AnalyticsSnapshot extends AnalyticsResponse {
+    seq: number;            // Deltas with a seq up to this are already included
+}
+
+export interface AnalyticsDelta {
+    seq: number;
+    total_tasks: number;
+    values: ValueBreakdown[];   // Current numbers for the values that changed
+    removed_values: string[];   // Values no task is aligned with any more
+    tasks: {
+        created: number[];
+        updated: number[];
+        deleted: number[];
+    };
+    tasks_truncated: boolean;   // Too many changes to list: reload the tasks
+}
+
 export interface PredictionRequest {
     task_type: string;
     aligned_value: string;